@@ -0,0 +1,16 @@
+"""Micro-benchmarks and a load script for the bot and API hot paths.
+
+Benchmarks are pytest modules that are not collected by the regular test run
+(``benchmarks`` is in ``norecursedirs``). Run them explicitly::
+
+    make bench           # compare with benchmarks/baseline.json
+    make bench-save      # refresh the baseline on the reference machine
+
+Everything runs offline. Telegram and OpenAI are replaced by the fakes in
+:mod:`benchmarks.fakes`, and the database is in-memory SQLite. Set
+``BENCH_DATABASE_URL`` to run against another database, e.g. PostgreSQL
+started with ``docker run -p 5432:5432 -e POSTGRES_PASSWORD=pg postgres:16``.
+
+:mod:`benchmarks.load` replays a weighted mix of WebApp requests against the
+FastAPI app, either in-process or against a running server.
+"""
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from _pytest.terminal import TerminalReporter
+from sqlalchemy.orm import Session, sessionmaker
+
+from .db import bind_session_factory, make_engine, seed
+from .fakes import offline_openai
+from .harness import Bench, save_baseline
+
+_bench: Bench | None = None
+
+
+@pytest.fixture(scope="session")
+def bench() -> Bench:
+    global _bench
+    if _bench is None:
+        _bench = Bench()
+    return _bench
+
+
+@pytest.fixture(scope="session")
+def session_factory() -> Iterator[sessionmaker[Session]]:
+    """Seeded database shared by all benchmarks of the session."""
+
+    engine = make_engine()
+    factory = sessionmaker(bind=engine, class_=Session)
+    seed(factory)
+    restore = bind_session_factory(factory)
+    try:
+        yield factory
+    finally:
+        restore()
+        engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _offline_openai() -> Iterator[None]:
+    with offline_openai():
+        yield
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    if _bench is None or not _bench.results:
+        return
+    terminalreporter.section("benchmarks")
+    for line in _bench.report():
+        terminalreporter.write_line(line)
+    if _bench.save:
+        save_baseline(_bench.results)
+        terminalreporter.write_line("baseline saved")
@@ -0,0 +1,172 @@
+"""Database fixtures for the benchmarks: engine, session binding and seed data."""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app.diabetes import models  # noqa: F401 - registers all tables
+from services.api.app.diabetes.models_learning import LearningPlan
+from services.api.app.diabetes.services import db
+
+# Fixed reference point so seeded data and timings do not depend on the clock.
+SEED_NOW = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class SeedSize:
+    users: int = 200
+    days: int = 30
+    entries_per_day: int = 6
+    reminders_per_user: int = 3
+
+
+def make_engine(url: str | None = None) -> Engine:
+    """Create the benchmark engine with all tables.
+
+    ``url`` defaults to ``BENCH_DATABASE_URL`` and then to in-memory SQLite.
+    """
+
+    url = url or os.environ.get("BENCH_DATABASE_URL") or "sqlite://"
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        engine = sa.create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    elif url.startswith("sqlite"):
+        # A file database gives each worker thread its own connection.
+        engine = sa.create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        engine = sa.create_engine(url, pool_pre_ping=True)
+        db.Base.metadata.drop_all(engine)
+    db.Base.metadata.create_all(engine)
+    return engine
+
+
+def bind_session_factory(factory: sessionmaker[Session]) -> Callable[[], None]:
+    """Point every loaded app module's ``SessionLocal`` to ``factory``.
+
+    Many modules import ``SessionLocal`` by name, so patching ``db`` alone is
+    not enough. Returns a callable restoring the previous bindings.
+    """
+
+    original = db.SessionLocal
+    patched: list[tuple[object, object]] = []
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("services.api.app") or module is None:
+            continue
+        if getattr(module, "SessionLocal", None) is original:
+            patched.append((module, original))
+            setattr(module, "SessionLocal", factory)
+
+    def restore() -> None:
+        for module, previous in patched:
+            setattr(module, "SessionLocal", previous)
+
+    return restore
+
+
+def seed(factory: sessionmaker[Session], size: SeedSize = SeedSize()) -> None:
+    """Insert users with profiles, diary entries, history and reminders."""
+
+    user_ids = range(1, size.users + 1)
+    start = SEED_NOW - timedelta(days=size.days)
+    step = timedelta(hours=24 / size.entries_per_day)
+    with factory() as session:
+        session.execute(
+            sa.insert(db.User),
+            [
+                {"telegram_id": uid, "thread_id": f"t{uid}", "first_name": f"U{uid}"}
+                for uid in user_ids
+            ],
+        )
+        session.execute(
+            sa.insert(db.Profile),
+            [
+                {
+                    "telegram_id": uid,
+                    "icr": 10.0,
+                    "cf": 2.0,
+                    "target_bg": 6.0,
+                    "low_threshold": 4.0,
+                    "high_threshold": 10.0,
+                    "timezone": "Europe/Moscow",
+                }
+                for uid in user_ids
+            ],
+        )
+        entries = [
+            {
+                "telegram_id": uid,
+                "event_time": start + step * n,
+                "sugar_before": 4.0 + (uid + n) % 9,
+                "xe": (n % 4) * 1.5,
+                "carbs_g": (n % 4) * 18.0,
+                "dose": float(n % 5),
+            }
+            for uid in user_ids
+            for n in range(size.days * size.entries_per_day)
+        ]
+        session.execute(sa.insert(db.Entry), entries)
+        session.execute(
+            sa.insert(db.HistoryRecord),
+            [
+                {
+                    "id": f"h{uid}-{n}",
+                    "telegram_id": uid,
+                    "date": (start + step * n).date(),
+                    "time": (start + step * n).time().replace(microsecond=0),
+                    "sugar": 4.0 + (uid + n) % 9,
+                    "carbs": (n % 4) * 18.0,
+                    "bread_units": (n % 4) * 1.5,
+                    "insulin": float(n % 5),
+                    "type": "meal" if n % 2 else "measurement",
+                }
+                for uid in user_ids
+                for n in range(size.days * 2)
+            ],
+        )
+        session.execute(
+            sa.insert(db.Reminder),
+            [
+                {
+                    "telegram_id": uid,
+                    "type": "sugar",
+                    "kind": "at_time",
+                    "time": time(7 + 5 * r, 0),
+                    "is_enabled": True,
+                }
+                for uid in user_ids
+                for r in range(size.reminders_per_user)
+            ],
+        )
+        session.execute(
+            sa.insert(LearningPlan),
+            [{"user_id": uid, "plan_json": ["intro"]} for uid in user_ids],
+        )
+        session.commit()
+
+
+def seed_day() -> date:
+    """Return a seeded day with a full set of entries."""
+
+    return (SEED_NOW - timedelta(days=1)).date()
+
+
+__all__ = [
+    "SEED_NOW",
+    "SeedSize",
+    "bind_session_factory",
+    "make_engine",
+    "seed",
+    "seed_day",
+]
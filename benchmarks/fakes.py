@@ -0,0 +1,246 @@
+"""Offline stand-ins for Telegram and OpenAI used by the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time as _time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import time, tzinfo
+from types import SimpleNamespace
+from typing import Any
+
+NUTRITION_REPLIES = (
+    "Гречка с курицей\nуглеводы: 45 г\nХЕ: 3.5\nкалории: 420 ккал",
+    "Овсянка на молоке, банан. Углеводы: 52,5 г, XE: 4–5",
+    "Пицца маргарита (2 куска)\nУглеводы: 60 ± 10 г\nХЕ: 5 ± 1",
+    "Салат цезарь без гренок. углеводы 8 г, 0.7 ХЕ",
+)
+
+
+class FakeBot:
+    """Records outgoing messages instead of calling the Bot API."""
+
+    def __init__(self) -> None:
+        self.sent: list[tuple[int | str, str]] = []
+        self._ids = itertools.count(1)
+
+    async def send_message(
+        self, chat_id: int | str, text: str, **kwargs: Any
+    ) -> SimpleNamespace:
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=next(self._ids), chat_id=chat_id, text=text)
+
+
+class FakeJob:
+    def __init__(self, name: str, data: object, next_run_time: object = None) -> None:
+        self.name = name
+        self.id = name
+        self.data = data
+        self.next_run_time = next_run_time
+        self.removed = False
+
+    def schedule_removal(self) -> None:
+        self.removed = True
+
+
+class FakeJobQueue:
+    """Minimal ``JobQueue`` keeping jobs in a dict keyed by name."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, FakeJob] = {}
+
+    def _add(self, name: str | None, data: object) -> FakeJob:
+        job = FakeJob(name or f"job_{len(self._jobs)}", data)
+        self._jobs[job.name] = job
+        return job
+
+    def run_daily(
+        self,
+        callback: Callable[..., object],
+        *,
+        time: time,
+        data: object = None,
+        name: str | None = None,
+        days: tuple[int, ...] = tuple(range(7)),
+        timezone: tzinfo | None = None,
+        job_kwargs: dict[str, object] | None = None,
+    ) -> FakeJob:
+        return self._add(name, data)
+
+    def run_repeating(
+        self,
+        callback: Callable[..., object],
+        *,
+        interval: object,
+        first: object = None,
+        data: object = None,
+        name: str | None = None,
+        job_kwargs: dict[str, object] | None = None,
+    ) -> FakeJob:
+        return self._add(name, data)
+
+    def run_once(
+        self,
+        callback: Callable[..., object],
+        *,
+        when: object,
+        data: object = None,
+        name: str | None = None,
+        timezone: tzinfo | None = None,
+        job_kwargs: dict[str, object] | None = None,
+    ) -> FakeJob:
+        return self._add(name, data)
+
+    def get_jobs_by_name(self, name: str) -> list[FakeJob]:
+        job = self._jobs.get(name)
+        return [job] if job is not None and not job.removed else []
+
+    def jobs(self) -> list[FakeJob]:
+        return [job for job in self._jobs.values() if not job.removed]
+
+
+class _FakeCompletions:
+    def __init__(self) -> None:
+        self._replies = itertools.cycle(NUTRITION_REPLIES)
+        self.calls = 0
+
+    def _reply(self) -> SimpleNamespace:
+        self.calls += 1
+        message = SimpleNamespace(role="assistant", content=next(self._replies))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+        )
+
+
+class _SyncCompletions(_FakeCompletions):
+    def create(self, **kwargs: Any) -> SimpleNamespace:
+        return self._reply()
+
+
+class _AsyncCompletions(_FakeCompletions):
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        return self._reply()
+
+
+class FakeOpenAI:
+    """``OpenAI`` client whose chat completions return canned meal texts."""
+
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=_SyncCompletions())
+
+    def close(self) -> None:
+        return None
+
+
+class FakeAsyncOpenAI:
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=_AsyncCompletions())
+
+    async def close(self) -> None:
+        return None
+
+
+VISION_JSON_REPLY = json.dumps(
+    {
+        "name": "Гречка с курицей",
+        "weight_g": 250,
+        "protein_g": 20,
+        "fat_g": 8,
+        "carbs_g": 45,
+        "calories_kcal": 420,
+        "xe": 3.5,
+    },
+    ensure_ascii=False,
+)
+
+
+class LatentVisionOpenAI:
+    """Sync client for the Assistants photo path; every request sleeps ``latency``."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests = 0
+        self.files = SimpleNamespace(create=self._call(SimpleNamespace(id="file")))
+        run = SimpleNamespace(id="run", thread_id="thread", status="queued")
+        done = SimpleNamespace(id="run", thread_id="thread", status="completed")
+        reply = SimpleNamespace(
+            run_id="run",
+            role="assistant",
+            content=[SimpleNamespace(text=SimpleNamespace(value=NUTRITION_REPLIES[0]))],
+        )
+        self.beta = SimpleNamespace(
+            threads=SimpleNamespace(
+                messages=SimpleNamespace(
+                    create=self._call(SimpleNamespace(id="msg")),
+                    list=self._call(SimpleNamespace(data=[reply])),
+                ),
+                runs=SimpleNamespace(create=self._call(run), retrieve=self._call(done)),
+            )
+        )
+
+    def _call(self, result: object) -> Callable[..., object]:
+        def call(**kwargs: Any) -> object:
+            self.requests += 1
+            _time.sleep(self.latency)
+            return result
+
+        return call
+
+
+class LatentVisionAsyncOpenAI:
+    """Async client answering photo analysis JSON after ``latency``."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs: Any) -> SimpleNamespace:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        message = SimpleNamespace(role="assistant", content=VISION_JSON_REPLY)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+        )
+
+
+@contextmanager
+def offline_openai() -> Iterator[tuple[FakeOpenAI, FakeAsyncOpenAI]]:
+    """Route the OpenAI client getters to the fakes for the duration."""
+
+    from services.api.app.diabetes.services import gpt_client
+    from services.api.app.diabetes.utils import openai_utils
+
+    sync_client = FakeOpenAI()
+    async_client = FakeAsyncOpenAI()
+    patched = [
+        (module, attr, getattr(module, attr))
+        for module in (gpt_client, openai_utils)
+        for attr in ("get_openai_client", "get_async_openai_client")
+    ]
+    for module, attr, _ in patched:
+        client = sync_client if attr == "get_openai_client" else async_client
+        setattr(module, attr, lambda client=client: client)
+    try:
+        yield sync_client, async_client
+    finally:
+        for module, attr, original in patched:
+            setattr(module, attr, original)
+
+
+__all__ = [
+    "FakeAsyncOpenAI",
+    "FakeBot",
+    "FakeJobQueue",
+    "FakeOpenAI",
+    "LatentVisionAsyncOpenAI",
+    "LatentVisionOpenAI",
+    "NUTRITION_REPLIES",
+    "VISION_JSON_REPLY",
+    "offline_openai",
+]
@@ -0,0 +1,188 @@
+"""Timing harness with baseline storage and regression thresholds.
+
+Each benchmark is timed for ``rounds`` runs after ``warmup`` runs; the median
+is compared with ``benchmarks/baseline.json``. A benchmark regresses when its
+median exceeds ``baseline * BENCH_THRESHOLD`` (default 2.0) and is also at
+least ``BENCH_MIN_DELTA_MS`` (default 0.5 ms) slower, so sub-millisecond
+jitter does not fail the run.
+
+``BENCH_SAVE=1`` writes the measured medians as the new baseline instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 2.0
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class BenchResult:
+    name: str
+    rounds: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+
+
+class Regression(AssertionError):
+    """Raised when a benchmark is slower than its baseline allows."""
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, float]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {name: float(value) for name, value in data.get("median_ms", {}).items()}
+
+
+def save_baseline(results: dict[str, BenchResult], path: Path = BASELINE_PATH) -> None:
+    """Store medians of ``results``, keeping baselines of benchmarks not run."""
+
+    medians = load_baseline(path)
+    medians.update({name: round(r.median_ms, 4) for name, r in results.items()})
+    data = {
+        "machine": f"{platform.system()} {platform.machine()} python {platform.python_version()}",
+        "median_ms": dict(sorted(medians.items())),
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+class Bench:
+    """Runs benchmarks, collects results and checks them against a baseline."""
+
+    def __init__(
+        self,
+        baseline: dict[str, float] | None = None,
+        *,
+        threshold: float | None = None,
+        min_delta_ms: float | None = None,
+        save: bool | None = None,
+    ) -> None:
+        self.baseline = load_baseline() if baseline is None else baseline
+        self.threshold = threshold or float(
+            os.environ.get("BENCH_THRESHOLD", DEFAULT_THRESHOLD)
+        )
+        self.min_delta_ms = (
+            min_delta_ms
+            if min_delta_ms is not None
+            else float(os.environ.get("BENCH_MIN_DELTA_MS", DEFAULT_MIN_DELTA_MS))
+        )
+        self.save = os.environ.get("BENCH_SAVE") == "1" if save is None else save
+        self.results: dict[str, BenchResult] = {}
+
+    def _record(self, name: str, timings: list[float]) -> BenchResult:
+        result = BenchResult(
+            name=name,
+            rounds=len(timings),
+            median_ms=statistics.median(timings) * 1000,
+            min_ms=min(timings) * 1000,
+            max_ms=max(timings) * 1000,
+        )
+        self.results[name] = result
+        self.check(result)
+        return result
+
+    def check(self, result: BenchResult) -> None:
+        if self.save:
+            return
+        base = self.baseline.get(result.name)
+        if base is None:
+            return
+        limit = max(base * self.threshold, base + self.min_delta_ms)
+        if result.median_ms > limit:
+            raise Regression(
+                f"{result.name}: median {result.median_ms:.3f} ms > "
+                f"{limit:.3f} ms (baseline {base:.3f} ms)"
+            )
+
+    def run(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        *,
+        rounds: int = 50,
+        warmup: int = 3,
+        setup: Callable[[], Any] | None = None,
+    ) -> BenchResult:
+        """Time ``fn`` (``setup`` runs untimed before every call)."""
+
+        for _ in range(warmup):
+            if setup is not None:
+                setup()
+            fn()
+        timings: list[float] = []
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                if setup is not None:
+                    setup()
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return self._record(name, timings)
+
+    async def arun(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        rounds: int = 50,
+        warmup: int = 3,
+        setup: Callable[[], Awaitable[Any]] | None = None,
+    ) -> BenchResult:
+        """Async counterpart of :meth:`run`."""
+
+        for _ in range(warmup):
+            if setup is not None:
+                await setup()
+            await fn()
+        timings: list[float] = []
+        for _ in range(rounds):
+            if setup is not None:
+                await setup()
+            start = time.perf_counter()
+            await fn()
+            timings.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+        return self._record(name, timings)
+
+    def report(self) -> list[str]:
+        lines = []
+        for name, r in sorted(self.results.items()):
+            base = self.baseline.get(name)
+            ratio = f" x{r.median_ms / base:.2f}" if base else ""
+            lines.append(
+                f"{name:<40} median {r.median_ms:9.3f} ms  "
+                f"min {r.min_ms:9.3f} ms  max {r.max_ms:9.3f} ms{ratio}"
+            )
+        return lines
+
+    def dump(self) -> dict[str, dict[str, Any]]:
+        return {name: asdict(r) for name, r in self.results.items()}
+
+
+__all__ = [
+    "BASELINE_PATH",
+    "Bench",
+    "BenchResult",
+    "Regression",
+    "load_baseline",
+    "save_baseline",
+]
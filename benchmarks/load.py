@@ -0,0 +1,264 @@
+"""Async load generator replaying a WebApp request mix against the API.
+
+Virtual users pick requests from a weighted mix resembling WebApp traffic:
+history and stats reads dominate, with some writes and reminder listings.
+By default the FastAPI app runs in-process on a seeded SQLite file::
+
+    python -m benchmarks.load --users 50 --duration 30
+
+``--base-url`` targets a running server instead. ``--token`` must then be the
+server's ``TELEGRAM_TOKEN`` and ``--user-ids`` must exist in its database.
+``--max-p95-ms`` makes the exit code non-zero when the overall p95 latency
+exceeds the limit, so the script can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import urllib.parse
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+
+import httpx
+
+DEFAULT_TOKEN = "bench-token"
+
+
+@dataclass(slots=True)
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def init_data(user_id: int, token: str) -> str:
+    """Build signed Telegram WebApp init data for ``user_id``."""
+
+    user = json.dumps({"id": user_id, "first_name": "Bench"}, separators=(",", ":"))
+    params = {"auth_date": str(int(time.time())), "query_id": "bench", "user": user}
+    data_check = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    params["hash"] = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(params)
+
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+async def _history_list(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.get("/api/history", params={"limit": 50})
+
+
+async def _history_add(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.post(
+        "/api/history",
+        json={
+            "id": uuid.uuid4().hex,
+            "date": "2025-03-01",
+            "time": "08:30",
+            "sugar": 6.4,
+            "carbs": 45.0,
+            "breadUnits": 3.5,
+            "insulin": 4.0,
+            "type": "meal",
+        },
+    )
+
+
+async def _stats(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.get("/api/stats", params={"telegramId": uid})
+
+
+async def _reminders(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.get("/api/reminders", params={"telegramId": uid})
+
+
+async def _profile(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.get("/api/profile", params={"telegramId": uid})
+
+
+async def _health(client: httpx.AsyncClient, uid: int) -> httpx.Response:
+    return await client.get("/api/health")
+
+
+MIX: dict[str, tuple[int, Request]] = {
+    "GET /api/history": (30, _history_list),
+    "POST /api/history": (15, _history_add),
+    "GET /api/stats": (20, _stats),
+    "GET /api/reminders": (15, _reminders),
+    "GET /api/profile": (10, _profile),
+    "GET /api/health": (10, _health),
+}
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    uid: int,
+    token: str,
+    deadline: float,
+    rng: random.Random,
+    think: float,
+    stats: dict[str, Stats],
+) -> None:
+    names = list(MIX)
+    weights = [MIX[name][0] for name in names]
+    headers = {"Authorization": f"tg {init_data(uid, token)}"}
+    client.headers.update(headers)
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            resp = await MIX[name][1](client, uid)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        stats[name].latencies.append(time.perf_counter() - start)
+        if not ok:
+            stats[name].errors += 1
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+async def _in_process_app(stack: AsyncExitStack, token: str) -> httpx.ASGITransport:
+    # Like the test suite, do not pick up a developer's production ``.env``.
+    os.environ.setdefault("SAHARLIGHT_ENV_FILE", ".env.test")
+
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from services.api.app.config import settings
+    from services.api.app.main import app
+
+    from .db import bind_session_factory, make_engine, seed
+    from .fakes import offline_openai
+
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if url is None:
+        # Concurrent requests need a connection per thread, which an
+        # in-memory database cannot share.
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        url = f"sqlite:///{tmp}/load.db"
+    engine = make_engine(url)
+    stack.callback(engine.dispose)
+    factory = sessionmaker(bind=engine, class_=Session)
+    seed(factory)
+    stack.callback(bind_session_factory(factory))
+    stack.enter_context(offline_openai())
+    previous = settings.telegram_token
+    settings.telegram_token = token
+    stack.callback(setattr, settings, "telegram_token", previous)
+    return httpx.ASGITransport(app=app)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    stats = {name: Stats() for name in MIX}
+    rng = random.Random(args.seed)
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            base_url = args.base_url
+            transport: httpx.AsyncBaseTransport | None = None
+        else:
+            base_url = "http://bench"
+            transport = await _in_process_app(stack, args.token)
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        clients = [
+            await stack.enter_async_context(
+                httpx.AsyncClient(base_url=base_url, transport=transport, timeout=30)
+            )
+            for _ in range(args.users)
+        ]
+        await asyncio.gather(
+            *(
+                _virtual_user(
+                    client,
+                    args.user_ids[i % len(args.user_ids)],
+                    args.token,
+                    deadline,
+                    random.Random(rng.random()),
+                    args.think_ms / 1000,
+                    stats,
+                )
+                for i, client in enumerate(clients)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    summary: dict[str, dict[str, float]] = {}
+    everything = Stats()
+    for name, s in stats.items():
+        everything.latencies.extend(s.latencies)
+        everything.errors += s.errors
+        summary[name] = _summarize(s, elapsed)
+    summary["total"] = _summarize(everything, elapsed)
+    return summary
+
+
+def _summarize(s: Stats, elapsed: float) -> dict[str, float]:
+    return {
+        "requests": len(s.latencies),
+        "errors": s.errors,
+        "rps": round(len(s.latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(s.latencies) * 1000, 2) if s.latencies else 0.0,
+        "p95_ms": round(s.percentile(0.95) * 1000, 2),
+        "p99_ms": round(s.percentile(0.99) * 1000, 2),
+    }
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between requests")
+    parser.add_argument("--base-url", help="target a running server instead of in-process")
+    parser.add_argument("--token", default=DEFAULT_TOKEN, help="bot token used to sign init data")
+    parser.add_argument(
+        "--user-ids",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=list(range(1, 201)),
+        help="comma-separated telegram ids of the virtual users",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="fail when total p95 exceeds this")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    summary = asyncio.run(run(args))
+    for name, row in summary.items():
+        print(
+            f"{name:<22} {row['requests']:>7.0f} req {row['errors']:>5.0f} err "
+            f"{row['rps']:>8.1f} rps  p50 {row['p50_ms']:>8.2f}  "
+            f"p95 {row['p95_ms']:>8.2f}  p99 {row['p99_ms']:>8.2f} ms"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+    total = summary["total"]
+    if total["errors"]:
+        return 1
+    if args.max_p95_ms is not None and total["p95_ms"] > args.max_p95_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from services.api.app.billing import jobs
+from services.api.app.billing.log import BillingLog
+from services.api.app.diabetes.services.db import (
+    Subscription,
+    SubscriptionPlan,
+    SubStatus,
+)
+
+from .db import bind_session_factory, make_engine
+from .harness import Bench
+
+MONTH_END = datetime(2024, 1, 31, 23, 59, tzinfo=timezone.utc)
+TOTAL = 100_000
+
+
+async def test_expire_subscriptions_at_month_end(
+    bench: Bench, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A separate database: the shared seed must not lose its subscriptions.
+    engine = make_engine("sqlite://")
+    factory = sessionmaker(bind=engine, class_=Session)
+    restore = bind_session_factory(factory)
+    monkeypatch.setattr(jobs, "_utcnow", lambda: datetime(2024, 2, 1, tzinfo=timezone.utc))
+
+    async def setup() -> None:
+        with factory() as session:
+            session.execute(sa.delete(BillingLog))
+            session.execute(sa.delete(Subscription))
+            session.execute(
+                sa.insert(Subscription),
+                [
+                    {
+                        "user_id": i,
+                        "plan": SubscriptionPlan.PRO,
+                        "status": SubStatus.active,
+                        "provider": "dummy",
+                        "transaction_id": f"tx{i}",
+                        "end_date": MONTH_END,
+                    }
+                    for i in range(1, TOTAL + 1)
+                ],
+            )
+            session.commit()
+
+    async def run() -> None:
+        await jobs.expire_subscriptions(None)
+
+    try:
+        await bench.arun(
+            f"expire_subscriptions[{TOTAL // 1000}k]", run, rounds=3, warmup=0, setup=setup
+        )
+        with factory() as session:
+            expired = session.scalar(
+                sa.select(sa.func.count()).where(Subscription.status == SubStatus.expired)
+            )
+        assert expired == TOTAL
+    finally:
+        restore()
+        engine.dispose()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from services.api.app.diabetes.services import db
+from services.api.app.services import cohort
+
+from .db import SEED_NOW, make_engine
+from .harness import Bench
+
+PATIENTS = 1000
+DAYS = 90
+PAGE_SIZE = 200
+ORG_ID = 1
+
+
+def _seed_org(factory: sessionmaker[Session]) -> None:
+    with factory() as session:
+        session.execute(
+            sa.insert(db.User),
+            [
+                {"telegram_id": i, "thread_id": "t", "org_id": ORG_ID}
+                for i in range(1, PATIENTS + 1)
+            ],
+        )
+        session.execute(
+            sa.insert(db.Entry),
+            [
+                {
+                    "telegram_id": i,
+                    "event_time": SEED_NOW - timedelta(days=d, hours=i % 24),
+                    "sugar_before": 4.0 + (i + d) % 10,
+                }
+                for i in range(1, PATIENTS + 1)
+                for d in range(DAYS)
+            ],
+        )
+        session.execute(
+            sa.insert(db.Alert),
+            [
+                {"user_id": i, "sugar": 3.0, "type": "hypo", "ts": SEED_NOW}
+                for i in range(1, PATIENTS + 1, 3)
+            ],
+        )
+        session.commit()
+
+
+def test_query_cohort_all_pages(bench: Bench) -> None:
+    # A separate database: the shared seed has no organisation.
+    engine = make_engine("sqlite://")
+    factory = sessionmaker(bind=engine, class_=Session)
+    _seed_org(factory)
+
+    def run() -> None:
+        seen = 0
+        with factory() as session:
+            for page in range(1, PATIENTS // PAGE_SIZE + 1):
+                total, items = cohort.query_cohort(
+                    session,
+                    ORG_ID,
+                    since=SEED_NOW - timedelta(days=DAYS),
+                    page=page,
+                    page_size=PAGE_SIZE,
+                )
+                seen += len(items)
+        assert total == PATIENTS
+        assert seen == PATIENTS
+
+    try:
+        bench.run(f"query_cohort[{PATIENTS} patients x {DAYS} days]", run, rounds=3, warmup=1)
+    finally:
+        engine.dispose()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import itertools
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from services.api.app.assistant.repositories import logs
+from services.api.app.diabetes.handlers.alert_handlers import db_eval
+from services.api.app.routers.history import get_history
+from services.api.app.services.stats import get_day_stats
+
+from .db import seed_day
+from .harness import Bench
+
+
+def test_db_eval(bench: Bench, session_factory: sessionmaker[Session]) -> None:
+    sugars = itertools.cycle((5.5, 12.5, 3.1, 7.0))
+    users = itertools.cycle(range(1, 51))
+
+    def run() -> None:
+        with session_factory() as session:
+            db_eval(session, next(users), next(sugars))
+
+    bench.run("db_eval", run, rounds=100)
+
+
+async def test_get_day_stats(bench: Bench, session_factory: sessionmaker[Session]) -> None:
+    day = seed_day()
+    users = itertools.cycle(range(1, 201))
+
+    async def run() -> None:
+        assert await get_day_stats(next(users), day) is not None
+
+    await bench.arun("get_day_stats", run, rounds=100)
+
+
+async def test_get_history(bench: Bench, session_factory: sessionmaker[Session]) -> None:
+    users = itertools.cycle(range(1, 201))
+
+    async def run() -> None:
+        user = {"id": next(users)}
+        records = await get_history(limit=None, user=user)  # type: ignore[arg-type]
+        assert len(records) == 60
+
+    await bench.arun("get_history[60 records]", run, rounds=100)
+
+
+async def test_flush_pending_logs(
+    bench: Bench, session_factory: sessionmaker[Session]
+) -> None:
+    steps = itertools.count()
+
+    async def setup() -> None:
+        step = next(steps)
+        async with logs.pending_logs_lock:
+            logs.pending_logs.extend(
+                logs._PendingLog(
+                    user_id=uid,
+                    plan_id=uid,
+                    module_idx=0,
+                    step_idx=step,
+                    role=role,
+                    content="Что такое ХЕ?",
+                )
+                for uid in range(1, 101)
+                for role in ("user", "assistant")
+            )
+
+    await bench.arun(
+        "flush_pending_logs[200 logs]",
+        logs.flush_pending_logs,
+        rounds=20,
+        setup=setup,
+    )
+    assert not logs.pending_logs
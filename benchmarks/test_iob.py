@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import datetime
+
+import numpy as np
+
+from services.api.app.diabetes.services.iob import TreatmentState
+from services.api.app.diabetes.utils.calc_bolus import (
+    PatientProfile,
+    calc_bolus,
+    calc_bolus_table,
+)
+
+from .harness import Bench
+
+NOW = datetime.datetime(2025, 3, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def test_calc_bolus_table(bench: Bench) -> None:
+    profile = PatientProfile(icr=12.0, cf=2.5, target_bg=6.0)
+    carbs = np.arange(0, 150, 1.0)
+    bgs = np.arange(3.0, 20.0, 0.1)
+    cells = len(carbs) * len(bgs)
+
+    def per_cell() -> None:
+        for c in carbs:
+            for bg in bgs:
+                calc_bolus(float(c), float(bg), profile, iob=1.0)
+
+    table = bench.run(
+        f"calc_bolus_table[{cells} cells]",
+        lambda: calc_bolus_table(carbs[:, None], bgs[None, :], profile, iob=1.0),
+        rounds=20,
+    )
+    loop = bench.run(f"calc_bolus loop[{cells} cells]", per_cell, rounds=3, warmup=1)
+    assert table.median_ms < loop.median_ms / 10
+
+
+def test_iob_curve(bench: Bench) -> None:
+    state = TreatmentState()
+    for i in range(100):
+        state.upsert(i + 1, NOW - datetime.timedelta(minutes=2 * i), 0.5, 5.0)
+    points = NOW.timestamp() + np.arange(0, 360, 5) * 60.0
+
+    bench.run("iob_curve[100 doses x 72 points]", lambda: state.iob_curve(points, 4.0, 75.0))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import io
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from services.api.app.diabetes.lab_documents import read_pdf_text
+
+from .harness import Bench
+
+PAGES = 40
+
+
+def _lab_report(pages: int) -> bytes:
+    """Two pages of results followed by ``pages - 2`` pages of comments."""
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        y = 800
+        for row in range(45):
+            if page < 2:
+                line = f"Analyte {page}-{row}: {4 + row % 5}.{row % 10} (3.3-5.5)"
+            else:
+                line = "Interpretation notes and terms of the laboratory. " * 2
+            pdf.drawString(30, y, line)
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_read_lab_pdf(bench: Bench) -> None:
+    data = _lab_report(PAGES)
+
+    def full_read() -> None:
+        reader = PdfReader(io.BytesIO(data))
+        "\n".join(page.extract_text() or "" for page in reader.pages)
+
+    def bounded_read() -> None:
+        result = read_pdf_text(data, 20)
+        assert result.pages_read == 3
+
+    bench.run(f"pdf_full_read[{PAGES} pages]", full_read, rounds=5, warmup=1)
+    bench.run(f"read_pdf_text[{PAGES} pages]", bounded_read, rounds=5, warmup=1)
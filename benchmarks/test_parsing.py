@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from services.api.app.diabetes.utils.functions import (
+    extract_nutrition_info,
+    smart_input,
+)
+
+from .fakes import NUTRITION_REPLIES, FakeOpenAI
+from .harness import Bench
+
+SMART_INPUTS = (
+    "сахар 7,8 xe 3 доза 4",
+    "sugar=6.2 dose=2.5",
+    "5 ммоль 2 ХЕ",
+    "xe 2.5 сахар 11",
+    "доза 6",
+)
+
+
+def test_smart_input(bench: Bench) -> None:
+    def run() -> None:
+        for text in SMART_INPUTS:
+            smart_input(text)
+
+    bench.run("smart_input", run, rounds=200)
+
+
+def test_extract_nutrition_info(bench: Bench) -> None:
+    client = FakeOpenAI()
+
+    def run() -> None:
+        for _ in NUTRITION_REPLIES:
+            reply = client.chat.completions.create(model="fake", messages=[])
+            extract_nutrition_info(reply.choices[0].message.content)
+
+    bench.run("extract_nutrition_info", run, rounds=200)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import time
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from services.api.app.diabetes.handlers import reminder_handlers
+from services.api.app.diabetes.services.db import Reminder
+from services.api.app.diabetes.services.reminders_schedule import compute_next
+
+from .fakes import FakeJobQueue
+from .harness import Bench
+
+TZ = ZoneInfo("Europe/Moscow")
+
+
+def test_compute_next(bench: Bench) -> None:
+    reminders = [
+        Reminder(kind="at_time", time=time(23, 30), days_mask=0b0100000),
+        Reminder(kind="at_time", time=time(8, 0), days_mask=0),
+        Reminder(kind="every", interval_minutes=90),
+        Reminder(kind="after_event", minutes_after=120),
+    ]
+
+    def run() -> None:
+        for rem in reminders:
+            compute_next(rem, TZ)
+
+    bench.run("compute_next", run, rounds=200)
+
+
+def test_schedule_all(bench: Bench, session_factory: sessionmaker[Session]) -> None:
+    queue = FakeJobQueue()
+
+    def setup() -> None:
+        nonlocal queue
+        queue = FakeJobQueue()
+
+    bench.run(
+        "schedule_all[600 reminders]",
+        lambda: reminder_handlers.schedule_all(queue),  # type: ignore[arg-type]
+        rounds=5,
+        warmup=1,
+        setup=setup,
+    )
+    assert len(queue.jobs()) == 600
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import sessionmaker
+
+import services.api.app.diabetes.handlers.reporting_handlers as handlers
+from services.api.app.diabetes.services.db import Base, Entry, User
+from services.api.app.diabetes.services.reporting import (
+    generate_pdf_report,
+    make_sugar_plot,
+)
+
+from .db import SEED_NOW
+from .harness import Bench
+
+ENTRIES = 50_000
+START = datetime.datetime(2024, 1, 1)
+
+
+def test_generate_pdf_report(bench: Bench) -> None:
+    entries = [
+        SimpleNamespace(
+            event_time=SEED_NOW - datetime.timedelta(hours=4 * n),
+            sugar_before=4.0 + n % 9,
+            carbs_g=40.0,
+            xe=3.3,
+            dose=6.0,
+        )
+        for n in range(180)
+    ]
+    plot = make_sugar_plot(entries, "30 дней")
+    day_lines = [
+        f"{(SEED_NOW - datetime.timedelta(days=d)):%d.%m}: сахар 7.4, доза 18, углеводы 160"
+        for d in range(30)
+    ]
+    errors = [f"{d:02d}.02: высокий сахар 14.2" for d in range(1, 11)]
+
+    def run() -> None:
+        plot.seek(0)
+        generate_pdf_report(
+            ["Всего записей: 180", "Средний сахар: 7.4"],
+            errors,
+            day_lines,
+            "Рекомендации: " + "держите сахар в целевом диапазоне. " * 40,
+            plot,
+        )
+
+    bench.run("generate_pdf_report[30 days]", run, rounds=10, warmup=1)
+
+
+@pytest.fixture
+def heavy_user(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'report.db'}")
+    Base.metadata.create_all(engine)
+    TestSession = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with TestSession() as session:
+        session.add(User(telegram_id=1, thread_id="tid"))
+        session.commit()
+        session.execute(
+            sa.insert(Entry),
+            [
+                {
+                    "telegram_id": 1,
+                    "event_time": START + datetime.timedelta(minutes=10 * i),
+                    "sugar_before": 2.5 + (i % 120) / 10,
+                    "carbs_g": 30.0,
+                    "dose": 2.0,
+                }
+                for i in range(ENTRIES)
+            ],
+        )
+        session.commit()
+    monkeypatch.setattr(handlers, "SessionLocal", TestSession)
+    yield
+    engine.dispose()
+
+
+@pytest.mark.usefixtures("heavy_user")
+def test_collect_report_memory_for_50k_entries() -> None:
+    # Warm up imports and SQLAlchemy caches on the last day only.
+    handlers._collect_report(1, START + datetime.timedelta(days=340)).close()
+
+    tracemalloc.start()
+    try:
+        data = handlers._collect_report(1, START)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    try:
+        assert data.total == ENTRIES
+        assert len(data.day_lines) == ENTRIES
+        assert len(data.series) == ENTRIES
+        assert data.digest.entries == ENTRIES
+        assert sum(1 for _ in data.day_lines) == ENTRIES
+    finally:
+        data.close()
+    # Loading the same rows as ORM objects peaks at ~80 MB.
+    assert peak < 8 * 1024 * 1024, f"peak {peak / 1e6:.1f} MB"
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pickle
+import tracemalloc
+from collections.abc import Callable
+
+from services.api.app.diabetes.user_session import UserSession
+
+from .harness import Bench
+
+USERS = 200
+
+
+def _user_data(user_id: int) -> dict[str, object]:
+    return {
+        "tg_init_data": f"query_id=AA{user_id:08d}&user=%7B%22id%22%3A{user_id}%7D",
+        "thread_id": f"thread_{user_id}",
+        "learning_plan_id": user_id,
+        "learning_plan_index": 3,
+        "learning_module_idx": 1,
+        "learning_onboarded": True,
+        "learn_profile_overrides": {"age_group": "adult", "diabetes_type": "T2"},
+        "assistant_last_mode": "chat",
+        "assistant_history": [
+            f"user: вопрос {i} про сахар\nassistant: ответ {i} про сахар" for i in range(20)
+        ],
+        "assistant_summary": "user: какой сахар в норме?; assistant: 4-7 ммоль/л.",
+        "learning_plan": [f"Шаг {i}: тема урока {i}" for i in range(12)],
+    }
+
+
+def _loaded_bytes(make: Callable[[dict[str, object]], object]) -> int:
+    """Memory held by ``USERS`` sessions right after loading the persistence file."""
+
+    raw = pickle.dumps({uid: make(_user_data(uid)) for uid in range(USERS)})
+    tracemalloc.start()
+    try:
+        loaded = pickle.loads(raw)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(loaded) == USERS
+    return size
+
+
+def test_user_session_memory() -> None:
+    as_dict = _loaded_bytes(dict)
+    as_session = _loaded_bytes(UserSession)
+    assert as_session < as_dict, (
+        f"per user: UserSession {as_session // USERS} B, dict {as_dict // USERS} B"
+    )
+
+
+def test_serialize_user_data(bench: Bench) -> None:
+    dicts = {uid: _user_data(uid) for uid in range(USERS)}
+    # Steady state of the persistence: sessions were loaded from the file and
+    # a few users touched their assistant history since.
+    sessions = pickle.loads(pickle.dumps({uid: UserSession(d) for uid, d in dicts.items()}))
+    for uid in range(0, USERS, 10):
+        sessions[uid]["assistant_history"].append("user: ещё вопрос")
+
+    bench.run(f"pickle user_data[dict x{USERS}]", lambda: pickle.dumps(dicts), rounds=50)
+    bench.run(
+        f"pickle user_data[UserSession x{USERS}]",
+        lambda: pickle.dumps(sessions),
+        rounds=50,
+    )
@@ -0,0 +1,69 @@
+"""End-to-end latency of the two photo analysis backends.
+
+Every OpenAI request of the fakes costs ``ROUND_TRIP`` seconds, standing in
+for network latency.  The Assistants path pays it for the upload, message,
+run, one run poll and the message list (the 2 s poll interval of
+``photo_handler`` is left out); the Chat Completions path for one request.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from services.api.app.config import settings
+from services.api.app.diabetes.prompts import (
+    PHOTO_ANALYSIS_JSON_PROMPT,
+    PHOTO_ANALYSIS_PROMPT,
+)
+from services.api.app.diabetes.services import gpt_client
+from services.api.app.diabetes.utils.executors import run_in_executor
+from services.api.app.diabetes.utils.functions import extract_nutrition_info
+
+from .fakes import LatentVisionAsyncOpenAI, LatentVisionOpenAI
+from .harness import Bench
+
+ROUND_TRIP = 0.02
+IMAGE = b"\xff\xd8\xff" + bytes(200_000)
+
+
+async def test_photo_analysis_backends(
+    bench: Bench, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sync_client = LatentVisionOpenAI(ROUND_TRIP)
+    async_client = LatentVisionAsyncOpenAI(ROUND_TRIP)
+
+    async def get_async_client() -> LatentVisionAsyncOpenAI:
+        return async_client
+
+    monkeypatch.setattr(gpt_client, "_get_client", lambda: sync_client)
+    monkeypatch.setattr(gpt_client, "_get_async_client", get_async_client)
+    monkeypatch.setattr(settings, "openai_api_key", "bench")
+    monkeypatch.setattr(settings, "openai_assistant_id", "asst_bench")
+
+    async def thread_path() -> None:
+        run = await gpt_client.send_message(
+            thread_id="thread", content=PHOTO_ANALYSIS_PROMPT, image_bytes=IMAGE
+        )
+        while run.status != "completed":
+            run = await run_in_executor(
+                "openai_sync",
+                sync_client.beta.threads.runs.retrieve,
+                thread_id=run.thread_id,
+                run_id=run.id,
+            )
+        messages = await run_in_executor(
+            "openai_sync", sync_client.beta.threads.messages.list, thread_id="thread"
+        )
+        info = extract_nutrition_info(messages.data[0].content[0].text.value)
+        assert info.carbs_g is not None
+
+    async def chat_path() -> None:
+        _, info = await gpt_client.analyze_photo(IMAGE, prompt=PHOTO_ANALYSIS_JSON_PROMPT)
+        assert info.carbs_g is not None
+
+    thread = await bench.arun("photo_analysis[assistants]", thread_path, rounds=10, warmup=1)
+    chat = await bench.arun("photo_analysis[chat]", chat_path, rounds=10, warmup=1)
+
+    assert sync_client.requests == 11 * 5
+    assert async_client.requests == 11
+    assert chat.median_ms < thread.median_ms
@@ -0,0 +1,98 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Diabetes Assistant API
+ * No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+
+import * as runtime from '../runtime';
+import type {
+  CohortPage,
+  HTTPValidationError,
+} from '../models/index';
+import {
+    CohortPageFromJSON,
+    CohortPageToJSON,
+    HTTPValidationErrorFromJSON,
+    HTTPValidationErrorToJSON,
+} from '../models/index';
+
+export interface CohortGetRequest {
+    orgId: number;
+    days?: number;
+    page?: number;
+    pageSize?: number;
+}
+
+/**
+ * 
+ */
+export class CohortApi extends runtime.BaseAPI {
+
+    /**
+     * Return time-in-range, average sugar, alert counts and last-seen for each patient of an organisation over the last `days` days. Available to clinicians and org admins of that organisation. Pages are cached for a short time.
+     * Get Cohort Stats
+     */
+    async cohortGetRaw(requestParameters: CohortGetRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<CohortPage>> {
+        if (requestParameters['orgId'] == null) {
+            throw new runtime.RequiredError(
+                'orgId',
+                'Required parameter "orgId" was null or undefined when calling cohortGet().'
+            );
+        }
+
+        const queryParameters: any = {};
+
+        if (requestParameters['orgId'] != null) {
+            queryParameters['orgId'] = requestParameters['orgId'];
+        }
+
+        if (requestParameters['days'] != null) {
+            queryParameters['days'] = requestParameters['days'];
+        }
+
+        if (requestParameters['page'] != null) {
+            queryParameters['page'] = requestParameters['page'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['pageSize'] = requestParameters['pageSize'];
+        }
+
+        const headerParameters: runtime.HTTPHeaders = {};
+
+        if (this.configuration && this.configuration.apiKey) {
+            headerParameters["Authorization"] = await this.configuration.apiKey("Authorization"); // telegramInitData authentication
+        }
+
+
+        let urlPath = `/cohort`;
+
+        const response = await this.request({
+            path: urlPath,
+            method: 'GET',
+            headers: headerParameters,
+            query: queryParameters,
+        }, initOverrides);
+
+        return new runtime.JSONApiResponse(response, (jsonValue) => CohortPageFromJSON(jsonValue));
+    }
+
+    /**
+     * Return time-in-range, average sugar, alert counts and last-seen for each patient of an organisation over the last `days` days. Available to clinicians and org admins of that organisation. Pages are cached for a short time.
+     * Get Cohort Stats
+     */
+    async cohortGet(requestParameters: CohortGetRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<CohortPage> {
+        const response = await this.cohortGetRaw(requestParameters, initOverrides);
+        return await response.value();
+    }
+
+}
@@ -0,0 +1,115 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Diabetes Assistant API
+ * No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+
+import * as runtime from '../runtime';
+import type {
+  HTTPValidationError,
+} from '../models/index';
+import {
+    HTTPValidationErrorFromJSON,
+    HTTPValidationErrorToJSON,
+} from '../models/index';
+
+export interface ExportGetRequest {
+    format?: ExportGetFormatEnum;
+    kind?: ExportGetKindEnum;
+    dateFrom?: Date;
+    dateTo?: Date;
+    gzip?: boolean;
+}
+
+/**
+ * 
+ */
+export class ExportApi extends runtime.BaseAPI {
+
+    /**
+     * Stream the user\'s diary entries and history records as NDJSON or CSV, optionally gzip-compressed. Rows are read through a server-side cursor, so large histories are not loaded into memory.
+     * Export Diary
+     */
+    async exportGetRaw(requestParameters: ExportGetRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<string>> {
+        const queryParameters: any = {};
+
+        if (requestParameters['format'] != null) {
+            queryParameters['format'] = requestParameters['format'];
+        }
+
+        if (requestParameters['kind'] != null) {
+            queryParameters['kind'] = requestParameters['kind'];
+        }
+
+        if (requestParameters['dateFrom'] != null) {
+            queryParameters['dateFrom'] = (requestParameters['dateFrom'] as any).toISOString().substring(0,10);
+        }
+
+        if (requestParameters['dateTo'] != null) {
+            queryParameters['dateTo'] = (requestParameters['dateTo'] as any).toISOString().substring(0,10);
+        }
+
+        if (requestParameters['gzip'] != null) {
+            queryParameters['gzip'] = requestParameters['gzip'];
+        }
+
+        const headerParameters: runtime.HTTPHeaders = {};
+
+        if (this.configuration && this.configuration.apiKey) {
+            headerParameters["Authorization"] = await this.configuration.apiKey("Authorization"); // telegramInitData authentication
+        }
+
+
+        let urlPath = `/export`;
+
+        const response = await this.request({
+            path: urlPath,
+            method: 'GET',
+            headers: headerParameters,
+            query: queryParameters,
+        }, initOverrides);
+
+        if (this.isJsonMime(response.headers.get('content-type'))) {
+            return new runtime.JSONApiResponse<string>(response);
+        } else {
+            return new runtime.TextApiResponse(response) as any;
+        }
+    }
+
+    /**
+     * Stream the user\'s diary entries and history records as NDJSON or CSV, optionally gzip-compressed. Rows are read through a server-side cursor, so large histories are not loaded into memory.
+     * Export Diary
+     */
+    async exportGet(requestParameters: ExportGetRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<string> {
+        const response = await this.exportGetRaw(requestParameters, initOverrides);
+        return await response.value();
+    }
+
+}
+
+/**
+ * @export
+ */
+export const ExportGetFormatEnum = {
+    Ndjson: 'ndjson',
+    Csv: 'csv'
+} as const;
+export type ExportGetFormatEnum = typeof ExportGetFormatEnum[keyof typeof ExportGetFormatEnum];
+/**
+ * @export
+ */
+export const ExportGetKindEnum = {
+    All: 'all',
+    Entries: 'entries',
+    History: 'history'
+} as const;
+export type ExportGetKindEnum = typeof ExportGetKindEnum[keyof typeof ExportGetKindEnum];
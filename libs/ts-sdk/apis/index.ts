@@ -1,6 +1,8 @@
 /* tslint:disable */
 /* eslint-disable */
+export * from './CohortApi';
 export * from './DefaultApi';
+export * from './ExportApi';
 export * from './HistoryApi';
 export * from './OnboardingApi';
 export * from './ProfilesApi';
@@ -0,0 +1,119 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Diabetes Assistant API
+ * No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { CohortPatient } from './CohortPatient';
+import {
+    CohortPatientFromJSON,
+    CohortPatientFromJSONTyped,
+    CohortPatientToJSON,
+    CohortPatientToJSONTyped,
+} from './CohortPatient';
+
+/**
+ * 
+ * @export
+ * @interface CohortPage
+ */
+export interface CohortPage {
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPage
+     */
+    orgId: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPage
+     */
+    days: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPage
+     */
+    page: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPage
+     */
+    pageSize: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPage
+     */
+    total: number;
+    /**
+     * 
+     * @type {Array<CohortPatient>}
+     * @memberof CohortPage
+     */
+    items: Array<CohortPatient>;
+}
+
+/**
+ * Check if a given object implements the CohortPage interface.
+ */
+export function instanceOfCohortPage(value: object): value is CohortPage {
+    if (!('orgId' in value) || value['orgId'] === undefined) return false;
+    if (!('days' in value) || value['days'] === undefined) return false;
+    if (!('page' in value) || value['page'] === undefined) return false;
+    if (!('pageSize' in value) || value['pageSize'] === undefined) return false;
+    if (!('total' in value) || value['total'] === undefined) return false;
+    if (!('items' in value) || value['items'] === undefined) return false;
+    return true;
+}
+
+export function CohortPageFromJSON(json: any): CohortPage {
+    return CohortPageFromJSONTyped(json, false);
+}
+
+export function CohortPageFromJSONTyped(json: any, ignoreDiscriminator: boolean): CohortPage {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'orgId': json['orgId'],
+        'days': json['days'],
+        'page': json['page'],
+        'pageSize': json['pageSize'],
+        'total': json['total'],
+        'items': ((json['items'] as Array<any>).map(CohortPatientFromJSON)),
+    };
+}
+
+export function CohortPageToJSON(json: any): CohortPage {
+    return CohortPageToJSONTyped(json, false);
+}
+
+export function CohortPageToJSONTyped(value?: CohortPage | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'orgId': value['orgId'],
+        'days': value['days'],
+        'page': value['page'],
+        'pageSize': value['pageSize'],
+        'total': value['total'],
+        'items': ((value['items'] as Array<any>).map(CohortPatientToJSON)),
+    };
+}
+
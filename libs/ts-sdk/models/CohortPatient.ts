@@ -0,0 +1,125 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Diabetes Assistant API
+ * No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+/**
+ * 
+ * @export
+ * @interface CohortPatient
+ */
+export interface CohortPatient {
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    telegramId: number;
+    /**
+     * 
+     * @type {string}
+     * @memberof CohortPatient
+     */
+    firstName?: string | null;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    readings: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    averageSugar?: number | null;
+    /**
+     * Share of readings within 3.9–10.0 mmol/L, percent.
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    timeInRange?: number | null;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    alerts: number;
+    /**
+     * 
+     * @type {number}
+     * @memberof CohortPatient
+     */
+    openAlerts: number;
+    /**
+     * 
+     * @type {Date}
+     * @memberof CohortPatient
+     */
+    lastSeen?: Date | null;
+}
+
+/**
+ * Check if a given object implements the CohortPatient interface.
+ */
+export function instanceOfCohortPatient(value: object): value is CohortPatient {
+    if (!('telegramId' in value) || value['telegramId'] === undefined) return false;
+    if (!('readings' in value) || value['readings'] === undefined) return false;
+    if (!('alerts' in value) || value['alerts'] === undefined) return false;
+    if (!('openAlerts' in value) || value['openAlerts'] === undefined) return false;
+    return true;
+}
+
+export function CohortPatientFromJSON(json: any): CohortPatient {
+    return CohortPatientFromJSONTyped(json, false);
+}
+
+export function CohortPatientFromJSONTyped(json: any, ignoreDiscriminator: boolean): CohortPatient {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'telegramId': json['telegramId'],
+        'firstName': json['firstName'] == null ? undefined : json['firstName'],
+        'readings': json['readings'],
+        'averageSugar': json['averageSugar'] == null ? undefined : json['averageSugar'],
+        'timeInRange': json['timeInRange'] == null ? undefined : json['timeInRange'],
+        'alerts': json['alerts'],
+        'openAlerts': json['openAlerts'],
+        'lastSeen': json['lastSeen'] == null ? undefined : (new Date(json['lastSeen'])),
+    };
+}
+
+export function CohortPatientToJSON(json: any): CohortPatient {
+    return CohortPatientToJSONTyped(json, false);
+}
+
+export function CohortPatientToJSONTyped(value?: CohortPatient | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'telegramId': value['telegramId'],
+        'firstName': value['firstName'],
+        'readings': value['readings'],
+        'averageSugar': value['averageSugar'],
+        'timeInRange': value['timeInRange'],
+        'alerts': value['alerts'],
+        'openAlerts': value['openAlerts'],
+        'lastSeen': value['lastSeen'] === null ? null : ((value['lastSeen'] as any)?.toISOString()),
+    };
+}
+
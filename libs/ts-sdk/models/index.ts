@@ -1,6 +1,8 @@
 /* tslint:disable */
 /* eslint-disable */
 export * from './AnalyticsPoint';
+export * from './CohortPage';
+export * from './CohortPatient';
 export * from './DayStats';
 export * from './EventPayload';
 export * from './HTTPValidationError';
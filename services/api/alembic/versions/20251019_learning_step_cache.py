@@ -0,0 +1,39 @@
+"""add learning_step_cache"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20251019_learning_step_cache"
+down_revision: Union[str, None] = "20251019_subscriptions_live_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "learning_step_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("topic_slug", sa.String(), nullable=False),
+        sa.Column("step_idx", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        "ix_learning_step_cache_topic_slug", "learning_step_cache", ["topic_slug"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_learning_step_cache_topic_slug", table_name="learning_step_cache")
+    op.drop_table("learning_step_cache")
@@ -0,0 +1,32 @@
+"""add partial index on live subscriptions (status, end_date)"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20251019_subscriptions_live_index"
+down_revision: Union[str, None] = "20251019_onboarding_metrics_watermark"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_WHERE = "status IN ('trial', 'active') AND end_date IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_subscriptions_live_status_end_date",
+        "subscriptions",
+        ["status", "end_date"],
+        postgresql_where=sa.text(_WHERE),
+        sqlite_where=sa.text(_WHERE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_subscriptions_live_status_end_date", table_name="subscriptions"
+    )
@@ -0,0 +1,144 @@
+"""Token-budgeted prompts for the assistant chat.
+
+:func:`build_messages` sends the rolling summary, then as many of the most
+recent turns as fit into ``ASSISTANT_CONTEXT_TOKENS``, then the question.
+Turns that no longer fit are still covered by the summary, which
+:func:`assistant_state.add_turn` compacts extractively on the hot path.
+
+With ``ASSISTANT_SUMMARY_LLM`` enabled, :func:`schedule_refine` also
+rewrites a grown summary with ``ASSISTANT_SUMMARY_MODEL`` in a background
+task and persists the result with :func:`memory_service.save_memory`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable, MutableMapping
+from datetime import datetime, timezone
+
+import httpx
+from openai import OpenAIError
+from sqlalchemy.exc import SQLAlchemyError
+
+from ...config import settings
+from ...diabetes import assistant_state
+from ...diabetes.services import gpt_client
+from ...diabetes.services.repository import CommitError
+from ...diabetes.utils.tokens import count_tokens
+from . import memory_service
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["build_messages", "schedule_refine"]
+
+# Role and separators the API adds around every message.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Краткое содержание предыдущего разговора:\n"
+REFINE_PROMPT = (
+    "Сожми заметки о разговоре пользователя с ассистентом по диабету. "
+    "Сохрани факты о пользователе, его вопросы и договорённости, убери повторы. "
+    "Пиши кратко, по одному пункту в строке."
+)
+
+_tasks: set[asyncio.Task[None]] = set()
+
+
+def _tokens(content: str) -> int:
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _turn_messages(turn: str) -> list[dict[str, str]]:
+    user_part, _, assistant_part = turn.partition("\nassistant: ")
+    if user_part.startswith("user: "):
+        user_part = user_part[6:]
+    messages = [{"role": "user", "content": user_part}]
+    if assistant_part:
+        messages.append({"role": "assistant", "content": assistant_part})
+    return messages
+
+
+def build_messages(
+    summary: str | None,
+    history: Iterable[str],
+    user_text: str,
+    *,
+    budget: int | None = None,
+) -> list[dict[str, str]]:
+    """Return chat messages for ``user_text`` within ``budget`` tokens.
+
+    The summary and the question are always included; recent turns are
+    added newest first until the next one would exceed the budget.
+    """
+
+    if budget is None:
+        budget = settings.assistant_context_tokens
+    head: list[dict[str, str]] = []
+    used = _tokens(user_text)
+    if summary:
+        content = SUMMARY_PREFIX + summary
+        head.append({"role": "system", "content": content})
+        used += _tokens(content)
+
+    turns: list[dict[str, str]] = []
+    for turn in reversed(list(history)):
+        messages = _turn_messages(turn)
+        cost = sum(_tokens(m["content"]) for m in messages)
+        if used + cost > budget:
+            break
+        turns[:0] = messages
+        used += cost
+    return [*head, *turns, {"role": "user", "content": user_text}]
+
+
+async def _refine(
+    user_id: int, user_data: MutableMapping[str, object], summary: str
+) -> None:
+    try:
+        completion = await gpt_client.create_chat_completion(
+            model=settings.assistant_summary_model,
+            messages=[
+                {"role": "system", "content": REFINE_PROMPT},
+                {"role": "user", "content": summary},
+            ],
+            temperature=0,
+            max_tokens=settings.assistant_summary_tokens,
+            task="assistant_summary",
+        )
+    except (OpenAIError, httpx.HTTPError, RuntimeError, asyncio.TimeoutError) as exc:
+        logger.warning("Failed to refine summary of user %s: %s", user_id, exc)
+        return
+    if getattr(completion, "id", None) == "static" or not completion.choices:
+        return
+    text = (completion.choices[0].message.content or "").strip()
+    if not text or user_data.get(assistant_state.SUMMARY_KEY) != summary:
+        # Nothing useful came back or a newer turn changed the summary.
+        return
+    compact = assistant_state.compact_summary(None, text)
+    user_data[assistant_state.SUMMARY_KEY] = compact
+    try:
+        memory = await memory_service.get_memory(user_id)
+        await memory_service.save_memory(
+            user_id,
+            turn_count=memory.turn_count if memory is not None else 0,
+            last_turn_at=(
+                memory.last_turn_at if memory is not None else datetime.now(timezone.utc)
+            ),
+            summary_text=compact,
+        )
+    except (CommitError, SQLAlchemyError):
+        logger.exception("Failed to save refined summary of user %s", user_id)
+
+
+def schedule_refine(user_id: int, user_data: MutableMapping[str, object]) -> None:
+    """Rewrite the summary of ``user_id`` with the summary model off the hot path."""
+
+    if not settings.assistant_summary_llm:
+        return
+    summary = user_data.get(assistant_state.SUMMARY_KEY)
+    if not isinstance(summary, str) or not summary:
+        return
+    task = asyncio.get_running_loop().create_task(_refine(user_id, user_data, summary))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
@@ -0,0 +1,275 @@
+"""Write-behind store for learning plans and progress.
+
+Learning handlers :func:`stage` the plan and progress of a user after every
+step.  Staged state is kept per user and written on a short timer
+(``LEARNING_FLUSH_DELAY_SEC``), so a burst of steps costs one write.  A plan
+or progress equal to the version last written is not staged at all.
+:func:`flush` writes everything pending in one session with a single
+update-or-insert per user; :func:`close` flushes on shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import cast
+
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...diabetes.models_learning import LearningPlan, LearningProgress, ProgressData
+from ...diabetes.services.db import SessionLocal, run_db
+from ...diabetes.services.repository import CommitError, commit
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "close",
+    "flush",
+    "has_pending",
+    "remember",
+    "reset_store",
+    "stage",
+    "take_missing_plan",
+]
+
+# Digests of the last written state are kept for this many users.  Users
+# evicted from the cache simply get their next step written in full.
+WRITTEN_LIMIT = 10_000
+
+
+@dataclass(slots=True)
+class _Pending:
+    plan_json: list[str] | None = None
+    plan_digest: str | None = None
+    progress: ProgressData | None = None
+    progress_digest: str | None = None
+
+
+@dataclass(slots=True)
+class _Written:
+    plan_id: int
+    plan_digest: str | None = None
+    progress_digest: str | None = None
+
+
+_pending: dict[tuple[int, int], _Pending] = {}
+_written: OrderedDict[int, _Written] = OrderedDict()
+_missing_plans: set[int] = set()
+_timer: asyncio.Task[None] | None = None
+
+
+def _digest(value: object) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _written_for(user_id: int, plan_id: int) -> _Written:
+    entry = _written.get(user_id)
+    if entry is None or entry.plan_id != plan_id:
+        entry = _Written(plan_id)
+        _written[user_id] = entry
+    _written.move_to_end(user_id)
+    while len(_written) > WRITTEN_LIMIT:
+        _written.popitem(last=False)
+    return entry
+
+
+def remember(
+    user_id: int,
+    plan_id: int,
+    *,
+    plan_json: list[str] | None = None,
+    progress: ProgressData | None = None,
+) -> None:
+    """Record state known to be stored so staging it again is a no-op."""
+
+    entry = _written_for(user_id, plan_id)
+    if plan_json is not None:
+        entry.plan_digest = _digest(plan_json)
+    if progress is not None:
+        entry.progress_digest = _digest(progress)
+
+
+async def stage(
+    user_id: int,
+    plan_id: int,
+    *,
+    plan_json: list[str] | None = None,
+    progress: ProgressData | None = None,
+) -> None:
+    """Queue changed plan and progress of ``user_id`` for the next flush."""
+
+    written = _written.get(user_id)
+    if written is not None and written.plan_id != plan_id:
+        written = None
+    key = (user_id, plan_id)
+    pending = _pending.get(key) or _Pending()
+    if plan_json is not None:
+        digest = _digest(plan_json)
+        if written is not None and written.plan_digest == digest:
+            pending.plan_json = pending.plan_digest = None
+        else:
+            pending.plan_json = list(plan_json)
+            pending.plan_digest = digest
+    if progress is not None:
+        digest = _digest(progress)
+        if written is not None and written.progress_digest == digest:
+            pending.progress = pending.progress_digest = None
+        else:
+            pending.progress = cast(ProgressData, dict(progress))
+            pending.progress_digest = digest
+    if pending.plan_json is None and pending.progress is None:
+        _pending.pop(key, None)
+        return
+    _pending[key] = pending
+    delay = settings.learning_flush_delay_sec
+    if delay <= 0:
+        await flush()
+    else:
+        _schedule(delay)
+
+
+def has_pending(user_id: int) -> bool:
+    """Return ``True`` if ``user_id`` has state waiting to be written."""
+
+    return any(uid == user_id for uid, _ in _pending)
+
+
+def take_missing_plan(plan_id: int) -> bool:
+    """Return ``True`` once if a flush found ``plan_id`` deleted."""
+
+    if plan_id in _missing_plans:
+        _missing_plans.discard(plan_id)
+        return True
+    return False
+
+
+def _write(session: Session, batch: dict[tuple[int, int], _Pending]) -> set[int]:
+    plan_ids = {plan_id for _, plan_id in batch}
+    present = set(
+        session.scalars(sa.select(LearningPlan.id).where(LearningPlan.id.in_(plan_ids)))
+    )
+    for (user_id, plan_id), entry in batch.items():
+        if plan_id not in present:
+            continue
+        if entry.plan_json is not None:
+            session.execute(
+                sa.update(LearningPlan)
+                .where(LearningPlan.id == plan_id)
+                .values(plan_json=entry.plan_json)
+            )
+        if entry.progress is not None:
+            result = session.execute(
+                sa.update(LearningProgress)
+                .where(
+                    LearningProgress.user_id == user_id,
+                    LearningProgress.plan_id == plan_id,
+                )
+                .values(progress_json=entry.progress)
+            )
+            if result.rowcount == 0:
+                session.add(
+                    LearningProgress(
+                        user_id=user_id, plan_id=plan_id, progress_json=entry.progress
+                    )
+                )
+    commit(session)
+    return plan_ids - present
+
+
+def _restore(batch: dict[tuple[int, int], _Pending]) -> None:
+    """Return a failed ``batch`` to the queue under any newer staged state."""
+
+    for key, entry in batch.items():
+        newer = _pending.get(key)
+        if newer is None:
+            _pending[key] = entry
+            continue
+        if newer.plan_json is None:
+            newer.plan_json = entry.plan_json
+            newer.plan_digest = entry.plan_digest
+        if newer.progress is None:
+            newer.progress = entry.progress
+            newer.progress_digest = entry.progress_digest
+
+
+async def flush() -> None:
+    """Write all pending plans and progress in one session."""
+
+    if not _pending:
+        return
+    batch = _pending.copy()
+    _pending.clear()
+    try:
+        missing = await run_db(_write, batch, sessionmaker=SessionLocal)
+    except (asyncio.CancelledError, CommitError, OSError, RuntimeError, SQLAlchemyError):
+        _restore(batch)
+        raise
+    for (user_id, plan_id), entry in batch.items():
+        if plan_id in missing:
+            continue
+        written = _written_for(user_id, plan_id)
+        if entry.plan_digest is not None:
+            written.plan_digest = entry.plan_digest
+        if entry.progress_digest is not None:
+            written.progress_digest = entry.progress_digest
+    if missing:
+        logger.warning("Dropped learning state of deleted plans %s", sorted(missing))
+        _missing_plans.update(missing)
+
+
+async def _flush_later(delay: float) -> None:
+    global _timer
+    await asyncio.sleep(delay)
+    try:
+        await flush()
+    except (CommitError, OSError, RuntimeError, SQLAlchemyError) as exc:
+        logger.exception("Failed to flush learning state", exc_info=exc)
+    _timer = None
+    if _pending:
+        _schedule(delay)
+
+
+def _schedule(delay: float) -> None:
+    global _timer
+    if _timer is not None and not _timer.done():
+        return
+    _timer = asyncio.get_running_loop().create_task(_flush_later(delay))
+
+
+async def close() -> None:
+    """Cancel the flush timer and write whatever is still pending."""
+
+    global _timer
+    task = _timer
+    _timer = None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:  # pragma: no cover - expected
+            pass
+    try:
+        await flush()
+    except (CommitError, OSError, RuntimeError, SQLAlchemyError) as exc:
+        logger.exception("Failed to flush learning state on exit", exc_info=exc)
+
+
+def reset_store() -> None:
+    """Forget all pending and written state (used by tests)."""
+
+    global _timer
+    task = _timer
+    _timer = None
+    if task is not None and not task.done() and not task.get_loop().is_closed():
+        task.cancel()
+    _pending.clear()
+    _written.clear()
+    _missing_plans.clear()
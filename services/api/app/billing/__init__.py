@@ -7,7 +7,7 @@ from .service import (
     create_subscription,
     verify_webhook,
 )
-from .log import BillingEvent, BillingLog, log_billing_event
+from .log import BillingEvent, BillingLog, log_billing_event, log_billing_events
 
 __all__ = [
     "BillingSettings",
@@ -20,4 +20,5 @@ __all__ = [
     "BillingLog",
     "BillingEvent",
     "log_billing_event",
+    "log_billing_events",
 ]
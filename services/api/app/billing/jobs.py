@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, time as dt_time, timezone
-from typing import cast
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Sequence
 
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
+from telegram import Bot
+from telegram.error import Forbidden
 from telegram.ext import ContextTypes
 
 from services.api.app.diabetes.handlers.reminder_jobs import DefaultJobQueue
@@ -17,12 +19,25 @@ from services.api.app.diabetes.services.db import (
     run_db,
 )
 from services.api.app.diabetes.services.repository import commit
-from .log import BillingEvent, log_billing_event
+from services.api.app.diabetes.utils.outbound import (
+    MessageDispatcher,
+    Priority,
+    get_dispatcher,
+)
+from .log import BillingEvent, log_billing_events
 
 logger = logging.getLogger(__name__)
 
 _JOB_NAME = "subscriptions_expire"
 
+EXPIRE_BATCH_SIZE = 1000
+# Trials keep their status; only those ended since the previous daily run
+# are logged and notified, so users are not re-notified every night.
+TRIAL_EXPIRY_WINDOW = timedelta(days=1)
+EXPIRED_MESSAGE = (
+    "⏳ Срок вашей подписки истёк. Продлить её можно в разделе «Подписка»."
+)
+
 
 def _utcnow() -> datetime:
     """Return current UTC time. Separated for easier testing."""
@@ -44,35 +59,144 @@ def schedule_subscription_expiration(jq: DefaultJobQueue) -> None:
     logger.info("📅 scheduled %s -> next_run=%s", _JOB_NAME, next_run)
 
 
-async def expire_subscriptions(_context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Expire outdated subscriptions."""
+def _log_expired(session: Session, rows: Sequence[tuple[int, int]]) -> None:
+    log_billing_events(
+        session,
+        (
+            (user_id, BillingEvent.EXPIRED, {"subscription_id": sub_id})
+            for sub_id, user_id in rows
+        ),
+    )
+
 
-    def _expire(session: Session) -> list[int]:
-        now = _utcnow()
-        subs = session.scalars(
-            sa.select(Subscription).where(
-                Subscription.status.in_([SubStatus.trial.value, SubStatus.active.value]),
+def _expire_active_batch(
+    session: Session, now: datetime, batch_size: int
+) -> list[tuple[int, int]]:
+    """Flip one batch of overdue active subscriptions to ``expired``.
+
+    Returns ``(subscription_id, user_id)`` of the updated rows.
+    ``(user_id, status)`` is unique, so an older ``expired`` row of the same
+    user is deleted first; its history stays in the billing log.
+    """
+
+    batch = session.execute(
+        sa.select(Subscription.id, Subscription.user_id)
+        .where(
+            Subscription.status == SubStatus.active.value,
+            Subscription.end_date.is_not(None),
+            Subscription.end_date < now,
+        )
+        .order_by(Subscription.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not batch:
+        return []
+    session.execute(
+        sa.delete(Subscription)
+        .where(
+            Subscription.user_id.in_([user_id for _, user_id in batch]),
+            Subscription.status == SubStatus.expired.value,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    rows = [
+        (sub_id, user_id)
+        for sub_id, user_id in session.execute(
+            sa.update(Subscription)
+            .where(Subscription.id.in_([sub_id for sub_id, _ in batch]))
+            .values(status=SubStatus.expired.value)
+            .returning(Subscription.id, Subscription.user_id)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    _log_expired(session, rows)
+    commit(session)
+    return rows
+
+
+def _expired_trials_batch(
+    session: Session, now: datetime, after_id: int, batch_size: int
+) -> list[tuple[int, int]]:
+    rows = [
+        (sub_id, user_id)
+        for sub_id, user_id in session.execute(
+            sa.select(Subscription.id, Subscription.user_id)
+            .where(
+                Subscription.status == SubStatus.trial.value,
                 Subscription.end_date.is_not(None),
                 Subscription.end_date < now,
+                Subscription.end_date >= now - TRIAL_EXPIRY_WINDOW,
+                Subscription.id > after_id,
             )
-        ).all()
-        for sub in subs:
-            if sub.status == SubStatus.active.value:
-                sub.status = cast(SubStatus, SubStatus.expired.value)
-            log_billing_event(
-                session,
-                sub.user_id,
-                BillingEvent.EXPIRED,
-                {"subscription_id": sub.id},
+            .order_by(Subscription.id)
+            .limit(batch_size)
+        )
+    ]
+    _log_expired(session, rows)
+    commit(session)
+    return rows
+
+
+async def _expire(now: datetime, batch_size: int) -> list[int]:
+    user_ids: list[int] = []
+    while True:
+        rows = await run_db(_expire_active_batch, now, batch_size)
+        user_ids.extend(user_id for _, user_id in rows)
+        if len(rows) < batch_size:
+            break
+    last_id = 0
+    while True:
+        rows = await run_db(_expired_trials_batch, now, last_id, batch_size)
+        user_ids.extend(user_id for _, user_id in rows)
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1][0]
+    return user_ids
+
+
+async def notify_expired(
+    bot: Bot,
+    user_ids: Sequence[int],
+    *,
+    dispatcher: MessageDispatcher | None = None,
+) -> int:
+    """Send the expiry notice through the rate-limited outbound dispatcher.
+
+    Returns the number of delivered messages.
+    """
+
+    results = await (dispatcher or get_dispatcher()).broadcast(
+        bot, user_ids, EXPIRED_MESSAGE, priority=Priority.NOTICE
+    )
+    delivered = 0
+    for user_id, result in zip(dict.fromkeys(user_ids), results):
+        if not isinstance(result, BaseException):
+            delivered += 1
+        elif not isinstance(result, Forbidden):
+            logger.warning(
+                "failed to notify user %s about expiry: %s", user_id, result
             )
-        if subs:
-            commit(session)
-        return [sub.user_id for sub in subs]
+    return delivered
+
+
+async def expire_subscriptions(
+    context: ContextTypes.DEFAULT_TYPE | None,
+    *,
+    batch_size: int = EXPIRE_BATCH_SIZE,
+) -> None:
+    """Expire outdated subscriptions and notify their owners."""
 
-    user_ids = await run_db(_expire)
-    for user_id in user_ids:
-        logger.info("notify user %s: subscription expired", user_id)
+    user_ids = await _expire(_utcnow(), batch_size)
     logger.info("expired %d subscription(s)", len(user_ids))
+    bot = getattr(context, "bot", None)
+    if bot is not None and user_ids:
+        delivered = await notify_expired(bot, user_ids)
+        logger.info("notified %d user(s) about expired subscription", delivered)
 
 
-__all__ = ["schedule_subscription_expiration", "expire_subscriptions"]
+__all__ = [
+    "expire_subscriptions",
+    "notify_expired",
+    "schedule_subscription_expiration",
+]
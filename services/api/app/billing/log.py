@@ -3,8 +3,9 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Iterable
 
+import sqlalchemy as sa
 from sqlalchemy import BigInteger, Integer, TIMESTAMP, Enum as SAEnum, JSON, func
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
@@ -42,7 +43,7 @@ class BillingLog(Base):
     context: Mapped[dict[str, Any] | None] = mapped_column(JSON)
 
 
-__all__ = ["BillingLog", "BillingEvent", "log_billing_event"]
+__all__ = ["BillingLog", "BillingEvent", "log_billing_event", "log_billing_events"]
 
 
 def log_billing_event(
@@ -56,3 +57,18 @@ def log_billing_event(
     log = BillingLog(user_id=user_id, event=event, context=context)
     session.add(log)
     session.flush()
+
+
+def log_billing_events(
+    session: Session,
+    events: Iterable[tuple[int, BillingEvent, dict[str, Any] | None]],
+) -> int:
+    """Persist many billing events with a single executemany ``INSERT``."""
+
+    rows = [
+        {"user_id": user_id, "event": event, "context": context}
+        for user_id, event, context in events
+    ]
+    if rows:
+        session.execute(sa.insert(BillingLog), rows)
+    return len(rows)
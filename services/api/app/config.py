@@ -69,6 +69,36 @@ class Settings(BaseSettings):
     db_password: Optional[str] = Field(default=None, alias="DB_PASSWORD")
     db_read_role: Optional[str] = Field(default=None, alias="DB_READ_ROLE")
     db_write_role: Optional[str] = Field(default=None, alias="DB_WRITE_ROLE")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(
+        default=30.0,
+        alias="DB_POOL_TIMEOUT",
+        description="Seconds to wait for a pooled connection before failing",
+    )
+    db_pool_recycle: int = Field(
+        default=1800,
+        alias="DB_POOL_RECYCLE",
+        description="Reconnect pooled connections older than this many seconds",
+    )
+    db_pool_pre_ping: bool = Field(
+        default=True,
+        alias="DB_POOL_PRE_PING",
+        description="Test connections on checkout to survive database restarts",
+    )
+    db_statement_timeout_ms: int = Field(
+        default=0,
+        alias="DB_STATEMENT_TIMEOUT_MS",
+        description="Postgres statement_timeout for every connection; 0 disables",
+    )
+    db_sqlite_busy_timeout_ms: int = Field(
+        default=5000, alias="DB_SQLITE_BUSY_TIMEOUT_MS"
+    )
+    db_sqlite_wal: bool = Field(
+        default=True,
+        alias="DB_SQLITE_WAL",
+        description="Use WAL journal mode for file-based SQLite databases",
+    )
 
     # Redis configuration
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
@@ -95,6 +125,35 @@ class Settings(BaseSettings):
     openai_command_model: str = Field(
         default="gpt-4o-mini", alias="OPENAI_COMMAND_MODEL"
     )
+    iob_enabled: bool = Field(
+        default=False,
+        alias="IOB_ENABLED",
+        description="Subtract insulin on board from the suggested bolus",
+    )
+    iob_carb_absorption_min: float = Field(
+        default=180.0,
+        alias="IOB_CARB_ABSORPTION_MIN",
+        description="Carb absorption time used for carbs on board, minutes",
+    )
+    report_model: str = Field(
+        default="gpt-4o-mini",
+        alias="REPORT_MODEL",
+        description="Model used for report recommendations",
+    )
+    report_advice_cache_size: int = Field(
+        default=256, alias="REPORT_ADVICE_CACHE_SIZE"
+    )
+    report_advice_cache_ttl_sec: int = Field(
+        default=86400,
+        alias="REPORT_ADVICE_CACHE_TTL_SEC",
+        description="TTL of cached report recommendations in seconds",
+    )
+    cohort_cache_size: int = Field(default=256, alias="COHORT_CACHE_SIZE")
+    cohort_cache_ttl_sec: int = Field(
+        default=60,
+        alias="COHORT_CACHE_TTL_SEC",
+        description="TTL of cached clinic cohort pages in seconds",
+    )
     whisper_rate_per_min_usd: float = Field(
         default=0.006, alias="WHISPER_RATE_PER_MIN_USD"
     )
@@ -120,6 +179,24 @@ class Settings(BaseSettings):
         alias="ASSISTANT_SUMMARY_TRIGGER",
         description="Turns before conversation is summarized",
     )
+    assistant_context_tokens: int = Field(
+        default=3000,
+        alias="ASSISTANT_CONTEXT_TOKENS",
+        description="Token budget of the summary, recent turns and question sent to the chat model",
+    )
+    assistant_summary_tokens: int = Field(
+        default=250,
+        alias="ASSISTANT_SUMMARY_TOKENS",
+        description="Tokens kept in the rolling conversation summary",
+    )
+    assistant_summary_llm: bool = Field(
+        default=False,
+        alias="ASSISTANT_SUMMARY_LLM",
+        description="Rewrite the summary with a cheap model in the background",
+    )
+    assistant_summary_model: str = Field(
+        default="gpt-4o-mini", alias="ASSISTANT_SUMMARY_MODEL"
+    )
     assistant_default_mode: Literal["menu", "chat", "learn", "labs", "visit"] = Field(
         default="menu",
         alias="ASSISTANT_DEFAULT_MODE",
@@ -159,6 +236,51 @@ class Settings(BaseSettings):
         alias="PENDING_LOG_LIMIT",
         description="Max pending lesson logs kept in memory",
     )
+    learning_shared_step_cache: bool = Field(
+        default=False,
+        alias="LEARNING_SHARED_STEP_CACHE",
+        description="Share generated step texts between users with the same profile bucket",
+    )
+    learning_flush_delay_sec: float = Field(
+        default=2.0,
+        alias="LEARNING_FLUSH_DELAY_SEC",
+        description="Delay before staged learning plans and progress are written; 0 writes at once",
+    )
+    labs_pdf_max_bytes: int = Field(
+        default=10_000_000,
+        alias="LABS_PDF_MAX_BYTES",
+        description="Largest lab PDF accepted for text extraction",
+    )
+    labs_pdf_max_pages: int = Field(
+        default=20,
+        alias="LABS_PDF_MAX_PAGES",
+        description="Pages of a lab PDF read at most",
+    )
+    labs_pdf_timeout_sec: float = Field(
+        default=20.0,
+        alias="LABS_PDF_TIMEOUT_SEC",
+        description="Seconds allowed for reading one lab PDF",
+    )
+    labs_pdf_workers: int = Field(
+        default=1,
+        alias="LABS_PDF_WORKERS",
+        description="Processes reading lab PDFs",
+    )
+    vision_backend: Literal["assistants", "chat"] = Field(
+        default="assistants",
+        alias="VISION_BACKEND",
+        description="Analyse photos in the Assistants thread or with one chat completion",
+    )
+    vision_model: str = Field(
+        default="gpt-4o-mini",
+        alias="VISION_MODEL",
+        description="Model for photo analysis with VISION_BACKEND=chat",
+    )
+    vision_cache_size: int = Field(
+        default=2048,
+        alias="VISION_CACHE_SIZE",
+        description="Vision answers cached by photo hash; 0 disables the cache",
+    )
     lesson_logs_ttl_days: int = Field(default=14, alias="LESSON_LOGS_TTL_DAYS")
     assistant_memory_ttl_days: int = Field(
         default=60, alias="ASSISTANT_MEMORY_TTL_DAYS"
@@ -185,6 +307,104 @@ class Settings(BaseSettings):
     )
     internal_api_key: Optional[str] = Field(default=None, alias="INTERNAL_API_KEY")
     admin_id: Optional[int] = Field(default=None, alias="ADMIN_ID")
+    bot_import_profile: bool = Field(
+        default=False,
+        alias="BOT_IMPORT_PROFILE",
+        description="Log an -X importtime report of bot imports at startup",
+    )
+    bot_import_profile_top: int = Field(default=20, alias="BOT_IMPORT_PROFILE_TOP")
+    bot_mode: Literal["polling", "webhook"] = Field(
+        default="polling",
+        alias="BOT_MODE",
+        description="How the bot receives updates from Telegram",
+    )
+    bot_webhook_url: Optional[str] = Field(default=None, alias="BOT_WEBHOOK_URL")
+    bot_webhook_secret: Optional[str] = Field(
+        default=None, alias="BOT_WEBHOOK_SECRET"
+    )
+    bot_webhook_path: str = Field(
+        default="/telegram/webhook", alias="BOT_WEBHOOK_PATH"
+    )
+    bot_webhook_listen: str = Field(default="127.0.0.1", alias="BOT_WEBHOOK_LISTEN")
+    bot_webhook_port: int = Field(default=8081, alias="BOT_WEBHOOK_PORT")
+    bot_concurrent_updates: int = Field(
+        default=1,
+        alias="BOT_CONCURRENT_UPDATES",
+        description="Updates processed in parallel; 1 keeps PTB's sequential mode",
+    )
+    bot_update_backlog: int = Field(
+        default=256,
+        alias="BOT_UPDATE_BACKLOG",
+        description="Max updates admitted to the processor before pushing back",
+    )
+    executor_db_workers: Optional[int] = Field(
+        default=None,
+        alias="EXECUTOR_DB_WORKERS",
+        description="Threads for run_db; defaults to pool size plus overflow",
+    )
+    executor_openai_workers: int = Field(default=8, alias="EXECUTOR_OPENAI_WORKERS")
+    executor_render_workers: int = Field(
+        default=1,
+        alias="EXECUTOR_RENDER_WORKERS",
+        description="Threads for report rendering; pyplot is not thread-safe",
+    )
+    executor_image_workers: int = Field(
+        default=2,
+        alias="EXECUTOR_IMAGE_WORKERS",
+        description="Threads for downscaling and hashing photos before Vision",
+    )
+    executor_queue_size: int = Field(
+        default=64,
+        alias="EXECUTOR_QUEUE_SIZE",
+        description="Calls that may queue per executor beyond its workers",
+    )
+    executor_queue_timeout: float = Field(
+        default=10.0,
+        alias="EXECUTOR_QUEUE_TIMEOUT",
+        description="Seconds to wait for a free executor slot before failing",
+    )
+    handler_profile_top_n: int = Field(
+        default=0,
+        alias="HANDLER_PROFILE_TOP_N",
+        description="Log the N slowest handler invocations; 0 disables the profiler",
+    )
+    handler_profile_sample_rate: float = Field(
+        default=1.0, alias="HANDLER_PROFILE_SAMPLE_RATE"
+    )
+    handler_profile_interval_sec: int = Field(
+        default=600, alias="HANDLER_PROFILE_INTERVAL_SEC"
+    )
+    outbound_global_rate: float = Field(
+        default=25.0,
+        alias="OUTBOUND_GLOBAL_RATE",
+        description="Bot messages per second across all chats",
+    )
+    outbound_global_burst: float = Field(default=30.0, alias="OUTBOUND_GLOBAL_BURST")
+    outbound_chat_rate: float = Field(
+        default=1.0,
+        alias="OUTBOUND_CHAT_RATE",
+        description="Bot messages per second to a single chat",
+    )
+    outbound_chat_burst: float = Field(default=3.0, alias="OUTBOUND_CHAT_BURST")
+    outbound_max_retries: int = Field(default=3, alias="OUTBOUND_MAX_RETRIES")
+    reminder_bucketed: bool = Field(
+        default=False,
+        alias="REMINDER_BUCKETED",
+        description="Fire daily reminders from one per-minute tick instead of a job each",
+    )
+    reminder_bucket_batch_size: int = Field(
+        default=100, alias="REMINDER_BUCKET_BATCH_SIZE"
+    )
+    reminder_bucket_jitter_sec: int = Field(
+        default=0,
+        alias="REMINDER_BUCKET_JITTER_SEC",
+        description="Spread the batches of one minute bucket over this many seconds",
+    )
+    onboarding_metrics_interval_sec: int = Field(
+        default=60,
+        alias="ONBOARDING_METRICS_INTERVAL_SEC",
+        description="Interval of incremental onboarding metrics aggregation; 0 disables",
+    )
 
     @field_validator("log_level", mode="before")
     @classmethod
@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
+import re
 from typing import MutableMapping, cast
 
 from services.api.app.config import get_settings
+from services.api.app.diabetes.utils.tokens import count_tokens
 
 _settings = get_settings()
 ASSISTANT_MAX_TURNS: int = _settings.assistant_max_turns
 ASSISTANT_SUMMARY_TRIGGER: int = _settings.assistant_summary_trigger
 ASSISTANT_DEFAULT_MODE: str = _settings.assistant_default_mode
+ASSISTANT_SUMMARY_TOKENS: int = _settings.assistant_summary_tokens
+
+# ``assistant_memory.summary_text`` holds at most this many characters.
+SUMMARY_MAX_CHARS = 1024
+GIST_USER_CHARS = 120
+GIST_ASSISTANT_CHARS = 160
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s")
 
 HISTORY_KEY = "assistant_history"
 SUMMARY_KEY = "assistant_summary"
@@ -17,21 +27,68 @@ LAST_MODE_KEY = "assistant_last_mode"
 AWAITING_KIND = "assistant_awaiting_kind"
 
 
+def _first_sentence(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    sentence = _SENTENCE_END_RE.split(text, maxsplit=1)[0]
+    if len(sentence) > limit:
+        sentence = sentence[: limit - 1].rstrip() + "…"
+    return sentence
+
+
+def _gist(turn: str) -> str:
+    """Return one line with the question and the gist of the answer."""
+
+    user_part, sep, assistant_part = turn.partition("\nassistant: ")
+    if user_part.startswith("user: "):
+        user_part = user_part[6:]
+    if not sep:
+        return _first_sentence(user_part, GIST_USER_CHARS + GIST_ASSISTANT_CHARS)
+    return (
+        f"user: {_first_sentence(user_part, GIST_USER_CHARS)}; "
+        f"assistant: {_first_sentence(assistant_part, GIST_ASSISTANT_CHARS)}"
+    )
+
+
 def summarize(parts: list[str]) -> str:
-    """Summarize *parts* into a single string.
+    """Summarize *parts* into one line per turn.
+
+    Each line keeps the first sentence of the question and of the answer.
+    Tests may monkeypatch this function to provide deterministic summaries.
+    """
+    return "\n".join(line for line in (_gist(part) for part in parts) if line)
 
-    The default implementation simply joins messages with spaces.  Tests may
-    monkeypatch this function to provide deterministic summaries.
+
+def compact_summary(previous: str | None, addition: str) -> str:
+    """Append ``addition`` to ``previous`` within the summary budget.
+
+    The oldest lines are dropped while the summary exceeds
+    :data:`ASSISTANT_SUMMARY_TOKENS` tokens or :data:`SUMMARY_MAX_CHARS`
+    characters; a single line that is still too long keeps its end.
     """
-    return " ".join(parts)
+
+    lines = [
+        line
+        for line in f"{previous or ''}\n{addition}".splitlines()
+        if line.strip()
+    ]
+    text = "\n".join(lines)
+    while len(lines) > 1 and (
+        len(text) > SUMMARY_MAX_CHARS or count_tokens(text) > ASSISTANT_SUMMARY_TOKENS
+    ):
+        lines.pop(0)
+        text = "\n".join(lines)
+    if len(text) > SUMMARY_MAX_CHARS:
+        text = text[-SUMMARY_MAX_CHARS:]
+    return text
 
 
 def add_turn(user_data: MutableMapping[str, object], text: str) -> int:
     """Append assistant reply ``text`` to ``user_data`` keeping short history.
 
     When the number of stored turns reaches :data:`ASSISTANT_SUMMARY_TRIGGER`,
-    older entries beyond :data:`ASSISTANT_MAX_TURNS` are summarized and the
-    summary is stored under ``assistant_summary`` key.
+    older entries beyond :data:`ASSISTANT_MAX_TURNS` are summarized and folded
+    into the summary stored under ``assistant_summary`` key, which is kept
+    within its budget by :func:`compact_summary`.
 
     Returns the number of turns summarized on this call.  The return value can
     be used by higher-level services to persist summaries in a database when
@@ -49,7 +106,7 @@ def add_turn(user_data: MutableMapping[str, object], text: str) -> int:
         if old:
             summary = summarize(old)
             prev = cast(str | None, user_data.get(SUMMARY_KEY))
-            user_data[SUMMARY_KEY] = f"{prev} {summary}".strip() if prev else summary
+            user_data[SUMMARY_KEY] = compact_summary(prev, summary)
             summarized = len(old)
         del history[:-ASSISTANT_MAX_TURNS]
     elif len(history) > ASSISTANT_MAX_TURNS:
@@ -94,11 +151,13 @@ __all__ = [
     "ASSISTANT_MAX_TURNS",
     "ASSISTANT_SUMMARY_TRIGGER",
     "ASSISTANT_DEFAULT_MODE",
+    "ASSISTANT_SUMMARY_TOKENS",
     "HISTORY_KEY",
     "SUMMARY_KEY",
     "LAST_MODE_KEY",
     "AWAITING_KIND",
     "summarize",
+    "compact_summary",
     "add_turn",
     "reset",
     "reset_mode_state",
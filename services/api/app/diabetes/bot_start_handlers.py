@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from typing import TypeAlias
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, WebAppInfo
@@ -49,7 +50,7 @@ def build_start_handler(ui_base_url: str) -> CommandHandlerT:
 
         user_data = getattr(context, "user_data", {})
         text = "👋 Добро пожаловать! Быстрая настройка в приложении:"
-        if not isinstance(user_data, dict) or "tg_init_data" not in user_data:
+        if not isinstance(user_data, Mapping) or "tg_init_data" not in user_data:
             text = "⚠️ Откройте приложение по кнопке ниже"
 
         if update.message:
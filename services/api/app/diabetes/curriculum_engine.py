@@ -25,7 +25,8 @@ from .prompts import (
 )
 from .llm_router import LLMTask
 from .metrics import lessons_completed, lessons_started, quiz_avg_score
-from .models_learning import Lesson, LessonProgress, LessonStep, QuizQuestion
+from .curriculum_index import get_lesson, get_lesson_by_slug
+from .models_learning import LessonProgress
 from .services import db, gpt_client
 from .services.repository import commit
 
@@ -52,10 +53,11 @@ class ProgressNotFoundError(Exception):
 async def start_lesson(user_id: int, lesson_slug: str) -> LessonProgress:
     """Start or reset a lesson for a user and return progress."""
 
+    lesson = await get_lesson_by_slug(lesson_slug)
+    if lesson is None:
+        raise LessonNotFoundError(lesson_slug)
+
     def _start(session: Session) -> LessonProgress:
-        lesson = session.execute(sa.select(Lesson).filter_by(slug=lesson_slug)).scalar_one_or_none()
-        if lesson is None:
-            raise LessonNotFoundError(lesson_slug)
         progress = session.execute(
             sa.select(LessonProgress).filter_by(user_id=user_id, lesson_id=lesson.id)
         ).scalar_one_or_none()
@@ -94,22 +96,24 @@ async def next_step(
     Behaviour is determined by ``settings.learning_content_mode``:
 
     * "dynamic" - generate step text on the fly.
-    * "static" - use predefined steps and quiz questions from the database.
+    * "static" - use predefined steps and quiz questions from the curriculum
+      index.
     """
     if settings.learning_content_mode == "dynamic":
 
-        def _get_progress(session: Session) -> tuple[int, str]:
+        def _get_progress(session: Session) -> int:
             progress = session.execute(
                 sa.select(LessonProgress).filter_by(user_id=user_id, lesson_id=lesson_id)
             ).scalar_one_or_none()
             if progress is None:
                 raise ProgressNotFoundError(user_id, lesson_id)
-            lesson = session.execute(sa.select(Lesson).filter_by(id=lesson_id)).scalar_one_or_none()
-            if lesson is None:
-                raise LessonNotFoundError(str(lesson_id))
-            return progress.current_step, lesson.slug
+            return progress.current_step
 
-        current_step, slug = await db.run_db(_get_progress)
+        current_step = await db.run_db(_get_progress)
+        lesson = await get_lesson(lesson_id)
+        if lesson is None:
+            raise LessonNotFoundError(str(lesson_id))
+        slug = lesson.slug
         step_idx = current_step + 1
         try:
             text = await generate_step_text(profile, slug, step_idx, prev_summary)
@@ -141,27 +145,25 @@ async def next_step(
             return f"{disclaimer()}\n\n{text}", False
         return text, False
     elif settings.learning_content_mode == "static":
+        static_lesson = await get_lesson(lesson_id)
+        if static_lesson is None:
+            raise LessonNotFoundError(str(lesson_id))
+        steps = static_lesson.steps
+        questions = static_lesson.questions
 
         def _advance_static(
             session: Session,
-        ) -> tuple[str | None, str | None, bool, bool, int, bool, str]:
+        ) -> tuple[str | None, str | None, bool, bool, int, bool]:
             progress = session.execute(
                 sa.select(LessonProgress).filter_by(user_id=user_id, lesson_id=lesson_id)
             ).scalar_one()
-            lesson = session.execute(sa.select(Lesson).filter_by(id=lesson_id)).scalar_one()
-            steps = session.scalars(
-                sa.select(LessonStep).filter_by(lesson_id=lesson_id).order_by(LessonStep.step_order)
-            ).all()
             if progress.current_step < len(steps):
-                step = steps[progress.current_step]
+                content = steps[progress.current_step]
                 first_step = progress.current_step == 0
                 progress.current_step += 1
                 step_idx = progress.current_step
                 commit(session)
-                return step.content, None, first_step, False, step_idx, False, lesson.slug
-            questions = session.scalars(
-                sa.select(QuizQuestion).filter_by(lesson_id=lesson_id).order_by(QuizQuestion.id)
-            ).all()
+                return content, None, first_step, False, step_idx, False
             if progress.current_question < len(questions):
                 q = questions[progress.current_question]
                 first_question = progress.current_question == 0
@@ -175,12 +177,11 @@ async def next_step(
                     first_question,
                     progress.current_step,
                     False,
-                    lesson.slug,
                 )
             if not progress.completed:
                 progress.completed = True
                 commit(session)
-            return None, None, False, False, progress.current_step, True, lesson.slug
+            return None, None, False, False, progress.current_step, True
 
         (
             step_content,
@@ -189,7 +190,6 @@ async def next_step(
             first_question,
             step_idx,
             completed,
-            slug,
         ) = await db.run_db(_advance_static)
         if step_content is not None and step_idx is not None:
             start = time.monotonic()
@@ -256,13 +256,12 @@ async def check_answer(
     """Check user's answer using the given profile and return feedback."""
 
     if settings.learning_content_mode == "dynamic":
-
-        def _get_slug(session: Session) -> str:
-            lesson = session.execute(sa.select(Lesson).filter_by(id=lesson_id)).scalar_one()
-            return lesson.slug
-
-        slug = await db.run_db(_get_slug)
-        correct, feedback = await check_user_answer(profile, slug, str(answer), last_step_text or "")
+        lesson = await get_lesson(lesson_id)
+        if lesson is None:
+            raise LessonNotFoundError(str(lesson_id))
+        correct, feedback = await check_user_answer(
+            profile, lesson.slug, str(answer), last_step_text or ""
+        )
         feedback = feedback.strip()
         return correct, feedback
 
@@ -271,13 +270,15 @@ async def check_answer(
     except (TypeError, ValueError):
         return False, "Пожалуйста, выберите номер варианта"
 
+    static_lesson = await get_lesson(lesson_id)
+    if static_lesson is None:
+        raise LessonNotFoundError(str(lesson_id))
+    questions = static_lesson.questions
+
     def _check(session: Session) -> tuple[bool, str, int, bool, int | None]:
         progress = session.execute(
             sa.select(LessonProgress).filter_by(user_id=user_id, lesson_id=lesson_id)
         ).scalar_one()
-        questions = session.scalars(
-            sa.select(QuizQuestion).filter_by(lesson_id=lesson_id).order_by(QuizQuestion.id)
-        ).all()
         question = questions[progress.current_question]
         correct = answer_index == question.correct_option
         explanation = question.options[question.correct_option]
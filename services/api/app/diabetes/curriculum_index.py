@@ -0,0 +1,242 @@
+"""In-memory index of the static learning curriculum.
+
+Lessons, their steps and quiz questions only change when
+:func:`services.api.app.diabetes.learning_fixtures.load_lessons` runs, yet
+every lesson step used to load them again.  :func:`get_index` reads the
+whole curriculum once into immutable tuples keyed by lesson id and slug;
+per-user :class:`LessonProgress` stays in the database.
+
+The fixture loader runs in its own process, so it records every change with
+:func:`record_change`, which bumps a counter in the ``curriculum_version``
+table in the same transaction.  The index remembers that counter together
+with the lesson count and highest id; every ``CHECK_INTERVAL`` seconds, and
+on any lookup that misses, it compares them with the database in one query
+and reloads when they differ.  :func:`bump_version` invalidates the index of
+the current process right away.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, cast
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models_learning import CurriculumVersion, Lesson, LessonStep, QuizQuestion
+from .services import db
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CurriculumIndex",
+    "LessonEntry",
+    "QuizItem",
+    "bump_version",
+    "get_index",
+    "get_lesson",
+    "get_lesson_by_slug",
+    "record_change",
+    "reset_index",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class QuizItem:
+    question: str
+    options: tuple[str, ...]
+    correct_option: int
+
+
+@dataclass(frozen=True, slots=True)
+class LessonEntry:
+    id: int
+    slug: str
+    title: str
+    is_active: bool
+    steps: tuple[str, ...]
+    questions: tuple[QuizItem, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CurriculumIndex:
+    """Snapshot of all lessons in id order."""
+
+    version: int
+    lessons: tuple[LessonEntry, ...]
+    by_id: Mapping[int, LessonEntry]
+    by_slug: Mapping[str, LessonEntry]
+    fingerprint: tuple[int, int, int]
+
+    @property
+    def active(self) -> tuple[LessonEntry, ...]:
+        return tuple(lesson for lesson in self.lessons if lesson.is_active)
+
+
+# Seconds between checks of the stored curriculum version.
+CHECK_INTERVAL = 30.0
+VERSION_NAME = "lessons"
+
+_version = 0
+_index: CurriculumIndex | None = None
+_source: tuple[object, object] | None = None
+_checked_at = 0.0
+
+
+def bump_version() -> None:
+    """Mark the cached curriculum as stale after lesson content changed."""
+
+    global _version
+    _version += 1
+
+
+def reset_index() -> None:
+    """Drop the cached curriculum (used by tests)."""
+
+    global _index, _source, _checked_at
+    _index = None
+    _source = None
+    _checked_at = 0.0
+
+
+def record_change(session: Session) -> None:
+    """Bump the stored curriculum version; the caller commits."""
+
+    table = cast(sa.Table, CurriculumVersion.__table__)
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table).values(name=VERSION_NAME, version=1)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={"version": table.c.version + 1, "updated_at": sa.func.now()},
+            )
+        )
+        return
+    row = session.get(CurriculumVersion, VERSION_NAME)
+    if row is None:
+        session.add(CurriculumVersion(name=VERSION_NAME, version=1))
+    else:
+        row.version += 1
+
+
+def _fingerprint(session: Session) -> tuple[int, int, int]:
+    count, max_id = session.execute(
+        sa.select(sa.func.count(Lesson.id), sa.func.max(Lesson.id))
+    ).one()
+    stored = session.scalar(
+        sa.select(CurriculumVersion.version).where(CurriculumVersion.name == VERSION_NAME)
+    )
+    return int(count or 0), int(max_id or 0), int(stored or 0)
+
+
+def _load(session: Session, version: int) -> CurriculumIndex:
+    lessons = session.scalars(sa.select(Lesson).order_by(Lesson.id)).all()
+    steps: dict[int, list[str]] = {}
+    for step in session.scalars(
+        sa.select(LessonStep).order_by(LessonStep.lesson_id, LessonStep.step_order)
+    ):
+        steps.setdefault(step.lesson_id, []).append(step.content)
+    questions: dict[int, list[QuizItem]] = {}
+    for q in session.scalars(
+        sa.select(QuizQuestion).order_by(QuizQuestion.lesson_id, QuizQuestion.id)
+    ):
+        questions.setdefault(q.lesson_id, []).append(
+            QuizItem(q.question, tuple(q.options), q.correct_option)
+        )
+    entries = tuple(
+        LessonEntry(
+            id=lesson.id,
+            slug=lesson.slug,
+            title=lesson.title,
+            is_active=lesson.is_active,
+            steps=tuple(steps.get(lesson.id, ())),
+            questions=tuple(questions.get(lesson.id, ())),
+        )
+        for lesson in lessons
+    )
+    return CurriculumIndex(
+        version=version,
+        lessons=entries,
+        by_id=MappingProxyType({entry.id: entry for entry in entries}),
+        by_slug=MappingProxyType({entry.slug: entry for entry in entries}),
+        fingerprint=_fingerprint(session),
+    )
+
+
+def _source_of(sessionmaker: db.SessionMaker[Session]) -> tuple[object, object]:
+    # Tests rebind one sessionmaker to a fresh engine, so key on both.
+    return sessionmaker, getattr(sessionmaker, "kw", {}).get("bind")
+
+
+async def get_index(
+    *, sessionmaker: db.SessionMaker[Session] | None = None, reload: bool = False
+) -> CurriculumIndex:
+    """Return the curriculum index, loading it when missing or stale."""
+
+    global _index, _source, _checked_at
+    if sessionmaker is None:
+        sessionmaker = db.SessionLocal
+    source = _source_of(sessionmaker)
+    index = _index
+    now = time.monotonic()
+    stale = (
+        reload
+        or index is None
+        or index.version != _version
+        or _source is None
+        or _source[0] is not source[0]
+        or _source[1] is not source[1]
+    )
+    if not stale and index is not None and now - _checked_at >= CHECK_INTERVAL:
+        _checked_at = now
+        stale = await db.run_db(_fingerprint, sessionmaker=sessionmaker) != index.fingerprint
+    if stale:
+        version = _version
+        index = await db.run_db(_load, version, sessionmaker=sessionmaker)
+        _index, _source, _checked_at = index, source, now
+        logger.debug("Loaded %d lessons into the curriculum index", len(index.lessons))
+    assert index is not None
+    return index
+
+
+async def _refresh_on_miss(
+    index: CurriculumIndex, sessionmaker: db.SessionMaker[Session] | None
+) -> CurriculumIndex | None:
+    fingerprint = await db.run_db(_fingerprint, sessionmaker=sessionmaker)
+    if fingerprint == index.fingerprint:
+        return None
+    return await get_index(sessionmaker=sessionmaker, reload=True)
+
+
+async def get_lesson(
+    lesson_id: int, *, sessionmaker: db.SessionMaker[Session] | None = None
+) -> LessonEntry | None:
+    """Return the lesson ``lesson_id`` or ``None``."""
+
+    index = await get_index(sessionmaker=sessionmaker)
+    lesson = index.by_id.get(lesson_id)
+    if lesson is None:
+        fresh = await _refresh_on_miss(index, sessionmaker)
+        if fresh is not None:
+            lesson = fresh.by_id.get(lesson_id)
+    return lesson
+
+
+async def get_lesson_by_slug(
+    slug: str, *, sessionmaker: db.SessionMaker[Session] | None = None
+) -> LessonEntry | None:
+    """Return the lesson with ``slug`` or ``None``."""
+
+    index = await get_index(sessionmaker=sessionmaker)
+    lesson = index.by_slug.get(slug)
+    if lesson is None:
+        fresh = await _refresh_on_miss(index, sessionmaker)
+        if fresh is not None:
+            lesson = fresh.by_slug.get(slug)
+    return lesson
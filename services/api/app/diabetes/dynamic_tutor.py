@@ -8,6 +8,9 @@ import httpx
 from openai import OpenAIError
 from openai.types.chat import ChatCompletionMessageParam
 
+from services.api.app.config import settings
+
+from . import step_cache
 from .prompts import build_system_prompt, build_user_prompt_step
 from .llm_router import LLMTask
 from .services.gpt_client import create_learning_chat_completion
@@ -88,12 +91,30 @@ async def generate_step_text(
     topic_slug: str,
     step_idx: int,
     prev_summary: str | None,
+    *,
+    shared_cache: bool | None = None,
 ) -> str:
-    """Generate explanation text for a learning step."""
+    """Generate explanation text for a learning step.
+
+    With ``shared_cache`` (``LEARNING_SHARED_STEP_CACHE`` by default) the text
+    is first looked up in :mod:`.step_cache`, shared by all users of the same
+    profile bucket, and stored there after generation.
+    """
+    if shared_cache is None:
+        shared_cache = settings.learning_shared_step_cache
     try:
+        key: str | None = None
+        if shared_cache:
+            key = step_cache.step_key(profile, topic_slug, step_idx, prev_summary)
+            cached = await step_cache.get(key)
+            if cached is not None:
+                return cached
         system = build_system_prompt(profile, task=LLMTask.EXPLAIN_STEP)
         user = build_user_prompt_step(topic_slug, step_idx, prev_summary)
-        return await _chat(LLMTask.EXPLAIN_STEP, system, user)
+        text = await _chat(LLMTask.EXPLAIN_STEP, system, user)
+        if key is not None and text:
+            await step_cache.put(key, topic_slug, step_idx, text)
+        return text
     except (OpenAIError, httpx.HTTPError, RuntimeError):
         logger.exception(
             "failed to generate step", extra={"topic": topic_slug, "step": step_idx}
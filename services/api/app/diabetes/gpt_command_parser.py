@@ -223,6 +223,7 @@ async def parse_command(
             temperature=0,
             max_tokens=256,
             timeout=api_timeout,
+            task="command_parse",
         )
         try:
             response: ChatCompletion = await asyncio.wait_for(
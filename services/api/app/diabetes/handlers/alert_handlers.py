@@ -15,8 +15,10 @@ from services.api.app.diabetes.services.db import (
     Alert,
     Profile,
     SessionLocal as _SessionLocal,
+    uow,
 )
 from services.api.app.diabetes.services.repository import CommitError, commit as _commit
+from services.api.app.diabetes.utils import outbound
 from services.api.app.diabetes.utils.helpers import get_coords_and_link
 from services.api.app.diabetes.utils.jobs import schedule_once
 
@@ -148,7 +150,9 @@ async def _send_alert_message(
     if coords and link:
         msg += f" {coords} {link}"
     try:
-        await context.bot.send_message(chat_id=user_id, text=msg)
+        await outbound.send_message(
+            context.bot, user_id, msg, priority=outbound.Priority.SOS
+        )
     except TelegramError as exc:
         logger.error("Failed to send alert message to user %s: %s", user_id, exc)
     except OSError as exc:
@@ -176,7 +180,9 @@ async def _send_alert_message(
             chat_id = None
         if chat_id is not None:
             try:
-                await context.bot.send_message(chat_id=chat_id, text=msg)
+                await outbound.send_message(
+                    context.bot, chat_id, msg, priority=outbound.Priority.SOS
+                )
             except TelegramError as exc:
                 logger.error(
                     "Failed to send alert message to SOS contact '%s': %s",
@@ -372,28 +378,32 @@ async def alert_job(context: ContextTypes.DEFAULT_TYPE) -> None:
             is not None
         )
 
-    active = cast(
-        bool,
-        await run_db(has_active_alert, sessionmaker=SessionLocal),
-    )
+    def resolve_alerts(session: Session) -> None:
+        alerts = session.scalars(
+            sa.select(Alert).filter_by(user_id=user_id, resolved=False)
+        ).all()
+        for a in alerts:
+            a.resolved = True
+        try:
+            commit(session)
+        except CommitError:
+            logger.error("Failed to commit resolved alerts for user %s", user_id)
+
+    last_repeat = count >= MAX_REPEATS
+    # The last repeat resolves the alerts in the same session before the
+    # message goes out, so no connection is held while sending.
+    async with uow(SessionLocal):
+        active = cast(
+            bool,
+            await run_db(has_active_alert, sessionmaker=SessionLocal),
+        )
+        if active and last_repeat:
+            await run_db(resolve_alerts, sessionmaker=SessionLocal)
     if not active:
         job.schedule_removal()
         return
     await _send_alert_message(user_id, sugar, profile, context, first_name)
-    if count >= MAX_REPEATS:
-
-        def resolve_alerts(session: Session) -> None:
-            alerts = session.scalars(
-                sa.select(Alert).filter_by(user_id=user_id, resolved=False)
-            ).all()
-            for a in alerts:
-                a.resolved = True
-            try:
-                commit(session)
-            except CommitError:
-                logger.error("Failed to commit resolved alerts for user %s", user_id)
-
-        await run_db(resolve_alerts, sessionmaker=SessionLocal)
+    if last_repeat:
         job.schedule_removal()
         return
     job_queue: DefaultJobQueue | None = cast(DefaultJobQueue | None, context.job_queue)
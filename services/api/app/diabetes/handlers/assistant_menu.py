@@ -20,6 +20,7 @@ from services.api.app.assistant.assistant_menu import render_assistant_menu
 from services.api.app.config import get_settings
 
 from services.api.app.assistant.services import memory_service
+from services.api.app.diabetes.utils import outbound
 from services.api.app.diabetes.utils.ui import BACK_BUTTON_TEXT
 from services.api.app.diabetes.assistant_state import AWAITING_KIND, set_last_mode
 from services.api.app.diabetes.labs_handlers import AWAITING_KIND as LABS_AWAITING_KIND
@@ -115,9 +116,11 @@ async def post_init(
         data = user_data_map[user_id]
         data[AWAITING_KIND] = mode
         set_last_mode(data, mode)
-        await app.bot.send_message(
-            chat_id=user_id,
-            text=MODE_TEXTS[mode],
+        await outbound.send_message(
+            app.bot,
+            user_id,
+            MODE_TEXTS[mode],
+            priority=outbound.Priority.NOTICE,
             reply_markup=_back_keyboard(),
         )
 
@@ -7,6 +7,7 @@ from enum import IntEnum
 from collections.abc import Awaitable, Callable, Coroutine
 from typing import TypeVar, cast
 
+from sqlalchemy.exc import SQLAlchemyError
 from telegram import Update
 from telegram.ext import (
     CommandHandler,
@@ -16,6 +17,7 @@ from telegram.ext import (
     filters,
 )
 
+from services.api.app.config import get_settings
 from services.api.app.diabetes.gpt_command_parser import parse_command
 from services.api.app.diabetes.services.db import (
     Profile,
@@ -26,6 +28,7 @@ from services.api.app.diabetes.utils.constants import MAX_SUGAR_MMOL_L, XE_GRAMS
 from services.api.app.diabetes.utils.calc_bolus import (
     PatientProfile,
     calc_bolus,
+    calc_bolus_table,
 )
 from services.api.app.diabetes.utils.functions import (
     _safe_float,
@@ -304,6 +307,24 @@ async def dose_long(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return END
 
 
+async def _insulin_on_board(user_id: int, profile: Profile) -> float | None:
+    """Return the user's insulin on board, or ``None`` if it is unavailable."""
+    from services.api.app.diabetes.services.iob import iob_engine
+
+    try:
+        on_board = await iob_engine.on_board(
+            user_id,
+            dia=getattr(profile, "dia", None),
+            insulin_type=getattr(profile, "insulin_type", None),
+        )
+    except (SQLAlchemyError, RuntimeError):
+        # IOB only lowers the recommendation; a failed lookup must not block
+        # the calculation, the user is told it was not taken into account.
+        logger.warning("Failed to compute IOB for user %s", user_id, exc_info=True)
+        return None
+    return on_board.iob
+
+
 async def dose_sugar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Finalize dose calculation after receiving sugar level."""
     user_data_raw = context.user_data
@@ -406,8 +427,17 @@ async def dose_sugar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         )
         user_data.pop("pending_entry", None)
         return END
+    iob: float | None = 0.0
+    if get_settings().iob_enabled:
+        iob = await _insulin_on_board(user_id, profile)
     try:
-        dose = calc_bolus(carbs_g, sugar, patient)
+        dose = calc_bolus(carbs_g, sugar, patient, iob=iob)
+        what_if = calc_bolus_table(
+            [max(carbs_g - XE_GRAMS, 0.0), carbs_g + XE_GRAMS],
+            sugar,
+            patient,
+            iob=iob,
+        )
     except ValueError:
         await message.reply_text(
             "Некорректные коэффициенты в профиле. Настройте их через /profile.",
@@ -428,6 +458,13 @@ async def dose_sugar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         f"• Сахар: {sugar} ммоль/л\n"
         f"• Короткий (болюс): {dose} Ед\n"
     )
+    if iob is None:
+        summary += "• Активный инсулин не учтён (нет данных)\n"
+    elif iob >= 0.05:
+        summary += f"• Активный инсулин (учтён): {iob:.1f} Ед\n"
+    summary += (
+        f"• Если на 1 ХЕ меньше / больше: {what_if[0]:g} / {what_if[1]:g} Ед\n"
+    )
     if long_val is not None:
         summary += f"• Длинный (базал): {long_val} ед\n"
     summary += "\nСохранить это в дневник?"
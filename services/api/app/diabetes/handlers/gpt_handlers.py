@@ -35,11 +35,12 @@ from services.api.app.diabetes.gpt_command_parser import (
     parse_command,
 )
 from services.api.app.diabetes.utils.constants import XE_GRAMS
+from services.api.app.diabetes.user_session import as_session
 from services.api.app.diabetes.utils.ui import confirm_keyboard
 from services.api.app.ui.keyboard import build_main_keyboard
 from services.api.app.diabetes.services import gpt_client
 from services.api.app.config import settings
-from services.api.app.assistant.services import memory_service
+from services.api.app.assistant.services import context_builder, memory_service
 from .registration import GPT_MODE_KEY, MODE_DISCLAIMED_KEY
 
 from .alert_handlers import check_alert as _check_alert
@@ -137,11 +138,11 @@ async def _handle_pending_entry(
     menu_keyboard: ReplyKeyboardMarkup | None,
 ) -> bool:
     """Process numeric input for a pending entry."""
-    pending_raw = user_data.get("pending_entry")
+    pending_raw = as_session(user_data).pending_entry
     edit_id = user_data.get("edit_id")
-    if not isinstance(pending_raw, dict) or edit_id is not None:
+    if pending_raw is None or edit_id is not None:
         return False
-    pending_entry: EntryData = pending_raw
+    pending_entry = cast(EntryData, pending_raw)
 
     pending_fields = user_data.get("pending_fields")
     if pending_fields:
@@ -386,14 +387,14 @@ async def apply_pending_entry(
     menu_keyboard: ReplyKeyboardMarkup | None,
 ) -> bool:
     """Apply quick values to pending entry or create a new one."""
-    pending_raw = user_data.get("pending_entry")
+    pending_raw = as_session(user_data).pending_entry
     edit_id = user_data.get("edit_id")
     if (
-        isinstance(pending_raw, dict)
+        pending_raw is not None
         and edit_id is None
         and (any(v is not None for v in quick.values()) or carbs_g is not None)
     ):
-        pending_entry: EntryData = pending_raw
+        pending_entry = cast(EntryData, pending_raw)
         if quick["sugar"] is not None:
             pending_entry["sugar_before"] = quick["sugar"]
         if quick["xe"] is not None:
@@ -749,23 +750,14 @@ async def chat_with_gpt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     user_text = message.text
 
     history = cast(list[str], user_data.get(assistant_state.HISTORY_KEY, []))[-assistant_state.ASSISTANT_MAX_TURNS :]
-    messages: list[dict[str, str]] = []
     summary = cast(str | None, user_data.get(assistant_state.SUMMARY_KEY))
-    if summary:
-        messages.append({"role": "system", "content": summary})
-    for turn in history:
-        user_part, _, assistant_part = turn.partition("\nassistant: ")
-        if user_part.startswith("user: "):
-            user_part = user_part[6:]
-        messages.append({"role": "user", "content": user_part})
-        if assistant_part:
-            messages.append({"role": "assistant", "content": assistant_part})
-    messages.append({"role": "user", "content": user_text})
+    messages = context_builder.build_messages(summary, history, user_text)
 
     try:
         completion = await gpt_client.create_chat_completion(
             model="gpt-4o-mini",
             messages=messages,
+            task="assistant",
         )
         content = completion.choices[0].message.content or ""
         reply = gpt_client.format_reply(content)
@@ -788,6 +780,8 @@ async def chat_with_gpt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     if user is not None:
         summary = cast(str | None, user_data.get(assistant_state.SUMMARY_KEY)) if summarized else None
         await memory_service.record_turn(user.id, summary_text=summary)
+        if summarized:
+            context_builder.schedule_refine(user.id, user_data)
 
 
 __all__ = [
@@ -5,6 +5,7 @@ import datetime
 import html
 import io
 import logging
+import time
 from collections.abc import MutableMapping
 from typing import cast
 
@@ -17,16 +18,31 @@ from telegram.ext import ContextTypes, ConversationHandler
 
 from sqlalchemy.orm import Session
 
+from services.api.app.diabetes.instrumentation import (
+    ASSISTANTS_MODEL,
+    observe_openai_call,
+)
 from services.api.app.diabetes.services.db import SessionLocal, User, run_db
+from services.api.app.diabetes.llm_router import LLMBackend, LLMTask
 from services.api.app.diabetes.services.gpt_client import (
     _get_client,
+    analyze_photo,
+    choose_backend,
     create_thread_sync,
     send_message,
 )
 from services.api.app.diabetes.services.repository import CommitError, commit
-from services.api.app.diabetes.utils.functions import extract_nutrition_info
+from services.api.app.diabetes import vision_cache
+from services.api.app.diabetes.user_session import as_session
+from services.api.app.diabetes.metrics import vision_latency_seconds, vision_upload_bytes
+from services.api.app.diabetes.utils.executors import (
+    ExecutorSaturatedError,
+    run_in_executor,
+)
+from services.api.app.diabetes.utils.functions import NutritionInfo, extract_nutrition_info
+from services.api.app.diabetes.utils.image_pipeline import PreparedImage, prepare_image
 from services.api.app.ui.keyboard import build_main_keyboard
-from ..prompts import PHOTO_ANALYSIS_PROMPT
+from ..prompts import PHOTO_ANALYSIS_JSON_PROMPT, PHOTO_ANALYSIS_PROMPT
 
 from . import EntryData, UserData
 
@@ -73,6 +89,18 @@ async def _delete_status_message(status_message: Message | None, tag: str) -> No
         raise
 
 
+async def _prepare_photo(file_bytes: bytes) -> PreparedImage:
+    """Downscale and hash ``file_bytes`` off the event loop."""
+
+    try:
+        image = await run_in_executor("image", prepare_image, file_bytes)
+    except ExecutorSaturatedError:
+        logger.warning("[PHOTO] Image executor saturated, sending original photo")
+        image = PreparedImage(data=file_bytes, original_size=len(file_bytes))
+    vision_upload_bytes.labels(stage="original").observe(image.original_size)
+    return image
+
+
 async def photo_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Prompt user to send a food photo for analysis."""
     message = update.message
@@ -81,6 +109,189 @@ async def photo_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await message.reply_text("📸 Пришлите фото блюда для анализа.", reply_markup=build_main_keyboard())
 
 
+async def _chat_vision(
+    message: Message, image_bytes: bytes
+) -> tuple[str, NutritionInfo, Message | None] | None:
+    """Analyse ``image_bytes`` with one Chat Completions request.
+
+    Return the Vision answer, its parsed values and the status message shown
+    meanwhile, or ``None`` if the user has already been told about a failure.
+    """
+
+    status_message = await message.reply_text("🔍 Анализирую фото (это займёт 5‑10 с)…")
+    try:
+        vision_text, nutrition = await analyze_photo(
+            image_bytes, prompt=PHOTO_ANALYSIS_JSON_PROMPT
+        )
+    except (OpenAIError, RuntimeError, ValueError, httpx.HTTPError) as exc:
+        logger.exception("[PHOTO] Chat Vision request failed: %s", exc)
+        await _delete_status_message(status_message, "CHAT_DELETE")
+        await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
+        return None
+    return vision_text, nutrition, status_message
+
+
+async def _assistant_vision(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    user_data: UserData,
+    user_id: int,
+    image_bytes: bytes,
+) -> tuple[str, Message | None] | None:
+    """Analyse ``image_bytes`` in the user's Assistants thread.
+
+    Return the Vision answer and the status message shown meanwhile, or
+    ``None`` if the user has already been told about a failure.
+    """
+
+    session = as_session(user_data)
+    thread_id = session.thread_id
+    if not thread_id:
+
+        def _fetch_or_create(session: Session) -> str:
+            user = session.get(User, user_id)
+            if user is not None:
+                existing_thread_id = (user.thread_id or "").strip()
+                if existing_thread_id:
+                    return existing_thread_id
+                thread_id_local = create_thread_sync()
+                user.thread_id = thread_id_local
+                commit(session)
+                return thread_id_local
+            thread_id_local = create_thread_sync()
+            session.add(User(telegram_id=user_id, thread_id=thread_id_local))
+            commit(session)
+            return thread_id_local
+
+        try:
+            thread_id = await run_db(_fetch_or_create, sessionmaker=SessionLocal)
+        except CommitError:
+            logger.exception("[PHOTO] Failed to commit user %s", user_id)
+            await message.reply_text("⚠️ Не удалось сохранить данные пользователя.")
+            return None
+        session.thread_id = thread_id
+
+    try:
+        run = await send_message(
+            thread_id=thread_id,
+            content=PHOTO_ANALYSIS_PROMPT,
+            image_bytes=image_bytes,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("[PHOTO] GPT request timed out")
+        await message.reply_text("⚠️ Превышено время ожидания ответа. Попробуйте ещё раз.")
+        return None
+    except (RuntimeError, httpx.HTTPError) as exc:
+        logger.exception("[PHOTO] Failed to send message: %s", exc)
+        await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
+        return None
+    status_message = await message.reply_text("🔍 Анализирую фото (это займёт 5‑10 с)…")
+    chat_id = getattr(message, "chat_id", None)
+
+    async def send_typing_action() -> None:
+        if not chat_id:
+            return
+        try:
+            await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
+        except TelegramError as exc:
+            logger.warning(
+                "[PHOTO][TYPING_ACTION] Failed to send typing action: %s",
+                exc,
+            )
+        except OSError as exc:
+            logger.exception(
+                "[PHOTO][TYPING_ACTION] OS error: %s",
+                exc,
+            )
+            raise
+
+    await send_typing_action()
+
+    max_attempts = 15
+    warn_after = 5
+    for attempt in range(max_attempts):
+        if run.status in ("completed", "failed", "cancelled", "expired"):
+            break
+        await asyncio.sleep(2)
+        try:
+            with observe_openai_call(ASSISTANTS_MODEL, "run_retrieve"):
+                run = await asyncio.wait_for(
+                    run_in_executor(
+                        "openai_sync",
+                        _get_client().beta.threads.runs.retrieve,
+                        thread_id=run.thread_id,
+                        run_id=run.id,
+                    ),
+                    timeout=RUN_RETRIEVE_TIMEOUT,
+                )
+        except asyncio.TimeoutError:
+            logger.warning("[PHOTO][RUN_RETRIEVE] Timed out retrieving run")
+            await _delete_status_message(status_message, "RUN_RETRIEVE_DELETE")
+            await message.reply_text("⚠️ Превышено время ожидания Vision. Попробуйте ещё раз.")
+            return None
+        except (OpenAIError, httpx.HTTPError) as exc:
+            logger.exception("[PHOTO][RUN_RETRIEVE] Failed to retrieve run: %s", exc)
+            await _delete_status_message(status_message, "RUN_RETRIEVE_DELETE")
+            await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
+            return None
+        if attempt == warn_after:
+            await send_typing_action()
+    else:
+        await _delete_status_message(status_message, "TIMEOUT_DELETE")
+        await message.reply_text("⚠️ Время ожидания Vision истекло. Попробуйте позже.")
+        return None
+
+    if run.status != "completed":
+        logger.error("[VISION][RUN_FAILED] run.status=%s", run.status)
+        if status_message and hasattr(status_message, "edit_text"):
+            try:
+                await status_message.edit_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
+            except TelegramError as exc:
+                logger.warning(
+                    "[PHOTO][RUN_FAILED_EDIT] Failed to send Vision failure notice: %s",
+                    exc,
+                )
+            except OSError as exc:
+                logger.exception(
+                    "[PHOTO][RUN_FAILED_EDIT] OS error: %s",
+                    exc,
+                )
+                raise
+        else:
+            await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
+        return None
+
+    with observe_openai_call(ASSISTANTS_MODEL, "messages_list"):
+        try:
+            messages = await run_in_executor(
+                "openai_sync",
+                _get_client().beta.threads.messages.list,
+                thread_id=run.thread_id,
+                run_id=run.id,
+            )
+        except TypeError:
+            messages = await run_in_executor(
+                "openai_sync",
+                _get_client().beta.threads.messages.list,
+                thread_id=run.thread_id,
+            )
+    vision_text = ""
+    for m in messages.data:
+        if getattr(m, "run_id", run.id) != run.id:
+            continue
+        if m.role == "assistant" and m.content:
+            first_block: object = m.content[0]
+            text_block = getattr(first_block, "text", None)
+            if text_block is not None:
+                vision_text = text_block.value
+                break
+    logger.debug(
+        "[VISION][RESPONSE] Ответ Vision для пользователя %s:\n%s",
+        user_id,
+        vision_text,
+    )
+    return vision_text, status_message
+
 async def photo_handler(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -132,148 +343,37 @@ async def photo_handler(
 
         logger.info("[PHOTO] Received photo from user %s", user_id)
 
-        thread_id = user_data.get("thread_id")
-        if not thread_id:
-
-            def _fetch_or_create(session: Session) -> str:
-                user = session.get(User, user_id)
-                if user is not None:
-                    existing_thread_id = (user.thread_id or "").strip()
-                    if existing_thread_id:
-                        return existing_thread_id
-                    thread_id_local = create_thread_sync()
-                    user.thread_id = thread_id_local
-                    commit(session)
-                    return thread_id_local
-                thread_id_local = create_thread_sync()
-                session.add(User(telegram_id=user_id, thread_id=thread_id_local))
-                commit(session)
-                return thread_id_local
-
-            try:
-                thread_id = await run_db(_fetch_or_create, sessionmaker=SessionLocal)
-            except CommitError:
-                logger.exception("[PHOTO] Failed to commit user %s", user_id)
-                await message.reply_text("⚠️ Не удалось сохранить данные пользователя.")
-                return END
-            user_data["thread_id"] = thread_id
-
-        try:
-            run = await send_message(
-                thread_id=thread_id,
-                content=PHOTO_ANALYSIS_PROMPT,
-                image_bytes=file_bytes,
-            )
-        except asyncio.TimeoutError:
-            logger.warning("[PHOTO] GPT request timed out")
-            await message.reply_text("⚠️ Превышено время ожидания ответа. Попробуйте ещё раз.")
-            return END
-        except (RuntimeError, httpx.HTTPError) as exc:
-            logger.exception("[PHOTO] Failed to send message: %s", exc)
-            await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
-            return END
-        status_message = await message.reply_text("🔍 Анализирую фото (это займёт 5‑10 с)…")
-        chat_id = getattr(message, "chat_id", None)
-
-        async def send_typing_action() -> None:
-            if not chat_id:
-                return
-            try:
-                await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
-            except TelegramError as exc:
-                logger.warning(
-                    "[PHOTO][TYPING_ACTION] Failed to send typing action: %s",
-                    exc,
-                )
-            except OSError as exc:
-                logger.exception(
-                    "[PHOTO][TYPING_ACTION] OS error: %s",
-                    exc,
-                )
-                raise
-
-        await send_typing_action()
-
-        max_attempts = 15
-        warn_after = 5
-        for attempt in range(max_attempts):
-            if run.status in ("completed", "failed", "cancelled", "expired"):
-                break
-            await asyncio.sleep(2)
-            try:
-                run = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        _get_client().beta.threads.runs.retrieve,
-                        thread_id=run.thread_id,
-                        run_id=run.id,
-                    ),
-                    timeout=RUN_RETRIEVE_TIMEOUT,
-                )
-            except asyncio.TimeoutError:
-                logger.warning("[PHOTO][RUN_RETRIEVE] Timed out retrieving run")
-                await _delete_status_message(status_message, "RUN_RETRIEVE_DELETE")
-                await message.reply_text("⚠️ Превышено время ожидания Vision. Попробуйте ещё раз.")
-                return END
-            except (OpenAIError, httpx.HTTPError) as exc:
-                logger.exception("[PHOTO][RUN_RETRIEVE] Failed to retrieve run: %s", exc)
-                await _delete_status_message(status_message, "RUN_RETRIEVE_DELETE")
-                await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
-                return END
-            if attempt == warn_after:
-                await send_typing_action()
+        image = await _prepare_photo(file_bytes)
+        cached_text = (
+            vision_cache.lookup(user_id, image.phash, image.digest)
+            if image.phash is not None and image.digest is not None
+            else None
+        )
+        status_message: Message | None = None
+        nutrition: NutritionInfo | None = None
+        if cached_text is not None:
+            logger.info("[PHOTO] Reusing cached Vision answer for user %s", user_id)
+            vision_text = cached_text
         else:
-            await _delete_status_message(status_message, "TIMEOUT_DELETE")
-            await message.reply_text("⚠️ Время ожидания Vision истекло. Попробуйте позже.")
-            return END
-
-        if run.status != "completed":
-            logger.error("[VISION][RUN_FAILED] run.status=%s", run.status)
-            if status_message and hasattr(status_message, "edit_text"):
-                try:
-                    await status_message.edit_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
-                except TelegramError as exc:
-                    logger.warning(
-                        "[PHOTO][RUN_FAILED_EDIT] Failed to send Vision failure notice: %s",
-                        exc,
-                    )
-                except OSError as exc:
-                    logger.exception(
-                        "[PHOTO][RUN_FAILED_EDIT] OS error: %s",
-                        exc,
-                    )
-                    raise
+            vision_upload_bytes.labels(stage="upload").observe(len(image.data))
+            backend = choose_backend(LLMTask.PHOTO_ANALYSIS)
+            started = time.perf_counter()
+            if backend is LLMBackend.CHAT:
+                chat_result = await _chat_vision(message, image.data)
+                if chat_result is None:
+                    return END
+                vision_text, nutrition, status_message = chat_result
             else:
-                await message.reply_text("⚠️ Vision не смог обработать фото. Попробуйте ещё раз.")
-            return END
-
-        try:
-            messages = await asyncio.to_thread(
-                _get_client().beta.threads.messages.list,
-                thread_id=run.thread_id,
-                run_id=run.id,
+                result = await _assistant_vision(message, context, user_data, user_id, image.data)
+                if result is None:
+                    return END
+                vision_text, status_message = result
+            vision_latency_seconds.labels(backend=backend.value).observe(
+                time.perf_counter() - started
             )
-        except TypeError:
-            messages = await asyncio.to_thread(
-                _get_client().beta.threads.messages.list,
-                thread_id=run.thread_id,
-            )
-        vision_text = ""
-        for m in messages.data:
-            if getattr(m, "run_id", run.id) != run.id:
-                continue
-            if m.role == "assistant" and m.content:
-                first_block: object = m.content[0]
-                text_block = getattr(first_block, "text", None)
-                if text_block is not None:
-                    vision_text = text_block.value
-                    break
-        logger.debug(
-            "[VISION][RESPONSE] Ответ Vision для пользователя %s:\n%s",
-            user_id,
-            vision_text,
-        )
 
-        nutrition = extract_nutrition_info(vision_text)
+        if nutrition is None:
+            nutrition = extract_nutrition_info(vision_text)
         if nutrition.carbs_g is None and nutrition.xe is None:
             logger.debug(
                 "[VISION][NO_PARSE] Ответ ассистента: %r для пользователя: %s",
@@ -307,7 +407,7 @@ async def photo_handler(
 
         pending_entry = cast(
             EntryData,
-            user_data.get("pending_entry")
+            as_session(user_data).pending_entry
             or {
                 "telegram_id": user_id,
                 "event_time": datetime.datetime.now(datetime.timezone.utc),
@@ -325,6 +425,8 @@ async def photo_handler(
             }
         )
         user_data["pending_entry"] = pending_entry
+        if cached_text is None and image.phash is not None and image.digest is not None:
+            vision_cache.store(user_id, image.phash, image.digest, vision_text)
         await _delete_status_message(status_message, "DELETE_STATUS")
         prefix = "🍽️ На фото:\n"
         suffix = "Введите текущий сахар (ммоль/л) — и я рассчитаю дозу инсулина."
@@ -44,6 +44,7 @@ from services.api.app.diabetes.services.db import (
     Alert,
     Reminder,
     User,
+    uow,
 )
 from services.api.app.diabetes.utils.ui import BACK_BUTTON_TEXT, PHOTO_BUTTON_PATTERN
 
@@ -594,11 +595,31 @@ async def profile_timezone_save(
     def db_set_timezone(session: Session) -> tuple[bool, bool]:
         return set_timezone(session, user_id, raw, auto=False)
 
-    if run_db is None:
-        with SessionLocal() as session:
-            existed, ok = db_set_timezone(session)
-    else:
-        existed, ok = await run_db(db_set_timezone, sessionmaker=SessionLocal)
+    def db_get_reminders(session: Session) -> list[Reminder]:
+        return session.scalars(
+            sa.select(Reminder)
+            .options(selectinload(Reminder.user))
+            .filter_by(telegram_id=user_id, is_enabled=True)
+            .filter(Reminder.time.is_not(None))
+        ).all()
+
+    job_queue = getattr(context, "job_queue", None)
+    reminders: list[Reminder] = []
+    async with uow(SessionLocal):
+        if run_db is None:
+            with SessionLocal() as session:
+                existed, ok = db_set_timezone(session)
+        else:
+            existed, ok = await run_db(db_set_timezone, sessionmaker=SessionLocal)
+        if ok and job_queue is not None:
+            if run_db is None:
+                with SessionLocal() as session:
+                    reminders = db_get_reminders(session)
+            else:
+                reminders = cast(
+                    list[Reminder],
+                    await run_db(db_get_reminders, sessionmaker=SessionLocal),
+                )
     if not ok:
         await message.reply_text(
             "⚠️ Не удалось обновить часовой пояс.",
@@ -606,27 +627,9 @@ async def profile_timezone_save(
         )
         return END
 
-    job_queue = getattr(context, "job_queue", None)
     if job_queue is None:
         logger.warning("profile_timezone_save called without job_queue")
     else:
-
-        def db_get_reminders(session: Session) -> list[Reminder]:
-            return session.scalars(
-                sa.select(Reminder)
-                .options(selectinload(Reminder.user))
-                .filter_by(telegram_id=user_id, is_enabled=True)
-                .filter(Reminder.time.is_not(None))
-            ).all()
-
-        if run_db is None:
-            with SessionLocal() as session:
-                reminders = db_get_reminders(session)
-        else:
-            reminders = cast(
-                list[Reminder],
-                await run_db(db_get_reminders, sessionmaker=SessionLocal),
-            )
         for rem in reminders:
             reminder_handlers._reschedule_job(job_queue, rem, rem.user)
         logger.info(
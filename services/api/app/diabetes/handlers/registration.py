@@ -26,6 +26,8 @@ from .router import callback_router
 from . import assistant_router
 from .. import learning_handlers
 from ..labs_handlers import LabsMessageHandler, labs_handler
+from ..utils import outbound
+from ..utils.executors import run_in_executor
 from ..utils.ui import (
     PROFILE_BUTTON_TEXT,
     REMINDERS_BUTTON_TEXT,
@@ -134,7 +136,7 @@ async def _gpt_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
     if not isinstance(user_id, int):
         return
     user_data = context.application.user_data.get(user_id)
-    if isinstance(user_data, dict):
+    if isinstance(user_data, MutableMapping):
         user_data.pop(GPT_MODE_KEY, None)
         user_data.pop(MODE_DISCLAIMED_KEY, None)
 
@@ -397,14 +399,16 @@ def register_handlers(
         ) -> None:
             bot = context.bot
             for user_id, data in context.application.user_data.items():
-                if not isinstance(user_id, int) or not isinstance(data, dict):
+                if not isinstance(user_id, int) or not isinstance(data, MutableMapping):
                     continue
                 if data.get(LAST_MODE_KEY) or data.get(AWAITING_KIND):
                     reset_mode_state(data)
                     try:
-                        await bot.send_message(
-                            chat_id=user_id,
-                            text="Ассистент:",
+                        await outbound.send_message(
+                            bot,
+                            user_id,
+                            "Ассистент:",
+                            priority=outbound.Priority.NOTICE,
                             reply_markup=assistant_menu.assistant_keyboard(),
                         )
                     except (TelegramError, OSError) as exc:
@@ -416,3 +420,25 @@ def register_handlers(
             first=datetime.timedelta(seconds=assistant_mode_timeout),
             name="assistant_mode_timeout",
         )
+
+        onboarding_metrics_interval = settings.onboarding_metrics_interval_sec
+
+        async def _aggregate_onboarding_metrics(
+            _context: ContextTypes.DEFAULT_TYPE,
+        ) -> None:
+            from services.api.app.management.aggregate_onboarding import (
+                aggregate_incremental,
+            )
+
+            try:
+                await run_in_executor("db", aggregate_incremental)
+            except SQLAlchemyError:
+                logger.exception("Failed to aggregate onboarding metrics")
+
+        if onboarding_metrics_interval > 0:
+            jq.run_repeating(
+                _aggregate_onboarding_metrics,
+                interval=datetime.timedelta(seconds=onboarding_metrics_interval),
+                first=datetime.timedelta(seconds=onboarding_metrics_interval),
+                name="aggregate_onboarding_metrics",
+            )
@@ -19,6 +19,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker, selectinload
 from sqlalchemy.orm.exc import DetachedInstanceError
 from telegram import (
+    Bot,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Message,
@@ -48,6 +49,7 @@ from services.api.app.diabetes.utils.helpers import (
     INVALID_TIME_MSG,
     parse_time_interval,
 )
+from services.api.app.diabetes.utils import outbound
 from services.api.app.diabetes.utils.jobs import _remove_jobs, schedule_once
 from services.api.app.ui.keyboard import build_main_keyboard
 from services.api.app.diabetes.schemas.reminders import ScheduleKind
@@ -1071,7 +1073,12 @@ async def reminder_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     job = context.job
     if job is None or job.data is None:
         return
-    data = cast("UserData", job.data)
+    await fire_reminder(context.bot, cast("UserData", job.data))
+
+
+async def fire_reminder(bot: Bot, data: UserData) -> None:
+    """Log the trigger of a reminder and send it to its chat."""
+
     rid = data.get("reminder_id")
     chat_id = data.get("chat_id")
     if rid is None or chat_id is None:
@@ -1107,8 +1114,12 @@ async def reminder_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     keyboard = InlineKeyboardMarkup([buttons])
     logger.info("Sending reminder %s to chat %s", rid, chat_id)
     try:
-        await context.bot.send_message(
-            chat_id=chat_id, text=text, reply_markup=keyboard
+        await outbound.send_message(
+            bot,
+            chat_id,
+            text,
+            priority=outbound.Priority.REMINDER,
+            reply_markup=keyboard,
         )
     except TelegramError:
         logger.exception("Failed to send reminder %s to chat %s", rid, chat_id)
@@ -1411,6 +1422,7 @@ __all__ = [
     "reminder_webapp_save",
     "delete_reminder",
     "reminder_job",
+    "fire_reminder",
     "reminder_callback",
     "reminder_action_cb",
     "callback_router",
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, TypeAlias, Any, cast
 from zoneinfo import ZoneInfo
 
@@ -10,7 +11,9 @@ from telegram.ext import ContextTypes, JobQueue
 
 from sqlalchemy.orm.exc import DetachedInstanceError
 
+from services.api.app.config import get_settings
 from services.api.app.diabetes.services.db import Reminder, User
+from services.api.app.diabetes.utils.reminder_wheel import WheelEntry, get_wheel
 from services.api.app.diabetes.schemas.reminders import ScheduleKind
 
 logger = logging.getLogger(__name__)
@@ -21,6 +24,66 @@ else:
     DefaultJobQueue = JobQueue
 
 
+REMINDER_TICK_JOB_NAME = "reminder_bucket_tick"
+BUCKET_SECONDS = 60
+# A tick must finish before the next one starts: APScheduler skips
+# overlapping runs of the same job.
+MAX_BUCKET_JITTER_SEC = 45
+
+
+async def reminder_bucket_tick(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Fire every wheel reminder due in the current minute bucket.
+
+    Due reminders are sent in batches of ``REMINDER_BUCKET_BATCH_SIZE``.
+    With ``REMINDER_BUCKET_JITTER_SEC`` the batches are spread evenly over
+    that many seconds instead of all going out at the top of the minute.
+    """
+
+    from . import reminder_handlers
+
+    due = get_wheel().pop_due(datetime.now(timezone.utc))
+    if not due:
+        return
+    settings = get_settings()
+    batch_size = max(1, settings.reminder_bucket_batch_size)
+    jitter = min(max(settings.reminder_bucket_jitter_sec, 0), MAX_BUCKET_JITTER_SEC)
+    batches = [due[i : i + batch_size] for i in range(0, len(due), batch_size)]
+    step = jitter / len(batches)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for index, batch in enumerate(batches):
+        delay = started + index * step - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        results = await asyncio.gather(
+            *(reminder_handlers.fire_reminder(context.bot, cast(Any, e.data)) for e in batch),
+            return_exceptions=True,
+        )
+        for entry, result in zip(batch, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to fire %s: %s", entry.name, result)
+    logger.info("Fired %d bucketed reminder(s) in %d batch(es)", len(due), len(batches))
+
+
+def ensure_bucket_tick(job_queue: DefaultJobQueue) -> None:
+    """Install the per-minute wheel tick once per job queue."""
+
+    if job_queue.get_jobs_by_name(REMINDER_TICK_JOB_NAME):
+        return
+    now = datetime.now(timezone.utc)
+    # First tick one second after the next minute boundary, so reminders
+    # set for HH:MM are already due when it runs.
+    first = BUCKET_SECONDS - now.second - now.microsecond / 1_000_000 + 1
+    job_queue.run_repeating(
+        reminder_bucket_tick,
+        interval=timedelta(seconds=BUCKET_SECONDS),
+        first=timedelta(seconds=first),
+        name=REMINDER_TICK_JOB_NAME,
+        job_kwargs={"id": REMINDER_TICK_JOB_NAME, "replace_existing": True},
+    )
+    logger.info("⏱ scheduled %s", REMINDER_TICK_JOB_NAME)
+
+
 def schedule_reminder(rem: Reminder, job_queue: DefaultJobQueue | None, user: User | None) -> None:
     """Schedule a reminder in the provided job queue."""
     if job_queue is None:
@@ -103,6 +166,16 @@ def schedule_reminder(rem: Reminder, job_queue: DefaultJobQueue | None, user: Us
         logger.info("SKIP %s kind=%s", name, kind.value)
         return
     if kind == ScheduleKind.at_time and rem.time is not None:
+        mask = getattr(rem, "days_mask", 0) or 0
+        days = tuple(i for i in range(7) if mask & (1 << i)) if mask else tuple(range(7))
+        if get_settings().reminder_bucketed:
+            next_run = get_wheel().add(
+                WheelEntry(name=name, data=context, at=rem.time, tz=tz, days=days)
+            )
+            ensure_bucket_tick(job_queue)
+            logger.info("SET %s kind=%s bucketed next_run=%s", name, kind.value, next_run)
+            return
+
         run_daily_sig = inspect.signature(job_queue.run_daily)
         run_daily_fn = cast(Any, job_queue.run_daily)
         run_daily_kwargs: dict[str, object] = {
@@ -113,8 +186,6 @@ def schedule_reminder(rem: Reminder, job_queue: DefaultJobQueue | None, user: Us
         }
 
         if "days" in run_daily_sig.parameters:
-            mask = getattr(rem, "days_mask", 0) or 0
-            days = tuple(i for i in range(7) if mask & (1 << i)) if mask else tuple(range(7))
             run_daily_kwargs["days"] = days
 
         if "timezone" in run_daily_sig.parameters:
@@ -152,4 +223,9 @@ def schedule_reminder(rem: Reminder, job_queue: DefaultJobQueue | None, user: Us
     logger.info("SET %s kind=%s next_run=%s", name, kind.value, next_run)
 
 
-__all__ = ["DefaultJobQueue", "schedule_reminder"]
+__all__ = [
+    "DefaultJobQueue",
+    "ensure_bucket_tick",
+    "reminder_bucket_tick",
+    "schedule_reminder",
+]
@@ -2,17 +2,20 @@
 
 from __future__ import annotations
 
-import asyncio
 import datetime  # Re-export for tests and type checkers
 import html
+import io
 import logging
 import os  # Re-export for tests and type checkers
+import threading
+import time
+from collections import OrderedDict
 
 from dataclasses import dataclass
 from typing import Protocol, cast
 
+import httpx
 from openai import OpenAIError
-from openai.types.beta.threads import TextContentBlock
 import telegram
 from telegram import (
     CallbackQuery,
@@ -27,25 +30,25 @@ from telegram import (
 from telegram.ext import ContextTypes
 
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
+from services.api.app.config import settings
 from services.api.app.diabetes.services.db import (
     SessionLocal,
     Entry,
-    User,
     HistoryRecord,
-    run_db,
 )
-from services.api.app.diabetes.services.gpt_client import (
-    send_message,
-    _get_client,
-    create_thread,
+from services.api.app.diabetes.services.gpt_client import create_chat_completion
+from services.api.app.diabetes.services.report_digest import (
+    DigestBuilder,
+    ReportDigest,
 )
-from services.api.app.diabetes.services.repository import CommitError, commit
-from ..prompts import REPORT_ANALYSIS_PROMPT_TEMPLATE
+from ..prompts import REPORT_ANALYSIS_PROMPT_TEMPLATE, REPORT_SYSTEM_PROMPT
 from services.api.app.diabetes.services.reporting import (
-    make_sugar_plot,
+    LineSpool,
+    SugarSeries,
     generate_pdf_report,
+    plot_sugar_series,
 )
+from services.api.app.diabetes.utils.executors import run_in_executor
 from services.api.app.diabetes.utils.ui import BACK_BUTTON_TEXT
 from services.api.app.ui.keyboard import build_main_keyboard
 from . import UserData
@@ -54,6 +57,13 @@ logger = logging.getLogger(__name__)
 
 LOW_SUGAR_THRESHOLD = 3.0
 HIGH_SUGAR_THRESHOLD = 13.0
+DEFAULT_GPT_TEXT = "Не удалось получить рекомендации."
+REPORT_ADVICE_MAX_TOKENS = 600
+REPORT_YIELD_PER = 1000
+
+AdviceCacheKey = tuple[int, str, str]
+_advice_cache: OrderedDict[AdviceCacheKey, tuple[str, float]] = OrderedDict()
+_advice_cache_lock = threading.Lock()
 
 
 class EntryLike(Protocol):
@@ -202,7 +212,7 @@ async def history_view(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             ).all()
 
     # Run DB work in a thread to keep the event loop responsive.
-    records = await asyncio.to_thread(_fetch_entries)
+    records = await run_in_executor("db", _fetch_entries)
     if not records:
         try:
             await message.reply_text("В дневнике пока нет записей.")
@@ -320,6 +330,75 @@ async def report_period_callback(
         await query.edit_message_text("Команда не распознана")
 
 
+@dataclass
+class ReportData:
+    """Everything a report needs, folded from one pass over the entries."""
+
+    total: int
+    errors: LineSpool
+    day_lines: LineSpool
+    series: SugarSeries
+    digest: ReportDigest
+
+    def close(self) -> None:
+        self.errors.close()
+        self.day_lines.close()
+
+
+def _collect_report(user_id: int, date_from: datetime.datetime) -> ReportData:
+    """Stream the user's entries since ``date_from`` into a :class:`ReportData`.
+
+    Only the needed columns are selected and rows are fetched in batches of
+    ``REPORT_YIELD_PER``. Each row is folded into the digest, the plot series
+    and the PDF line spools, so memory does not grow with the number of
+    entries beyond the compact plot arrays.
+    """
+
+    stmt = (
+        sa.select(
+            Entry.event_time,
+            Entry.sugar_before,
+            Entry.carbs_g,
+            Entry.xe,
+            Entry.dose,
+        )
+        .where(Entry.telegram_id == user_id)
+        .where(Entry.event_time >= date_from)
+        .order_by(Entry.event_time)
+        .execution_options(yield_per=REPORT_YIELD_PER)
+    )
+    digest = DigestBuilder()
+    series = SugarSeries()
+    errors = LineSpool()
+    day_lines = LineSpool()
+    total = 0
+    try:
+        with SessionLocal() as session:
+            for event_time, sugar, carbs, xe, dose in session.execute(stmt):
+                total += 1
+                digest.add(event_time, sugar, carbs_g=carbs, dose=dose, xe=xe)
+                series.add(event_time, sugar)
+                day_str = event_time.strftime("%d.%m")
+                day_lines.write(
+                    f"{day_str}: сахар {_dash(sugar)}, "
+                    f"углеводы {_dash(carbs)}, доза {_dash(dose)}"
+                )
+                if sugar is not None:
+                    if sugar < LOW_SUGAR_THRESHOLD:
+                        errors.write(f"{day_str}: низкий сахар {sugar}")
+                    elif sugar > HIGH_SUGAR_THRESHOLD:
+                        errors.write(f"{day_str}: высокий сахар {sugar}")
+    except BaseException:
+        errors.close()
+        day_lines.close()
+        raise
+    return ReportData(total, errors, day_lines, series, digest.build())
+
+
+def _dash(value: float | None) -> str:
+    return str(value) if value is not None else "—"
+
+
 async def send_report(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -332,20 +411,25 @@ async def send_report(
     if tg_user is None:
         return
     user_id = tg_user.id
-    message = update.message
-
-    def _fetch_entries() -> list[Entry]:
-        with SessionLocal() as session:
-            return session.scalars(
-                sa.select(Entry)
-                .where(Entry.telegram_id == user_id)
-                .where(Entry.event_time >= date_from)
-                .order_by(Entry.event_time)
-            ).all()
 
     # Run blocking DB calls in a thread to avoid freezing the event loop.
-    entries = await asyncio.to_thread(_fetch_entries)
-    if not entries:
+    data = await run_in_executor("db", _collect_report, user_id, date_from)
+    try:
+        await _reply_report(update, user_id, data, date_from, period_label, query)
+    finally:
+        data.close()
+
+
+async def _reply_report(
+    update: Update,
+    user_id: int,
+    data: ReportData,
+    date_from: datetime.datetime,
+    period_label: str,
+    query: CallbackQuery | None,
+) -> None:
+    message = update.message
+    if not data.total:
         text = f"Нет записей за {period_label}."
         if query is not None:
             await query.edit_message_text(text)
@@ -353,93 +437,21 @@ async def send_report(
             await message.reply_text(text)
         return
 
-    summary_lines = [f"Всего записей: {len(entries)}"]
-    errors = []
-    day_lines = []
-    for entry in entries:
-        day_str = entry.event_time.strftime("%d.%m")
-        sugar = entry.sugar_before if entry.sugar_before is not None else "—"
-        carbs = entry.carbs_g if entry.carbs_g is not None else "—"
-        dose = entry.dose if entry.dose is not None else "—"
-        line = f"{day_str}: сахар {sugar}, углеводы {carbs}, доза {dose}"
-        day_lines.append(line)
-        if entry.sugar_before is not None:
-            if entry.sugar_before < LOW_SUGAR_THRESHOLD:
-                errors.append(f"{day_str}: низкий сахар {entry.sugar_before}")
-            elif entry.sugar_before > HIGH_SUGAR_THRESHOLD:
-                errors.append(f"{day_str}: высокий сахар {entry.sugar_before}")
-    summary_text = "\n".join(summary_lines)
-    errors_text = "\n".join(errors) if errors else "нет"
-    days_text = "\n".join(day_lines)
-
-    prompt = REPORT_ANALYSIS_PROMPT_TEMPLATE.format(
-        summary=summary_text,
-        errors=errors_text,
-        days=days_text,
+    summary_lines = [f"Всего записей: {data.total}"]
+    gpt_text = await _report_advice(user_id, date_from, period_label, data.digest)
+    report_msg = "<b>Отчёт сформирован</b>\n\n" + "\n".join(
+        summary_lines + [row.line() for row in data.digest.rows()]
     )
 
-    default_gpt_text = "Не удалось получить рекомендации."
-    gpt_text: str | None = default_gpt_text
-    context.user_data = context.user_data or {}  # context.user_data всегда словарь.
-    user_data = cast(UserData, context.user_data)
-    thread_id = cast(str | None, user_data.get("thread_id"))
-    if thread_id is None:
-        thread_id, saved = await _ensure_user_thread_id(user_id)
-        if thread_id and saved:
-            user_data["thread_id"] = thread_id
-    if thread_id:
-        try:
-            run = await send_message(thread_id=thread_id, content=prompt)
-            max_attempts = 15
-            for _ in range(max_attempts):
-                if run.status in ("completed", "failed", "cancelled", "expired"):
-                    break
-                await asyncio.sleep(2)
-                run = await asyncio.to_thread(
-                    _get_client().beta.threads.runs.retrieve,
-                    thread_id=run.thread_id,
-                    run_id=run.id,
-                )
-            if run.status == "completed":
-                messages = await asyncio.to_thread(
-                    _get_client().beta.threads.messages.list,
-                    thread_id=run.thread_id,
-                )
-                gpt_text = next(
-                    (
-                        block.text.value
-                        for m in messages.data
-                        if m.role == "assistant"
-                        for block in m.content
-                        if isinstance(block, TextContentBlock)
-                    ),
-                    None,
-                )
-                if gpt_text is None:
-                    gpt_text = next(
-                        (
-                            block.text.value
-                            for m in messages.data
-                            if m.role == "assistant"
-                            for block in m.content
-                            if hasattr(block, "text") and hasattr(block.text, "value")
-                        ),
-                        default_gpt_text,
-                    )
-            else:
-                logger.error("[GPT][RUN_FAILED] status=%s", run.status)
-        except OpenAIError:
-            logger.exception("[GPT] Failed to get recommendations")
-        except OSError as exc:
-            logger.exception("[GPT] OS error while getting recommendations: %s", exc)
-    else:
-        logger.warning("[GPT] thread_id missing for user %s", user_id)
-    report_msg = "<b>Отчёт сформирован</b>\n\n" + "\n".join(summary_lines + day_lines)
+    def _render() -> tuple[io.BytesIO, io.BytesIO]:
+        plot = plot_sugar_series(data.series, period_label)
+        pdf = generate_pdf_report(
+            summary_lines, data.errors, data.day_lines, gpt_text, plot
+        )
+        return plot, pdf
 
-    plot_buf = make_sugar_plot(entries, period_label)
-    pdf_buf = generate_pdf_report(
-        summary_lines, errors, day_lines, gpt_text or default_gpt_text, plot_buf
-    )
+    # Plot and PDF rendering is CPU-bound; keep it off the event loop.
+    plot_buf, pdf_buf = await run_in_executor("render", _render)
     plot_buf.seek(0)
     pdf_buf.seek(0)
     if query is not None:
@@ -471,55 +483,75 @@ async def send_report(
         )
 
 
-def _thread_id_db_task(
-    session: Session,
-    user_id: int,
-    new_thread_id: str | None = None,
-) -> tuple[str | None, bool]:
-    """Fetch or persist a ``thread_id`` for ``user_id`` within one session.
+def _advice_cache_get(key: AdviceCacheKey) -> str | None:
+    ttl = settings.report_advice_cache_ttl_sec
+    with _advice_cache_lock:
+        cached = _advice_cache.get(key)
+        if cached is None:
+            return None
+        text, ts = cached
+        if time.monotonic() - ts >= ttl:
+            _advice_cache.pop(key, None)
+            return None
+        _advice_cache.move_to_end(key)
+        return text
 
-    When ``new_thread_id`` is ``None`` the current identifier is returned.
-    Otherwise the provided identifier is saved to the database.
-    """
 
-    db_user = session.get(User, user_id)
-    if new_thread_id is None:
-        if db_user is None:
-            return None, False
-        return db_user.thread_id, True
+def _advice_cache_put(key: AdviceCacheKey, text: str) -> None:
+    max_size = settings.report_advice_cache_size
+    if max_size <= 0:
+        return
+    with _advice_cache_lock:
+        _advice_cache[key] = (text, time.monotonic())
+        _advice_cache.move_to_end(key)
+        while len(_advice_cache) > max_size:
+            _advice_cache.popitem(last=False)
 
-    if db_user is None:
-        session.add(User(telegram_id=user_id, thread_id=new_thread_id))
-    else:
-        db_user.thread_id = new_thread_id
-    try:
-        commit(session)
-    except CommitError:
-        return None, False
-    return new_thread_id, True
 
+async def _report_advice(
+    user_id: int,
+    date_from: datetime.datetime,
+    period_label: str,
+    digest: ReportDigest,
+) -> str:
+    """Return GPT recommendations for ``digest``.
+
+    The prompt is built from the compact digest, so its size does not depend on
+    the number of entries. Replies are cached per user, period start and
+    digest version: re-requesting an unchanged report costs no API call.
+    """
 
-async def _ensure_user_thread_id(user_id: int) -> tuple[str | None, bool]:
-    """Return an existing thread or create and persist a new one."""
+    key = (user_id, date_from.date().isoformat(), digest.version)
+    cached = _advice_cache_get(key)
+    if cached is not None:
+        logger.info("[report_advice_cache] cache_hit %s", key)
+        return cached
 
-    thread_id, saved = await run_db(
-        _thread_id_db_task,
-        user_id,
-        sessionmaker=SessionLocal,
-    )
-    if thread_id is not None:
-        return thread_id, saved
-
-    new_thread_id = await create_thread()
-    thread_id, saved = await run_db(
-        _thread_id_db_task,
-        user_id,
-        new_thread_id,
-        sessionmaker=SessionLocal,
+    prompt = REPORT_ANALYSIS_PROMPT_TEMPLATE.format(
+        period=period_label, digest=digest.text()
     )
-    if not saved:
-        return None, False
-    return thread_id, True
+    try:
+        completion = await create_chat_completion(
+            model=settings.report_model,
+            messages=[
+                {"role": "system", "content": REPORT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            max_tokens=REPORT_ADVICE_MAX_TOKENS,
+            task="report",
+        )
+    except (OpenAIError, httpx.HTTPError, RuntimeError):
+        logger.exception("[GPT] Failed to get recommendations")
+        return DEFAULT_GPT_TEXT
+    content = completion.choices[0].message.content if completion.choices else None
+    if not content:
+        logger.error("[GPT] Empty recommendations for user %s", user_id)
+        return DEFAULT_GPT_TEXT
+    text = content.strip()
+    if completion.id != "static":
+        _advice_cache_put(key, text)
+    return text
 
 
 __all__ = [
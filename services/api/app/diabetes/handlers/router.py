@@ -150,6 +150,9 @@ async def handle_edit_or_delete(
                 logger.exception("Failed to delete entry")
                 await query.edit_message_text("⚠️ Не удалось удалить запись.")
                 return
+            from services.api.app.diabetes.services.iob import iob_engine
+
+            iob_engine.invalidate(user.id)
             await query.edit_message_text("❌ Запись удалена.")
             return
     if action != "edit":
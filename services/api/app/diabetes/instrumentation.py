@@ -0,0 +1,69 @@
+"""Helpers that feed the latency histograms defined in :mod:`.metrics`."""
+
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from services.api.app.diabetes.metrics import (
+    openai_request_seconds,
+    openai_tokens_total,
+)
+
+ASSISTANTS_MODEL = "assistant"
+
+
+def callable_label(fn: object) -> str:
+    """Return a short, stable metric label for ``fn``.
+
+    The label is ``<module tail>.<qualname>`` with ``<locals>`` segments
+    dropped, e.g. ``metrics.get_onboarding_metrics._query``. Partials are
+    unwrapped and bound methods use their function's name.
+    """
+
+    while isinstance(fn, functools.partial):
+        fn = fn.func
+    fn = getattr(fn, "__func__", fn)
+    qualname = getattr(fn, "__qualname__", None) or type(fn).__qualname__
+    qualname = qualname.replace(".<locals>", "")
+    module = getattr(fn, "__module__", None) or ""
+    tail = module.rsplit(".", 1)[-1]
+    return f"{tail}.{qualname}" if tail else qualname
+
+
+@contextmanager
+def observe_openai_call(model: str, task: str) -> Iterator[None]:
+    """Time the enclosed OpenAI request and record its outcome."""
+
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        openai_request_seconds.labels(model=model, task=task, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+def record_openai_usage(usage: object, *, model: str, task: str) -> None:
+    """Add prompt and completion token counts from ``usage`` to the counters."""
+
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if isinstance(tokens, int) and tokens > 0:
+            openai_tokens_total.labels(model=model, task=task, kind=kind).inc(tokens)
+
+
+__all__ = [
+    "ASSISTANTS_MODEL",
+    "callable_label",
+    "observe_openai_call",
+    "record_openai_usage",
+]
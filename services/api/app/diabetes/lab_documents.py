@@ -0,0 +1,234 @@
+"""Bounded text extraction from lab result PDFs.
+
+``pypdf`` parses a page in pure Python, and a scanned 30-page report can
+take seconds.  :func:`extract_pdf_text` therefore reads the document in a
+small process pool (``LABS_PDF_WORKERS``) under a timeout
+(``LABS_PDF_TIMEOUT_SEC``), so it never blocks the event loop nor holds the
+GIL of the bot process.  Documents above ``LABS_PDF_MAX_BYTES`` are refused
+and at most ``LABS_PDF_MAX_PAGES`` pages are read.  Pages are read one by
+one, and reading stops at the first page without lab rows after rows were
+found: the results are over and the rest is usually comments and legal
+text.
+
+Extracted texts are cached by Telegram's ``file_unique_id``, so a document
+sent again is answered without downloading or parsing it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from services.api.app.config import settings
+from services.api.app.diabetes.metrics import labs_pdf_extract_seconds
+from services.api.app.diabetes.utils.lazy_import import LazyAttrs
+
+logger = logging.getLogger(__name__)
+
+# Loaded in the worker process on the first PDF it reads.
+_lazy = LazyAttrs(
+    globals(),
+    {
+        "PdfReader": ("pypdf", "PdfReader"),
+        "PdfReadError": ("pypdf.errors", "PdfReadError"),
+    },
+)
+__getattr__ = _lazy.module_getattr
+
+__all__ = [
+    "DocumentTimeoutError",
+    "DocumentTooLargeError",
+    "LAB_ROW_RE",
+    "LabDocumentError",
+    "PdfText",
+    "cached_text",
+    "extract_pdf_text",
+    "read_pdf_text",
+    "reset_cache",
+    "shutdown_pool",
+]
+
+# ``<name>: <number>`` as understood by ``labs_handlers.parse_labs``.
+LAB_ROW_RE = re.compile(r"^([^:]+?):\s*([\d.,]+)")
+
+CACHE_LIMIT = 128
+
+_cache: OrderedDict[str, str] = OrderedDict()
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+class LabDocumentError(RuntimeError):
+    """Raised when a lab document is refused or cannot be read in time."""
+
+
+class DocumentTooLargeError(LabDocumentError):
+    """Raised for documents above ``LABS_PDF_MAX_BYTES``."""
+
+
+class DocumentTimeoutError(LabDocumentError):
+    """Raised when reading a document exceeds ``LABS_PDF_TIMEOUT_SEC``."""
+
+
+@dataclass(frozen=True, slots=True)
+class PdfText:
+    """Text read from a PDF and how much of the document it covers."""
+
+    text: str
+    pages_read: int
+    total_pages: int
+
+
+def _has_lab_rows(text: str) -> bool:
+    return any(LAB_ROW_RE.search(line.strip()) for line in text.splitlines())
+
+
+def read_pdf_text(file_bytes: bytes, max_pages: int) -> PdfText:
+    """Read the text of at most ``max_pages`` pages of a PDF.
+
+    Runs in the worker process.  Stops at the first page without lab rows
+    that follows a page with them.
+    """
+
+    PdfReader = _lazy("PdfReader")
+    reader = PdfReader(io.BytesIO(file_bytes))
+    total = len(reader.pages)
+    parts: list[str] = []
+    found_rows = False
+    pages_read = 0
+    for index in range(min(total, max_pages)):
+        page_text = reader.pages[index].extract_text() or ""
+        pages_read += 1
+        if _has_lab_rows(page_text):
+            found_rows = True
+        elif found_rows:
+            break
+        parts.append(page_text)
+    return PdfText("\n".join(parts), pages_read, total)
+
+
+def _file_key(file_bytes: bytes) -> str:
+    return "sha256:" + hashlib.sha256(file_bytes).hexdigest()
+
+
+def cached_text(key: str) -> str | None:
+    """Return the cached text of the document ``key`` or ``None``."""
+
+    text = _cache.get(key)
+    if text is not None:
+        _cache.move_to_end(key)
+    return text
+
+
+def _remember(key: str, text: str) -> None:
+    _cache[key] = text
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_LIMIT:
+        _cache.popitem(last=False)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(settings.labs_pdf_workers, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill the workers of ``pool`` so a runaway PDF stops using the CPU."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def extract_pdf_text(file_bytes: bytes, *, cache_key: str | None = None) -> str | None:
+    """Return the text of a lab PDF, or ``None`` if it cannot be parsed.
+
+    ``cache_key`` should be the document's ``file_unique_id``; the hash of
+    ``file_bytes`` is used without one.  Raises
+    :class:`DocumentTooLargeError` and :class:`DocumentTimeoutError`.
+    """
+
+    key = cache_key or _file_key(file_bytes)
+    text = cached_text(key)
+    if text is not None:
+        labs_pdf_extract_seconds.labels(outcome="cached").observe(0)
+        return text
+    if len(file_bytes) > settings.labs_pdf_max_bytes:
+        labs_pdf_extract_seconds.labels(outcome="too_large").observe(0)
+        raise DocumentTooLargeError(f"PDF of {len(file_bytes)} bytes is too large")
+
+    pool = _get_pool()
+    started = time.perf_counter()
+    future = asyncio.get_running_loop().run_in_executor(
+        pool, read_pdf_text, file_bytes, settings.labs_pdf_max_pages
+    )
+    try:
+        result = await asyncio.wait_for(future, timeout=settings.labs_pdf_timeout_sec)
+    except asyncio.TimeoutError:
+        labs_pdf_extract_seconds.labels(outcome="timeout").observe(
+            time.perf_counter() - started
+        )
+        logger.warning(
+            "Reading PDF timed out after %.1fs", settings.labs_pdf_timeout_sec
+        )
+        _discard_pool(pool)
+        raise DocumentTimeoutError("Timed out while reading PDF") from None
+    except BrokenProcessPool as exc:
+        labs_pdf_extract_seconds.labels(outcome="error").observe(
+            time.perf_counter() - started
+        )
+        logger.warning("PDF worker died: %s", exc)
+        _discard_pool(pool)
+        return None
+    except (_lazy("PdfReadError"), OSError, ValueError) as exc:
+        labs_pdf_extract_seconds.labels(outcome="error").observe(
+            time.perf_counter() - started
+        )
+        logger.warning("Failed to read PDF: %s", exc)
+        return None
+
+    labs_pdf_extract_seconds.labels(outcome="ok").observe(time.perf_counter() - started)
+    if result.pages_read < result.total_pages:
+        logger.info(
+            "Read %d of %d PDF pages", result.pages_read, result.total_pages
+        )
+    _remember(key, result.text)
+    return result.text
+
+
+def shutdown_pool() -> None:
+    """Stop the PDF worker processes; they are started again on next use."""
+
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def reset_cache() -> None:
+    """Forget extracted texts (used by tests)."""
+
+    _cache.clear()
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-import io
 import logging
 import re
 from dataclasses import dataclass
 from collections.abc import Callable, Iterable, Mapping
 from typing import Coroutine, MutableMapping, cast
 
-from pypdf import PdfReader
-from pypdf.errors import PdfReadError
 from telegram import Message, Update
 from telegram.error import TelegramError
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
 
+from services.api.app.config import settings
+from services.api.app.diabetes import lab_documents
+from services.api.app.diabetes.lab_documents import (
+    LAB_ROW_RE,
+    DocumentTimeoutError,
+    DocumentTooLargeError,
+)
 from services.api.app.ui.keyboard import build_main_keyboard
 
 logger = logging.getLogger(__name__)
@@ -25,6 +29,10 @@ KIND_TEXT = "text"
 
 END = ConversationHandler.END
 
+TOO_LARGE_REPLY = (
+    "⚠️ Файл слишком большой. Пришлите только страницы с результатами анализов."
+)
+
 
 # Typical reference ranges used when none are provided by the user.
 DEFAULT_REFS: dict[str, tuple[float, float]] = {
@@ -59,7 +67,7 @@ def _parse_line(line: str) -> LabResult | None:
 
     if any(p.search(line) for p in MEDICATION_PATTERNS):
         return None
-    m = re.search(r"^([^:]+?):\s*([\d.,]+)", line)
+    m = LAB_ROW_RE.search(line)
     if not m:
         return None
     name = m.group(1).strip()
@@ -156,21 +164,53 @@ def format_reply(results: Iterable[LabResult]) -> str:
     return "\n\n".join(parts) if parts else "Не удалось распознать анализы."
 
 
+def _is_pdf(mime: str | None) -> bool:
+    return bool(mime and "pdf" in mime.lower())
+
+
 def _extract_text_from_file(file_bytes: bytes, mime: str | None) -> str:
-    """Extract text from ``file_bytes`` using simple heuristics."""
+    """Decode ``file_bytes`` as text; binary files yield an empty string."""
 
-    if mime and "pdf" in mime.lower():
-        try:
-            reader = PdfReader(io.BytesIO(file_bytes))
-            return "\n".join(page.extract_text() or "" for page in reader.pages)
-        except (PdfReadError, OSError) as exc:  # pragma: no cover - best effort
-            logger.warning("Failed to read PDF: %s", exc)
     try:
         return file_bytes.decode("utf-8")
     except UnicodeDecodeError:
         return ""
 
 
+async def _read_file_text(
+    file_bytes: bytes, mime: str | None, cache_key: str | None
+) -> str:
+    """Return the text of an uploaded file, reading PDFs off the event loop.
+
+    Raises :class:`DocumentTooLargeError` and :class:`DocumentTimeoutError`
+    for PDFs.
+    """
+
+    if _is_pdf(mime):
+        text = await lab_documents.extract_pdf_text(file_bytes, cache_key=cache_key)
+        if text is not None:
+            return text
+    return _extract_text_from_file(file_bytes, mime)
+
+
+def _document_cache_key(message: Message) -> str | None:
+    """Return the cache key of a PDF document attached to ``message``."""
+
+    document = message.document
+    if document is None or not _is_pdf(document.mime_type):
+        return None
+    unique_id = document.file_unique_id
+    return unique_id if isinstance(unique_id, str) and unique_id else None
+
+
+def _document_too_large(message: Message) -> bool:
+    document = message.document
+    if document is None or not _is_pdf(document.mime_type):
+        return False
+    size = document.file_size
+    return isinstance(size, int) and size > settings.labs_pdf_max_bytes
+
+
 async def _download_file(message: Message, ctx: ContextTypes.DEFAULT_TYPE) -> tuple[bytes, str | None] | None:
     """Download a document or photo and return its bytes and MIME type."""
 
@@ -209,7 +249,17 @@ async def labs_handler(update: Update, ctx: ContextTypes.DEFAULT_TYPE) -> int:
 
     kind = KIND_TEXT
     text = message.text or ""
-    if not text:
+    cache_key = None if text else _document_cache_key(message)
+    cached = lab_documents.cached_text(cache_key) if cache_key else None
+    if cached is not None:
+        kind = KIND_FILE
+        text = cached
+    elif not text:
+        if _document_too_large(message):
+            await message.reply_text(TOO_LARGE_REPLY)
+            user_data.pop("waiting_labs", None)
+            user_data.pop("assistant_last_mode", None)
+            return END
         downloaded = await _download_file(message, ctx)
         if downloaded is None:
             await message.reply_text("⚠️ Не удалось получить файл.")
@@ -224,7 +274,21 @@ async def labs_handler(update: Update, ctx: ContextTypes.DEFAULT_TYPE) -> int:
             user_data.pop("assistant_last_mode", None)
             return END
         kind = KIND_FILE
-        text = _extract_text_from_file(file_bytes, mime)
+        try:
+            text = await _read_file_text(file_bytes, mime, cache_key)
+        except DocumentTooLargeError:
+            await message.reply_text(TOO_LARGE_REPLY)
+            user_data.pop("waiting_labs", None)
+            user_data.pop("assistant_last_mode", None)
+            return END
+        except DocumentTimeoutError:
+            await message.reply_text(
+                "⚠️ Не удалось прочитать PDF. Пришлите страницы с результатами "
+                "фото или текстом."
+            )
+            user_data.pop("waiting_labs", None)
+            user_data.pop("assistant_last_mode", None)
+            return END
 
     user_data[AWAITING_KIND] = kind
     results = parse_labs(text)
@@ -6,24 +6,32 @@ Usage
 >>> from services.api.app.diabetes.learning_fixtures import load_lessons
 >>> asyncio.run(load_lessons())
 
-This reads the JSON file at ``content/lessons_v0.json`` and inserts
-``Lesson`` and ``QuizQuestion`` records using
-:mod:`services.api.app.diabetes.services.db`.
+This reads the JSON file at ``content/lessons_v0.json`` and upserts
+``Lesson``, ``LessonStep`` and ``QuizQuestion`` records using
+:mod:`services.api.app.diabetes.services.db`.  Lessons whose content hash
+matches the database are left untouched.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
 import json
 import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
 from pathlib import Path
 import re
+from typing import cast
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
 from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 
+from . import curriculum_index
 from .models_learning import Lesson, LessonProgress, LessonStep, QuizQuestion
 from .prompts import LESSONS_V0_PATH
 from .services.db import SessionLocal, SessionMaker, init_db, run_db
@@ -31,7 +39,7 @@ from .services.repository import CommitError, commit
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["load_lessons", "reset_lessons"]
+__all__ = ["LoadSummary", "load_lessons", "reset_lessons"]
 
 
 class QuizModel(BaseModel):
@@ -53,50 +61,219 @@ LESSON_LIST = TypeAdapter(list[LessonModel])
 DEFAULT_CONTENT_FILE = LESSONS_V0_PATH
 
 
+@dataclass(frozen=True, slots=True)
+class LoadSummary:
+    """Outcome of :func:`load_lessons`."""
+
+    inserted: int
+    updated: int
+    unchanged: int
+    seconds: float
+
+
+def _slug(item: LessonModel) -> str:
+    return item.slug or re.sub(r"[^a-z0-9]+", "-", item.title.lower()).strip("-")
+
+
+def _content_hash(
+    title: str,
+    is_active: bool,
+    steps: Sequence[str],
+    quiz: Sequence[tuple[str, Sequence[str], int]],
+) -> str:
+    payload = {
+        "title": title,
+        "is_active": is_active,
+        "steps": list(steps),
+        "quiz": [[question, list(options), answer] for question, options, answer in quiz],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _fixture_hash(item: LessonModel) -> str:
+    return _content_hash(
+        item.title, True, item.steps, [(q.question, q.options, q.answer) for q in item.quiz]
+    )
+
+
+def _stored_hashes(session: Session, slugs: Sequence[str]) -> dict[str, str]:
+    """Return content hashes of the stored lessons with ``slugs``."""
+
+    lessons = session.execute(
+        sa.select(Lesson.id, Lesson.slug, Lesson.title, Lesson.is_active).where(
+            Lesson.slug.in_(slugs)
+        )
+    ).all()
+    ids = [lesson.id for lesson in lessons]
+    steps: dict[int, list[str]] = {}
+    for lesson_id, content in session.execute(
+        sa.select(LessonStep.lesson_id, LessonStep.content)
+        .where(LessonStep.lesson_id.in_(ids))
+        .order_by(LessonStep.lesson_id, LessonStep.step_order)
+    ):
+        steps.setdefault(lesson_id, []).append(content)
+    quiz: dict[int, list[tuple[str, Sequence[str], int]]] = {}
+    for lesson_id, question, options, answer in session.execute(
+        sa.select(
+            QuizQuestion.lesson_id,
+            QuizQuestion.question,
+            QuizQuestion.options,
+            QuizQuestion.correct_option,
+        )
+        .where(QuizQuestion.lesson_id.in_(ids))
+        .order_by(QuizQuestion.lesson_id, QuizQuestion.id)
+    ):
+        quiz.setdefault(lesson_id, []).append((question, options, answer))
+    return {
+        lesson.slug: _content_hash(
+            lesson.title,
+            lesson.is_active,
+            steps.get(lesson.id, []),
+            quiz.get(lesson.id, []),
+        )
+        for lesson in lessons
+    }
+
+
+def _upsert(
+    session: Session,
+    table: sa.Table,
+    rows: list[dict[str, object]],
+    keys: Sequence[str],
+) -> None:
+    """Insert ``rows`` into ``table``, updating rows whose ``keys`` exist."""
+
+    if not rows:
+        return
+    columns = [name for name in rows[0] if name not in keys]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c[name] for name in keys],
+                set_={name: stmt.excluded[name] for name in columns},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        match = [table.c[name] == row[name] for name in keys]
+        if session.execute(sa.select(*table.primary_key).where(*match)).first() is None:
+            session.execute(sa.insert(table).values(row))
+        else:
+            session.execute(
+                sa.update(table).where(*match).values({name: row[name] for name in columns})
+            )
+
+
+def _apply(session: Session, lessons: Sequence[tuple[str, LessonModel]]) -> None:
+    """Write ``lessons`` with bulk upserts; the caller commits."""
+
+    lesson_table = cast(sa.Table, Lesson.__table__)
+    _upsert(
+        session,
+        lesson_table,
+        [
+            {
+                "slug": slug,
+                "title": item.title,
+                "content": "\n".join(item.steps),
+                "is_active": True,
+            }
+            for slug, item in lessons
+        ],
+        ["slug"],
+    )
+    ids = dict(
+        session.execute(
+            sa.select(Lesson.slug, Lesson.id).where(
+                Lesson.slug.in_([slug for slug, _ in lessons])
+            )
+        ).tuples().all()
+    )
+    _upsert(
+        session,
+        cast(sa.Table, LessonStep.__table__),
+        [
+            {"lesson_id": ids[slug], "step_order": idx, "content": step}
+            for slug, item in lessons
+            for idx, step in enumerate(item.steps, start=1)
+        ],
+        ["lesson_id", "step_order"],
+    )
+    for slug, item in lessons:
+        session.execute(
+            sa.delete(LessonStep).where(
+                LessonStep.lesson_id == ids[slug],
+                LessonStep.step_order > len(item.steps),
+            )
+        )
+    # Quiz questions have no natural key; progress refers to them by
+    # position, so replacing them keeps ``current_question`` meaningful.
+    session.execute(
+        sa.delete(QuizQuestion).where(QuizQuestion.lesson_id.in_(ids.values()))
+    )
+    quiz_rows = [
+        {
+            "lesson_id": ids[slug],
+            "question": q.question,
+            "options": q.options,
+            "correct_option": q.answer,
+        }
+        for slug, item in lessons
+        for q in item.quiz
+    ]
+    if quiz_rows:
+        session.execute(sa.insert(QuizQuestion), quiz_rows)
+
+
 async def load_lessons(
     content_path: Path | str = DEFAULT_CONTENT_FILE,
     *,
     sessionmaker: SessionMaker[Session] = SessionLocal,
-) -> None:
-    """Load lessons and quiz questions from ``content_path`` into the database."""
+) -> LoadSummary:
+    """Load lessons and quiz questions from ``content_path`` into the database.
+
+    Lessons are matched by slug and compared by a hash of their title, steps
+    and quiz; only new and changed lessons are written, in one transaction.
+    """
 
+    started = time.perf_counter()
     path = Path(content_path)
     raw = json.loads(path.read_text(encoding="utf-8"))
-    lessons = LESSON_LIST.validate_python(raw)
+    lessons = [(_slug(item), item) for item in LESSON_LIST.validate_python(raw)]
 
-    def _load(session: Session) -> None:
-        for item in lessons:
-            slug = item.slug or re.sub(r"[^a-z0-9]+", "-", item.title.lower()).strip(
-                "-"
-            )
-            lesson = Lesson(
-                slug=slug,
-                title=item.title,
-                content="\n".join(item.steps),
-                is_active=True,
-            )
-            session.add(lesson)
-            session.flush()
-            for idx, step in enumerate(item.steps, start=1):
-                session.add(
-                    LessonStep(lesson_id=lesson.id, step_order=idx, content=step)
-                )
-            for q in item.quiz:
-                session.add(
-                    QuizQuestion(
-                        lesson_id=lesson.id,
-                        question=q.question,
-                        options=q.options,
-                        correct_option=q.answer,
-                    )
-                )
+    def _load(session: Session) -> tuple[int, int]:
+        stored = _stored_hashes(session, [slug for slug, _ in lessons])
+        changed = [
+            (slug, item)
+            for slug, item in lessons
+            if stored.get(slug) != _fixture_hash(item)
+        ]
+        if not changed:
+            return 0, 0
+        _apply(session, changed)
+        curriculum_index.record_change(session)
         try:
             commit(session)
         except CommitError:
             logger.exception("Failed to load lessons from %s", path)
             raise
+        updated = sum(1 for slug, _ in changed if slug in stored)
+        return len(changed) - updated, updated
 
-    await run_db(_load, sessionmaker=sessionmaker)
+    inserted, updated = await run_db(_load, sessionmaker=sessionmaker)
+    if inserted or updated:
+        curriculum_index.bump_version()
+    return LoadSummary(
+        inserted=inserted,
+        updated=updated,
+        unchanged=len(lessons) - inserted - updated,
+        seconds=time.perf_counter() - started,
+    )
 
 
 async def reset_lessons(*, sessionmaker: SessionMaker[Session] = SessionLocal) -> None:
@@ -107,9 +284,11 @@ async def reset_lessons(*, sessionmaker: SessionMaker[Session] = SessionLocal) -
         session.execute(sa.delete(QuizQuestion))
         session.execute(sa.delete(LessonStep))
         session.execute(sa.delete(Lesson))
+        curriculum_index.record_change(session)
         commit(session)
 
     await run_db(_reset, sessionmaker=sessionmaker)
+    curriculum_index.bump_version()
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -126,8 +305,14 @@ async def main(argv: list[str] | None = None) -> None:
     init_db()
     if args.reset:
         await reset_lessons()
-    await load_lessons(args.path)
-    logger.info("OK: lessons loaded")
+    summary = await load_lessons(args.path)
+    logger.info(
+        "OK: lessons loaded: %d inserted, %d updated, %d unchanged in %.2fs",
+        summary.inserted,
+        summary.updated,
+        summary.unchanged,
+        summary.seconds,
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI utility
@@ -33,7 +33,7 @@ from services.api.app.diabetes.models_learning import (
     LessonProgress,
     ProgressData,
 )
-from services.api.app.diabetes.services.db import SessionLocal, run_db
+from services.api.app.diabetes.services.db import SessionLocal, run_db, uow
 from services.api.app.diabetes.services.repository import commit
 from .dynamic_tutor import (
     BUSY_MESSAGE,
@@ -50,6 +50,7 @@ from .learning_utils import choose_initial_topic
 # Re-export the curriculum engine so tests and callers can patch it easily.
 # Including it in ``__all__`` below marks the import as used for the linter.
 from . import curriculum_engine as curriculum_engine
+from . import curriculum_index
 from .curriculum_engine import LessonNotFoundError, ProgressNotFoundError
 from .prompts import build_system_prompt, build_user_prompt_step, disclaimer
 from .llm_router import LLMTask
@@ -69,8 +70,10 @@ from services.api.app.assistant.repositories.learning_profile import (
     get_learning_profile,
     upsert_learning_profile,
 )
+from services.api.app.assistant.services import learning_store
 from services.api.app.assistant.services import progress_service as progress_repo
 from .planner import generate_learning_plan, pretty_plan
+from .user_session import as_session
 
 if TYPE_CHECKING:
     App: TypeAlias = Application[
@@ -86,8 +89,6 @@ else:
 
 logger = logging.getLogger(__name__)
 
-PLANS_KEY = "learning_plans"
-PROGRESS_KEY = "learning_progress"
 BUSY_KEY = "learn_busy"
 STEP_GRACE_PERIOD = 5 * 60
 
@@ -191,54 +192,59 @@ async def _generate_step_text_logged(
     return text
 
 
-async def _persist(
-    user_id: int,
-    user_data: MutableMapping[str, Any],
-    bot_data: MutableMapping[str, object],
-) -> None:
-    plans = cast(dict[int, Any], bot_data.setdefault(PLANS_KEY, {}))
-    progress = cast(dict[int, ProgressData], bot_data.setdefault(PROGRESS_KEY, {}))
-    raw_plan = user_data.get("learning_plan")
-    plan: list[str] | None = raw_plan if isinstance(raw_plan, list) else None
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id = raw_plan_id if isinstance(raw_plan_id, int) else None
-    if plan is not None:
-        plans[user_id] = plan
+def _progress_data(
+    user_data: MutableMapping[str, Any], state: LearnState
+) -> ProgressData:
+    return {
+        "topic": state.topic,
+        "module_idx": cast(int, user_data.get("learning_module_idx", 0)),
+        "step_idx": state.step,
+        "snapshot": state.last_step_text,
+        "prev_summary": state.prev_summary,
+        "last_sent_step_id": state.last_sent_step_id,
+    }
+
+
+async def _persist(user_id: int, user_data: MutableMapping[str, Any]) -> None:
+    """Stage the plan and progress of ``user_id`` in the learning store.
+
+    Only resolving or creating the plan touches the database here; the
+    plan and progress themselves are written behind by ``learning_store``.
+    """
+
+    session = as_session(user_data)
+    plan = session.learning_plan
+    plan_id = session.learning_plan_id
+    if plan_id is not None and learning_store.take_missing_plan(plan_id):
+        session.learning_plan_id = None
+        plan_id = None
+    if plan is not None and plan_id is None:
         try:
-            if plan_id is None:
+            async with uow():
                 active = await plans_repo.get_active_plan(user_id)
                 if active is None:
                     plan_id = await plans_repo.create_plan(user_id, 1, plan)
                 else:
                     plan_id = active.id
-                user_data["learning_plan_id"] = plan_id
-            else:
-                await plans_repo.update_plan(plan_id, plan_json=plan)
+            if active is None:
+                learning_store.remember(user_id, plan_id, plan_json=plan)
+            session.learning_plan_id = plan_id
         except (
             SQLAlchemyError,
             RuntimeError,
         ) as exc:  # pragma: no cover - logging only
             logger.exception("persist plan failed: %s", exc)
-            plan_id = None
-            user_data.pop("learning_plan_id", None)
+            session.learning_plan_id = None
+            return
+    if plan_id is None:
+        return
     state = get_state(user_data)
-    if state is not None and plan_id is not None:
-        data: ProgressData = {
-            "topic": state.topic,
-            "module_idx": cast(int, user_data.get("learning_module_idx", 0)),
-            "step_idx": state.step,
-            "snapshot": state.last_step_text,
-            "prev_summary": state.prev_summary,
-            "last_sent_step_id": state.last_sent_step_id,
-        }
-        progress[user_id] = data
-        try:
-            await progress_repo.upsert_progress(user_id, plan_id, data)
-        except (
-            SQLAlchemyError,
-            RuntimeError,
-        ) as exc:  # pragma: no cover - logging only
-            logger.exception("persist progress failed: %s", exc)
+    await learning_store.stage(
+        user_id,
+        plan_id,
+        plan_json=plan,
+        progress=_progress_data(user_data, state) if state is not None else None,
+    )
 
 
 async def _hydrate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
@@ -305,38 +311,28 @@ async def _hydrate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         return True
     if "learning_plan" in user_data and "learning_plan_index" in user_data:
         return True
-    bot_data = cast(MutableMapping[str, Any], context.bot_data)
-    plans_map = cast(dict[int, Any], bot_data.setdefault(PLANS_KEY, {}))
-    progress_map = cast(dict[int, ProgressData], bot_data.setdefault(PROGRESS_KEY, {}))
-    data = progress_map.get(user.id)
-    if data is not None and "last_sent_step_id" not in data:
-        data["last_sent_step_id"] = None
-    raw_plan = plans_map.get(user.id)
-    plan: list[str] | None = raw_plan if isinstance(raw_plan, list) else None
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id = raw_plan_id if isinstance(raw_plan_id, int) else None
-    if data is None or plan is None or plan_id is None:
-        try:
-            db_plan = await plans_repo.get_active_plan(user.id)
-            if db_plan is None:
-                return True
-            plan = db_plan.plan_json
-            plan_id = db_plan.id
-            db_progress = await progress_repo.get_progress(user.id, plan_id)
-            if db_progress is None:
-                return True
-            data = db_progress.progress_json
-            if "last_sent_step_id" not in data:
-                data["last_sent_step_id"] = None
-            plans_map[user.id] = plan
-            progress_map[user.id] = data
-            user_data["learning_plan_id"] = plan_id
-        except (
-            SQLAlchemyError,
-            RuntimeError,
-        ) as exc:  # pragma: no cover - logging only
-            logger.exception("hydrate failed: %s", exc)
+    try:
+        if learning_store.has_pending(user.id):
+            await learning_store.flush()
+        db_plan = await plans_repo.get_active_plan(user.id)
+        if db_plan is None:
             return True
+        plan = db_plan.plan_json
+        plan_id = db_plan.id
+        db_progress = await progress_repo.get_progress(user.id, plan_id)
+        if db_progress is None:
+            return True
+        data = db_progress.progress_json
+        learning_store.remember(user.id, plan_id, plan_json=plan, progress=data)
+        if "last_sent_step_id" not in data:
+            data["last_sent_step_id"] = None
+        user_data["learning_plan_id"] = plan_id
+    except (
+        SQLAlchemyError,
+        RuntimeError,
+    ) as exc:  # pragma: no cover - logging only
+        logger.exception("hydrate failed: %s", exc)
+        return True
     topic = data["topic"]
     module_idx = data["module_idx"]
     step_idx = data["step_idx"]
@@ -365,14 +361,7 @@ async def _hydrate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
                 )
             return False
         data["snapshot"] = snapshot
-        progress_map[user.id] = data
-        try:
-            await progress_repo.upsert_progress(user.id, plan_id, data)
-        except (
-            SQLAlchemyError,
-            RuntimeError,
-        ) as exc:  # pragma: no cover - logging only
-            logger.exception("snapshot persist failed: %s", exc)
+        await learning_store.stage(user.id, plan_id, progress=data)
     state = LearnState(
         topic=topic,
         step=step_idx,
@@ -401,13 +390,8 @@ async def _static_learn_command(
         return
     model = settings.learning_command_model
 
-    def _list(session: Session) -> list[tuple[str, str]]:
-        lessons = session.scalars(
-            sa.select(Lesson).filter_by(is_active=True).order_by(Lesson.id)
-        ).all()
-        return [(lesson.title, lesson.slug) for lesson in lessons]
-
-    lessons = await run_db(_list, sessionmaker=SessionLocal)
+    index = await curriculum_index.get_index(sessionmaker=SessionLocal)
+    lessons = [(lesson.title, lesson.slug) for lesson in index.active]
     if not lessons:
         logger.info(
             "learn_fallback",
@@ -474,8 +458,7 @@ async def _dynamic_learn_command(
     if user is None:
         return
     user_data = cast(MutableMapping[str, Any], context.user_data)
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id: int | None = raw_plan_id if isinstance(raw_plan_id, int) else None
+    plan_id = as_session(user_data).learning_plan_id
     try:
         profile_db = await profiles.get_profile_for_user(user.id, context)
     except AuthRequiredError as exc:
@@ -515,22 +498,9 @@ async def _dynamic_learn_command(
         state.last_sent_step_id = getattr(sent, "message_id", None)
         set_state(user_data, state)
         if plan_id is not None:
-            progress_map = cast(
-                dict[int, ProgressData], context.bot_data.setdefault(PROGRESS_KEY, {})
+            await learning_store.stage(
+                user.id, plan_id, progress=_progress_data(user_data, state)
             )
-            data: ProgressData = {
-                "topic": state.topic,
-                "module_idx": cast(int, user_data.get("learning_module_idx", 0)),
-                "step_idx": state.step,
-                "snapshot": state.last_step_text,
-                "prev_summary": state.prev_summary,
-                "last_sent_step_id": state.last_sent_step_id,
-            }
-            progress_map[user.id] = data
-            try:
-                await progress_repo.upsert_progress(user.id, plan_id, data)
-            except (SQLAlchemyError, RuntimeError) as exc:
-                logger.exception("persist progress failed: %s", exc)
         return
     if not await ensure_overrides(update, context):
         return
@@ -572,8 +542,9 @@ async def _dynamic_learn_command(
         await message.reply_text(BUSY_MESSAGE, reply_markup=build_main_keyboard())
         return
     plan = generate_learning_plan(text)
-    user_data["learning_plan"] = plan
-    user_data["learning_plan_index"] = 0
+    session = as_session(user_data)
+    session.learning_plan = plan
+    session.learning_plan_index = 0
     await message.reply_text(
         f"\U0001f5fa План обучения\n{pretty_plan(plan)}",
         reply_markup=build_main_keyboard(),
@@ -590,9 +561,8 @@ async def _dynamic_learn_command(
         last_step_at=time.monotonic(),
     )
     set_state(user_data, state)
-    await _persist(user.id, user_data, context.bot_data)
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id = raw_plan_id if isinstance(raw_plan_id, int) else None
+    await _persist(user.id, user_data)
+    plan_id = as_session(user_data).learning_plan_id
     if plan_id is not None:
         await safe_add_lesson_log(
             user.id,
@@ -616,7 +586,6 @@ async def learn_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 async def _start_lesson(
     message: Message,
     user_data: MutableMapping[str, Any],
-    bot_data: MutableMapping[str, object],
     profile: Mapping[str, str | None],
     topic_slug: str,
 ) -> None:
@@ -669,8 +638,9 @@ async def _start_lesson(
         await message.reply_text(BUSY_MESSAGE, reply_markup=build_main_keyboard())
         return
     plan = generate_learning_plan(text)
-    user_data["learning_plan"] = plan
-    user_data["learning_plan_index"] = 0
+    session = as_session(user_data)
+    session.learning_plan = plan
+    session.learning_plan_index = 0
     await message.reply_text(
         f"\U0001f5fa План обучения\n{pretty_plan(plan)}",
         reply_markup=build_main_keyboard(),
@@ -687,9 +657,8 @@ async def _start_lesson(
         last_step_at=time.monotonic(),
     )
     set_state(user_data, state)
-    await _persist(from_user.id, user_data, bot_data)
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id = raw_plan_id if isinstance(raw_plan_id, int) else None
+    await _persist(from_user.id, user_data)
+    plan_id = as_session(user_data).learning_plan_id
     if plan_id is not None:
         await safe_add_lesson_log(
             from_user.id,
@@ -796,7 +765,7 @@ async def lesson_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     profile = _get_profile(user_data)
     if not await _hydrate(update, context):
         return
-    await _start_lesson(message, user_data, context.bot_data, profile, topic_slug)
+    await _start_lesson(message, user_data, profile, topic_slug)
 
 
 async def lesson_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -830,7 +799,7 @@ async def lesson_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     profile = _get_profile(user_data)
     if not await _hydrate(update, context):
         return
-    await _start_lesson(message, user_data, context.bot_data, profile, slug)
+    await _start_lesson(message, user_data, profile, slug)
 
 
 async def lesson_answer_handler(
@@ -861,8 +830,7 @@ async def lesson_answer_handler(
         await message.reply_text(RATE_LIMIT_MESSAGE)
         return
     profile = _get_profile(user_data)
-    raw_plan_id = user_data.get("learning_plan_id")
-    plan_id = raw_plan_id if isinstance(raw_plan_id, int) else None
+    plan_id = as_session(user_data).learning_plan_id
     telegram_id = from_user.id if from_user else None
     user_text = message.text.strip()
     state.awaiting = False
@@ -928,24 +896,6 @@ async def lesson_answer_handler(
         state.prev_summary = sanitized_feedback
         state.last_sent_step_id = getattr(sent, "message_id", None)
         set_state(user_data, state)
-        if telegram_id is not None and plan_id is not None:
-            data: ProgressData = {
-                "topic": state.topic,
-                "module_idx": cast(int, user_data.get("learning_module_idx", 0)),
-                "step_idx": state.step,
-                "snapshot": state.last_step_text,
-                "prev_summary": state.prev_summary,
-                "last_sent_step_id": state.last_sent_step_id,
-            }
-            progress_map = cast(
-                dict[int, ProgressData],
-                context.bot_data.setdefault(PROGRESS_KEY, {}),
-            )
-            progress_map[telegram_id] = data
-            try:
-                await progress_repo.upsert_progress(telegram_id, plan_id, data)
-            except (SQLAlchemyError, RuntimeError) as exc:
-                logger.exception("persist progress failed: %s", exc)
         log_user_ok: bool | None = None
         log_feedback_ok: bool | None = None
         log_next_ok: bool | None = None
@@ -991,7 +941,7 @@ async def lesson_answer_handler(
         state.last_step_at = time.monotonic()
         set_state(user_data, state)
         if from_user is not None:
-            await _persist(from_user.id, user_data, context.bot_data)
+            await _persist(from_user.id, user_data)
 
 
 async def quiz_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1284,7 +1234,7 @@ async def exit_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     clear_state(user_data)
     user = update.effective_user
     if user is not None:
-        await _persist(user.id, user_data, context.bot_data)
+        await _persist(user.id, user_data)
     await message.reply_text(
         f"Сессия {ASSISTANT_BUTTON_TEXT} завершена.", reply_markup=build_main_keyboard()
     )
@@ -1299,7 +1249,7 @@ async def plan_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     if not await _hydrate(update, context):
         return
     user_data = cast(MutableMapping[str, Any], context.user_data)
-    plan = cast(list[str] | None, user_data.get("learning_plan"))
+    plan = as_session(user_data).learning_plan
     if not plan:
         await message.reply_text(
             f"План не найден. Нажмите кнопку {ASSISTANT_BUTTON_TEXT} или команду /learn, чтобы начать.",
@@ -1318,24 +1268,25 @@ async def skip_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     if not await _hydrate(update, context):
         return
     user_data = cast(MutableMapping[str, Any], context.user_data)
-    plan = cast(list[str] | None, user_data.get("learning_plan"))
+    plan = as_session(user_data).learning_plan
     if not plan:
         await message.reply_text(
             f"План не найден. Нажмите кнопку {ASSISTANT_BUTTON_TEXT} или команду /learn, чтобы начать.",
             reply_markup=build_main_keyboard(),
         )
         return
-    idx = cast(int, user_data.get("learning_plan_index", 0)) + 1
+    session = as_session(user_data)
+    idx = session.learning_plan_index + 1
     completed = idx >= len(plan)
     if completed:
         await message.reply_text("План завершён.", reply_markup=build_main_keyboard())
     else:
         await message.reply_text(plan[idx], reply_markup=build_main_keyboard())
     idx = min(idx, len(plan) - 1)
-    user_data["learning_plan_index"] = idx
+    session.learning_plan_index = idx
     user = update.effective_user
     if user is not None and not completed:
-        await _persist(user.id, user_data, context.bot_data)
+        await _persist(user.id, user_data)
 
 
 def register_handlers(app: App) -> None:
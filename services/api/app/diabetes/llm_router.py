@@ -1,4 +1,4 @@
-"""Utilities for choosing LLM models for learning tasks."""
+"""Utilities for choosing LLM models and backends for tasks."""
 
 from __future__ import annotations
 
@@ -8,11 +8,19 @@ from services.api.app import config
 
 
 class LLMTask(str, Enum):
-    """Supported learning tasks routed to different LLM models."""
+    """Supported tasks routed to different LLM models."""
 
     EXPLAIN_STEP = "explain_step"
     QUIZ_CHECK = "quiz_check"
     LONG_PLAN = "long_plan"
+    PHOTO_ANALYSIS = "photo_analysis"
+
+
+class LLMBackend(str, Enum):
+    """OpenAI API used to run a task."""
+
+    CHAT = "chat"
+    ASSISTANTS = "assistants"
 
 
 class LLMRouter:
@@ -28,11 +36,25 @@ class LLMRouter:
     def choose_model(self, task: LLMTask) -> str:
         """Return the model name appropriate for *task*.
 
-        Currently all tasks use the default model, but the router centralizes
-        the decision to simplify future improvements.
+        Learning tasks use the default model; photo analysis uses
+        ``VISION_MODEL``.
         """
 
+        if task is LLMTask.PHOTO_ANALYSIS:
+            return config.get_settings().vision_model
         return self._default_model
 
+    def choose_backend(self, task: LLMTask) -> LLMBackend:
+        """Return the API *task* runs on.
+
+        Photo analysis follows ``VISION_BACKEND``: one Chat Completions
+        request with the image inline, or the Assistants thread of the user.
+        Everything else uses Chat Completions.
+        """
+
+        if task is LLMTask.PHOTO_ANALYSIS:
+            return LLMBackend(config.get_settings().vision_backend)
+        return LLMBackend.CHAT
+
 
-__all__ = ["LLMRouter", "LLMTask"]
+__all__ = ["LLMBackend", "LLMRouter", "LLMTask"]
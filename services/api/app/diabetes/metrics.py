@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from prometheus_client import Counter, Gauge, Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
 from prometheus_client.metrics import MetricWrapperBase
 
 
@@ -55,7 +55,146 @@ learning_prompt_cache_hit: Counter = Counter(
 learning_prompt_cache_miss: Counter = Counter(
     "learning_prompt_cache_miss", "Number of learning prompt cache misses",
 )
+learning_step_cache_hit: Counter = Counter(
+    "learning_step_cache_hit",
+    "Number of step texts served from the shared cache",
+    ("tier",),
+)
+learning_step_cache_miss: Counter = Counter(
+    "learning_step_cache_miss", "Number of step texts missing from the shared cache",
+)
 
 assistant_mode_total: Counter = Counter(
     "assistant_mode_total", "Total number of assistant mode requests", ("mode",)
 )
+
+bot_startup_seconds: Gauge = Gauge(
+    "bot_startup_seconds", "Duration of bot startup phases", ("phase",)
+)
+bot_import_seconds: Gauge = Gauge(
+    "bot_import_seconds",
+    "Cumulative import time of the slowest packages at bot startup",
+    ("module",),
+)
+
+bot_update_queue_depth: Gauge = Gauge(
+    "bot_update_queue_depth",
+    "Telegram updates waiting to be processed",
+    ("stage",),
+)
+bot_update_wait_seconds: Histogram = Histogram(
+    "bot_update_wait_seconds",
+    "Time an update waits for its chat and a free worker",
+)
+bot_update_latency_seconds: Histogram = Histogram(
+    "bot_update_latency_seconds",
+    "Time spent processing a Telegram update",
+    ("outcome",),
+)
+
+handler_latency_seconds: Histogram = Histogram(
+    "handler_latency_seconds",
+    "Time spent in a PTB handler callback",
+    ("handler", "outcome"),
+)
+db_call_wait_seconds: Histogram = Histogram(
+    "db_call_wait_seconds",
+    "Time a run_db call waits before its worker thread starts",
+    ("function",),
+)
+db_call_seconds: Histogram = Histogram(
+    "db_call_seconds",
+    "Execution time of a run_db call in its worker thread",
+    ("function", "outcome"),
+)
+openai_request_seconds: Histogram = Histogram(
+    "openai_request_seconds",
+    "Latency of OpenAI API requests",
+    ("model", "task", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+openai_tokens_total: Counter = Counter(
+    "openai_tokens_total",
+    "Tokens consumed by OpenAI chat completions",
+    ("model", "task", "kind"),
+)
+
+vision_upload_bytes: Histogram = Histogram(
+    "vision_upload_bytes",
+    "Size of food photos before and after preparation for Vision",
+    ("stage",),
+    buckets=(25_000, 50_000, 100_000, 200_000, 300_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000),
+)
+vision_latency_seconds: Histogram = Histogram(
+    "vision_latency_seconds",
+    "Time from photo upload to the Vision answer, per backend",
+    ("backend",),
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0),
+)
+vision_cache_hit_total: Counter = Counter(
+    "vision_cache_hit_total",
+    "Food photos answered from the Vision cache",
+    ("scope",),
+)
+vision_cache_miss_total: Counter = Counter(
+    "vision_cache_miss_total",
+    "Hashed food photos not found in the Vision cache",
+)
+
+labs_pdf_extract_seconds: Histogram = Histogram(
+    "labs_pdf_extract_seconds",
+    "Time to extract the text of an uploaded lab PDF",
+    ("outcome",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0),
+)
+
+executor_workers: Gauge = Gauge(
+    "executor_workers", "Configured worker threads per named executor", ("executor",)
+)
+executor_in_flight: Gauge = Gauge(
+    "executor_in_flight",
+    "Calls admitted to a named executor (running or queued)",
+    ("executor",),
+)
+executor_queue_wait_seconds: Histogram = Histogram(
+    "executor_queue_wait_seconds",
+    "Time a call waits for a thread of its executor",
+    ("executor",),
+)
+executor_rejected_total: Counter = Counter(
+    "executor_rejected_total",
+    "Calls rejected because the executor stayed saturated",
+    ("executor",),
+)
+
+db_pool_size: Gauge = Gauge(
+    "db_pool_size", "Configured size of the SQLAlchemy connection pool"
+)
+db_pool_in_use: Gauge = Gauge(
+    "db_pool_in_use", "Connections currently checked out of the pool"
+)
+db_pool_overflow: Gauge = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size"
+)
+db_pool_checkout_wait_seconds: Histogram = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+
+outbound_queue_lag_seconds: Histogram = Histogram(
+    "outbound_queue_lag_seconds",
+    "Time an outbound bot message waits for the rate limiter",
+    ("priority",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+outbound_queue_depth: Gauge = Gauge(
+    "outbound_queue_depth",
+    "Outbound messages waiting for a global rate-limit token",
+    ("priority",),
+    multiprocess_mode="livesum",
+)
+outbound_retry_after_total: Counter = Counter(
+    "outbound_retry_after_total",
+    "RetryAfter responses received from Telegram",
+)
@@ -3,6 +3,7 @@ from services.api.app.models.onboarding_event import OnboardingEvent  # noqa: F4
 from services.api.app.models.onboarding_metrics import (  # noqa: F401
     OnboardingMetricEvent,
     OnboardingMetricDaily,
+    OnboardingMetricWatermark,
 )
 from services.api.app.assistant import models as assistant_models  # noqa: F401
 from services.api.app.diabetes import models_learning  # noqa: F401
@@ -191,3 +191,32 @@ class LearningUserProfile(Base):
     )
 
     user: Mapped[User] = relationship("User")
+
+
+class LearningStepCache(Base):
+    """Step text generated for a profile bucket and shared between users."""
+
+    __tablename__ = "learning_step_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    topic_slug: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    step_idx: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False
+    )
+
+
+class CurriculumVersion(Base):
+    """Counter bumped whenever lesson content is loaded or reset."""
+
+    __tablename__ = "curriculum_version"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=sa.func.now(),
+        onupdate=sa.func.now(),
+        nullable=False,
+    )
@@ -84,16 +84,30 @@ def _canon_slug(slug: str | None) -> str:
 # --- Dynamic prompts -----------------------------------------------------------
 
 
+ProfileBucket = tuple[str, str, str, str, str]
+
+
+def profile_bucket(p: Mapping[str, str | None]) -> ProfileBucket:
+    """Return the profile fields :func:`build_system_prompt` depends on.
+
+    Profiles with the same bucket produce the same system prompt, so texts
+    generated for one of them can be shared with the others.
+    """
+    age = (p.get("age_group") or "").strip()
+    return (
+        age if age in AGE_TONE else "",
+        (p.get("diabetes_type") or "unknown").strip() or "unknown",
+        str(p.get("therapyType", "unknown")),
+        str(p.get("learning_level", "novice")),
+        str(p.get("carbUnits", "XE")),
+    )
+
+
 def build_system_prompt(p: Mapping[str, str | None], task: object | None = None) -> str:
     """Build a system prompt tailored to the user *p* profile."""
-    age = (p.get("age_group") or "").strip()
+    age, diabetes_type, therapy, level, carb_units = profile_bucket(p)
     tone = AGE_TONE.get(age, "ясно и просто")
 
-    diabetes_type = (p.get("diabetes_type") or "unknown").strip() or "unknown"
-    therapy = p.get("therapyType", "unknown")
-    level = p.get("learning_level", "novice")
-    carb_units = p.get("carbUnits", "XE")
-
     prompt = dedent(
         f"""
         [v={PROMPT_VERSION} lang={PROMPT_LANG}]
@@ -164,10 +178,23 @@ PHOTO_ANALYSIS_PROMPT = (
     "ХЕ: <...>"
 )
 
+PHOTO_ANALYSIS_JSON_PROMPT = (
+    "Определи по фото название блюда, вес порции и его пищевую ценность. "
+    "Верни JSON: name — название блюда на русском языке, weight_g — вес порции "
+    "в граммах, protein_g, fat_g, carbs_g — белки, жиры и углеводы в граммах, "
+    "calories_kcal — калории, xe — хлебные единицы. Если значение определить "
+    "нельзя, укажи null."
+)
+
+REPORT_SYSTEM_PROMPT = (
+    "Ты — помощник по самоконтролю диабета. По сводке дневника дай 3–5 кратких "
+    "практических рекомендаций на русском языке. Не назначай и не меняй дозы "
+    "инсулина, при опасных значениях советуй обратиться к врачу."
+)
+
 REPORT_ANALYSIS_PROMPT_TEMPLATE = (
-    "Проанализируй дневник диабета пользователя и предложи краткие рекомендации.\n\n"
-    "Сводка:\n{summary}\n\nОшибки и критические значения:\n{errors}\n\n"
-    "Данные по дням:\n{days}\n"
+    "Проанализируй дневник диабета пользователя за {period} и предложи краткие "
+    "рекомендации.\n\nСводка:\n{digest}\n"
 )
 
 # --- Static lessons (optional legacy content) ---------------------------------
@@ -192,6 +219,7 @@ __all__ = [
     "MAX_PROMPT_LEN",
     # helpers
     "disclaimer",
+    "profile_bucket",
     "build_system_prompt",
     "build_user_prompt_step",
     "build_explain_step",
@@ -202,6 +230,8 @@ __all__ = [
     "SYSTEM_TUTOR_RU",
     "QUIZ_CHECK_FORMAT_RU",
     "PHOTO_ANALYSIS_PROMPT",
+    "PHOTO_ANALYSIS_JSON_PROMPT",
+    "REPORT_SYSTEM_PROMPT",
     "REPORT_ANALYSIS_PROMPT_TEMPLATE",
     "LESSONS_V0_PATH",
     "LESSONS_V0_DATA",
@@ -6,9 +6,12 @@ import asyncio
 import logging
 import sqlite3
 import threading
+import time as _time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import date, datetime, time
 from enum import Enum
-from typing import Callable, Iterable, Optional, Protocol, TypeVar
+from typing import AsyncIterator, Callable, Iterable, Optional, Protocol, TypeVar
 from typing_extensions import Concatenate, ParamSpec
 
 from sqlalchemy import (
@@ -28,6 +31,7 @@ from sqlalchemy import (
 import sqlalchemy as sa
 from sqlalchemy.engine import URL, Engine
 from sqlalchemy.exc import SQLAlchemyError, UnboundExecutionError
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -44,7 +48,17 @@ from services.api.app.config import (
     get_db_write_password,
     settings,
 )
+from services.api.app.diabetes.instrumentation import callable_label
+from services.api.app.diabetes.metrics import (
+    db_call_seconds,
+    db_call_wait_seconds,
+    db_pool_checkout_wait_seconds,
+    db_pool_in_use,
+    db_pool_overflow,
+    db_pool_size,
+)
 from services.api.app.diabetes.schemas.reminders import ReminderType, ScheduleKind
+from services.api.app.diabetes.utils.executors import run_in_executor
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +90,75 @@ sqlite_memory_lock = threading.Lock()
 SessionLocal: sessionmaker[Session] = sessionmaker(autoflush=False, autocommit=False)
 
 
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that exports checkout wait and usage metrics."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = _time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.observe(_time.perf_counter() - started)
+            self._update_gauges()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        db_pool_size.set(self.size())
+        db_pool_in_use.set(self.checkedout())
+        db_pool_overflow.set(max(self.overflow(), 0))
+
+
+def _is_sqlite_memory(url: URL) -> bool:
+    return url.drivername.startswith("sqlite") and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: URL) -> dict[str, object]:
+    """Return ``create_engine`` keyword arguments for ``url`` from settings.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pool; file-based
+    SQLite and Postgres get a sized, pre-pinged, recycled ``QueuePool``.
+    """
+
+    if _is_sqlite_memory(url):
+        return {}
+    options: dict[str, object] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.drivername.startswith("postgresql") and settings.db_statement_timeout_ms > 0:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.db_statement_timeout_ms}"
+        }
+    return options
+
+
+def _sqlite_pragmas(dbapi_connection: sqlite3.Connection, _record: object) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.db_sqlite_busy_timeout_ms)}")
+        if settings.db_sqlite_wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+    finally:
+        cursor.close()
+
+
+def _configure_engine(target: Engine, url: URL) -> None:
+    """Apply per-connection tuning that cannot go through ``create_engine``."""
+
+    if url.drivername.startswith("sqlite") and not _is_sqlite_memory(url):
+        sa.event.listen(target, "connect", _sqlite_pragmas)
+    if isinstance(target.pool, InstrumentedQueuePool):
+        target.pool._update_gauges()
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -106,18 +189,49 @@ async def run_db(
         to the module's ``SessionLocal`` so tests can inject their own.
     *args, **kwargs:
         Additional arguments forwarded to ``fn``.
+
+    The wait for a worker thread and the execution time are recorded in the
+    ``db_call_wait_seconds`` and ``db_call_seconds`` histograms, labelled with
+    the name of ``fn``.
     """
 
+    unit = _current_unit.get()
+    if unit is not None and (sessionmaker is None or sessionmaker is unit.sessionmaker):
+        return await unit.run(fn, *args, **kwargs)
+
     if sessionmaker is None:
         sessionmaker = SessionLocal
 
+    label = callable_label(fn)
+
     def wrapper() -> T:
-        with sessionmaker() as session:
-            return fn(session, *args, **kwargs)
+        started = _time.perf_counter()
+        db_call_wait_seconds.labels(function=label).observe(started - submitted)
+        outcome = "ok"
+        try:
+            with sessionmaker() as session:
+                return fn(session, *args, **kwargs)
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            db_call_seconds.labels(function=label, outcome=outcome).observe(
+                _time.perf_counter() - started
+            )
+
+    bind = _get_bind(sessionmaker)
+    submitted = _time.perf_counter()
+    if _runs_inline(bind):
+        with sqlite_memory_lock:
+            return wrapper()
 
+    return await run_in_executor("db", wrapper)
+
+
+def _get_bind(sessionmaker: SessionMaker[S]) -> Engine | sa.Connection:
     try:
         with sessionmaker() as _session:
-            bind = _session.get_bind()
+            return _session.get_bind()
     except UnboundExecutionError as exc:
         logger.error(
             "Database engine is not initialized. Call init_db() to configure it."
@@ -126,11 +240,127 @@ async def run_db(
             "Database engine is not initialized; run init_db() before calling run_db()."
         ) from exc
 
-    if bind.url.drivername == "sqlite" and bind.url.database == ":memory:":
-        with sqlite_memory_lock:
-            return wrapper()
 
-    return await asyncio.to_thread(wrapper)
+def _runs_inline(bind: Engine | sa.Connection) -> bool:
+    """In-memory SQLite lives in one connection, so work runs on the caller's thread."""
+
+    url = getattr(bind, "engine", bind).url
+    return url.drivername == "sqlite" and url.database == ":memory:"
+
+
+class UnitOfWork:
+    """One session shared by the database steps of an update or request.
+
+    Created by :func:`uow`.  Steps run one at a time on the ``db`` executor in
+    the same session and transaction, and :func:`run_db` calls made inside the
+    ``async with`` block join it, so helpers built on ``run_db`` need no
+    changes.  As with ``run_db``, objects returned by a step are detached.
+    Changes a step leaves uncommitted are committed when the block exits and
+    rolled back if it raises; a step that raises rolls back as well.
+
+    Keep the block around database work only: the connection stays checked
+    out until it exits.
+    """
+
+    def __init__(self, sessionmaker: SessionMaker[Session]) -> None:
+        self.sessionmaker = sessionmaker
+        self._session: Session | None = None
+        self._inline = False
+        self._lock = asyncio.Lock()
+
+    async def _call(self, step: Callable[[], T]) -> T:
+        if self._inline:
+            with sqlite_memory_lock:
+                return step()
+        return await run_in_executor("db", step)
+
+    async def run(
+        self,
+        fn: Callable[Concatenate[Session, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """Run ``fn(session, *args, **kwargs)`` in the unit's session."""
+
+        label = callable_label(fn)
+        async with self._lock:
+            if self._session is None:
+                self._inline = _runs_inline(_get_bind(self.sessionmaker))
+
+            def step() -> T:
+                started = _time.perf_counter()
+                db_call_wait_seconds.labels(function=label).observe(started - submitted)
+                outcome = "ok"
+                try:
+                    if self._session is None:
+                        self._session = self.sessionmaker()
+                    session = self._session
+                    try:
+                        result = fn(session, *args, **kwargs)
+                        session.flush()
+                    except BaseException:
+                        session.rollback()
+                        raise
+                    session.expunge_all()
+                    return result
+                except BaseException:
+                    outcome = "error"
+                    raise
+                finally:
+                    db_call_seconds.labels(function=label, outcome=outcome).observe(
+                        _time.perf_counter() - started
+                    )
+
+            submitted = _time.perf_counter()
+            return await self._call(step)
+
+    async def _finish(self, failed: bool) -> None:
+        session = self._session
+        if session is None:
+            return
+        self._session = None
+
+        def finish() -> None:
+            from .repository import commit
+
+            try:
+                if failed:
+                    session.rollback()
+                elif session.in_transaction():
+                    commit(session)
+            finally:
+                session.close()
+
+        async with self._lock:
+            await self._call(finish)
+
+
+_current_unit: ContextVar[UnitOfWork | None] = ContextVar("db_unit_of_work", default=None)
+
+
+@asynccontextmanager
+async def uow(sessionmaker: SessionMaker[Session] | None = None) -> AsyncIterator[UnitOfWork]:
+    """Share one session between the database steps of the enclosed block.
+
+    Nested blocks for the same sessionmaker join the outer unit.  Commit
+    failures on exit raise :class:`~.repository.CommitError`.
+    """
+
+    current = _current_unit.get()
+    if current is not None and (sessionmaker is None or sessionmaker is current.sessionmaker):
+        yield current
+        return
+    unit = UnitOfWork(sessionmaker or SessionLocal)
+    token = _current_unit.set(unit)
+    failed = False
+    try:
+        yield unit
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _current_unit.reset(token)
+        await unit._finish(failed)
 
 
 def dispose_engine(target: Engine | None = None) -> None:
@@ -465,6 +695,18 @@ class Subscription(Base):
     __tablename__ = "subscriptions"
     __table_args__ = (
         sa.UniqueConstraint("user_id", "status", name="subscriptions_user_status_key"),
+        # Only live subscriptions are scanned by the expiry job.
+        sa.Index(
+            "ix_subscriptions_live_status_end_date",
+            "status",
+            "end_date",
+            postgresql_where=sa.text(
+                "status IN ('trial', 'active') AND end_date IS NOT NULL"
+            ),
+            sqlite_where=sa.text(
+                "status IN ('trial', 'active') AND end_date IS NOT NULL"
+            ),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -558,10 +800,11 @@ def init_db() -> None:
                 SessionLocal.configure(bind=None)
                 engine.dispose()
             try:
-                engine = create_engine(database_url)
+                engine = create_engine(database_url, **engine_options(database_url))
             except SQLAlchemyError as exc:
                 logger.error("Failed to initialize database engine: %s", exc)
                 raise RuntimeError("Failed to initialize database engine") from exc
+            _configure_engine(engine, database_url)
             SessionLocal.configure(bind=engine)
 
     if engine is None:
@@ -1,9 +1,12 @@
 # gpt_client.py
 
 import asyncio
+import base64
 import hashlib
 import io
+import json
 import logging
+import math
 import os
 import re
 import threading
@@ -11,7 +14,7 @@ import time
 from asyncio import AbstractEventLoop
 from collections import OrderedDict
 from pathlib import Path
-from typing import Iterable, Mapping, cast
+from typing import Any, Iterable, Mapping, cast
 from weakref import WeakKeyDictionary
 
 import httpx
@@ -27,11 +30,18 @@ from openai.types.beta.threads import (
 )
 
 from services.api.app import config
-from services.api.app.diabetes.llm_router import LLMRouter, LLMTask
+from services.api.app.diabetes.instrumentation import (
+    ASSISTANTS_MODEL,
+    observe_openai_call,
+    record_openai_usage,
+)
+from services.api.app.diabetes.llm_router import LLMBackend, LLMRouter, LLMTask
 from services.api.app.diabetes.metrics import (
     learning_prompt_cache_hit,
     learning_prompt_cache_miss,
 )
+from services.api.app.diabetes.utils.executors import run_in_executor
+from services.api.app.diabetes.utils.functions import NutritionInfo
 from services.api.app.diabetes.utils.openai_utils import (
     get_async_openai_client,
     get_openai_client,
@@ -45,6 +55,7 @@ MESSAGE_CREATION_TIMEOUT = 30.0
 RUN_CREATION_TIMEOUT = 30.0
 CHAT_COMPLETION_TIMEOUT = 30.0
 CHAT_COMPLETION_MAX_RETRIES = 2
+PHOTO_ANALYSIS_TIMEOUT = 60.0
 
 _client: OpenAI | None = None
 _client_lock = threading.Lock()
@@ -63,6 +74,12 @@ def choose_model(task: LLMTask) -> str:
     return _learning_router.choose_model(task)
 
 
+def choose_backend(task: LLMTask) -> LLMBackend:
+    """Return the API configured for the given task."""
+
+    return _learning_router.choose_backend(task)
+
+
 def make_cache_key(
     model: str,
     system: str,
@@ -205,8 +222,15 @@ async def create_chat_completion(
     temperature: float | None = None,
     max_tokens: int | None = None,
     timeout: float | httpx.Timeout | None = None,
+    task: str = "chat",
+    response_format: Mapping[str, Any] | None = None,
 ) -> ChatCompletion:
-    """Create a chat completion with typed return value."""
+    """Create a chat completion with typed return value.
+
+    ``task`` only labels the ``openai_request_seconds`` and
+    ``openai_tokens_total`` metrics.  ``response_format`` is passed through
+    to request JSON output.
+    """
     settings = config.get_settings()
     api_key = settings.openai_api_key or os.environ.get("OPENAI_API_KEY")
     if not api_key:
@@ -225,16 +249,27 @@ async def create_chat_completion(
     else:
         timeout_param = timeout
 
+    extra: dict[str, Any] = {}
+    if response_format is not None:
+        extra["response_format"] = response_format
+
     for attempt in range(CHAT_COMPLETION_MAX_RETRIES + 1):
         try:
-            return await client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout_param,
-                stream=False,
-            )
+            with observe_openai_call(model, task):
+                completion = cast(
+                    ChatCompletion,
+                    await client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        timeout=timeout_param,
+                        stream=False,
+                        **extra,
+                    ),
+                )
+            record_openai_usage(getattr(completion, "usage", None), model=model, task=task)
+            return completion
         except AttributeError as exc:
             logger.warning("[OpenAI] %s", exc)
             return _static_completion(model)
@@ -341,6 +376,7 @@ async def create_learning_chat_completion(
         temperature=temperature,
         max_tokens=max_tokens,
         timeout=timeout,
+        task=task.value,
     )
     if not getattr(completion, "choices", None):
         logger.error("[OpenAI] completion has no choices: %s", completion)
@@ -374,10 +410,11 @@ async def create_thread() -> str:
     """
     client: OpenAI = _get_client()
     try:
-        thread: Thread = await asyncio.wait_for(
-            asyncio.to_thread(client.beta.threads.create),
-            timeout=THREAD_CREATION_TIMEOUT,
-        )
+        with observe_openai_call(ASSISTANTS_MODEL, "thread_create"):
+            thread: Thread = await asyncio.wait_for(
+                run_in_executor("openai_sync", client.beta.threads.create),
+                timeout=THREAD_CREATION_TIMEOUT,
+            )
     except OpenAIError as exc:
         logger.exception("[OpenAI] Failed to create thread: %s", exc)
         raise
@@ -466,7 +503,10 @@ async def _upload_image_file(client: OpenAI, image_path: str) -> FileObject:
             with open(safe_path, "rb") as f:
                 return client.files.create(file=f, purpose="assistants")
 
-        file = await asyncio.wait_for(asyncio.to_thread(_upload), timeout=FILE_UPLOAD_TIMEOUT)
+        with observe_openai_call(ASSISTANTS_MODEL, "file_upload"):
+            file = await asyncio.wait_for(
+                run_in_executor("openai_sync", _upload), timeout=FILE_UPLOAD_TIMEOUT
+            )
     except asyncio.TimeoutError:
         logger.exception("[OpenAI] Timeout while uploading %s", safe_path)
         raise RuntimeError("Timed out while uploading image")
@@ -491,7 +531,11 @@ async def _upload_image_bytes(client: OpenAI, image_bytes: bytes) -> FileObject:
                     file=("image.jpg", buffer), purpose="assistants"
                 )
 
-        file = await asyncio.wait_for(asyncio.to_thread(_upload_bytes), timeout=FILE_UPLOAD_TIMEOUT)
+        with observe_openai_call(ASSISTANTS_MODEL, "file_upload"):
+            file = await asyncio.wait_for(
+                run_in_executor("openai_sync", _upload_bytes),
+                timeout=FILE_UPLOAD_TIMEOUT,
+            )
     except asyncio.TimeoutError:
         logger.exception("[OpenAI] Timeout while uploading bytes")
         raise RuntimeError("Timed out while uploading image")
@@ -573,15 +617,17 @@ async def send_message(
         message_content = [text_block]
     # 2. Создаём сообщение в thread
     try:
-        await asyncio.wait_for(
-            asyncio.to_thread(
-                client.beta.threads.messages.create,
-                thread_id=thread_id,
-                role="user",
-                content=message_content,
-            ),
-            timeout=MESSAGE_CREATION_TIMEOUT,
-        )
+        with observe_openai_call(ASSISTANTS_MODEL, "message_create"):
+            await asyncio.wait_for(
+                run_in_executor(
+                    "openai_sync",
+                    client.beta.threads.messages.create,
+                    thread_id=thread_id,
+                    role="user",
+                    content=message_content,
+                ),
+                timeout=MESSAGE_CREATION_TIMEOUT,
+            )
     except OpenAIError as exc:
         logger.exception("[OpenAI] Failed to create message: %s", exc)
         raise
@@ -592,14 +638,16 @@ async def send_message(
 
     # 3. Запускаем ассистента
     try:
-        run = await asyncio.wait_for(
-            asyncio.to_thread(
-                client.beta.threads.runs.create,
-                thread_id=thread_id,
-                assistant_id=settings.openai_assistant_id,
-            ),
-            timeout=RUN_CREATION_TIMEOUT,
-        )
+        with observe_openai_call(ASSISTANTS_MODEL, "run_create"):
+            run = await asyncio.wait_for(
+                run_in_executor(
+                    "openai_sync",
+                    client.beta.threads.runs.create,
+                    thread_id=thread_id,
+                    assistant_id=settings.openai_assistant_id,
+                ),
+                timeout=RUN_CREATION_TIMEOUT,
+            )
     except OpenAIError as exc:
         logger.exception("[OpenAI] Failed to create run: %s", exc)
         raise
@@ -615,3 +663,116 @@ async def send_message(
     else:
         logger.debug("[OpenAI] Run %s started (thread %s)", run.id, thread_id)
         return run
+
+
+_NUTRITION_FIELDS = ("weight_g", "protein_g", "fat_g", "carbs_g", "calories_kcal", "xe")
+
+PHOTO_NUTRITION_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "photo_nutrition",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                **{field: {"type": ["number", "null"]} for field in _NUTRITION_FIELDS},
+            },
+            "required": ["name", *_NUTRITION_FIELDS],
+            "additionalProperties": False,
+        },
+    },
+}
+
+_NUTRITION_LABELS = (
+    ("weight_g", "Вес", "г"),
+    ("protein_g", "Белки", "г"),
+    ("fat_g", "Жиры", "г"),
+    ("carbs_g", "Углеводы", "г"),
+    ("calories_kcal", "Калории", "ккал"),
+    ("xe", "ХЕ", ""),
+)
+
+
+def _image_data_url(image_bytes: bytes) -> str:
+    """Return ``image_bytes`` as a base64 ``data:`` URL."""
+
+    if image_bytes.startswith(b"\x89PNG"):
+        mime = "image/png"
+    elif image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        mime = "image/webp"
+    elif image_bytes.startswith(b"GIF8"):
+        mime = "image/gif"
+    else:
+        mime = "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(image_bytes).decode('ascii')}"
+
+
+def _nutrition_value(value: object) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    number = float(value)
+    if not math.isfinite(number) or number < 0:
+        return None
+    return number
+
+
+def format_nutrition(name: str, info: NutritionInfo) -> str:
+    """Render ``info`` in the text format of ``PHOTO_ANALYSIS_PROMPT``."""
+
+    lines = [name.strip() or "Блюдо"]
+    for field, label, unit in _NUTRITION_LABELS:
+        value = getattr(info, field)
+        if value is not None:
+            lines.append(f"{label}: {value:g} {unit}".rstrip())
+    return "\n".join(lines)
+
+
+def parse_photo_nutrition(content: str) -> tuple[str, NutritionInfo]:
+    """Parse a ``PHOTO_NUTRITION_FORMAT`` reply into its text and values.
+
+    Raises :class:`ValueError` if ``content`` is not a JSON object.
+    """
+
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("Photo analysis reply is not a JSON object")
+    info = NutritionInfo(
+        **{field: _nutrition_value(data.get(field)) for field in _NUTRITION_FIELDS}
+    )
+    name = data.get("name")
+    return format_nutrition(name if isinstance(name, str) else "", info), info
+
+
+async def analyze_photo(image_bytes: bytes, *, prompt: str) -> tuple[str, NutritionInfo]:
+    """Analyse a food photo with one Chat Completions request.
+
+    The image is sent inline as a ``data:`` URL and the model answers with
+    ``PHOTO_NUTRITION_FORMAT`` JSON, so no file upload, thread or run
+    polling is involved.  Returns the answer rendered as text together
+    with the parsed values; raises :class:`ValueError` on a reply that is
+    not valid JSON.
+    """
+
+    completion = await create_chat_completion(
+        model=choose_model(LLMTask.PHOTO_ANALYSIS),
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": _image_data_url(image_bytes)}},
+                ],
+            }
+        ],
+        temperature=0,
+        timeout=PHOTO_ANALYSIS_TIMEOUT,
+        task=LLMTask.PHOTO_ANALYSIS.value,
+        response_format=PHOTO_NUTRITION_FORMAT,
+    )
+    if not getattr(completion, "choices", None):
+        raise ValueError("OpenAI completion has no choices")
+    content = getattr(completion.choices[0].message, "content", None)
+    if not content:
+        raise ValueError("OpenAI completion choice has empty content")
+    return parse_photo_nutrition(content)
@@ -0,0 +1,279 @@
+"""Insulin-on-board (IOB) and carbs-on-board (COB) engine.
+
+Insulin activity follows the exponential model used by oref0 and Loop: the
+curve is parameterized by the duration of insulin action (``Profile.dia``)
+and a peak time chosen from ``Profile.insulin_type``. Carbohydrates are
+absorbed linearly over ``IOB_CARB_ABSORPTION_MIN`` minutes.
+
+:class:`IOBEngine` keeps the recent doses and carbs of each user in memory
+and fetches only entries added or edited since the previous calculation, so
+each call costs O(recent doses) regardless of the diary length.  Edits are
+found by comparing the database's own timestamps with the newest one seen,
+so clock skew between the bot and the database cannot hide them.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import sqlalchemy as sa
+from numpy.typing import ArrayLike, NDArray
+from sqlalchemy.orm import Session
+
+from services.api.app.config import settings
+from services.api.app.diabetes.services.db import Entry, SessionLocal, run_db
+from services.api.app.diabetes.utils.constants import XE_GRAMS
+
+logger = logging.getLogger(__name__)
+
+# Minutes from injection to peak activity by ``Profile.insulin_type``.
+INSULIN_PEAK_MINUTES: dict[str, float] = {
+    "aspart": 75.0,
+    "lispro": 75.0,
+    "glulisine": 75.0,
+    "regular": 150.0,
+}
+DEFAULT_PEAK_MINUTES = 75.0
+DEFAULT_DIA_HOURS = 4.0
+MAX_TRACKED_USERS = 10_000
+
+
+def peak_minutes(insulin_type: str | None, dia_hours: float) -> float:
+    """Return the activity peak for ``insulin_type``.
+
+    The exponential model needs the peak strictly before half of DIA, so
+    short DIA settings pull the peak earlier.
+    """
+
+    peak = INSULIN_PEAK_MINUTES.get(insulin_type or "", DEFAULT_PEAK_MINUTES)
+    return min(peak, dia_hours * 60.0 * 0.4)
+
+
+def insulin_on_board_fraction(
+    minutes: ArrayLike, dia_hours: float, peak: float
+) -> NDArray[np.float64]:
+    """Fraction of a dose still active ``minutes`` after injection.
+
+    Doses in the future count fully; doses older than DIA count as zero.
+    """
+
+    if dia_hours <= 0:
+        raise ValueError("dia must be greater than 0")
+    t = np.asarray(minutes, dtype=np.float64)
+    td = dia_hours * 60.0
+    tp = min(peak, td * 0.4)
+    tau = tp * (1 - tp / td) / (1 - 2 * tp / td)
+    a = 2 * tau / td
+    s = 1 / (1 - a + (1 + a) * np.exp(-td / tau))
+    tc = np.clip(t, 0.0, td)
+    remaining = 1 - s * (1 - a) * (
+        (tc**2 / (tau * td * (1 - a)) - tc / tau - 1) * np.exp(-tc / tau) + 1
+    )
+    return np.where(t <= 0, 1.0, np.where(t >= td, 0.0, np.clip(remaining, 0, 1)))
+
+
+def carbs_on_board_fraction(
+    minutes: ArrayLike, absorption_minutes: float
+) -> NDArray[np.float64]:
+    """Fraction of carbs not yet absorbed ``minutes`` after the meal."""
+
+    if absorption_minutes <= 0:
+        raise ValueError("absorption_minutes must be greater than 0")
+    t = np.asarray(minutes, dtype=np.float64)
+    return np.clip(1 - t / absorption_minutes, 0.0, 1.0)
+
+
+@dataclass(frozen=True)
+class OnBoard:
+    """Insulin and carbs still acting at ``at``."""
+
+    at: datetime.datetime
+    iob: float
+    cob: float
+
+
+def _epoch(value: datetime.datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class TreatmentState:
+    """Recent doses and carbs of one user, keyed by entry id."""
+
+    treatments: dict[int, tuple[float, float, float]] = field(default_factory=dict)
+    last_id: int = 0
+    # Newest ``created_at``/``updated_at`` seen, as stamped by the database.
+    changed_at: datetime.datetime | None = None
+
+    def upsert(
+        self,
+        entry_id: int,
+        event_time: datetime.datetime,
+        units: float | None,
+        carbs_g: float | None,
+    ) -> None:
+        if not units and not carbs_g:
+            self.treatments.pop(entry_id, None)
+        else:
+            self.treatments[entry_id] = (
+                _epoch(event_time),
+                units or 0.0,
+                carbs_g or 0.0,
+            )
+        self.last_id = max(self.last_id, entry_id)
+
+    def prune(self, before: float) -> None:
+        stale = [key for key, (ts, _, _) in self.treatments.items() if ts < before]
+        for key in stale:
+            del self.treatments[key]
+
+    def arrays(
+        self,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        if not self.treatments:
+            empty = np.zeros(0, dtype=np.float64)
+            return empty, empty, empty
+        data = np.array(list(self.treatments.values()), dtype=np.float64)
+        return data[:, 0], data[:, 1], data[:, 2]
+
+    def iob_curve(
+        self, at: ArrayLike, dia_hours: float, peak: float
+    ) -> NDArray[np.float64]:
+        """IOB at each epoch second in ``at`` (one row per time point)."""
+
+        times, units, _ = self.arrays()
+        at_arr = np.atleast_1d(np.asarray(at, dtype=np.float64))
+        if not len(times):
+            return np.zeros(at_arr.shape, dtype=np.float64)
+        minutes = (at_arr[:, None] - times[None, :]) / 60.0
+        fractions = insulin_on_board_fraction(minutes, dia_hours, peak)
+        # Doses recorded after a time point do not count for it.
+        fractions = np.where(minutes < 0, 0.0, fractions)
+        return np.asarray(fractions @ units, dtype=np.float64)
+
+    def cob_curve(
+        self, at: ArrayLike, absorption_minutes: float
+    ) -> NDArray[np.float64]:
+        times, _, grams = self.arrays()
+        at_arr = np.atleast_1d(np.asarray(at, dtype=np.float64))
+        if not len(times):
+            return np.zeros(at_arr.shape, dtype=np.float64)
+        minutes = (at_arr[:, None] - times[None, :]) / 60.0
+        fractions = carbs_on_board_fraction(minutes, absorption_minutes)
+        fractions = np.where(minutes < 0, 0.0, fractions)
+        return np.asarray(fractions @ grams, dtype=np.float64)
+
+
+class IOBEngine:
+    """Per-user IOB/COB state updated incrementally from ``Entry`` rows."""
+
+    def __init__(self, max_users: int = MAX_TRACKED_USERS) -> None:
+        self._states: OrderedDict[int, TreatmentState] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_users = max_users
+
+    def _state(self, user_id: int) -> TreatmentState:
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is None:
+                state = self._states[user_id] = TreatmentState()
+                while len(self._states) > self._max_users:
+                    self._states.popitem(last=False)
+            else:
+                self._states.move_to_end(user_id)
+            return state
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget the cached state, e.g. after an entry was deleted."""
+
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def sync(
+        self,
+        session: Session,
+        user_id: int,
+        now: datetime.datetime,
+        window: datetime.timedelta,
+    ) -> TreatmentState:
+        """Fetch entries added or edited since the last sync into the state."""
+
+        state = self._state(user_id)
+        since = now - window
+        stamp = sa.func.coalesce(Entry.updated_at, Entry.created_at)
+        changed = Entry.id > state.last_id
+        if state.changed_at is not None:
+            # ``>=``: an edit in the same clock tick as the watermark counts.
+            changed = sa.or_(changed, stamp >= state.changed_at)
+        rows = session.execute(
+            sa.select(
+                stamp,
+                Entry.id,
+                Entry.event_time,
+                Entry.insulin_short,
+                Entry.dose,
+                Entry.carbs_g,
+                Entry.xe,
+            )
+            .where(Entry.telegram_id == user_id)
+            .where(Entry.event_time >= since)
+            .where(changed)
+        )
+        with self._lock:
+            for changed_at, entry_id, event_time, short, dose, carbs_g, xe in rows:
+                if changed_at is not None and (
+                    state.changed_at is None or changed_at > state.changed_at
+                ):
+                    state.changed_at = changed_at
+                if carbs_g is None and xe is not None:
+                    carbs_g = xe * XE_GRAMS
+                units = short if short is not None else dose
+                state.upsert(entry_id, event_time, units, carbs_g)
+            state.prune(_epoch(since))
+        return state
+
+    async def on_board(
+        self,
+        user_id: int,
+        *,
+        dia: float | None = None,
+        insulin_type: str | None = None,
+        now: datetime.datetime | None = None,
+    ) -> OnBoard:
+        """Return IOB and COB for ``user_id`` at ``now``."""
+
+        dia_hours = dia or DEFAULT_DIA_HOURS
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        absorption = settings.iob_carb_absorption_min
+        window = datetime.timedelta(minutes=max(dia_hours * 60.0, absorption))
+        state = await run_db(
+            self.sync, user_id, now, window, sessionmaker=SessionLocal
+        )
+        at = _epoch(now)
+        peak = peak_minutes(insulin_type, dia_hours)
+        with self._lock:
+            iob = float(state.iob_curve(at, dia_hours, peak)[0])
+            cob = float(state.cob_curve(at, absorption)[0])
+        return OnBoard(at=now, iob=iob, cob=cob)
+
+
+iob_engine = IOBEngine()
+
+
+__all__ = [
+    "INSULIN_PEAK_MINUTES",
+    "IOBEngine",
+    "OnBoard",
+    "TreatmentState",
+    "carbs_on_board_fraction",
+    "insulin_on_board_fraction",
+    "iob_engine",
+    "peak_minutes",
+]
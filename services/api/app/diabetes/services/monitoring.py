@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import logging
 
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
 from ..metrics import (
     get_metric_value,
     db_down_seconds,
@@ -29,11 +32,14 @@ def notify(message: str) -> None:
     send_slack(message)
 
 
+def _select_one(session: Session) -> None:
+    session.execute(sa.text("SELECT 1"))
+
+
 async def ping_db() -> None:
     """Ping database and update ``db_down_seconds`` gauge."""
-
     try:
-        await run_db(lambda s: None, sessionmaker=SessionLocal)
+        await run_db(_select_one, sessionmaker=SessionLocal)
         db_down_seconds.set(0)
     except Exception:  # pragma: no cover - logging only
         logger.exception("DB ping failed")
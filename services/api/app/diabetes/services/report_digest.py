@@ -0,0 +1,245 @@
+"""Compact digest of diary entries for the report GPT prompt.
+
+Sending every entry of the period to the model makes the prompt grow with
+the period length. :class:`DigestBuilder` folds entries one by one into
+per-day aggregates, time in range, hypo/hyper episode counts, carb and
+insulin totals and a handful of outliers; :meth:`ReportDigest.text` renders
+at most ``max_rows`` aggregate rows, so the prompt stays the same size for a
+week and for a year.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import heapq
+import math
+from dataclasses import dataclass, field
+
+from services.api.app.diabetes.utils.constants import XE_GRAMS
+
+# Target range used for time in range (international consensus, mmol/L).
+TIR_LOW = 3.9
+TIR_HIGH = 10.0
+HYPO_THRESHOLD = 3.0
+HYPER_THRESHOLD = 13.0
+MAX_ROWS = 31
+MAX_OUTLIERS = 3
+
+
+@dataclass
+class DayStats:
+    """Aggregates of one day (or of a bucket of consecutive days)."""
+
+    start: datetime.date
+    end: datetime.date
+    entries: int = 0
+    readings: int = 0
+    sugar_sum: float = 0.0
+    sugar_min: float = math.inf
+    sugar_max: float = -math.inf
+    carbs_g: float = 0.0
+    insulin: float = 0.0
+
+    @property
+    def sugar_mean(self) -> float | None:
+        return self.sugar_sum / self.readings if self.readings else None
+
+    def merge(self, other: DayStats) -> None:
+        self.end = max(self.end, other.end)
+        self.entries += other.entries
+        self.readings += other.readings
+        self.sugar_sum += other.sugar_sum
+        self.sugar_min = min(self.sugar_min, other.sugar_min)
+        self.sugar_max = max(self.sugar_max, other.sugar_max)
+        self.carbs_g += other.carbs_g
+        self.insulin += other.insulin
+
+    def line(self) -> str:
+        label = self.start.strftime("%d.%m")
+        if self.end != self.start:
+            label = f"{label}–{self.end.strftime('%d.%m')}"
+        mean = self.sugar_mean
+        sugar = (
+            f"{self.sugar_min:.1f}/{mean:.1f}/{self.sugar_max:.1f}"
+            if mean is not None
+            else "—"
+        )
+        return (
+            f"{label}: сахар {sugar}, углеводы {self.carbs_g:.0f} г, "
+            f"инсулин {self.insulin:.1f} ЕД"
+        )
+
+
+@dataclass(frozen=True)
+class Outlier:
+    event_time: datetime.datetime
+    sugar: float
+
+
+@dataclass(frozen=True)
+class ReportDigest:
+    """Aggregated view of a report period."""
+
+    entries: int
+    readings: int
+    in_range: int
+    hypo_episodes: int
+    hyper_episodes: int
+    carbs_total: float
+    insulin_total: float
+    days: list[DayStats] = field(default_factory=list)
+    outliers: list[Outlier] = field(default_factory=list)
+
+    @property
+    def time_in_range(self) -> float | None:
+        """Share of readings within ``TIR_LOW``–``TIR_HIGH`` in percent."""
+
+        return 100.0 * self.in_range / self.readings if self.readings else None
+
+    def rows(self, max_rows: int = MAX_ROWS) -> list[DayStats]:
+        """Return day aggregates merged into at most ``max_rows`` buckets."""
+
+        if len(self.days) <= max_rows:
+            return list(self.days)
+        span = (self.days[-1].start - self.days[0].start).days + 1
+        width = math.ceil(span / max_rows)
+        first = self.days[0].start
+        buckets: dict[int, DayStats] = {}
+        for day in self.days:
+            index = (day.start - first).days // width
+            bucket = buckets.get(index)
+            if bucket is None:
+                buckets[index] = DayStats(start=day.start, end=day.end)
+                bucket = buckets[index]
+            bucket.merge(day)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def text(self, max_rows: int = MAX_ROWS) -> str:
+        tir = self.time_in_range
+        tir_text = f"{tir:.0f}%" if tir is not None else "нет измерений"
+        lines = [
+            f"Записей: {self.entries}, дней с записями: {len(self.days)}, "
+            f"измерений сахара: {self.readings}",
+            f"Время в диапазоне {TIR_LOW}–{TIR_HIGH} ммоль/л: {tir_text}",
+            f"Эпизодов гипогликемии (<{HYPO_THRESHOLD}): {self.hypo_episodes}, "
+            f"гипергликемии (>{HYPER_THRESHOLD}): {self.hyper_episodes}",
+            f"Углеводы всего: {self.carbs_total:.0f} г, "
+            f"инсулин всего: {self.insulin_total:.1f} ЕД",
+            "По дням (сахар мин/сред/макс):",
+            *(row.line() for row in self.rows(max_rows)),
+        ]
+        if self.outliers:
+            lines.append("Выбросы:")
+            lines.extend(
+                f"{o.event_time.strftime('%d.%m %H:%M')}: сахар {o.sugar:.1f}"
+                for o in self.outliers
+            )
+        return "\n".join(lines)
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the digest; changes whenever the data does."""
+
+        return hashlib.sha256(self.text().encode("utf-8")).hexdigest()[:16]
+
+
+class DigestBuilder:
+    """Fold entries, in chronological order, into a :class:`ReportDigest`."""
+
+    def __init__(self, max_outliers: int = MAX_OUTLIERS) -> None:
+        self._max_outliers = max_outliers
+        self._days: dict[datetime.date, DayStats] = {}
+        self._entries = 0
+        self._readings = 0
+        self._in_range = 0
+        self._hypo_episodes = 0
+        self._hyper_episodes = 0
+        self._in_hypo = False
+        self._in_hyper = False
+        self._carbs = 0.0
+        self._insulin = 0.0
+        self._seq = 0
+        self._low: list[tuple[float, int, Outlier]] = []
+        self._high: list[tuple[float, int, Outlier]] = []
+
+    def add(
+        self,
+        event_time: datetime.datetime,
+        sugar: float | None,
+        carbs_g: float | None = None,
+        dose: float | None = None,
+        xe: float | None = None,
+    ) -> None:
+        day_key = event_time.date()
+        day = self._days.get(day_key)
+        if day is None:
+            day = self._days[day_key] = DayStats(start=day_key, end=day_key)
+        self._entries += 1
+        day.entries += 1
+        if carbs_g is None and xe is not None:
+            carbs_g = xe * XE_GRAMS
+        if carbs_g is not None:
+            day.carbs_g += carbs_g
+            self._carbs += carbs_g
+        if dose is not None:
+            day.insulin += dose
+            self._insulin += dose
+        if sugar is None:
+            return
+        self._readings += 1
+        day.readings += 1
+        day.sugar_sum += sugar
+        day.sugar_min = min(day.sugar_min, sugar)
+        day.sugar_max = max(day.sugar_max, sugar)
+        if TIR_LOW <= sugar <= TIR_HIGH:
+            self._in_range += 1
+        hypo = sugar < HYPO_THRESHOLD
+        hyper = sugar > HYPER_THRESHOLD
+        if hypo and not self._in_hypo:
+            self._hypo_episodes += 1
+        if hyper and not self._in_hyper:
+            self._hyper_episodes += 1
+        self._in_hypo = hypo
+        self._in_hyper = hyper
+        if sugar < TIR_LOW:
+            self._keep(self._low, -sugar, Outlier(event_time, sugar))
+        elif sugar > TIR_HIGH:
+            self._keep(self._high, sugar, Outlier(event_time, sugar))
+
+    def _keep(
+        self, heap: list[tuple[float, int, Outlier]], score: float, outlier: Outlier
+    ) -> None:
+        if self._max_outliers <= 0:
+            return
+        self._seq += 1
+        item = (score, self._seq, outlier)
+        if len(heap) < self._max_outliers:
+            heapq.heappush(heap, item)
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def build(self) -> ReportDigest:
+        outliers = [item[2] for item in self._low + self._high]
+        outliers.sort(key=lambda o: o.event_time)
+        return ReportDigest(
+            entries=self._entries,
+            readings=self._readings,
+            in_range=self._in_range,
+            hypo_episodes=self._hypo_episodes,
+            hyper_episodes=self._hyper_episodes,
+            carbs_total=self._carbs,
+            insulin_total=self._insulin,
+            days=[self._days[key] for key in sorted(self._days)],
+            outliers=outliers,
+        )
+
+
+__all__ = [
+    "DayStats",
+    "DigestBuilder",
+    "Outlier",
+    "ReportDigest",
+    "TIR_HIGH",
+    "TIR_LOW",
+]
@@ -1,27 +1,45 @@
 # reporting.py
 
+import itertools
 import logging
 import os
 import io
+import tempfile
 import textwrap
 import threading
+from array import array
 from datetime import datetime
-from typing import Callable, Iterable, Protocol, Sequence, cast
-
-import matplotlib.pyplot as plt
-from matplotlib.dates import date2num
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont, TTFError
-from reportlab.pdfgen import canvas
+from typing import IO, Iterable, Iterator, Protocol
 
 from services.api.app import config
+from services.api.app.diabetes.utils.lazy_import import LazyAttrs
 
 logger = logging.getLogger(__name__)
 
-date2num_typed: Callable[[datetime], float] = date2num
+# matplotlib и reportlab загружаются при первом построении отчёта, чтобы
+# импорт обработчиков бота не тянул их в каждый процесс.
+_lazy = LazyAttrs(
+    globals(),
+    {
+        "plt": ("matplotlib.pyplot", None),
+        "date2num": ("matplotlib.dates", "date2num"),
+        "A4": ("reportlab.lib.pagesizes", "A4"),
+        "mm": ("reportlab.lib.units", "mm"),
+        "ImageReader": ("reportlab.lib.utils", "ImageReader"),
+        "pdfmetrics": ("reportlab.pdfbase.pdfmetrics", None),
+        "TTFont": ("reportlab.pdfbase.ttfonts", "TTFont"),
+        "TTFError": ("reportlab.pdfbase.ttfonts", "TTFError"),
+        "canvas": ("reportlab.pdfgen.canvas", None),
+    },
+)
+__getattr__ = _lazy.module_getattr
+
+
+def date2num_typed(value: datetime) -> float:
+    """Typed wrapper around :func:`matplotlib.dates.date2num`."""
+
+    return float(_lazy("date2num")(value))
+
 
 # Регистрация шрифтов для поддержки кириллицы и жирного начертания
 DEFAULT_FONT_DIR = "/usr/share/fonts/truetype/dejavu"
@@ -40,6 +58,9 @@ def _register_font(name: str, filename: str) -> tuple[bool, str | None]:
     settings = config.get_settings()
     font_dir = settings.font_dir or DEFAULT_FONT_DIR
     path = os.path.join(font_dir, filename)
+    pdfmetrics = _lazy("pdfmetrics")
+    TTFont = _lazy("TTFont")
+    TTFError = _lazy("TTFError")
     try:
         pdfmetrics.registerFont(TTFont(name, path))
         return True, None
@@ -99,6 +120,75 @@ def register_fonts() -> bool:
         return success
 
 
+class SugarSeries:
+    """Точки графика сахара в компактных массивах ``array('d')``.
+
+    Позволяет накапливать данные графика построчно, не храня объекты
+    записей. Точки добавляются в хронологическом порядке; время
+    переводится в числа ``matplotlib`` пачками по ``batch_size``.
+    """
+
+    def __init__(self, batch_size: int = 1024) -> None:
+        self._times: array[float] = array("d")
+        self._sugars: array[float] = array("d")
+        self._pending: list[datetime] = []
+        self._batch_size = batch_size
+
+    def add(self, event_time: datetime, sugar: float | None) -> None:
+        if sugar is None:
+            return
+        self._pending.append(event_time)
+        self._sugars.append(sugar)
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._times.extend(_lazy("date2num")(self._pending))
+            self._pending.clear()
+
+    @property
+    def times(self) -> array[float]:
+        self._flush()
+        return self._times
+
+    @property
+    def sugars(self) -> array[float]:
+        return self._sugars
+
+    def __len__(self) -> int:
+        return len(self._sugars)
+
+
+class LineSpool:
+    """Построчный буфер для разделов PDF-отчёта.
+
+    Строки держатся в памяти до ``max_size`` байт, затем сбрасываются во
+    временный файл. Итерация читает их обратно по одной.
+    """
+
+    def __init__(self, max_size: int = 256 * 1024) -> None:
+        self._file: IO[str] = tempfile.SpooledTemporaryFile(
+            max_size=max_size, mode="w+", encoding="utf-8"
+        )
+        self._count = 0
+
+    def write(self, line: str) -> None:
+        self._file.write(line.replace("\n", " ") + "\n")
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        self._file.seek(0)
+        for line in self._file:
+            yield line.rstrip("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
 def make_sugar_plot(entries: Iterable[SugarEntry], period_label: str) -> io.BytesIO:
     """Собирает график сахара за период.
 
@@ -115,14 +205,20 @@ def make_sugar_plot(entries: Iterable[SugarEntry], period_label: str) -> io.Byte
         Логирует отсутствие данных и использует глобальное состояние
         ``matplotlib``.
     """
-    entries_sorted = sorted(
+    series = SugarSeries()
+    for entry in sorted(
         (e for e in entries if e.sugar_before is not None),
         key=lambda e: e.event_time,
-    )
-    times: list[float] = [date2num_typed(e.event_time) for e in entries_sorted]
-    sugars_plot: list[float] = [cast(float, e.sugar_before) for e in entries_sorted]
+    ):
+        series.add(entry.event_time, entry.sugar_before)
+    return plot_sugar_series(series, period_label)
+
 
-    if not sugars_plot:
+def plot_sugar_series(series: SugarSeries, period_label: str) -> io.BytesIO:
+    """Рисует график по уже накопленной серии :class:`SugarSeries`."""
+    plt = _lazy("plt")
+
+    if not series:
         logger.info("No sugar data available for %s", period_label)
         buf = io.BytesIO()
         plt.figure(figsize=(7, 3))
@@ -141,7 +237,12 @@ def make_sugar_plot(entries: Iterable[SugarEntry], period_label: str) -> io.Byte
         return buf
 
     plt.figure(figsize=(7, 3))
-    plt.plot(times, sugars_plot, marker="o", label="Сахар (ммоль/л)")
+    plt.plot(
+        series.times.tolist(),
+        series.sugars.tolist(),
+        marker="o",
+        label="Сахар (ммоль/л)",
+    )
     plt.gca().xaxis_date()
     plt.gcf().autofmt_xdate()
     plt.title(f"Динамика сахара за {period_label}")
@@ -177,14 +278,17 @@ def wrap_text(text: str, width: int = 100) -> list[str]:
 
 
 def generate_pdf_report(
-    summary_lines: Sequence[str],
-    errors: Sequence[str],
-    day_lines: Sequence[str],
+    summary_lines: Iterable[str],
+    errors: Iterable[str],
+    day_lines: Iterable[str],
     gpt_text: str,
     plot_buf: io.BytesIO | None,
 ) -> io.BytesIO:
     """Генерирует PDF-отчёт для врача.
 
+    Строки разделов читаются по одной, поэтому вместо списков можно
+    передать генераторы или :class:`LineSpool`.
+
     Args:
         summary_lines: Сводка по записей дневника.
         errors: Список ошибок или критических значений.
@@ -199,6 +303,11 @@ def generate_pdf_report(
         Использует библиотеку ``reportlab`` для записи PDF и может
         логировать предупреждения при ошибках чтения изображения.
     """
+    A4 = _lazy("A4")
+    mm = _lazy("mm")
+    canvas = _lazy("canvas")
+    ImageReader = _lazy("ImageReader")
+
     fonts_available = register_fonts()
     if fonts_available:
         regular_font = "DejaVuSans"
@@ -238,29 +347,25 @@ def generate_pdf_report(
         y -= 6 * mm
         y = check_page_break(y, regular_font, 11)
 
-    if errors:
+    def draw_section(y_pos: float, title: str, lines: Iterable[str]) -> float:
+        iterator = iter(lines)
+        first = next(iterator, None)
+        if first is None:
+            return y_pos
         c.setFont(bold_font, 13)
-        y = check_page_break(y, bold_font, 13)
-        c.drawString(x_margin, y, "Ошибки и критические значения:")
-        y -= 7 * mm
+        y_pos = check_page_break(y_pos, bold_font, 13)
+        c.drawString(x_margin, y_pos, title)
+        y_pos -= 7 * mm
         c.setFont(regular_font, 11)
-        y = check_page_break(y, regular_font, 11)
-        for err in errors:
-            c.drawString(x_margin, y, err)
-            y -= 6 * mm
-            y = check_page_break(y, regular_font, 11)
+        y_pos = check_page_break(y_pos, regular_font, 11)
+        for line in itertools.chain((first,), iterator):
+            c.drawString(x_margin, y_pos, line)
+            y_pos -= 6 * mm
+            y_pos = check_page_break(y_pos, regular_font, 11)
+        return y_pos
 
-    if day_lines:
-        c.setFont(bold_font, 13)
-        y = check_page_break(y, bold_font, 13)
-        c.drawString(x_margin, y, "Динамика по дням:")
-        y -= 7 * mm
-        c.setFont(regular_font, 11)
-        y = check_page_break(y, regular_font, 11)
-        for line in day_lines:
-            c.drawString(x_margin, y, line)
-            y -= 6 * mm
-            y = check_page_break(y, regular_font, 11)
+    y = draw_section(y, "Ошибки и критические значения:", errors)
+    y = draw_section(y, "Динамика по дням:", day_lines)
 
     # Вставка графика
     if plot_buf:
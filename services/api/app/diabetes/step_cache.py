@@ -0,0 +1,151 @@
+"""Shared cache of generated learning step texts.
+
+A step explanation only depends on the prompt version, the bucketed profile
+fields read by :func:`prompts.build_system_prompt`, the topic, the step and
+the previous summary.  Users in the same bucket therefore share one text
+instead of each triggering an LLM call.  Texts live in the
+``learning_step_cache`` table behind a small in-process LRU, so they survive
+restarts and can be pre-generated offline with
+:mod:`services.api.app.management.warm_step_cache`.
+
+The tier is used by :func:`dynamic_tutor.generate_step_text` when
+``LEARNING_SHARED_STEP_CACHE`` is enabled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Mapping, cast
+
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .llm_router import LLMTask
+from .metrics import learning_step_cache_hit, learning_step_cache_miss
+from .models_learning import LearningStepCache
+from .prompts import PROMPT_VERSION, _canon_slug, profile_bucket
+from .services.db import SessionLocal, run_db
+from .services.gpt_client import choose_model
+from .services.repository import CommitError, commit
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["clear_topic", "get", "put", "reset_memory", "step_key"]
+
+MEMORY_LIMIT = 512
+
+_memory: OrderedDict[str, str] = OrderedDict()
+
+
+def step_key(
+    profile: Mapping[str, str | None],
+    topic_slug: str,
+    step_idx: int,
+    prev_summary: str | None,
+) -> str:
+    """Return the shared cache key of a step for ``profile``."""
+
+    summary_hash = (
+        hashlib.sha256(prev_summary.encode("utf-8")).hexdigest() if prev_summary else ""
+    )
+    raw = json.dumps(
+        [
+            PROMPT_VERSION,
+            choose_model(LLMTask.EXPLAIN_STEP),
+            list(profile_bucket(profile)),
+            _canon_slug(topic_slug),
+            step_idx,
+            summary_hash,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, text: str) -> None:
+    _memory[key] = text
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_LIMIT:
+        _memory.popitem(last=False)
+
+
+async def get(key: str) -> str | None:
+    """Return the shared text for ``key`` or ``None`` on a miss."""
+
+    text = _memory.get(key)
+    if text is not None:
+        _memory.move_to_end(key)
+        learning_step_cache_hit.labels(tier="memory").inc()
+        return text
+
+    def _get(session: Session) -> str | None:
+        return cast(
+            str | None,
+            session.scalar(
+                sa.select(LearningStepCache.text).where(LearningStepCache.key == key)
+            ),
+        )
+
+    try:
+        text = await run_db(_get, sessionmaker=SessionLocal)
+    except SQLAlchemyError:
+        logger.exception("Failed to read shared step cache")
+        text = None
+    if text is None:
+        learning_step_cache_miss.inc()
+        return None
+    learning_step_cache_hit.labels(tier="db").inc()
+    _remember(key, text)
+    return text
+
+
+async def put(key: str, topic_slug: str, step_idx: int, text: str) -> None:
+    """Store ``text`` under ``key`` for every user of the same bucket."""
+
+    _remember(key, text)
+
+    def _put(session: Session) -> None:
+        session.merge(
+            LearningStepCache(
+                key=key,
+                topic_slug=_canon_slug(topic_slug),
+                step_idx=step_idx,
+                text=text,
+            )
+        )
+        commit(session)
+
+    try:
+        await run_db(_put, sessionmaker=SessionLocal)
+    except (CommitError, SQLAlchemyError):
+        logger.exception("Failed to write shared step cache")
+
+
+async def clear_topic(topic_slug: str) -> int:
+    """Delete stored texts of ``topic_slug`` and return how many were removed."""
+
+    slug = _canon_slug(topic_slug)
+
+    def _clear(session: Session) -> int:
+        result = cast(
+            sa.CursorResult[object],
+            session.execute(
+                sa.delete(LearningStepCache).where(LearningStepCache.topic_slug == slug)
+            ),
+        )
+        commit(session)
+        return result.rowcount
+
+    removed = await run_db(_clear, sessionmaker=SessionLocal)
+    _memory.clear()
+    return removed
+
+
+def reset_memory() -> None:
+    """Drop the in-process tier (used by tests)."""
+
+    _memory.clear()
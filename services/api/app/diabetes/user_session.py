@@ -0,0 +1,379 @@
+"""Typed, compact ``context.user_data`` for the bot.
+
+PTB keeps one ``user_data`` mapping per user in memory and
+``PicklePersistence`` pickles all of them on every flush.
+:class:`UserSession` is the mapping PTB creates for each user (see
+``services.bot.main.build_application``).  It keeps the dict interface the
+handlers use, and:
+
+* known keys are listed in :data:`FIELDS` with their type and section, and
+  the typed properties return a default when a key is unset or holds a
+  value of another type;
+* lists that grow with use (assistant history, learning plan) are bounded;
+* keys starting with ``_`` hold runtime objects such as tasks and are never
+  persisted;
+* pickling stores a schema version, a codec byte and a msgpack payload
+  (pickle when a value cannot be encoded), and
+  the ``assistant`` and ``learning`` sections stay encoded until a handler
+  reads one of their keys, so sessions of idle users cost a few bytes;
+* values round-trip with their exact types: a section holding a tuple or a
+  dict subclass is pickled instead, since msgpack would return a list or a
+  plain dict.
+
+Known fields are encoded by their position in :data:`FIELDS`: append new
+fields at the end.  When a field changes meaning, bump
+:data:`SCHEMA_VERSION` and register in :data:`UPGRADES` a function that
+rewrites a payload of the previous version; sessions written by older
+versions are upgraded when loaded instead of being dropped.
+
+The gain is memory, not speed: an idle user costs a fraction of a plain
+dict, but flushing is slower.  ``benchmarks/test_user_session.py`` pickles
+200 sessions in about 1.3 ms against 0.75 ms for the same plain dicts.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from dataclasses import dataclass
+from typing import Any, cast
+
+import msgpack
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "FIELDS",
+    "SCHEMA_VERSION",
+    "UPGRADES",
+    "Field",
+    "UserSession",
+    "as_session",
+]
+
+SCHEMA_VERSION = 1
+HISTORY_LIMIT = 50
+PLAN_LIMIT = 100
+
+_MSGPACK = b"m"
+_PICKLE = b"p"
+
+
+@dataclass(frozen=True, slots=True)
+class Field:
+    """A known ``user_data`` key.
+
+    ``default`` builds the value the typed property returns, and stores,
+    when the key is unset; without it the property returns ``None``.
+    """
+
+    key: str
+    types: tuple[type, ...]
+    section: str = "core"
+    limit: int | None = None
+    default: Callable[[], object] | None = None
+
+
+FIELDS: tuple[Field, ...] = (
+    Field("pending_entry", (dict,)),
+    Field("pending_fields", (list,)),
+    Field("edit_id", (int,)),
+    Field("edit_entry", (dict,)),
+    Field("edit_field", (str,)),
+    Field("edit_query", (dict,)),
+    Field("awaiting_report_date", (bool,)),
+    Field("thread_id", (str,)),
+    Field("tg_init_data", (str,)),
+    Field("waiting_labs", (bool,)),
+    Field("lesson_id", (int,)),
+    Field("lesson_slug", (str,)),
+    Field("learning_plan_id", (int,)),
+    Field("learning_plan_index", (int,), default=int),
+    Field("learning_module_idx", (int,)),
+    Field("learning_onboarded", (bool,)),
+    Field("learning_profile_backfilled", (bool,)),
+    Field("learn_onboarding_stage", (str,)),
+    Field("learn_profile_overrides", (dict,)),
+    Field("assistant_last_mode", (str,)),
+    Field(
+        "assistant_history",
+        (list,),
+        section="assistant",
+        limit=HISTORY_LIMIT,
+        default=list,
+    ),
+    Field("assistant_summary", (str,), section="assistant"),
+    Field("learning_plan", (list,), section="learning", limit=PLAN_LIMIT),
+    Field("learn_state", (dict,), section="learning"),
+)
+
+_BY_KEY: dict[str, tuple[int, Field]] = {f.key: (i, f) for i, f in enumerate(FIELDS)}
+
+Upgrade = Callable[[dict[object, object]], dict[object, object]]
+
+# ``UPGRADES[n]`` turns a payload written by version ``n`` into one of
+# version ``n + 1``.  Payloads are keyed by field position (or by name for
+# unknown keys), and the core and each section are upgraded separately.
+UPGRADES: dict[int, Upgrade] = {}
+
+
+def _encode(obj: object) -> bytes:
+    header = bytes([SCHEMA_VERSION])
+    try:
+        payload = cast(
+            bytes, msgpack.packb(obj, use_bin_type=True, datetime=True, strict_types=True)
+        )
+    except (TypeError, ValueError, OverflowError):
+        pass
+    else:
+        return header + _MSGPACK + payload
+    return header + _PICKLE + pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(raw: bytes) -> dict[object, object]:
+    version, codec, payload = raw[0], raw[1:2], raw[2:]
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"unsupported user session version {version}")
+    if codec == _MSGPACK:
+        values = msgpack.unpackb(payload, raw=False, strict_map_key=False, timestamp=3)
+    else:
+        values = pickle.loads(payload)
+    while version < SCHEMA_VERSION:
+        upgrade = UPGRADES.get(version)
+        if upgrade is None:
+            raise ValueError(f"no upgrade from user session version {version}")
+        values = upgrade(dict(values))
+        version += 1
+    return cast(dict[object, object], values)
+
+
+def _bounded(field: Field, value: object) -> object:
+    if field.limit is not None and isinstance(value, list) and len(value) > field.limit:
+        del value[: -field.limit]
+    return value
+
+
+def _restore(core: bytes, packed: dict[str, bytes]) -> UserSession:
+    session = UserSession()
+    try:
+        values = _decode(core)
+    except (ValueError, pickle.UnpicklingError) as exc:
+        logger.error("Dropping unreadable user session: %s", exc)
+        return session
+    session._data = _named(values)
+    session._packed = packed
+    return session
+
+
+def _named(values: Mapping[object, object]) -> dict[str, object]:
+    data: dict[str, object] = {}
+    for key, value in values.items():
+        if isinstance(key, int):
+            if key >= len(FIELDS):
+                continue
+            key = FIELDS[key].key
+        data[cast(str, key)] = value
+    return data
+
+
+class UserSession(MutableMapping[str, object]):
+    """Per-user state with known fields, bounded lists and compact pickling."""
+
+    __slots__ = ("_data", "_packed")
+
+    def __init__(self, data: Mapping[str, object] | None = None) -> None:
+        self._data: dict[str, object] = {}
+        # Sections not decoded since the session was loaded.
+        self._packed: dict[str, bytes] = {}
+        if data:
+            self.update(data)
+
+    def _unpack(self, section: str) -> None:
+        raw = self._packed.pop(section, None)
+        if raw is None:
+            return
+        try:
+            values = _named(_decode(raw))
+        except (ValueError, pickle.UnpicklingError) as exc:
+            logger.error("Dropping unreadable %s section: %s", section, exc)
+            return
+        for key, value in values.items():
+            self._data.setdefault(key, value)
+
+    def _ensure(self, key: str) -> None:
+        if self._packed:
+            known = _BY_KEY.get(key)
+            if known is not None:
+                self._unpack(known[1].section)
+
+    def _unpack_all(self) -> None:
+        for section in list(self._packed):
+            self._unpack(section)
+
+    def __getitem__(self, key: str) -> object:
+        self._ensure(key)
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: object) -> None:
+        self._ensure(key)
+        known = _BY_KEY.get(key)
+        self._data[key] = _bounded(known[1], value) if known is not None else value
+
+    def __delitem__(self, key: str) -> None:
+        self._ensure(key)
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        if isinstance(key, str):
+            self._ensure(key)
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        self._unpack_all()
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        self._unpack_all()
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._packed.clear()
+
+    def copy(self) -> UserSession:
+        session = UserSession()
+        session._data = dict(self._data)
+        session._packed = dict(self._packed)
+        return session
+
+    def __eq__(self, other: object) -> bool:
+        # PicklePersistence compares the stored session with the live one
+        # after every update; they are the same object, so skip decoding.
+        if other is self:
+            return True
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"UserSession({dict(self)!r})"
+
+    def _dump(self) -> tuple[bytes, dict[str, bytes]]:
+        core: dict[object, object] = {}
+        sections: dict[str, dict[int, object]] = {}
+        for key, value in self._data.items():
+            known = _BY_KEY.get(key)
+            if known is None:
+                if not key.startswith("_"):
+                    core[key] = value
+                continue
+            index, field = known
+            if field.limit is not None:
+                value = _bounded(field, value)
+            if field.section == "core":
+                core[index] = value
+            else:
+                sections.setdefault(field.section, {})[index] = value
+        packed = dict(self._packed)
+        for name, values in sections.items():
+            packed[name] = _encode(values)
+        return _encode(core), packed
+
+    def __reduce__(self) -> tuple[Any, tuple[bytes, dict[str, bytes]]]:
+        # Untouched sections are written back as the bytes they were read as.
+        return _restore, self._dump()
+
+    def _typed(self, key: str) -> Any:
+        field = _BY_KEY[key][1]
+        value = self.get(key)
+        if isinstance(value, field.types):
+            return value
+        if field.default is None:
+            return None
+        value = field.default()
+        self[key] = value
+        return value
+
+    def _set_or_clear(self, key: str, value: object) -> None:
+        if value is None:
+            self.pop(key, None)
+        else:
+            self[key] = value
+
+    @property
+    def pending_entry(self) -> dict[str, Any] | None:
+        return cast(dict[str, Any] | None, self._typed("pending_entry"))
+
+    @pending_entry.setter
+    def pending_entry(self, value: Mapping[str, Any] | None) -> None:
+        self._set_or_clear("pending_entry", value)
+
+    @property
+    def thread_id(self) -> str | None:
+        return cast(str | None, self._typed("thread_id"))
+
+    @thread_id.setter
+    def thread_id(self, value: str | None) -> None:
+        self._set_or_clear("thread_id", value)
+
+    @property
+    def tg_init_data(self) -> str | None:
+        return cast(str | None, self._typed("tg_init_data"))
+
+    @tg_init_data.setter
+    def tg_init_data(self, value: str | None) -> None:
+        self._set_or_clear("tg_init_data", value)
+
+    @property
+    def lesson_id(self) -> int | None:
+        return cast(int | None, self._typed("lesson_id"))
+
+    @property
+    def learning_plan(self) -> list[str] | None:
+        return cast(list[str] | None, self._typed("learning_plan"))
+
+    @learning_plan.setter
+    def learning_plan(self, value: list[str] | None) -> None:
+        self._set_or_clear("learning_plan", value)
+
+    @property
+    def learning_plan_id(self) -> int | None:
+        return cast(int | None, self._typed("learning_plan_id"))
+
+    @learning_plan_id.setter
+    def learning_plan_id(self, value: int | None) -> None:
+        self._set_or_clear("learning_plan_id", value)
+
+    @property
+    def learning_plan_index(self) -> int:
+        return cast(int, self._typed("learning_plan_index"))
+
+    @learning_plan_index.setter
+    def learning_plan_index(self, value: int) -> None:
+        self["learning_plan_index"] = value
+
+    @property
+    def assistant_history(self) -> list[str]:
+        return cast(list[str], self._typed("assistant_history"))
+
+    @property
+    def assistant_summary(self) -> str | None:
+        return cast(str | None, self._typed("assistant_summary"))
+
+
+def as_session(data: Mapping[str, object] | None) -> UserSession:
+    """Return ``data`` as a :class:`UserSession`.
+
+    A plain dict is wrapped rather than copied, so writes through the
+    session, including its typed properties, reach ``data``.
+    """
+
+    if isinstance(data, UserSession):
+        return data
+    session = UserSession()
+    if type(data) is dict:
+        session._data = data
+    elif data:
+        session.update(data)
+    return session
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_FLOOR, localcontext
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 from .constants import XE_GRAMS
 
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+
 
 @dataclass
 class PatientProfile:
@@ -122,4 +126,55 @@ def calc_bolus(
     return _round_bolus(total_f, bolus_round_step)
 
 
-__all__ = ["PatientProfile", "calc_bolus"]
+def calc_bolus_table(
+    carbs: ArrayLike,
+    current_bg: ArrayLike,
+    profile: PatientProfile,
+    *,
+    carb_units: Literal["g", "xe"] = "g",
+    bolus_round_step: float = 0.5,
+    max_bolus: float | None = None,
+    iob: float | None = None,
+) -> NDArray[np.float64]:
+    """Vectorized :func:`calc_bolus` for "what-if" dose tables.
+
+    ``carbs`` and ``current_bg`` are broadcast against each other, e.g. a
+    column of carb amounts and a row of glucose values give a full table in
+    one call. Validation and rounding match :func:`calc_bolus`.
+    """
+    import numpy as np  # deferred: keeps numpy out of bot startup
+
+    if profile.icr <= 0:
+        raise ValueError("Profile icr must be greater than 0")
+    if profile.cf <= 0:
+        raise ValueError("Profile cf must be greater than 0")
+    if profile.target_bg <= 0:
+        raise ValueError("Profile target_bg must be greater than 0")
+    if bolus_round_step <= 0:
+        raise ValueError("bolus_round_step must be positive")
+    if carb_units not in {"g", "xe"}:
+        raise ValueError("carb_units must be 'g' or 'xe'")
+    carbs_arr = np.asarray(carbs, dtype=np.float64)
+    bg_arr = np.asarray(current_bg, dtype=np.float64)
+    if (carbs_arr < 0).any():
+        raise ValueError("carbs must be non-negative")
+    if (bg_arr < 0).any():
+        raise ValueError("current_bg must be non-negative")
+    if iob is not None and iob < 0:
+        raise ValueError("iob must be non-negative")
+    if max_bolus is not None and max_bolus < 0:
+        raise ValueError("max_bolus must be non-negative")
+
+    carbs_g = carbs_arr * XE_GRAMS if carb_units == "xe" else carbs_arr
+    meal = carbs_g / profile.icr
+    correction = np.maximum((bg_arr - profile.target_bg) / profile.cf, 0.0)
+    total = np.maximum(meal + correction - (iob or 0.0), 0.0)
+    if max_bolus is not None:
+        total = np.minimum(total, max_bolus)
+    # Rounding before the floor keeps float noise (0.3 / 0.1 == 2.999...)
+    # from dropping a step that Decimal arithmetic in ``calc_bolus`` keeps.
+    steps = np.floor(np.round(total / bolus_round_step, 9))
+    return np.asarray(steps * bolus_round_step, dtype=np.float64)
+
+
+__all__ = ["PatientProfile", "calc_bolus", "calc_bolus_table"]
@@ -0,0 +1,224 @@
+"""Named, sized thread pools for blocking work.
+
+``asyncio.to_thread`` shares the loop's single default executor, so slow
+OpenAI uploads compete with database sessions and neither can be sized on its
+own. Blocking calls go through one of the named executors instead:
+
+* ``db`` — SQLAlchemy sessions; sized to ``DB_POOL_SIZE + DB_MAX_OVERFLOW``
+  so a thread never waits for a connection that cannot exist;
+* ``openai_sync`` — synchronous OpenAI SDK calls (Assistants API, uploads);
+* ``render`` — CPU-bound report rendering (matplotlib, reportlab);
+* ``image`` — decoding, downscaling and hashing photos before Vision.
+
+Each executor admits at most ``workers + queue_size`` calls. Further callers
+wait up to ``queue_timeout`` seconds for a slot and then get
+:class:`ExecutorSaturatedError` instead of piling up unbounded work.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Literal, TypeVar
+from weakref import WeakKeyDictionary
+
+from typing_extensions import ParamSpec
+
+from services.api.app.config import settings
+from services.api.app.diabetes.metrics import (
+    executor_in_flight,
+    executor_queue_wait_seconds,
+    executor_rejected_total,
+    executor_workers,
+)
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+ExecutorName = Literal["db", "openai_sync", "render", "image"]
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when an executor has no free slot within its queue timeout."""
+
+    def __init__(self, name: str, timeout: float) -> None:
+        super().__init__(f"Executor {name!r} is saturated (waited {timeout:.1f}s)")
+        self.name = name
+        self.timeout = timeout
+
+
+class BoundedExecutor:
+    """Thread pool with bounded admission and saturation metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        *,
+        queue_size: int = 0,
+        queue_timeout: float = 10.0,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative")
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"{name}-executor"
+        )
+        self._slots: WeakKeyDictionary[AbstractEventLoop, asyncio.Semaphore] = (
+            WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        executor_workers.labels(executor=name).set(workers)
+        executor_in_flight.labels(executor=name).set(0)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of calls admitted at once (running or queued)."""
+
+        return self.workers + self.queue_size
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._slots.get(loop)
+        if sem is None:
+            sem = self._slots.setdefault(loop, asyncio.Semaphore(self.capacity))
+        return sem
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            executor_in_flight.labels(executor=self.name).set(self._in_flight)
+
+    async def run(
+        self, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run ``fn`` in this executor and return its result.
+
+        Context variables are propagated like with ``asyncio.to_thread``.
+        """
+
+        sem = self._semaphore()
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            executor_rejected_total.labels(executor=self.name).inc()
+            logger.warning(
+                "Executor %s saturated: %d in flight", self.name, self._in_flight
+            )
+            raise ExecutorSaturatedError(self.name, self.queue_timeout) from None
+
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        submitted = time.perf_counter()
+
+        def work() -> T:
+            executor_queue_wait_seconds.labels(executor=self.name).observe(
+                time.perf_counter() - submitted
+            )
+            return call()
+
+        def release(_: Future[T]) -> None:
+            # The slot is freed when the thread finishes, even if the caller
+            # was cancelled meanwhile, so abandoned work still counts.
+            self._track(-1)
+            try:
+                loop.call_soon_threadsafe(sem.release)
+            except RuntimeError:  # pragma: no cover - loop already closed
+                pass
+
+        self._track(1)
+        try:
+            future = self._pool.submit(work)
+        except BaseException:
+            self._track(-1)
+            sem.release()
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_executors: dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _configured_workers(name: str) -> int:
+    if name == "db":
+        # One thread per connection the pool can hand out.
+        return settings.executor_db_workers or max(
+            settings.db_pool_size + settings.db_max_overflow, 1
+        )
+    if name == "openai_sync":
+        return settings.executor_openai_workers
+    if name == "render":
+        return settings.executor_render_workers
+    if name == "image":
+        return settings.executor_image_workers
+    raise ValueError(f"Unknown executor: {name}")
+
+
+def get_executor(name: ExecutorName) -> BoundedExecutor:
+    """Return the named executor, creating it from settings on first use."""
+
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = BoundedExecutor(
+                    name,
+                    _configured_workers(name),
+                    queue_size=settings.executor_queue_size,
+                    queue_timeout=settings.executor_queue_timeout,
+                )
+                _executors[name] = executor
+    return executor
+
+
+async def run_in_executor(
+    name: ExecutorName, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+) -> T:
+    """Run blocking ``fn`` in the executor called ``name``."""
+
+    return await get_executor(name).run(fn, *args, **kwargs)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down all executors; they are recreated on next use."""
+
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+__all__ = [
+    "BoundedExecutor",
+    "ExecutorName",
+    "ExecutorSaturatedError",
+    "get_executor",
+    "run_in_executor",
+    "shutdown_executors",
+]
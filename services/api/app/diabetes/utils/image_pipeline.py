@@ -0,0 +1,119 @@
+"""Prepare food photos before they are sent to Vision.
+
+Telegram hands us the largest photo size and users send full-resolution
+images as documents, while Vision downsamples everything so the short side
+is at most 768 px anyway.  :func:`prepare_image` does that downscale
+locally, re-encodes the result as a JPEG of bounded size and computes the
+keys :mod:`services.api.app.diabetes.vision_cache` uses to recognise a photo
+that was already analysed: a 64-bit difference hash of the downscaled image
+and the sha256 of the bytes that are uploaded.
+
+The work is CPU-bound, so callers run it in the ``image`` executor.  Input
+that Pillow cannot decode is passed through unchanged and without a hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PreparedImage", "hamming", "prepare_image"]
+
+# Vision fits images into 2048x2048 and then scales the short side to 768.
+MAX_SHORT_SIDE = 768
+MAX_LONG_SIDE = 2048
+MAX_BYTES = 300_000
+JPEG_QUALITIES = (85, 75, 65, 50)
+HASH_SIZE = 8
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedImage:
+    """Image bytes ready for upload, their perceptual hash and digest."""
+
+    data: bytes
+    original_size: int
+    phash: int | None = None
+    digest: str | None = None
+    width: int | None = None
+    height: int | None = None
+
+
+def _dhash(image: Image.Image) -> int:
+    """Return the 64-bit difference hash of ``image``."""
+
+    gray = image.convert("L").resize(
+        (HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS
+    )
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """Return the number of differing bits between two hashes."""
+
+    return (a ^ b).bit_count()
+
+
+def _target_size(width: int, height: int) -> tuple[int, int]:
+    scale = min(
+        1.0,
+        MAX_SHORT_SIDE / min(width, height),
+        MAX_LONG_SIDE / max(width, height),
+    )
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def prepare_image(raw: bytes) -> PreparedImage:
+    """Downscale ``raw`` to the Vision resolution and hash it.
+
+    The JPEG quality is lowered step by step until the encoded image fits
+    into ``MAX_BYTES``; the smallest encoding is used if none does.  A JPEG
+    that needs no downscale is kept as is when re-encoding would not shrink it.
+    """
+
+    try:
+        with Image.open(io.BytesIO(raw)) as opened:
+            source_format = opened.format
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.debug("[IMAGE] Passing undecodable image through: %s", exc)
+        return PreparedImage(data=raw, original_size=len(raw))
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    size = _target_size(*image.size)
+    resized = size != image.size
+    if resized:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    phash = _dhash(image)
+
+    data = b""
+    for quality in JPEG_QUALITIES:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        data = buffer.getvalue()
+        if len(data) <= MAX_BYTES:
+            break
+    if source_format == "JPEG" and not resized and len(raw) <= len(data):
+        data = raw
+    return PreparedImage(
+        data=data,
+        original_size=len(raw),
+        phash=phash,
+        digest=hashlib.sha256(data).hexdigest(),
+        width=image.width,
+        height=image.height,
+    )
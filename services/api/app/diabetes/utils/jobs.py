@@ -31,6 +31,8 @@ except ModuleNotFoundError:  # pragma: no cover - fallback for older APScheduler
 
 from telegram.ext import ContextTypes, Job, JobQueue
 
+from .reminder_wheel import get_wheel
+
 APS_RUNTIME_ERRORS = (RuntimeError, APSchedulerError, JobLookupError)
 # Some job stores surface raw LookupError (e.g. KeyError) when a job is already gone.
 # Treat those as expected cleanup races to avoid crashing the scheduler.
@@ -345,7 +347,8 @@ def _remove_jobs(job_queue: DefaultJobQueue, base_name: str) -> int:
 
     Hard removal is required as APScheduler may keep stale jobs even when
     the job queue loses track of them. Leftover jobs could fire after
-    restart, so we aggressively remove them. Returns the number of jobs
+    restart, so we aggressively remove them. Entries of the bucketed
+    reminder wheel are dropped as well. Returns the number of jobs
     removed.
     """
     names = {base_name, f"{base_name}_after", f"{base_name}_snooze"}
@@ -441,6 +444,8 @@ def _remove_jobs(job_queue: DefaultJobQueue, base_name: str) -> int:
                 if _safe_remove(any_job):
                     removed += 1
 
+    removed += get_wheel().discard(names)
+
     logger.debug("Removed %d jobs for base '%s'", removed, base_name)
     return removed
 
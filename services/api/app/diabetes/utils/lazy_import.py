@@ -0,0 +1,68 @@
+"""Deferred imports for heavy optional dependencies.
+
+Handler modules are imported when the bot starts, but libraries such as
+``matplotlib``, ``reportlab`` or ``pypdf`` are only needed by a few rarely
+used commands. :class:`LazyAttrs` binds module attributes to their source
+modules and imports them on first access, so the cost is paid by the first
+report or lab upload instead of by every worker at startup.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Mapping, MutableMapping
+from typing import Any
+
+
+class LazyAttrs:
+    """Resolve module-level names from other modules on first use.
+
+    ``attrs`` maps a local name to ``(module, attribute)``; ``attribute`` set
+    to ``None`` binds the module itself. Resolved values are stored in
+    ``namespace`` (the owning module's ``globals()``), so later lookups and
+    ``monkeypatch.setattr`` behave exactly as for an eager import.
+    """
+
+    def __init__(
+        self,
+        namespace: MutableMapping[str, object],
+        attrs: Mapping[str, tuple[str, str | None]],
+    ) -> None:
+        self._namespace = namespace
+        self._attrs = dict(attrs)
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str) -> Any:
+        """Return ``name`` from the owning module, importing it if needed."""
+
+        try:
+            return self._namespace[name]
+        except KeyError:
+            pass
+        try:
+            module_name, attr = self._attrs[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        with self._lock:
+            if name not in self._namespace:
+                module = importlib.import_module(module_name)
+                value = module if attr is None else getattr(module, attr)
+                self._namespace[name] = value
+        return self._namespace[name]
+
+    def module_getattr(self, name: str) -> Any:
+        """Module ``__getattr__`` hook (PEP 562) for the lazy names."""
+
+        if name not in self._attrs:
+            module = self._namespace.get("__name__", "module")
+            raise AttributeError(f"module {module!r} has no attribute {name!r}")
+        return self(name)
+
+    def names(self) -> tuple[str, ...]:
+        """Return the names handled lazily."""
+
+        return tuple(self._attrs)
+
+
+__all__ = ["LazyAttrs"]
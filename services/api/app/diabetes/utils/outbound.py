@@ -0,0 +1,367 @@
+"""Rate-limited outbound dispatcher for bot messages.
+
+Telegram rejects bots that exceed roughly 30 messages per second overall or
+about one message per second to the same chat with ``RetryAfter``. Every
+proactive send (reminders, SOS alerts, billing notices, broadcasts) goes
+through :class:`MessageDispatcher`, which enforces:
+
+* a global token bucket shared by all chats;
+* a token bucket per chat;
+* priority lanes: when the global bucket is empty, waiting SOS alerts are
+  served before reminders, reminders before notices and notices before
+  marketing;
+* ``RetryAfter`` handling: the global bucket is paused for the requested time
+  and the message is retried.
+
+Callers await their own send, so no background worker has to be managed.
+The time a message waits for its turn is exported as
+``outbound_queue_lag_seconds``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from asyncio import AbstractEventLoop
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import IntEnum
+from typing import Any, cast
+from weakref import WeakKeyDictionary
+
+from telegram import Bot, Message
+from telegram.error import RetryAfter
+
+from services.api.app.config import settings
+from services.api.app.diabetes.metrics import (
+    outbound_queue_depth,
+    outbound_queue_lag_seconds,
+    outbound_retry_after_total,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bound on concurrently awaited sends inside one ``send_many`` call so a
+# 100k broadcast does not create 100k coroutines at once.
+SEND_MANY_WINDOW = 256
+# Per-chat buckets are pruned once this many chats are tracked.
+MAX_TRACKED_CHATS = 10_000
+
+
+class Priority(IntEnum):
+    """Outbound lanes; lower values are served first."""
+
+    SOS = 0
+    REMINDER = 1
+    NOTICE = 2
+    MARKETING = 3
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        return now
+
+    def delay(self) -> float:
+        """Return seconds until one token can be taken."""
+
+        now = self._refill()
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        return max(wait, self._paused_until - now)
+
+    def take(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+    def reserve(self) -> float:
+        """Take a token now, possibly on credit; return seconds to wait."""
+
+        wait = self.delay()
+        self._tokens -= 1
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Refuse tokens for ``seconds`` (e.g. after ``RetryAfter``)."""
+
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity and self._paused_until <= self._clock()
+
+
+class _PriorityGate:
+    """Hands out tokens of a bucket to waiters in priority order."""
+
+    def __init__(self, bucket: TokenBucket, loop: AbstractEventLoop) -> None:
+        self._bucket = bucket
+        self._loop = loop
+        self._heap: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: Priority) -> None:
+        if not self._heap and self._bucket.delay() == 0:
+            self._bucket.take()
+            return
+        waiter: asyncio.Future[None] = self._loop.create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+        label = priority.name.lower()
+        outbound_queue_depth.labels(label).inc()
+        try:
+            self._wake()
+            await waiter
+        finally:
+            outbound_queue_depth.labels(label).dec()
+
+    def _wake(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._heap:
+            waiter = self._heap[0][2]
+            if waiter.done():
+                heapq.heappop(self._heap)
+                continue
+            wait = self._bucket.delay()
+            if wait > 0:
+                self._timer = self._loop.call_later(wait, self._wake)
+                return
+            heapq.heappop(self._heap)
+            self._bucket.take()
+            waiter.set_result(None)
+
+
+@dataclass(slots=True)
+class OutboundMessage:
+    """A message for :meth:`MessageDispatcher.send_many`."""
+
+    chat_id: int | str
+    text: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+class MessageDispatcher:
+    """Send bot messages under global and per-chat rate limits."""
+
+    def __init__(
+        self,
+        *,
+        global_rate: float = 25.0,
+        global_burst: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_burst, clock=clock)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: dict[int | str, TokenBucket] = {}
+        self._gates: WeakKeyDictionary[AbstractEventLoop, _PriorityGate] = (
+            WeakKeyDictionary()
+        )
+        self.max_retries = max_retries
+
+    def _gate(self) -> _PriorityGate:
+        loop = asyncio.get_running_loop()
+        gate = self._gates.get(loop)
+        if gate is None:
+            gate = self._gates[loop] = _PriorityGate(self._global, loop)
+        return gate
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_TRACKED_CHATS:
+                self._chats = {
+                    key: value for key, value in self._chats.items() if not value.idle
+                }
+            bucket = self._chats[chat_id] = TokenBucket(
+                self._chat_rate, self._chat_burst, clock=self._clock
+            )
+        return bucket
+
+    async def send(
+        self,
+        bot: Bot,
+        chat_id: int | str,
+        text: str,
+        *,
+        priority: Priority = Priority.REMINDER,
+        **kwargs: Any,
+    ) -> Message:
+        """Send one message once both buckets allow it.
+
+        ``RetryAfter`` pauses the global bucket and the message is retried up
+        to ``max_retries`` times; any other error propagates to the caller.
+        """
+
+        label = priority.name.lower()
+        enqueued = self._clock()
+        attempt = 0
+        while True:
+            chat_wait = self._chat_bucket(chat_id).reserve()
+            if chat_wait > 0:
+                await asyncio.sleep(chat_wait)
+            await self._gate().acquire(priority)
+            if attempt == 0:
+                outbound_queue_lag_seconds.labels(label).observe(
+                    self._clock() - enqueued
+                )
+            try:
+                return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            except RetryAfter as exc:
+                # An int on the pinned PTB 21; later releases may return a
+                # timedelta, so the value is narrowed at runtime.
+                retry_after: object = exc.retry_after
+                delay = (
+                    retry_after.total_seconds()
+                    if isinstance(retry_after, timedelta)
+                    else float(cast(float, retry_after))
+                )
+                outbound_retry_after_total.inc()
+                self._global.pause(delay)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(
+                    "RetryAfter %.1fs sending to %s, retry %d/%d",
+                    delay,
+                    chat_id,
+                    attempt,
+                    self.max_retries,
+                )
+
+    async def send_many(
+        self,
+        bot: Bot,
+        messages: Iterable[OutboundMessage],
+        *,
+        priority: Priority = Priority.NOTICE,
+    ) -> list[Message | BaseException]:
+        """Send ``messages`` concurrently; failures are returned, not raised."""
+
+        results: list[Message | BaseException] = []
+        window: list[OutboundMessage] = []
+
+        async def flush() -> None:
+            sent = await asyncio.gather(
+                *(
+                    self.send(bot, m.chat_id, m.text, priority=priority, **m.kwargs)
+                    for m in window
+                ),
+                return_exceptions=True,
+            )
+            for item in sent:
+                if isinstance(item, asyncio.CancelledError):
+                    raise item
+                results.append(item)
+            window.clear()
+
+        for message in messages:
+            window.append(message)
+            if len(window) >= SEND_MANY_WINDOW:
+                await flush()
+        if window:
+            await flush()
+        return results
+
+    async def broadcast(
+        self,
+        bot: Bot,
+        chat_ids: Sequence[int | str],
+        text: str,
+        *,
+        priority: Priority = Priority.MARKETING,
+        **kwargs: Any,
+    ) -> list[Message | BaseException]:
+        """Send the same text to every chat in ``chat_ids`` once."""
+
+        return await self.send_many(
+            bot,
+            (
+                OutboundMessage(chat_id, text, dict(kwargs))
+                for chat_id in dict.fromkeys(chat_ids)
+            ),
+            priority=priority,
+        )
+
+
+_dispatcher: MessageDispatcher | None = None
+
+
+def get_dispatcher() -> MessageDispatcher:
+    """Return the process-wide dispatcher configured from settings."""
+
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = MessageDispatcher(
+            global_rate=settings.outbound_global_rate,
+            global_burst=settings.outbound_global_burst,
+            chat_rate=settings.outbound_chat_rate,
+            chat_burst=settings.outbound_chat_burst,
+            max_retries=settings.outbound_max_retries,
+        )
+    return _dispatcher
+
+
+def reset_dispatcher() -> None:
+    """Drop the process-wide dispatcher (tests, settings reload)."""
+
+    global _dispatcher
+    _dispatcher = None
+
+
+async def send_message(
+    bot: Bot,
+    chat_id: int | str,
+    text: str,
+    *,
+    priority: Priority = Priority.REMINDER,
+    **kwargs: Any,
+) -> Message:
+    """Send one message through the process-wide dispatcher."""
+
+    return await get_dispatcher().send(
+        bot, chat_id, text, priority=priority, **kwargs
+    )
+
+
+__all__ = [
+    "MessageDispatcher",
+    "OutboundMessage",
+    "Priority",
+    "TokenBucket",
+    "get_dispatcher",
+    "reset_dispatcher",
+    "send_message",
+]
@@ -0,0 +1,157 @@
+"""In-memory timing wheel for daily ``at_time`` reminders.
+
+With bucketed firing enabled, daily reminders are not registered as separate
+APScheduler jobs. They are kept in :class:`ReminderWheel`, a heap ordered by
+the next fire time. A single job ticks once per minute and pops every
+reminder due in that bucket. Thousands of reminders at 08:00 then cost one
+scheduler job instead of thousands.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone, tzinfo
+
+
+@dataclass(slots=True)
+class WheelEntry:
+    """A daily reminder kept in the wheel."""
+
+    name: str
+    data: dict[str, object]
+    at: time
+    tz: tzinfo
+    days: tuple[int, ...] = tuple(range(7))
+    fire_at: datetime = field(default=datetime.min.replace(tzinfo=timezone.utc))
+
+
+def next_fire(
+    at: time, tz: tzinfo, days: Iterable[int], after: datetime
+) -> datetime | None:
+    """Return the first local ``at`` on one of ``days`` strictly after ``after``.
+
+    ``days`` use ``datetime.weekday()`` numbering (0 is Monday), as
+    ``JobQueue.run_daily`` does. The result is in UTC.
+    """
+
+    allowed = set(days)
+    if not allowed:
+        return None
+    local = after.astimezone(tz)
+    for offset in range(8):
+        day = local.date() + timedelta(days=offset)
+        if day.weekday() not in allowed:
+            continue
+        candidate = datetime.combine(day, at.replace(tzinfo=None), tzinfo=tz)
+        if candidate > after:
+            return candidate.astimezone(timezone.utc)
+    return None
+
+
+class ReminderWheel:
+    """Heap of daily reminders keyed by job name.
+
+    Removal is lazy: stale heap items are skipped when popped, so ``add`` and
+    ``discard`` are O(log n) and O(1).
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, WheelEntry]] = {}
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def _push(self, entry: WheelEntry, after: datetime) -> bool:
+        fire_at = next_fire(entry.at, entry.tz, entry.days, after)
+        if fire_at is None:
+            self._entries.pop(entry.name, None)
+            return False
+        entry.fire_at = fire_at
+        seq = next(self._seq)
+        self._entries[entry.name] = (seq, entry)
+        heapq.heappush(self._heap, (fire_at, seq, entry.name))
+        return True
+
+    def add(self, entry: WheelEntry, *, now: datetime | None = None) -> datetime | None:
+        """Add or replace ``entry``; return its next fire time in UTC.
+
+        Re-adding an entry with the same schedule keeps its pending fire time:
+        a refresh that lands after the minute boundary but before the tick
+        must not push that day's reminder to the next day.
+        """
+
+        with self._lock:
+            current = self._entries.get(entry.name)
+            if current is not None:
+                seq, old = current
+                if (old.at, old.tz, old.days) == (entry.at, entry.tz, entry.days):
+                    entry.fire_at = old.fire_at
+                    self._entries[entry.name] = (seq, entry)
+                    return entry.fire_at
+            if self._push(entry, now or datetime.now(timezone.utc)):
+                return entry.fire_at
+            return None
+
+    def discard(self, names: Iterable[str]) -> int:
+        """Drop entries by name; return how many were present."""
+
+        removed = 0
+        with self._lock:
+            for name in names:
+                if self._entries.pop(name, None) is not None:
+                    removed += 1
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                live = {seq for seq, _ in self._entries.values()}
+                self._heap = [item for item in self._heap if item[1] in live]
+                heapq.heapify(self._heap)
+        return removed
+
+    def pop_due(self, now: datetime) -> list[WheelEntry]:
+        """Return entries due at or before ``now`` and re-arm them."""
+
+        due: list[WheelEntry] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, name = heapq.heappop(self._heap)
+                current = self._entries.get(name)
+                if current is None or current[0] != seq:
+                    continue
+                entry = current[1]
+                due.append(entry)
+                self._push(entry, max(now, entry.fire_at))
+        return due
+
+    def next_fire_at(self, name: str) -> datetime | None:
+        current = self._entries.get(name)
+        return current[1].fire_at if current is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+
+
+_wheel = ReminderWheel()
+
+
+def get_wheel() -> ReminderWheel:
+    """Return the process-wide reminder wheel."""
+
+    return _wheel
+
+
+__all__ = ["ReminderWheel", "WheelEntry", "get_wheel", "next_fire"]
@@ -0,0 +1,42 @@
+"""Approximate token counting for prompt budgets.
+
+``tiktoken`` is used when it is installed.  Otherwise tokens are estimated
+from the UTF-8 length: about four bytes per token for English and slightly
+more for Cyrillic, so the estimate errs on the large side for Russian text.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+from typing import Callable, cast
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+__all__ = ["count_tokens"]
+
+BYTES_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder() -> Callable[[str], list[int]] | None:
+    if tiktoken is None:
+        return None
+    try:
+        return cast(Callable[[str], list[int]], tiktoken.get_encoding("o200k_base").encode)
+    except (KeyError, ValueError, OSError):  # pragma: no cover - missing encoding data
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens of ``text``."""
+
+    if not text:
+        return 0
+    encode = _encoder()
+    if encode is not None:
+        return len(encode(text))
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
@@ -0,0 +1,87 @@
+"""In-process cache of Vision answers for photos that were already analysed.
+
+Users often resend the same photo after a timeout or forward one picture to
+the bot several times.  Answers are remembered per user by perceptual hash,
+where a photo whose hash differs from a cached one in at most
+``NEAR_DISTANCE`` bits (a re-crop or a recompressed forward) is treated as
+the same dish.  Across users only byte-identical images match: the global
+tier is keyed by the sha256 of the prepared image, because similar-looking
+but different plates must never get another user's carb estimate.
+
+``VISION_CACHE_SIZE`` bounds the global tier and ``0`` disables the cache.
+Hashes and digests come from :func:`services.api.app.diabetes.utils.image_pipeline.prepare_image`.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+
+from services.api.app.config import settings
+
+from .metrics import vision_cache_hit_total, vision_cache_miss_total
+from .utils.image_pipeline import hamming
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["lookup", "reset_cache", "store"]
+
+PER_USER_LIMIT = 32
+NEAR_DISTANCE = 4
+USER_LIMIT = 10_000
+
+_global: OrderedDict[str, str] = OrderedDict()
+_per_user: OrderedDict[int, OrderedDict[int, str]] = OrderedDict()
+
+
+def lookup(user_id: int, phash: int, digest: str) -> str | None:
+    """Return a cached Vision answer for the image or ``None``."""
+
+    if settings.vision_cache_size <= 0:
+        return None
+    entries = _per_user.get(user_id)
+    if entries is not None:
+        _per_user.move_to_end(user_id)
+        best: tuple[int, int] | None = None
+        for cached_hash in entries:
+            distance = hamming(cached_hash, phash)
+            if distance <= NEAR_DISTANCE and (best is None or distance < best[0]):
+                best = (distance, cached_hash)
+        if best is not None:
+            entries.move_to_end(best[1])
+            vision_cache_hit_total.labels(scope="user").inc()
+            return entries[best[1]]
+    text = _global.get(digest)
+    if text is not None:
+        _global.move_to_end(digest)
+        vision_cache_hit_total.labels(scope="global").inc()
+        return text
+    vision_cache_miss_total.inc()
+    return None
+
+
+def store(user_id: int, phash: int, digest: str, text: str) -> None:
+    """Remember the Vision answer ``text`` for the image."""
+
+    limit = settings.vision_cache_size
+    if limit <= 0 or not text:
+        return
+    entries = _per_user.setdefault(user_id, OrderedDict())
+    _per_user.move_to_end(user_id)
+    entries[phash] = text
+    entries.move_to_end(phash)
+    while len(entries) > PER_USER_LIMIT:
+        entries.popitem(last=False)
+    while len(_per_user) > USER_LIMIT:
+        _per_user.popitem(last=False)
+    _global[digest] = text
+    _global.move_to_end(digest)
+    while len(_global) > limit:
+        _global.popitem(last=False)
+
+
+def reset_cache() -> None:
+    """Forget all cached answers (used by tests)."""
+
+    _global.clear()
+    _per_user.clear()
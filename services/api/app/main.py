@@ -30,12 +30,14 @@ from .diabetes.handlers.reminder_jobs import DefaultJobQueue
 from .diabetes.models_learning import Lesson
 from .diabetes.services.db import init_db, run_db
 from services.api.app.diabetes.services.gpt_client import dispose_openai_clients
+from services.api.app.diabetes.utils.executors import shutdown_executors
 from services.api.app.diabetes.utils.helpers import dispose_geo_client
 from services.api.app.diabetes.utils.openai_utils import dispose_http_client
 from .telegram_auth import require_tg_user  # noqa: F401
 from .legacy import router as legacy_router
 from .routers import metrics
 from .routers.billing import router as billing_router
+from .routers.export import router as export_router
 from .routers.health import router as health_router
 from .routers.history import router as history_router
 from .routers.learning_profile import router as learning_profile_router
@@ -87,6 +89,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         await dispose_http_client()
         await dispose_openai_clients()
         await stop_flush_task()
+        shutdown_executors()
 
 
 app = FastAPI(title="Diabetes Assistant API", version="1.0.0", lifespan=lifespan)
@@ -123,6 +126,7 @@ api_router.include_router(timezones_router)
 api_router.include_router(health_router)
 api_router.include_router(users_router)
 api_router.include_router(history_router)
+api_router.include_router(export_router)
 api_router.include_router(onboarding_router)
 
 # ────────── include router ──────────
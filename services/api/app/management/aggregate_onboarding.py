@@ -1,8 +1,14 @@
 """Aggregate onboarding events into daily metrics.
 
-This script can be scheduled via cron. Example (run nightly for previous day):
+Counters are normally kept current by :func:`aggregate_incremental`, which the
+bot runs every ``ONBOARDING_METRICS_INTERVAL_SEC`` seconds: it folds events
+past a persisted watermark into ``onboarding_metrics_daily`` with upserts.
+Single days or ranges can still be recomputed from scratch via cron or by
+hand (backfill):
 
     5 0 * * * python -m services.api.app.management.aggregate_onboarding --date "$(date -I -d 'yesterday')"
+    python -m services.api.app.management.aggregate_onboarding --from 2024-01-01 --to 2024-01-31
+    python -m services.api.app.management.aggregate_onboarding --incremental
 """
 
 from __future__ import annotations
@@ -11,10 +17,12 @@ import argparse
 import json
 import logging
 import sys
-from datetime import date, datetime, timedelta
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
 from typing import Iterable, Sequence, cast
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -24,32 +32,130 @@ from services.api.app.diabetes.services.repository import commit
 from services.api.app.models.onboarding_metrics import (
     OnboardingMetricEvent,
     OnboardingMetricDaily,
+    OnboardingMetricWatermark,
 )
 
 logger = logging.getLogger(__name__)
 
+WATERMARK_NAME = "onboarding_metrics_daily"
+INCREMENTAL_BATCH_SIZE = 5000
+# Events younger than this are left for the next run: ids are assigned
+# before commit, so a slow transaction may still insert a lower id.
+SETTLE_DELAY = timedelta(seconds=30)
 
-def _aggregate(session: Session, start: datetime, end: datetime) -> Sequence[tuple[str, str, int]]:
+CounterKey = tuple[date, str, str]
+
+
+def _aggregate(
+    session: Session, start: datetime, end: datetime, max_id: int | None = None
+) -> Sequence[tuple[str, str, int]]:
     """Return counts of onboarding events grouped by variant and step."""
 
+    stmt = sa.select(
+        OnboardingMetricEvent.variant,
+        OnboardingMetricEvent.step,
+        func.count(),
+    ).where(
+        OnboardingMetricEvent.created_at >= start,
+        OnboardingMetricEvent.created_at < end,
+    )
+    if max_id is not None:
+        stmt = stmt.where(OnboardingMetricEvent.id <= max_id)
     rows = cast(
         list[tuple[str, str, int]],
         session.execute(
-            sa.select(
-                OnboardingMetricEvent.variant,
-                OnboardingMetricEvent.step,
-                func.count(),
-            )
-            .where(
-                OnboardingMetricEvent.created_at >= start,
-                OnboardingMetricEvent.created_at < end,
-            )
-            .group_by(OnboardingMetricEvent.variant, OnboardingMetricEvent.step)
+            stmt.group_by(OnboardingMetricEvent.variant, OnboardingMetricEvent.step)
         ).all(),
     )
     return rows
 
 
+def _watermark(session: Session) -> OnboardingMetricWatermark | None:
+    """Return the watermark row locked for the rest of the transaction."""
+
+    return session.scalars(
+        sa.select(OnboardingMetricWatermark)
+        .where(OnboardingMetricWatermark.name == WATERMARK_NAME)
+        .with_for_update()
+    ).first()
+
+
+def _event_date(created_at: datetime) -> date:
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def _create_watermark(session: Session) -> bool:
+    """Insert the watermark row; return ``False`` if another run already did."""
+
+    table = cast(sa.Table, OnboardingMetricWatermark.__table__)
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        result = cast(
+            sa.CursorResult[object],
+            session.execute(
+                insert(table)
+                .values(name=WATERMARK_NAME, last_event_id=0)
+                .on_conflict_do_nothing(index_elements=[table.c.name])
+            ),
+        )
+        return result.rowcount == 1
+    session.add(OnboardingMetricWatermark(name=WATERMARK_NAME, last_event_id=0))
+    session.flush()
+    return True
+
+
+def _clear_rebuilt_days(session: Session) -> None:
+    """Delete daily rows the first incremental run is about to rebuild.
+
+    Every stored event is folded again, so only days from the oldest stored
+    event on are cleared; older rows may outlive their raw events.
+    """
+
+    oldest = session.scalar(sa.select(func.min(OnboardingMetricEvent.created_at)))
+    if oldest is None:
+        return
+    session.execute(
+        sa.delete(OnboardingMetricDaily).where(
+            OnboardingMetricDaily.date >= _event_date(oldest)
+        )
+    )
+
+
+def _upsert_counts(session: Session, counts: Counter[CounterKey]) -> None:
+    """Add ``counts`` to the daily counters, creating missing rows."""
+
+    if not counts:
+        return
+    rows = [
+        {"date": day, "variant": variant, "step": step, "count": count}
+        for (day, variant, step), count in counts.items()
+    ]
+    table = cast(sa.Table, OnboardingMetricDaily.__table__)
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.date, table.c.variant, table.c.step],
+                set_={"count": table.c.count + stmt.excluded.count},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        daily = session.get(
+            OnboardingMetricDaily, (row["date"], row["variant"], row["step"])
+        )
+        if daily is None:
+            session.add(OnboardingMetricDaily(**row))
+        else:
+            daily.count += cast(int, row["count"])
+
+
 def aggregate_for_date(
     target_date: date, *, sessionmaker: SessionMaker[Session] = SessionLocal
 ) -> list[dict[str, object]]:
@@ -68,7 +174,12 @@ def aggregate_for_date(
     end = start + timedelta(days=1)
 
     with sessionmaker() as session:
-        rows = _aggregate(session, start, end)
+        # Once the incremental aggregator runs, events past its watermark are
+        # left to it; counting them here as well would add them twice.
+        mark = _watermark(session)
+        rows = _aggregate(
+            session, start, end, mark.last_event_id if mark is not None else None
+        )
 
         session.execute(sa.delete(OnboardingMetricDaily).where(OnboardingMetricDaily.date == target_date))
         for variant, step, count in rows:
@@ -78,6 +189,78 @@ def aggregate_for_date(
     return [{"variant": variant, "step": step, "count": count} for variant, step, count in rows]
 
 
+def backfill(
+    date_from: date,
+    date_to: date,
+    *,
+    sessionmaker: SessionMaker[Session] = SessionLocal,
+) -> dict[str, list[dict[str, object]]]:
+    """Recompute daily metrics for every date in ``[date_from, date_to]``."""
+
+    result: dict[str, list[dict[str, object]]] = {}
+    day = date_from
+    while day <= date_to:
+        result[day.isoformat()] = aggregate_for_date(day, sessionmaker=sessionmaker)
+        day += timedelta(days=1)
+    return result
+
+
+def aggregate_incremental(
+    *,
+    sessionmaker: SessionMaker[Session] = SessionLocal,
+    batch_size: int = INCREMENTAL_BATCH_SIZE,
+    settle: timedelta = SETTLE_DELAY,
+    now: datetime | None = None,
+) -> int:
+    """Fold events past the watermark into the daily counters.
+
+    Each batch of at most ``batch_size`` events is upserted and the watermark
+    advanced in the same transaction. The first run rebuilds the days covered
+    by stored events, so rows written by earlier full-day runs are not
+    counted twice. Returns the number of folded events.
+    """
+
+    cutoff = (now or datetime.now(timezone.utc)) - settle
+    total = 0
+    while True:
+        with sessionmaker() as session:
+            mark = _watermark(session)
+            if mark is None:
+                if _create_watermark(session):
+                    _clear_rebuilt_days(session)
+                mark = _watermark(session)
+                assert mark is not None
+            events = session.execute(
+                sa.select(
+                    OnboardingMetricEvent.id,
+                    OnboardingMetricEvent.variant,
+                    OnboardingMetricEvent.step,
+                    OnboardingMetricEvent.created_at,
+                )
+                .where(OnboardingMetricEvent.id > mark.last_event_id)
+                .order_by(OnboardingMetricEvent.id)
+                .limit(batch_size)
+            ).all()
+            counts: Counter[CounterKey] = Counter()
+            last_id = mark.last_event_id
+            settled = True
+            for event_id, variant, step, created_at in events:
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                if created_at >= cutoff:
+                    settled = False
+                    break
+                counts[(_event_date(created_at), variant, step)] += 1
+                last_id = event_id
+            _upsert_counts(session, counts)
+            mark.last_event_id = last_id
+            commit(session)
+        folded = sum(counts.values())
+        total += folded
+        if not settled or len(events) < batch_size or folded == 0:
+            return total
+
+
 def main(argv: Iterable[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Aggregate onboarding events into daily metrics")
     parser.add_argument(
@@ -86,6 +269,23 @@ def main(argv: Iterable[str] | None = None) -> int:
         default=date.today(),
         help="Target date in YYYY-MM-DD (defaults to today)",
     )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=date.fromisoformat,
+        help="Backfill from this date (YYYY-MM-DD) instead of a single --date",
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=date.fromisoformat,
+        help="Last date of the backfill range (defaults to --from)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fold events past the watermark instead of recomputing whole days",
+    )
     parser.add_argument(
         "--stdout",
         action="store_true",
@@ -93,22 +293,38 @@ def main(argv: Iterable[str] | None = None) -> int:
     )
     args = parser.parse_args(list(argv) if argv is not None else None)
 
+    metrics: object
+    if args.incremental:
+        target = "new events"
+    elif args.date_from is not None:
+        date_to = args.date_to or args.date_from
+        if date_to < args.date_from:
+            parser.error("--to must not be before --from")
+        target = f"{args.date_from}..{date_to}"
+    else:
+        target = str(args.date)
+
     try:
-        metrics = aggregate_for_date(args.date)
+        if args.incremental:
+            metrics = {"events": aggregate_incremental()}
+        elif args.date_from is not None:
+            metrics = backfill(args.date_from, date_to)
+        else:
+            metrics = aggregate_for_date(args.date)
     except SQLAlchemyError:
         logger.exception(
-            "Database error while aggregating onboarding metrics for %s", args.date
+            "Database error while aggregating onboarding metrics for %s", target
         )
         return 1
     except (TypeError, ValueError):
         logger.exception(
             "Invalid data encountered while aggregating onboarding metrics for %s",
-            args.date,
+            target,
         )
         return 1
     except Exception:  # pragma: no cover - defensive programming
         logger.exception(
-            "Unexpected error while aggregating onboarding metrics for %s", args.date
+            "Unexpected error while aggregating onboarding metrics for %s", target
         )
         return 1
 
@@ -116,7 +332,7 @@ def main(argv: Iterable[str] | None = None) -> int:
     if args.stdout:
         sys.stdout.write(f"{metrics_json}\n")
     else:
-        logger.info("Aggregated metrics for %s: %s", args.date, metrics_json)
+        logger.info("Aggregated metrics for %s: %s", target, metrics_json)
     return 0
 
 
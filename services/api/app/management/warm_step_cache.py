@@ -0,0 +1,157 @@
+"""Pre-generate shared learning step texts for the common profile buckets.
+
+The most frequent learning profiles are read from ``learning_user_profile``
+and the first steps of a topic are generated once per profile bucket into
+``learning_step_cache`` (see :mod:`services.api.app.diabetes.step_cache`).
+Run it offline after changing prompts or adding a topic:
+
+    python -m services.api.app.management.warm_step_cache --topic xe_basics
+    python -m services.api.app.management.warm_step_cache --topic xe_basics --steps 2 --refresh
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import Iterable, Mapping
+
+import sqlalchemy as sa
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from services.api.app.diabetes import step_cache
+from services.api.app.diabetes.dynamic_tutor import BUSY_MESSAGE, generate_step_text
+from services.api.app.diabetes.models_learning import LearningUserProfile
+from services.api.app.diabetes.services.db import SessionLocal, SessionMaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = 20
+DEFAULT_STEPS = 1
+
+
+def common_profiles(
+    limit: int = DEFAULT_BUCKETS,
+    *,
+    sessionmaker: SessionMaker[Session] = SessionLocal,
+) -> list[dict[str, str | None]]:
+    """Return the ``limit`` most frequent learning profiles.
+
+    The empty profile of users who skipped onboarding always comes first.
+    """
+
+    with sessionmaker() as session:
+        rows = session.execute(
+            sa.select(
+                LearningUserProfile.age_group,
+                LearningUserProfile.learning_level,
+                LearningUserProfile.diabetes_type,
+            )
+            .group_by(
+                LearningUserProfile.age_group,
+                LearningUserProfile.learning_level,
+                LearningUserProfile.diabetes_type,
+            )
+            .order_by(func.count().desc())
+            .limit(limit)
+        ).all()
+    profiles: list[dict[str, str | None]] = [{}]
+    for age_group, learning_level, diabetes_type in rows:
+        profile: dict[str, str | None] = {}
+        if age_group is not None:
+            profile["age_group"] = age_group
+        if learning_level is not None:
+            profile["learning_level"] = learning_level
+        if diabetes_type is not None:
+            profile["diabetes_type"] = diabetes_type
+        profiles.append(profile)
+    return profiles
+
+
+async def warm_topic(
+    topic_slug: str,
+    profiles: Iterable[Mapping[str, str | None]],
+    *,
+    steps: int = DEFAULT_STEPS,
+    refresh: bool = False,
+) -> dict[str, int]:
+    """Generate steps ``1..steps`` of ``topic_slug`` for every profile bucket.
+
+    Steps are generated without a previous summary, as they are at the start
+    of a lesson. Buckets already cached are skipped unless ``refresh`` drops
+    the stored texts of the topic first.
+    """
+
+    if refresh:
+        await step_cache.clear_topic(topic_slug)
+    stats = {"generated": 0, "cached": 0, "failed": 0}
+    seen: set[str] = set()
+    for profile in profiles:
+        for step_idx in range(1, steps + 1):
+            key = step_cache.step_key(profile, topic_slug, step_idx, None)
+            if key in seen:
+                continue
+            seen.add(key)
+            if await step_cache.get(key) is not None:
+                stats["cached"] += 1
+                continue
+            text = await generate_step_text(
+                profile, topic_slug, step_idx, None, shared_cache=True
+            )
+            if text == BUSY_MESSAGE or not text:
+                stats["failed"] += 1
+            else:
+                stats["generated"] += 1
+    return stats
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Pre-generate shared learning step texts for common profiles"
+    )
+    parser.add_argument("--topic", required=True, help="Topic slug to warm up")
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        default=DEFAULT_BUCKETS,
+        help="Number of most frequent learning profiles to cover",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=DEFAULT_STEPS,
+        help="Generate steps 1..N of the topic",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Drop cached texts of the topic and generate them again",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    if args.buckets < 0 or args.steps < 1:
+        parser.error("--buckets must be >= 0 and --steps >= 1")
+
+    try:
+        profiles = common_profiles(args.buckets)
+        stats = asyncio.run(
+            warm_topic(args.topic, profiles, steps=args.steps, refresh=args.refresh)
+        )
+    except SQLAlchemyError:
+        logger.exception("Database error while warming step cache for %s", args.topic)
+        return 1
+
+    logger.info(
+        "Warmed step cache for %s: %d generated, %d cached, %d failed",
+        args.topic,
+        stats["generated"],
+        stats["cached"],
+        stats["failed"],
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -50,4 +50,23 @@ class OnboardingMetricDaily(Base):
     )
 
 
-__all__ = ["OnboardingMetricEvent", "OnboardingMetricDaily"]
+class OnboardingMetricWatermark(Base):
+    """Last ``OnboardingMetricEvent.id`` folded into the daily counters."""
+
+    __tablename__ = "onboarding_metrics_watermark"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+__all__ = [
+    "OnboardingMetricEvent",
+    "OnboardingMetricDaily",
+    "OnboardingMetricWatermark",
+]
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import re
 from datetime import timedelta
@@ -12,7 +11,9 @@ from telegram.ext import ContextTypes
 
 from .diabetes.services.db import Reminder, User
 from .diabetes.handlers.reminder_jobs import DefaultJobQueue, schedule_reminder
+from services.api.app.diabetes.utils.executors import run_in_executor
 from services.api.app.diabetes.utils.jobs import _remove_jobs, dbg_jobs_dump
+from services.api.app.diabetes.utils.reminder_wheel import get_wheel
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +46,7 @@ async def _reminders_gc(_context: ContextTypes.DEFAULT_TYPE) -> None:
             )
 
     try:
-        reminders = await asyncio.to_thread(load_active)
+        reminders = await run_in_executor("db", load_active)
     except SQLAlchemyError as exc:
         logger.exception("Failed to load active reminders", exc_info=exc)
         return
@@ -57,8 +58,9 @@ async def _reminders_gc(_context: ContextTypes.DEFAULT_TYPE) -> None:
         except Exception:  # pragma: no cover - defensive programming
             logger.exception("Failed to schedule reminder %s", rem.id)
 
-    for job_id, name in dbg_jobs_dump(jq):
-        nm = name or job_id
+    names = [name or job_id for job_id, name in dbg_jobs_dump(jq)]
+    names.extend(get_wheel().names())
+    for nm in names:
         if not nm:
             continue
         match = re.match(r"^reminder_(\d+)", nm)
@@ -111,7 +113,7 @@ async def notify_reminder_saved(reminder_id: int) -> None:
             user = session.get(User, rem.telegram_id) if rem is not None else None
             return rem, user
 
-    rem, user = await asyncio.to_thread(load_objects)
+    rem, user = await run_in_executor("db", load_objects)
     if rem is None:
         logger.warning("Reminder %s not found for scheduling", reminder_id)
         return
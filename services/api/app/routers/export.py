@@ -0,0 +1,67 @@
+"""Diary export endpoint."""
+
+from __future__ import annotations
+
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..schemas.user import UserContext
+from ..services.export import ExportFormat, ExportKind, export_stream
+from ..telegram_auth import require_tg_user
+
+router = APIRouter()
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get(
+    "/export",
+    operation_id="exportGet",
+    tags=["Export"],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Diary rows as NDJSON or CSV, optionally gzip-compressed.",
+            "content": {
+                "application/x-ndjson": {},
+                "text/csv": {},
+                "application/gzip": {},
+            },
+        }
+    },
+)
+async def export_diary(
+    fmt: ExportFormat = Query("ndjson", alias="format"),
+    kind: ExportKind = Query("all"),
+    date_from: datetime.date | None = Query(None, alias="dateFrom"),
+    date_to: datetime.date | None = Query(None, alias="dateTo"),
+    gzip: bool = Query(False),
+    user: UserContext = Depends(require_tg_user),
+) -> StreamingResponse:
+    """Stream the user's diary entries and history records."""
+
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="dateFrom must not be after dateTo")
+    stream = export_stream(
+        user["id"],
+        fmt=fmt,
+        kind=kind,
+        date_from=date_from,
+        date_to=date_to,
+        compress=gzip,
+    )
+    filename = f"diary-export.{fmt}"
+    media_type = MEDIA_TYPES[fmt]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
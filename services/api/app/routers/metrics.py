@@ -1,9 +1,15 @@
 import logging
+import os
 from datetime import date
 from typing import cast
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -16,11 +22,25 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def render_metrics() -> bytes:
+    """Serialize metrics of this process or, in multiprocess mode, of all.
+
+    When ``PROMETHEUS_MULTIPROC_DIR`` is set every process (API workers and
+    the bot) writes its samples there and they are aggregated on scrape.
+    """
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry)
+    return generate_latest()
+
+
 @router.get("/metrics")
 def get_metrics(_user: UserContext = Depends(require_tg_user)) -> Response:
     """Return Prometheus metrics."""
 
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 
 @router.get("/metrics/onboarding")
@@ -2,15 +2,19 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from ..schemas.stats import AnalyticsPoint, DayStats
+from ..schemas.stats import AnalyticsPoint, CohortPage, DayStats
 from ..schemas.user import UserContext
+from ..services.cohort import get_cohort, get_user_org
 from ..services.stats import get_day_stats
+from ..services.user_roles import get_user_role
 from ..telegram_auth import check_token
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+COHORT_ROLES = {"clinician", "org_admin", "superadmin"}
+
 
 @router.get(
     "/stats",
@@ -43,3 +47,26 @@ async def get_analytics(
         AnalyticsPoint(date="2024-01-04", sugar=6.0),
         AnalyticsPoint(date="2024-01-05", sugar=5.4),
     ]
+
+
+@router.get(
+    "/cohort",
+    response_model=CohortPage,
+    operation_id="cohortGet",
+    tags=["Cohort"],
+)
+async def get_cohort_stats(
+    org_id: int = Query(alias="orgId"),
+    days: int = Query(14, ge=1, le=365),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200, alias="pageSize"),
+    user: UserContext = Depends(check_token),
+) -> CohortPage:
+    """Return time-in-range, average sugar, alerts and last-seen per patient."""
+
+    role = await get_user_role(user["id"])
+    if role not in COHORT_ROLES:
+        raise HTTPException(status_code=403, detail="clinician role required")
+    if role != "superadmin" and await get_user_org(user["id"]) != org_id:
+        raise HTTPException(status_code=403, detail="org mismatch")
+    return await get_cohort(org_id, days=days, page=page, page_size=page_size)
@@ -1,3 +1,5 @@
+import datetime
+
 from pydantic import BaseModel
 
 
@@ -10,3 +12,23 @@ class DayStats(BaseModel):
 class AnalyticsPoint(BaseModel):
     date: str
     sugar: float
+
+
+class CohortPatient(BaseModel):
+    telegramId: int
+    firstName: str | None = None
+    readings: int
+    averageSugar: float | None = None
+    timeInRange: float | None = None
+    alerts: int
+    openAlerts: int
+    lastSeen: datetime.datetime | None = None
+
+
+class CohortPage(BaseModel):
+    orgId: int
+    days: int
+    page: int
+    pageSize: int
+    total: int
+    items: list[CohortPatient]
@@ -0,0 +1,210 @@
+"""Per-patient aggregates for an organisation's cohort.
+
+A page of the organisation's patients (members without a staff role) is
+aggregated in a single grouped statement: diary readings and alerts are
+rolled up per patient inside the requested window, the last entry over the
+whole diary, and all of it is joined back onto the page, so the clinic panel
+does not have to call ``/stats`` once per patient. Pages are cached for
+``COHORT_CACHE_TTL_SEC`` seconds.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..diabetes.services import db
+from ..diabetes.services.report_digest import TIR_HIGH, TIR_LOW
+from ..schemas.stats import CohortPage, CohortPatient
+
+CohortCacheKey = tuple[int, int, int, int]
+
+_cache: OrderedDict[CohortCacheKey, tuple[CohortPage, float]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: CohortCacheKey) -> CohortPage | None:
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None:
+            return None
+        page, ts = cached
+        if time.monotonic() - ts >= settings.cohort_cache_ttl_sec:
+            _cache.pop(key, None)
+            return None
+        _cache.move_to_end(key)
+        return page
+
+
+def _cache_put(key: CohortCacheKey, page: CohortPage) -> None:
+    max_size = settings.cohort_cache_size
+    if max_size <= 0 or settings.cohort_cache_ttl_sec <= 0:
+        return
+    with _cache_lock:
+        _cache[key] = (page, time.monotonic())
+        _cache.move_to_end(key)
+        while len(_cache) > max_size:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def query_cohort(
+    session: Session,
+    org_id: int,
+    *,
+    since: datetime.datetime,
+    page: int,
+    page_size: int,
+) -> tuple[int, list[CohortPatient]]:
+    """Return the total number of patients and one page of aggregates."""
+
+    is_patient = (
+        db.User.org_id == org_id,
+        sa.or_(db.UserRole.role.is_(None), db.UserRole.role == "patient"),
+    )
+    members = (
+        sa.select(db.User.telegram_id)
+        .outerjoin(db.UserRole, db.UserRole.user_id == db.User.telegram_id)
+        .where(*is_patient)
+    )
+    total = session.scalar(sa.select(sa.func.count()).select_from(members.subquery()))
+
+    patients = (
+        sa.select(db.User.telegram_id, db.User.first_name)
+        .outerjoin(db.UserRole, db.UserRole.user_id == db.User.telegram_id)
+        .where(*is_patient)
+        .order_by(db.User.telegram_id)
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+        .cte("patients")
+    )
+    page_ids = sa.select(patients.c.telegram_id)
+
+    sugar = db.Entry.sugar_before
+    readings = (
+        sa.select(
+            db.Entry.telegram_id.label("telegram_id"),
+            sa.func.count(sugar).label("readings"),
+            sa.func.avg(sugar).label("average"),
+            sa.func.sum(sa.case((sugar.between(TIR_LOW, TIR_HIGH), 1), else_=0)).label(
+                "in_range"
+            ),
+        )
+        .where(db.Entry.telegram_id.in_(page_ids), db.Entry.event_time >= since)
+        .group_by(db.Entry.telegram_id)
+        .subquery("readings")
+    )
+    last_seen = (
+        sa.select(
+            db.Entry.telegram_id.label("telegram_id"),
+            sa.func.max(db.Entry.event_time).label("last_seen"),
+        )
+        .where(db.Entry.telegram_id.in_(page_ids))
+        .group_by(db.Entry.telegram_id)
+        .subquery("last_seen")
+    )
+    alerts = (
+        sa.select(
+            db.Alert.user_id.label("telegram_id"),
+            sa.func.count(db.Alert.id).label("alerts"),
+            sa.func.sum(sa.case((db.Alert.resolved.is_(False), 1), else_=0)).label(
+                "open_alerts"
+            ),
+        )
+        .where(db.Alert.user_id.in_(page_ids), db.Alert.ts >= since)
+        .group_by(db.Alert.user_id)
+        .subquery("alerts")
+    )
+    stmt = (
+        sa.select(
+            patients.c.telegram_id,
+            patients.c.first_name,
+            readings.c.readings,
+            readings.c.average,
+            readings.c.in_range,
+            last_seen.c.last_seen,
+            alerts.c.alerts,
+            alerts.c.open_alerts,
+        )
+        .outerjoin(readings, readings.c.telegram_id == patients.c.telegram_id)
+        .outerjoin(alerts, alerts.c.telegram_id == patients.c.telegram_id)
+        .outerjoin(last_seen, last_seen.c.telegram_id == patients.c.telegram_id)
+        .order_by(patients.c.telegram_id)
+    )
+
+    items: list[CohortPatient] = []
+    for row in session.execute(stmt):
+        count = int(row.readings or 0)
+        items.append(
+            CohortPatient(
+                telegramId=row.telegram_id,
+                firstName=row.first_name,
+                readings=count,
+                averageSugar=round(float(row.average), 2) if count else None,
+                timeInRange=(
+                    round(100.0 * int(row.in_range or 0) / count, 1) if count else None
+                ),
+                alerts=int(row.alerts or 0),
+                openAlerts=int(row.open_alerts or 0),
+                lastSeen=row.last_seen,
+            )
+        )
+    return int(total or 0), items
+
+
+async def get_cohort(
+    org_id: int,
+    *,
+    days: int = 14,
+    page: int = 1,
+    page_size: int = 50,
+    now: datetime.datetime | None = None,
+) -> CohortPage:
+    """Return cached per-patient aggregates for ``org_id`` over ``days``."""
+
+    key = (org_id, days, page, page_size)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    since = (now or datetime.datetime.now(datetime.timezone.utc)) - datetime.timedelta(
+        days=days
+    )
+
+    def _query(session: Session) -> tuple[int, list[CohortPatient]]:
+        return query_cohort(
+            session, org_id, since=since, page=page, page_size=page_size
+        )
+
+    total, items = await db.run_db(_query, sessionmaker=db.SessionLocal)
+    result = CohortPage(
+        orgId=org_id,
+        days=days,
+        page=page,
+        pageSize=page_size,
+        total=total,
+        items=items,
+    )
+    _cache_put(key, result)
+    return result
+
+
+async def get_user_org(user_id: int) -> int | None:
+    def _get(session: Session) -> int | None:
+        return session.scalar(
+            sa.select(db.User.org_id).where(db.User.telegram_id == user_id)
+        )
+
+    return await db.run_db(_get, sessionmaker=db.SessionLocal)
+
+
+__all__ = ["clear_cache", "get_cohort", "get_user_org", "query_cohort"]
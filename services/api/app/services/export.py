@@ -0,0 +1,255 @@
+"""Streaming export of diary data as NDJSON or CSV.
+
+Rows are read through a server-side cursor (``yield_per``), encoded one by
+one and flushed in chunks of about ``EXPORT_CHUNK_BYTES``, optionally through
+a streaming gzip compressor. Memory use does not depend on history size.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+import threading
+import zlib
+from collections.abc import AsyncIterator, Iterator, Mapping
+from typing import Literal
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..diabetes.services import db
+from ..diabetes.utils.executors import run_in_executor
+
+ExportFormat = Literal["ndjson", "csv"]
+ExportKind = Literal["all", "entries", "history"]
+
+EXPORT_YIELD_PER = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+ENTRY_FIELDS: tuple[str, ...] = (
+    "id",
+    "event_time",
+    "sugar_before",
+    "carbs_g",
+    "xe",
+    "insulin_short",
+    "insulin_long",
+    "weight_g",
+    "protein_g",
+    "fat_g",
+    "calories_kcal",
+)
+HISTORY_FIELDS: tuple[str, ...] = (
+    "id",
+    "date",
+    "time",
+    "type",
+    "sugar",
+    "carbs",
+    "bread_units",
+    "insulin",
+    "notes",
+)
+CSV_COLUMNS: tuple[str, ...] = ("kind",) + tuple(
+    dict.fromkeys(ENTRY_FIELDS + HISTORY_FIELDS)
+)
+
+Row = Mapping[str, object]
+
+
+def _entry_rows(
+    session: Session,
+    user_id: int,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+) -> Iterator[Row]:
+    # Like the entries API, never expose the legacy ``dose`` column: a
+    # dose-only entry is reported as ``insulin_short``.
+    columns = [
+        (
+            sa.func.coalesce(db.Entry.insulin_short, db.Entry.dose).label(name)
+            if name == "insulin_short"
+            else getattr(db.Entry, name)
+        )
+        for name in ENTRY_FIELDS
+    ]
+    stmt = sa.select(*columns).where(db.Entry.telegram_id == user_id)
+    if date_from is not None:
+        start = datetime.datetime.combine(
+            date_from, datetime.time.min, tzinfo=datetime.timezone.utc
+        )
+        stmt = stmt.where(db.Entry.event_time >= start)
+    if date_to is not None:
+        end = datetime.datetime.combine(
+            date_to + datetime.timedelta(days=1),
+            datetime.time.min,
+            tzinfo=datetime.timezone.utc,
+        )
+        stmt = stmt.where(db.Entry.event_time < end)
+    stmt = stmt.order_by(db.Entry.event_time, db.Entry.id).execution_options(
+        yield_per=EXPORT_YIELD_PER
+    )
+    for row in session.execute(stmt):
+        yield {"kind": "entry", **row._asdict()}
+
+
+def _history_rows(
+    session: Session,
+    user_id: int,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+) -> Iterator[Row]:
+    record = db.HistoryRecord
+    columns = [getattr(record, name) for name in HISTORY_FIELDS]
+    stmt = sa.select(*columns).where(record.telegram_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(record.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(record.date <= date_to)
+    stmt = stmt.order_by(record.date, record.time, record.id).execution_options(
+        yield_per=EXPORT_YIELD_PER
+    )
+    for row in session.execute(stmt):
+        yield {"kind": "history", **row._asdict()}
+
+
+def iter_rows(
+    user_id: int,
+    kind: ExportKind = "all",
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    *,
+    session_factory: sessionmaker[Session] | None = None,
+) -> Iterator[Row]:
+    """Yield the user's diary rows, entries first, then history records."""
+
+    factory = session_factory or db.SessionLocal
+    with factory() as session:
+        if kind in ("all", "entries"):
+            yield from _entry_rows(session, user_id, date_from, date_to)
+        if kind in ("all", "history"):
+            yield from _history_rows(session, user_id, date_from, date_to)
+
+
+def _plain(value: object) -> object:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: Iterator[Row]) -> Iterator[str]:
+    for row in rows:
+        yield (
+            json.dumps(
+                {key: _plain(value) for key, value in row.items()},
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+
+
+def encode_csv(rows: Iterator[Row]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            "" if row.get(column) is None else _plain(row.get(column))
+            for column in CSV_COLUMNS
+        )
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines: Iterator[str], *, compress: bool = False) -> Iterator[bytes]:
+    """Join ``lines`` into byte chunks, gzip-compressing them if requested."""
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending: list[bytes] = []
+    size = 0
+
+    def flush() -> bytes:
+        nonlocal size
+        data = b"".join(pending)
+        pending.clear()
+        size = 0
+        return compressor.compress(data) if compressor else data
+
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            chunk = flush()
+            if chunk:
+                yield chunk
+    chunk = flush()
+    if compressor is not None:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+class ExportStream:
+    """Drive a blocking chunk iterator from the ``db`` executor.
+
+    The iterator holds a DB session, so every step (and the final close)
+    runs in the executor and under one lock: a cancelled request cannot
+    close the generator while a worker is still advancing it.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._lock = threading.Lock()
+
+    def _next(self) -> bytes | None:
+        with self._lock:
+            return next(self._chunks, None)
+
+    def _close(self) -> None:
+        with self._lock:
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await run_in_executor("db", self._next)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await run_in_executor("db", self._close)
+
+
+def export_stream(
+    user_id: int,
+    *,
+    fmt: ExportFormat = "ndjson",
+    kind: ExportKind = "all",
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    compress: bool = False,
+) -> ExportStream:
+    rows = iter_rows(user_id, kind, date_from, date_to)
+    lines = encode_csv(rows) if fmt == "csv" else encode_ndjson(rows)
+    return ExportStream(chunked(lines, compress=compress))
+
+
+__all__ = [
+    "CSV_COLUMNS",
+    "ExportFormat",
+    "ExportKind",
+    "ExportStream",
+    "chunked",
+    "encode_csv",
+    "encode_ndjson",
+    "export_stream",
+    "iter_rows",
+]
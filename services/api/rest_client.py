@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Mapping, MutableMapping
 from typing import cast
 
 import httpx
@@ -28,7 +29,7 @@ async def _auth_headers(ctx: ContextTypes.DEFAULT_TYPE | None) -> dict[str, str]
 
     init_data: str | None = None
     user_data = getattr(ctx, "user_data", None) if ctx is not None else None
-    if isinstance(user_data, dict):
+    if isinstance(user_data, Mapping):
         init_data = cast(str | None, user_data.get("tg_init_data"))
     if not isinstance(init_data, str) and ctx is not None:
         application = getattr(ctx, "application", None)
@@ -45,9 +46,11 @@ async def _auth_headers(ctx: ContextTypes.DEFAULT_TYPE | None) -> dict[str, str]
                 persisted_all = persistence.get_user_data()
             if isinstance(persisted_all, dict):
                 user_dict = persisted_all.get(user_id)
-                if isinstance(user_dict, dict):
+                if isinstance(user_dict, Mapping):
                     init_data = cast(str | None, user_dict.get("tg_init_data"))
-                    if isinstance(init_data, str) and isinstance(user_data, dict):
+                    if isinstance(init_data, str) and isinstance(
+                        user_data, MutableMapping
+                    ):
                         user_data["tg_init_data"] = init_data
 
     if isinstance(init_data, str):
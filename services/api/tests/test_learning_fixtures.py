@@ -96,3 +96,54 @@ async def test_invalid_schema(tmp_path: Path) -> None:
     SessionLocal = setup_db()
     with pytest.raises(ValidationError):
         await load_lessons(path, sessionmaker=SessionLocal)
+
+
+@pytest.mark.asyncio()
+async def test_reload_applies_only_changed_lessons(tmp_path: Path) -> None:
+    sample = [
+        {
+            "slug": "one",
+            "title": "One",
+            "steps": ["a", "b", "c"],
+            "quiz": [{"question": "q1", "options": ["1", "2"], "answer": 0}],
+        },
+        {
+            "slug": "two",
+            "title": "Two",
+            "steps": ["x"],
+            "quiz": [{"question": "q2", "options": ["1", "2"], "answer": 1}],
+        },
+    ]
+    path = tmp_path / "lessons.json"
+    path.write_text(json.dumps(sample), encoding="utf-8")
+
+    SessionLocal = setup_db()
+    first = await load_lessons(path, sessionmaker=SessionLocal)
+    assert (first.inserted, first.updated, first.unchanged) == (2, 0, 0)
+
+    again = await load_lessons(path, sessionmaker=SessionLocal)
+    assert (again.inserted, again.updated, again.unchanged) == (0, 0, 2)
+
+    with SessionLocal() as session:
+        lesson_id = session.query(Lesson).filter_by(slug="one").one().id
+
+    sample[0]["steps"] = ["a", "B"]
+    sample[0]["quiz"] = [{"question": "q1!", "options": ["1", "2"], "answer": 1}]
+    path.write_text(json.dumps(sample), encoding="utf-8")
+    changed = await load_lessons(path, sessionmaker=SessionLocal)
+    assert (changed.inserted, changed.updated, changed.unchanged) == (0, 1, 1)
+
+    with SessionLocal() as session:
+        lesson = session.query(Lesson).filter_by(slug="one").one()
+        assert lesson.id == lesson_id
+        assert lesson.content == "a\nB"
+        steps = (
+            session.query(LessonStep)
+            .filter_by(lesson_id=lesson_id)
+            .order_by(LessonStep.step_order)
+            .all()
+        )
+        assert [s.content for s in steps] == ["a", "B"]
+        questions = session.query(QuizQuestion).filter_by(lesson_id=lesson_id).all()
+        assert [(q.question, q.correct_option) for q in questions] == [("q1!", 1)]
+        assert session.query(Lesson).count() == 2
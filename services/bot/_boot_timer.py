@@ -0,0 +1,10 @@
+# file: services/bot/_boot_timer.py
+"""Start of the bot import phase.
+
+``services.bot.main`` imports this module before anything else, so
+``IMPORT_STARTED`` marks when loading the bot modules began.
+"""
+
+import time
+
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,195 @@
+# file: services/bot/handler_metrics.py
+"""Latency metrics and an opt-in profiler for PTB handler callbacks.
+
+:func:`instrument_handlers` wraps the callback of every registered handler —
+including the entry points, states and fallbacks of conversation handlers — so
+each invocation is observed in ``handler_latency_seconds``. When a
+:class:`HandlerProfiler` is passed, a sample of invocations is also kept to
+report the slowest ones.
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import inspect
+import itertools
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, BaseHandler, ConversationHandler
+
+from services.api.app.diabetes.instrumentation import callable_label
+from services.api.app.diabetes.metrics import handler_latency_seconds
+
+logger = logging.getLogger(__name__)
+
+_INSTRUMENTED_ATTR = "__handler_metrics__"
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerSample:
+    """One recorded handler invocation."""
+
+    handler: str
+    duration: float
+    outcome: str
+    update_id: int | None
+    chat_id: int | None
+    finished_at: float
+
+
+class HandlerProfiler:
+    """Keep the ``top_n`` slowest sampled handler invocations.
+
+    Only a ``sample_rate`` fraction of invocations is considered, so the
+    profiler can stay enabled in production. ``top_n=0`` disables it.
+    """
+
+    def __init__(
+        self,
+        top_n: int,
+        sample_rate: float = 1.0,
+        *,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.top_n = max(top_n, 0)
+        self.sample_rate = sample_rate
+        self._rng = rng
+        self._heap: list[tuple[float, int, HandlerSample]] = []
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0 and self.sample_rate > 0
+
+    def record(
+        self, handler: str, duration: float, outcome: str, update: object
+    ) -> None:
+        if not self.enabled:
+            return
+        if self.sample_rate < 1.0 and self._rng() >= self.sample_rate:
+            return
+        if len(self._heap) >= self.top_n and duration <= self._heap[0][0]:
+            return
+        update_id: int | None = None
+        chat_id: int | None = None
+        if isinstance(update, Update):
+            update_id = update.update_id
+            chat = update.effective_chat
+            chat_id = chat.id if chat is not None else None
+        sample = HandlerSample(
+            handler=handler,
+            duration=duration,
+            outcome=outcome,
+            update_id=update_id,
+            chat_id=chat_id,
+            finished_at=time.time(),
+        )
+        entry = (duration, next(self._seq), sample)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heapreplace(self._heap, entry)
+
+    def slowest(self) -> list[HandlerSample]:
+        """Return recorded samples, slowest first."""
+
+        return [sample for _, _, sample in sorted(self._heap, reverse=True)]
+
+    def dump(self, *, reset: bool = True) -> list[HandlerSample]:
+        """Log the slowest invocations and optionally start a new window."""
+
+        samples = self.slowest()
+        if samples:
+            lines = "\n".join(
+                f"  {s.duration * 1000:9.1f} ms  {s.handler} [{s.outcome}]"
+                f" update={s.update_id} chat={s.chat_id}"
+                for s in samples
+            )
+            logger.info("Slowest %d handler invocations:\n%s", len(samples), lines)
+        if reset:
+            self._heap.clear()
+        return samples
+
+
+def _wrap_callback(
+    callback: Callable[..., Any], label: str, profiler: HandlerProfiler | None
+) -> Callable[..., Any]:
+    @functools.wraps(callback)
+    async def wrapped(update: object, context: object) -> Any:
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            result = callback(update, context)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            handler_latency_seconds.labels(handler=label, outcome=outcome).observe(
+                duration
+            )
+            if profiler is not None:
+                profiler.record(label, duration, outcome, update)
+
+    setattr(wrapped, _INSTRUMENTED_ATTR, True)
+    return wrapped
+
+
+def _iter_handlers(
+    handlers: Iterable[BaseHandler[Any, Any, Any]],
+) -> Iterator[BaseHandler[Any, Any, Any]]:
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            yield from _iter_handlers(handler.entry_points)
+            for state_handlers in handler.states.values():
+                yield from _iter_handlers(state_handlers)
+            yield from _iter_handlers(handler.fallbacks)
+        else:
+            yield handler
+
+
+def instrument_handlers(
+    application: object, profiler: HandlerProfiler | None = None
+) -> int:
+    """Wrap all registered handler callbacks of ``application``.
+
+    Call after every handler is registered. Already wrapped callbacks are
+    left alone, so calling it twice is harmless. Returns the number of
+    callbacks wrapped.
+    """
+
+    groups: dict[int, list[BaseHandler[Any, Any, Any]]] = getattr(
+        application, "handlers", {}
+    )
+    wrapped = 0
+    for group in groups.values():
+        for handler in _iter_handlers(group):
+            callback = handler.callback
+            if getattr(callback, _INSTRUMENTED_ATTR, False):
+                continue
+            handler.callback = _wrap_callback(
+                callback, callable_label(callback), profiler
+            )
+            wrapped += 1
+    return wrapped
+
+
+__all__ = [
+    "HandlerProfiler",
+    "HandlerSample",
+    "instrument_handlers",
+]
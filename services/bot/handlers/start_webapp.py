@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import os
+from collections.abc import Mapping
 from typing import TypeAlias
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, WebAppInfo
@@ -42,7 +43,7 @@ def build_start_handler() -> CommandHandlerT:
 
         user_data = getattr(context, "user_data", {})
         text = "👋 Добро пожаловать! Быстрая настройка в приложении:"
-        if not isinstance(user_data, dict) or "tg_init_data" not in user_data:
+        if not isinstance(user_data, Mapping) or "tg_init_data" not in user_data:
             text = "⚠️ Откройте приложение по кнопке ниже"
 
         if update.message:
@@ -1,7 +1,11 @@
 # file: services/bot/main.py
 """Bot entry point and configuration."""
 
+# Imported first so that the timer covers every module below.
+from services.bot._boot_timer import IMPORT_STARTED
+
 import os
+import time
 from pathlib import Path
 from types import ModuleType, SimpleNamespace
 
@@ -33,12 +37,18 @@ import config
 from services.api.app.billing.jobs import schedule_subscription_expiration
 from services.api.app.config import settings
 from services.api.app.diabetes.handlers.registration import register_handlers
+from services.api.app.diabetes.metrics import bot_startup_seconds
 from services.api.app.diabetes.services.db import init_db
+from services.api.app.diabetes.user_session import UserSession, as_session
 from services.api.app.diabetes.utils.menu_setup import setup_chat_menu
 from services.api.app.menu_button import post_init as menu_button_post_init
+from services.bot.handler_metrics import HandlerProfiler, instrument_handlers
 from services.bot.handlers.start_webapp import build_start_handler
 from services.bot.ptb_patches import apply_jobqueue_stop_workaround  # 👈 добавили
 from services.bot.telegram_payments import register_billing_handlers
+from services.bot.update_processor import ChatOrderedUpdateProcessor
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
 if TYPE_CHECKING:
     DefaultJobQueue: TypeAlias = JobQueue[ContextTypes.DEFAULT_TYPE]
@@ -273,21 +283,76 @@ async def post_init(
     from services.api.app.diabetes.handlers import assistant_menu
 
     await assistant_menu.post_init(app)
+    if current_settings.learning_mode_enabled and current_settings.learning_content_mode == "static":
+        from services.api.app.diabetes import curriculum_index
+
+        try:
+            await curriculum_index.get_index()
+        except SQLAlchemyError as exc:
+            logger.warning("Failed to load the curriculum index: %s", exc)
     if app.job_queue:
         logger.info("✅ JobQueue initialized and ready")
     else:
         logger.error("❌ JobQueue is NOT available!")
 
 
+async def post_shutdown(
+    app: Application[
+        ExtBot[None],
+        ContextTypes.DEFAULT_TYPE,
+        dict[str, object],
+        dict[str, object],
+        dict[str, object],
+        DefaultJobQueue,
+    ],
+) -> None:
+    """Write pending learning state and stop the lab PDF workers."""
+
+    from services.api.app.assistant.services import learning_store
+    from services.api.app.diabetes import lab_documents
+
+    await learning_store.close()
+    lab_documents.shutdown_pool()
+
+
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.exception(
         "Exception while handling update %s", update, exc_info=context.error
     )
 
 
-def build_persistence() -> (
+class SessionPicklePersistence(
     PicklePersistence[dict[str, object], dict[str, object], dict[str, object]]
 ):
+    """PicklePersistence that loads ``user_data`` as :class:`UserSession`.
+
+    Files written before ``UserSession`` hold plain dicts; they are converted
+    on load and saved in the compact format on the next flush.
+    """
+
+    async def get_user_data(self) -> dict[int, dict[str, object]]:
+        data = await super().get_user_data()
+        if self.user_data:
+            # ``flush`` writes the stored copy, so upgrade it as well.
+            self.user_data = {
+                user_id: cast(dict[str, object], as_session(user_data))
+                for user_id, user_data in self.user_data.items()
+            }
+        return {
+            user_id: cast(dict[str, object], as_session(user_data))
+            for user_id, user_data in data.items()
+        }
+
+
+# Handlers are typed against ``ContextTypes.DEFAULT_TYPE``; UserSession
+# provides the same mapping interface.
+CONTEXT_TYPES = cast(
+    "ContextTypes[ContextTypes.DEFAULT_TYPE, dict[str, object], dict[str, object], dict[str, object]]",
+    ContextTypes(user_data=UserSession),
+)
+
+
+def build_persistence() -> SessionPicklePersistence:
     """Create PicklePersistence with configurable path.
 
     Path can be overridden via ``BOT_PERSISTENCE_PATH``. By default it is stored
@@ -310,7 +375,82 @@ def build_persistence() -> (
         raise RuntimeError(
             f"Persistence directory is not writable: {persistence_path.parent}"
         )
-    return PicklePersistence(str(persistence_path), single_file=True)
+    return SessionPicklePersistence(str(persistence_path), single_file=True)
+
+
+def build_application(
+    token: str,
+    persistence: PicklePersistence[
+        dict[str, object], dict[str, object], dict[str, object]
+    ],
+) -> Application[
+    ExtBot[None],
+    ContextTypes.DEFAULT_TYPE,
+    dict[str, object],
+    dict[str, object],
+    dict[str, object],
+    DefaultJobQueue,
+]:
+    """Build the PTB application according to the bot runtime settings."""
+
+    builder = (
+        Application.builder()
+        .token(token)
+        .context_types(CONTEXT_TYPES)
+        .persistence(persistence)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    workers = settings.bot_concurrent_updates
+    if workers > 1:
+        builder = builder.concurrent_updates(
+            ChatOrderedUpdateProcessor(workers, settings.bot_update_backlog)
+        )
+        logger.info("✅ Concurrent updates: %d workers, per-chat ordering", workers)
+    if settings.bot_mode == "webhook":
+        # Updates arrive through the ASGI endpoint; no getUpdates polling.
+        builder = builder.updater(None)
+    return builder.build()
+
+
+def run_webhook(
+    application: Application[
+        ExtBot[None],
+        ContextTypes.DEFAULT_TYPE,
+        dict[str, object],
+        dict[str, object],
+        dict[str, object],
+        DefaultJobQueue,
+    ],
+) -> None:  # pragma: no cover - runs the server until interrupted
+    """Serve Telegram webhooks with uvicorn until the process is stopped."""
+
+    import uvicorn
+
+    from services.bot.webhook import build_webhook_app
+
+    if not settings.bot_webhook_secret:
+        logger.warning("BOT_WEBHOOK_SECRET is not set; webhook requests are not verified")
+    if not settings.bot_webhook_url:
+        logger.warning("BOT_WEBHOOK_URL is not set; assuming the webhook is registered")
+    webhook_app = build_webhook_app(
+        application,
+        secret_token=settings.bot_webhook_secret,
+        webhook_url=settings.bot_webhook_url,
+        path=settings.bot_webhook_path,
+    )
+    logger.info(
+        "✅ Webhook mode on %s:%d%s",
+        settings.bot_webhook_listen,
+        settings.bot_webhook_port,
+        settings.bot_webhook_path,
+    )
+    uvicorn.run(
+        webhook_app,
+        host=settings.bot_webhook_listen,
+        port=settings.bot_webhook_port,
+        log_config=None,
+    )
 
 
 def main() -> None:  # pragma: no cover
@@ -322,6 +462,12 @@ def main() -> None:  # pragma: no cover
     )
     configure_http_client_logging(_resolve_telegram_token())
     logger.info("=== Bot started ===")
+    bot_startup_seconds.labels(phase="imports").set(IMPORT_SECONDS)
+    logger.info("Bot modules imported in %.2fs", IMPORT_SECONDS)
+    if settings.bot_import_profile:
+        from services.bot.startup_profile import record_import_profile
+
+        record_import_profile(top=settings.bot_import_profile_top)
 
     # применяем воркараунд к PTB JobQueue.stop
     apply_jobqueue_stop_workaround()
@@ -361,13 +507,7 @@ def main() -> None:  # pragma: no cover
         dict[str, object],
         dict[str, object],
         DefaultJobQueue,
-    ] = (
-        Application.builder()
-        .token(BOT_TOKEN)
-        .persistence(persistence)
-        .post_init(post_init)
-        .build()
-    )
+    ] = build_application(BOT_TOKEN, persistence)
 
     application.add_handler(build_start_handler(), group=0)
     logger.info("✅ /start → WebApp CTA mode enabled")
@@ -390,13 +530,41 @@ def main() -> None:  # pragma: no cover
     schedule_subscription_expiration(job_queue)
 
     # ---- Register handlers (they may schedule reminders)
+    handlers_started = time.perf_counter()
     register_handlers(application)
+    bot_startup_seconds.labels(phase="handlers").set(
+        time.perf_counter() - handlers_started
+    )
     if settings.learning_mode_enabled:
         logger.info("📚 🤖 Ассистент_AI включён")
     else:
         logger.info("📚 🤖 Ассистент_AI выключен")
     register_billing_handlers(application)
 
+    # ---- Handler latency metrics (and the opt-in slowest-handlers profiler)
+    profiler = HandlerProfiler(
+        settings.handler_profile_top_n, settings.handler_profile_sample_rate
+    )
+    instrumented = instrument_handlers(
+        application, profiler if profiler.enabled else None
+    )
+    logger.info("📈 Instrumented %d handler callbacks", instrumented)
+    if profiler.enabled:
+
+        async def dump_handler_profile(_: ContextTypes.DEFAULT_TYPE) -> None:
+            profiler.dump()
+
+        job_queue.run_repeating(
+            dump_handler_profile,
+            interval=settings.handler_profile_interval_sec,
+            name="handler_profile_dump",
+        )
+        logger.info(
+            "🐢 Handler profiler: top %d every %ds",
+            profiler.top_n,
+            settings.handler_profile_interval_sec,
+        )
+
     # ---- Schedule test job on startup
     async def test_job(context: ContextTypes.DEFAULT_TYPE) -> None:
         admin_id = settings.admin_id
@@ -411,10 +579,22 @@ def main() -> None:  # pragma: no cover
     logger.info("🧪 Scheduled test_job in +30s")
 
     # ---- Run (без дополнительного ручного shutdown — PTB сделает сам)
-    application.run_polling()
-
-
-__all__ = ["main", "error_handler", "settings", "TELEGRAM_TOKEN", "build_persistence"]
+    if settings.bot_mode == "webhook":
+        run_webhook(application)
+    else:
+        application.run_polling()
+
+
+__all__ = [
+    "main",
+    "error_handler",
+    "settings",
+    "TELEGRAM_TOKEN",
+    "SessionPicklePersistence",
+    "build_persistence",
+    "build_application",
+    "run_webhook",
+]
 
 if __name__ == "__main__":  # pragma: no cover
     main()
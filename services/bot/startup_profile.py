@@ -0,0 +1,194 @@
+# file: services/bot/startup_profile.py
+"""Import-time profiling for the bot entry point.
+
+Runs a fresh interpreter with ``-X importtime`` and parses its report so that
+slow imports show up in the logs and in Prometheus without restarting the
+bot by hand. Can also be used from the command line::
+
+    python -m services.bot.startup_profile --top 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from services.api.app.diabetes.metrics import bot_import_seconds
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules the bot imports while starting: the entry point itself plus the
+# handler modules that ``register_handlers`` loads inside the function.
+BOT_IMPORT_TARGETS: tuple[str, ...] = (
+    "services.bot.main",
+    "services.api.app.diabetes.handlers.dose_calc",
+    "services.api.app.diabetes.handlers.reporting_handlers",
+    "services.api.app.diabetes.handlers.alert_handlers",
+    "services.api.app.diabetes.handlers.sos_handlers",
+    "services.api.app.diabetes.handlers.security_handlers",
+    "services.api.app.diabetes.handlers.photo_handlers",
+    "services.api.app.diabetes.handlers.sugar_handlers",
+    "services.api.app.diabetes.handlers.gpt_handlers",
+    "services.api.app.diabetes.handlers.billing_handlers",
+    "services.api.app.diabetes.handlers.assistant_menu",
+    "services.api.app.diabetes.handlers.profile",
+    "services.api.app.diabetes.handlers.reminder_handlers",
+)
+
+# Libraries that must only be loaded by the handlers that use them.
+HEAVY_MODULES: tuple[str, ...] = ("matplotlib", "reportlab", "pypdf")
+
+_IMPORTTIME_RE = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s*)(?P<module>\S+)\s*$"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTiming:
+    """Single line of an ``-X importtime`` report."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def top_level(self) -> str:
+        return self.module.partition(".")[0]
+
+
+def parse_importtime(lines: Iterable[str]) -> list[ImportTiming]:
+    """Parse ``-X importtime`` output, ignoring unrelated lines."""
+
+    timings: list[ImportTiming] = []
+    for line in lines:
+        match = _IMPORTTIME_RE.match(line.rstrip("\n"))
+        if match is None:
+            continue
+        indent = match.group("indent")
+        timings.append(
+            ImportTiming(
+                module=match.group("module"),
+                self_us=int(match.group("self")),
+                cumulative_us=int(match.group("cumulative")),
+                depth=max(len(indent) - 1, 0) // 2,
+            )
+        )
+    return timings
+
+
+def profile_imports(
+    modules: Sequence[str] = BOT_IMPORT_TARGETS, *, timeout: float = 120.0
+) -> list[ImportTiming]:
+    """Import ``modules`` in a fresh interpreter and return its import timings."""
+
+    code = "".join(f"import {name}\n" for name in modules)
+    env = dict(os.environ)
+    python_path = env.get("PYTHONPATH")
+    env["PYTHONPATH"] = (
+        f"{REPO_ROOT}{os.pathsep}{python_path}" if python_path else str(REPO_ROOT)
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env=env,
+        timeout=timeout,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-5:])
+        raise RuntimeError(f"Import profiling failed: {tail}")
+    return parse_importtime(proc.stderr.splitlines())
+
+
+def loaded_heavy_modules(timings: Iterable[ImportTiming]) -> list[str]:
+    """Return heavy top-level packages present in ``timings``."""
+
+    found = {timing.top_level for timing in timings}
+    return [name for name in HEAVY_MODULES if name in found]
+
+
+def slowest_imports(
+    timings: Iterable[ImportTiming], top: int = 20
+) -> list[tuple[str, int]]:
+    """Return the ``top`` packages by total import time in microseconds.
+
+    Self times are summed per top-level package, so the cost of a library is
+    attributed to it no matter which module pulled it in.
+    """
+
+    totals: dict[str, int] = {}
+    for timing in timings:
+        totals[timing.top_level] = totals.get(timing.top_level, 0) + timing.self_us
+    ordered = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return ordered[:top]
+
+
+def format_report(timings: Iterable[ImportTiming], top: int = 20) -> str:
+    """Render the slowest packages as a small table."""
+
+    lines = [f"{'ms':>9}  package"]
+    for package, total_us in slowest_imports(timings, top):
+        lines.append(f"{total_us / 1000:>9.1f}  {package}")
+    return "\n".join(lines)
+
+
+def record_import_profile(
+    top: int = 20, modules: Sequence[str] = BOT_IMPORT_TARGETS
+) -> list[ImportTiming]:
+    """Profile bot imports, log the slowest packages and export them as metrics."""
+
+    try:
+        timings = profile_imports(modules)
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Import profiling failed: %s", exc)
+        return []
+    bot_import_seconds.clear()
+    for package, total_us in slowest_imports(timings, top):
+        bot_import_seconds.labels(module=package).set(total_us / 1e6)
+    logger.info("Bot import profile (top %d):\n%s", top, format_report(timings, top))
+    heavy = loaded_heavy_modules(timings)
+    if heavy:
+        logger.warning("Heavy modules imported at startup: %s", ", ".join(heavy))
+    return timings
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile bot import time")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("modules", nargs="*", default=list(BOT_IMPORT_TARGETS))
+    args = parser.parse_args(argv)
+    timings = profile_imports(args.modules)
+    print(format_report(timings, args.top))
+    heavy = loaded_heavy_modules(timings)
+    if heavy:
+        print(f"\nHeavy modules imported: {', '.join(heavy)}")
+        return 1
+    return 0
+
+
+__all__ = [
+    "BOT_IMPORT_TARGETS",
+    "HEAVY_MODULES",
+    "ImportTiming",
+    "parse_importtime",
+    "profile_imports",
+    "loaded_heavy_modules",
+    "slowest_imports",
+    "format_report",
+    "record_import_profile",
+]
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
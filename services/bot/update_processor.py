@@ -0,0 +1,146 @@
+# file: services/bot/update_processor.py
+"""Concurrent update processing with per-chat ordering.
+
+PTB processes updates one by one by default, so a slow Vision request or
+report for one user delays everybody else. :class:`ChatOrderedUpdateProcessor`
+runs updates from different chats in parallel on a bounded number of workers
+while updates from the same chat are still handled strictly in order, which
+keeps conversation handlers and ``user_data`` consistent.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from services.api.app.diabetes.metrics import (
+    bot_update_latency_seconds,
+    bot_update_queue_depth,
+    bot_update_wait_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def update_chat_key(update: object) -> int | None:
+    """Return the key that serializes ``update``: chat id, else user id."""
+
+    if not isinstance(update, Update):
+        return None
+    chat = update.effective_chat
+    if chat is not None:
+        return chat.id
+    user = update.effective_user
+    if user is not None:
+        return user.id
+    return None
+
+
+class _ChatLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Process up to ``workers`` updates at once, one at a time per chat.
+
+    ``backlog`` bounds how many updates may be admitted (running or waiting
+    for their chat/worker) before PTB itself stops handing out new ones; the
+    webhook endpoint uses :attr:`pending` to push back on Telegram.
+    """
+
+    __slots__ = ("_workers", "_worker_semaphore", "_chat_locks", "_pending")
+
+    def __init__(self, workers: int, backlog: int | None = None) -> None:
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        backlog = max(backlog or workers * 16, workers)
+        super().__init__(backlog)
+        self._workers = workers
+        self._worker_semaphore = asyncio.Semaphore(workers)
+        self._chat_locks: dict[int, _ChatLock] = {}
+        self._pending = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def backlog(self) -> int:
+        return self.max_concurrent_updates
+
+    @property
+    def pending(self) -> int:
+        """Number of admitted updates that have not finished yet."""
+
+        return self._pending
+
+    def _acquire_chat(self, key: int) -> _ChatLock:
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = _ChatLock()
+        entry.users += 1
+        return entry
+
+    def _release_chat(self, key: int, entry: _ChatLock) -> None:
+        entry.users -= 1
+        if entry.users == 0 and self._chat_locks.get(key) is entry:
+            del self._chat_locks[key]
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        key = update_chat_key(update)
+        queued_at = time.monotonic()
+        self._pending += 1
+        bot_update_queue_depth.labels(stage="processor").set(self._pending)
+        entry = self._acquire_chat(key) if key is not None else None
+        awaited = False
+        try:
+            if entry is not None:
+                await entry.lock.acquire()
+            try:
+                async with self._worker_semaphore:
+                    started = time.monotonic()
+                    bot_update_wait_seconds.observe(started - queued_at)
+                    outcome = "ok"
+                    awaited = True
+                    try:
+                        await coroutine
+                    except Exception:
+                        outcome = "error"
+                        raise
+                    finally:
+                        bot_update_latency_seconds.labels(outcome=outcome).observe(
+                            time.monotonic() - started
+                        )
+            finally:
+                if entry is not None:
+                    entry.lock.release()
+        finally:
+            if not awaited and inspect.iscoroutine(coroutine):
+                coroutine.close()
+            if entry is not None and key is not None:
+                self._release_chat(key, entry)
+            self._pending -= 1
+            bot_update_queue_depth.labels(stage="processor").set(self._pending)
+
+    async def initialize(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        if self._pending:
+            logger.info("Update processor shutting down with %d pending", self._pending)
+
+
+__all__ = ["ChatOrderedUpdateProcessor", "update_chat_key"]
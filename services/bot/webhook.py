@@ -0,0 +1,120 @@
+# file: services/bot/webhook.py
+"""ASGI webhook endpoint for the bot.
+
+In webhook mode Telegram pushes updates to :data:`WEBHOOK_PATH` instead of
+the bot long-polling ``getUpdates``. The app built here owns the PTB
+``Application`` lifecycle (initialize → post_init → start, and the reverse on
+shutdown) and feeds verified updates into ``application.update_queue``.
+"""
+
+from __future__ import annotations
+
+import hmac
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import FastAPI, Request, Response
+from telegram import Update
+from telegram.ext import Application
+
+from services.api.app.diabetes.metrics import bot_update_queue_depth
+from services.bot.update_processor import ChatOrderedUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/telegram/webhook"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+RETRY_AFTER_SECONDS = 5
+
+AnyApplication = Application[Any, Any, Any, Any, Any, Any]
+
+
+async def start_application(application: AnyApplication) -> None:
+    """Initialize and start ``application`` the way ``run_polling`` does."""
+
+    await application.initialize()
+    if application.post_init is not None:
+        await application.post_init(application)
+    await application.start()
+
+
+async def stop_application(application: AnyApplication) -> None:
+    """Stop and shut down ``application`` including its post hooks."""
+
+    if application.running:
+        await application.stop()
+    if application.post_stop is not None:
+        await application.post_stop(application)
+    await application.shutdown()
+    if application.post_shutdown is not None:
+        await application.post_shutdown(application)
+
+
+def build_webhook_app(
+    application: AnyApplication,
+    *,
+    secret_token: str | None,
+    webhook_url: str | None = None,
+    path: str = WEBHOOK_PATH,
+) -> FastAPI:
+    """Return an ASGI app that serves Telegram webhooks for ``application``.
+
+    When ``webhook_url`` is given the webhook is registered with Telegram on
+    startup. Requests without the matching ``secret_token`` are rejected.
+    While the concurrent processor is at its backlog the endpoint answers 503
+    so Telegram retries later instead of the bot buffering without bound.
+    """
+
+    processor = application.update_processor
+    bounded = processor if isinstance(processor, ChatOrderedUpdateProcessor) else None
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await start_application(application)
+        if webhook_url:
+            await application.bot.set_webhook(
+                url=webhook_url,
+                secret_token=secret_token,
+                allowed_updates=Update.ALL_TYPES,
+            )
+            logger.info("Webhook registered at %s", webhook_url)
+        try:
+            yield
+        finally:
+            await stop_application(application)
+
+    app = FastAPI(title="Diabetes Bot Webhook", lifespan=lifespan)
+
+    @app.post(path)
+    async def telegram_webhook(request: Request) -> Response:
+        if secret_token:
+            received = request.headers.get(SECRET_HEADER, "")
+            if not hmac.compare_digest(received.encode(), secret_token.encode()):
+                return Response(status_code=403)
+        if bounded is not None and bounded.pending >= bounded.backlog:
+            return Response(
+                status_code=503, headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+        try:
+            payload = await request.json()
+        except ValueError:
+            return Response(status_code=400)
+        update = Update.de_json(payload, application.bot)
+        if update is None:
+            return Response(status_code=400)
+        await application.update_queue.put(update)
+        bot_update_queue_depth.labels(stage="ptb").set(application.update_queue.qsize())
+        return Response(status_code=200)
+
+    return app
+
+
+__all__ = [
+    "WEBHOOK_PATH",
+    "SECRET_HEADER",
+    "build_webhook_app",
+    "start_application",
+    "stop_application",
+]
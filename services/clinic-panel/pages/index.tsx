@@ -1,7 +1,16 @@
-import { useEffect } from 'react';
-import { DefaultApi } from '@offonika/diabetes-ts-sdk';
+import { useEffect, useState } from 'react';
+import { useRouter } from 'next/router';
+import { CohortApi, DefaultApi } from '@offonika/diabetes-ts-sdk';
+import type { CohortPage } from '@offonika/diabetes-ts-sdk';
+
+const PAGE_SIZE = 50;
 
 export default function Home() {
+  const router = useRouter();
+  const orgId = Number(router.query.orgId);
+  const [page, setPage] = useState(1);
+  const [cohort, setCohort] = useState<CohortPage | null>(null);
+
   useEffect(() => {
     const api = new DefaultApi();
     api.healthGet()
@@ -13,5 +22,62 @@ export default function Home() {
       });
   }, []);
 
-  return <main>Clinic Panel</main>;
+  useEffect(() => {
+    if (!Number.isInteger(orgId)) {
+      return;
+    }
+    new CohortApi()
+      .cohortGet({ orgId, page, pageSize: PAGE_SIZE })
+      .then(setCohort)
+      .catch((err) => {
+        console.error('Cohort load error', err);
+      });
+  }, [orgId, page]);
+
+  const pages = cohort ? Math.max(1, Math.ceil(cohort.total / cohort.pageSize)) : 1;
+
+  return (
+    <main>
+      <h1>Clinic Panel</h1>
+      {cohort && (
+        <>
+          <table>
+            <thead>
+              <tr>
+                <th>Пациент</th>
+                <th>TIR, %</th>
+                <th>Средний сахар</th>
+                <th>Измерений</th>
+                <th>Алерты (открытые)</th>
+                <th>Последняя запись</th>
+              </tr>
+            </thead>
+            <tbody>
+              {cohort.items.map((p) => (
+                <tr key={p.telegramId}>
+                  <td>{p.firstName ?? p.telegramId}</td>
+                  <td>{p.timeInRange ?? '—'}</td>
+                  <td>{p.averageSugar ?? '—'}</td>
+                  <td>{p.readings}</td>
+                  <td>
+                    {p.alerts} ({p.openAlerts})
+                  </td>
+                  <td>{p.lastSeen ? p.lastSeen.toLocaleString() : '—'}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+          <button disabled={page <= 1} onClick={() => setPage(page - 1)}>
+            ←
+          </button>
+          <span>
+            {page} / {pages}
+          </span>
+          <button disabled={page >= pages} onClick={() => setPage(page + 1)}>
+            →
+          </button>
+        </>
+      )}
+    </main>
+  );
 }
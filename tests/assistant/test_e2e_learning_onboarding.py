@@ -10,6 +10,7 @@ from sqlalchemy.pool import StaticPool
 
 from services.api.app import profiles
 from services.api.app.assistant.repositories import plans as plans_repo
+from services.api.app.assistant.services import learning_store
 from services.api.app.assistant.services import progress_service as progress_repo
 from services.api.app.diabetes import learning_handlers, learning_onboarding
 from services.api.app.diabetes.handlers import (
@@ -44,6 +45,7 @@ def setup_db(monkeypatch: pytest.MonkeyPatch) -> sessionmaker[Session]:
     db.Base.metadata.create_all(bind=engine)
     monkeypatch.setattr(plans_repo, "SessionLocal", session_local, raising=False)
     monkeypatch.setattr(progress_repo, "SessionLocal", session_local, raising=False)
+    monkeypatch.setattr(learning_store, "SessionLocal", session_local, raising=False)
     yield session_local
     db.dispose_engine(engine)
 
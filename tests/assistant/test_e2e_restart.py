@@ -9,11 +9,12 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from services.api.app.assistant.repositories import plans as plans_repo
+from services.api.app.assistant.services import learning_store
 from services.api.app.assistant.services import progress_service as progress_repo
 from services.api.app.diabetes.services import db
 from services.api.app.diabetes import learning_handlers
 from services.api.app.diabetes.planner import generate_learning_plan, pretty_plan
-from services.api.app.diabetes.models_learning import LearningProgress, ProgressData
+from services.api.app.diabetes.models_learning import LearningProgress
 
 
 class DummyMessage:
@@ -39,6 +40,7 @@ def setup_db(monkeypatch: pytest.MonkeyPatch) -> sessionmaker[Session]:
     db.Base.metadata.create_all(bind=engine)
     monkeypatch.setattr(plans_repo, "SessionLocal", session_local, raising=False)
     monkeypatch.setattr(progress_repo, "SessionLocal", session_local, raising=False)
+    monkeypatch.setattr(learning_store, "SessionLocal", session_local, raising=False)
     yield session_local
     db.dispose_engine(engine)
 
@@ -158,16 +160,17 @@ async def test_hydrate_generates_snapshot_and_persists(
 
     monkeypatch.setattr(learning_handlers, "safe_add_lesson_log", fake_add_log)
 
+    monkeypatch.setattr(learning_handlers.settings, "learning_flush_delay_sec", 0)
     calls: list[dict[str, Any]] = []
-    orig_upsert = progress_repo.upsert_progress
+    orig_write = learning_store._write
 
-    async def spy_upsert(
-        user_id: int, plan_id: int, progress_json: ProgressData
-    ) -> Any:
-        calls.append(progress_json.copy())
-        return await orig_upsert(user_id, plan_id, progress_json)
+    def spy_write(session: Session, batch: dict[Any, Any]) -> set[int]:
+        calls.extend(
+            entry.progress.copy() for entry in batch.values() if entry.progress
+        )
+        return orig_write(session, batch)
 
-    monkeypatch.setattr(progress_repo, "upsert_progress", spy_upsert)
+    monkeypatch.setattr(learning_store, "_write", spy_write)
 
     msg_learn = DummyMessage(text="/learn")
     update = SimpleNamespace(message=msg_learn, effective_user=msg_learn.from_user)
@@ -181,7 +184,7 @@ async def test_hydrate_generates_snapshot_and_persists(
     upd_ans = SimpleNamespace(message=msg_ans, effective_user=msg_ans.from_user)
     await learning_handlers.lesson_answer_handler(upd_ans, context)
     assert msg_ans.sent == ["feedback\n\n—\n\nШаг 2"]
-    assert len(calls) == 3
+    assert len(calls) == 2
 
     with setup_db() as session:  # type: ignore[misc]
         progress = session.query(LearningProgress).one()
@@ -195,7 +198,7 @@ async def test_hydrate_generates_snapshot_and_persists(
     await learning_handlers.plan_command(upd_plan, context2)
 
     assert context2.user_data.get("learning_plan_index") == 1
-    assert len(calls) == 4
+    assert len(calls) == 3
     assert gen_calls == [1, 2, 2]
 
     msg_learn2 = DummyMessage(text="/learn")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, cast
+from typing import Any
 
 import pytest
 from sqlalchemy import create_engine
@@ -11,10 +11,10 @@ from telegram import Bot, Chat, Message, Update, User
 from telegram.ext import Application, MessageHandler, filters
 
 from services.api.app.assistant.repositories import plans as plans_repo
+from services.api.app.assistant.services import learning_store
 from services.api.app.assistant.services import progress_service as progress_repo
 from services.api.app.diabetes import learning_handlers
 from services.api.app.diabetes.services import db
-from services.api.app.diabetes.models_learning import ProgressData
 
 
 class DummyBot(Bot):
@@ -206,9 +206,6 @@ async def test_hydration_busy_message(monkeypatch: pytest.MonkeyPatch) -> None:
     assert "upsert" not in called
     assert "lesson" not in called
     assert learning_handlers.get_state(app.user_data[1]) is None
-    progress_map = cast(
-        dict[int, ProgressData], app.bot_data[learning_handlers.PROGRESS_KEY]
-    )
-    assert progress_map[1]["snapshot"] is None
+    assert not learning_store.has_pending(1)
 
     await app.shutdown()
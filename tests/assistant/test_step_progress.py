@@ -9,6 +9,9 @@ from services.api.app.config import settings
 from services.api.app.diabetes import learning_handlers
 from services.api.app.diabetes.learning_state import LearnState, set_state
 from services.api.app.diabetes.llm_router import LLMTask
+from services.api.app.diabetes.services import db
+from services.api.app.assistant.repositories import plans as plans_repo
+from services.api.app.assistant.services import learning_store
 from services.api.app.assistant.services import progress_service as progress_repo
 
 
@@ -29,7 +32,9 @@ async def test_step_advances_and_text_changes(
     """Answering a step should advance progress and yield new text."""
 
     # Deterministic environment
+    monkeypatch.setattr(plans_repo, "SessionLocal", session_local, raising=False)
     monkeypatch.setattr(progress_repo, "SessionLocal", session_local, raising=False)
+    monkeypatch.setattr(learning_store, "SessionLocal", session_local, raising=False)
     monkeypatch.setattr(settings, "learning_mode_enabled", True)
     monkeypatch.setattr(settings, "learning_content_mode", "dynamic")
 
@@ -62,9 +67,13 @@ async def test_step_advances_and_text_changes(
 
     monkeypatch.setattr(learning_handlers, "check_user_answer", fake_check_user_answer)
 
-    user_data: dict[str, Any] = {"learning_plan_id": 1}
+    with session_local() as session:
+        session.add(db.User(telegram_id=1, thread_id=""))
+        session.commit()
+    plan_id = await plans_repo.create_plan(1, version=1, plan_json=["Шаг 1", "Шаг 2"])
+    user_data: dict[str, Any] = {"learning_plan_id": plan_id}
     set_state(user_data, LearnState(topic="t", step=1, awaiting=True, last_step_text="Шаг 1"))
-    await progress_repo.upsert_progress(1, 1, {
+    await progress_repo.upsert_progress(1, plan_id, {
         "topic": "t", "module_idx": 0, "step_idx": 1, "snapshot": "Шаг 1", "prev_summary": None,
     })
 
@@ -77,6 +86,7 @@ async def test_step_advances_and_text_changes(
     state = learning_handlers.get_state(user_data)
     assert state.step == 2
     assert state.last_step_text == "Шаг 2"
-    progress = await progress_repo.get_progress(1, 1)
+    await learning_store.flush()
+    progress = await progress_repo.get_progress(1, plan_id)
     assert progress is not None
     assert progress.progress_json["step_idx"] == 2
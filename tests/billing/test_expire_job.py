@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from typing import Any, cast
 
 import pytest
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
+from telegram.error import Forbidden, RetryAfter
 
 from services.api.app.diabetes.services.db import (
     Base,
@@ -17,6 +19,7 @@ from services.api.app.diabetes.services.db import (
 )
 from services.api.app.billing.log import BillingEvent, BillingLog
 from services.api.app.billing import jobs
+from services.api.app.diabetes.utils.outbound import MessageDispatcher
 
 
 def _setup_db() -> sessionmaker[Session]:
@@ -167,3 +170,106 @@ def test_schedule_subscription_expiration_skips_without_run_daily(
 def test_utcnow_returns_aware_datetime() -> None:
     now = jobs._utcnow()
     assert now.tzinfo is timezone.utc
+
+
+class _FakeBot:
+    def __init__(self, *, blocked: set[int] | None = None, flood_once: int | None = None):
+        self.sent: list[int] = []
+        self.blocked = blocked or set()
+        self.flood_once = flood_once
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        if chat_id in self.blocked:
+            raise Forbidden("blocked")
+        if chat_id == self.flood_once:
+            self.flood_once = None
+            raise RetryAfter(0)
+        self.sent.append(chat_id)
+
+
+def _patch_run_db(monkeypatch: pytest.MonkeyPatch, session_local: sessionmaker[Session]) -> None:
+    async def run_db(fn, *args, **kwargs) -> Any:  # type: ignore[no-untyped-def]
+        with session_local() as session:
+            return fn(session, *args)
+
+    monkeypatch.setattr(jobs, "run_db", run_db)
+
+
+@pytest.mark.asyncio
+async def test_expire_subscriptions_batches_and_notifies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session_local = _setup_db()
+    now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    with session_local() as session:
+        session.add_all(
+            [
+                Subscription(
+                    user_id=i,
+                    plan=SubscriptionPlan.PRO,
+                    status=SubStatus.active,
+                    provider="dummy",
+                    transaction_id=f"tx{i}",
+                    end_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                )
+                for i in range(1, 6)
+            ]
+        )
+        # User 5 already has an expired subscription; it is replaced so the
+        # active one can expire without violating (user_id, status).
+        session.add(
+            Subscription(
+                user_id=5,
+                plan=SubscriptionPlan.PRO,
+                status=SubStatus.expired,
+                provider="dummy",
+                transaction_id="old5",
+                end_date=datetime(2023, 1, 1, tzinfo=timezone.utc),
+            )
+        )
+        # A trial that ended long ago was handled by an earlier run.
+        session.add(
+            Subscription(
+                user_id=6,
+                plan=SubscriptionPlan.PRO,
+                status=SubStatus.trial,
+                provider="dummy",
+                transaction_id="tx6",
+                end_date=datetime(2023, 12, 1, tzinfo=timezone.utc),
+            )
+        )
+        session.commit()
+    _patch_run_db(monkeypatch, session_local)
+    monkeypatch.setattr(jobs, "_utcnow", lambda: now)
+    bot = _FakeBot(blocked={2}, flood_once=3)
+
+    await jobs.expire_subscriptions(cast(Any, SimpleNamespace(bot=bot)), batch_size=2)
+
+    with session_local() as session:
+        statuses = {
+            (s.user_id, s.transaction_id): s.status
+            for s in session.scalars(select(Subscription))
+        }
+        logged = sorted(
+            session.scalars(
+                select(BillingLog.user_id).where(BillingLog.event == BillingEvent.EXPIRED)
+            )
+        )
+    assert [statuses[(i, f"tx{i}")] for i in range(1, 6)] == [SubStatus.expired] * 5
+    assert (5, "old5") not in statuses
+    assert statuses[(6, "tx6")] == SubStatus.trial
+    assert logged == [1, 2, 3, 4, 5]
+    assert sorted(bot.sent) == [1, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_notify_expired_uses_dispatcher() -> None:
+    dispatcher = MessageDispatcher(global_rate=1000.0, global_burst=2.0)
+    bot = _FakeBot(blocked={4})
+
+    delivered = await jobs.notify_expired(
+        cast(Any, bot), [1, 2, 2, 3, 4, 5], dispatcher=dispatcher
+    )
+
+    assert delivered == 4
+    assert bot.sent == [1, 2, 3, 5]
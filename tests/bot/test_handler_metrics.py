@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from telegram.ext import (
+    Application,
+    CommandHandler,
+    ConversationHandler,
+    MessageHandler,
+    filters,
+)
+
+from services.api.app.diabetes.metrics import get_metric_value, handler_latency_seconds
+from services.bot.handler_metrics import HandlerProfiler, instrument_handlers
+
+
+async def start(update: object, context: object) -> int:
+    return 1
+
+
+async def answer(update: object, context: object) -> int:
+    return ConversationHandler.END
+
+
+async def broken(update: object, context: object) -> None:
+    raise RuntimeError("boom")
+
+
+def _application() -> Any:
+    application = Application.builder().token("123:TEST").updater(None).build()
+    application.add_handler(
+        ConversationHandler(
+            entry_points=[CommandHandler("start", start)],
+            states={1: [MessageHandler(filters.TEXT, answer)]},
+            fallbacks=[CommandHandler("cancel", broken)],
+        )
+    )
+    application.add_handler(MessageHandler(filters.PHOTO, broken), group=1)
+    return application
+
+
+@pytest.mark.asyncio
+async def test_instrument_handlers_wraps_nested_callbacks() -> None:
+    application = _application()
+
+    assert instrument_handlers(application) == 4
+    assert instrument_handlers(application) == 0
+
+    conv = application.handlers[0][0]
+    entry = conv.entry_points[0]
+    assert entry.callback.__wrapped__ is start
+
+    ok = handler_latency_seconds.labels(
+        handler="test_handler_metrics.start", outcome="ok"
+    )
+    error = handler_latency_seconds.labels(
+        handler="test_handler_metrics.broken", outcome="error"
+    )
+    ok_before = get_metric_value(ok, "count")
+    error_before = get_metric_value(error, "count")
+
+    assert await entry.callback(None, None) == 1
+    with pytest.raises(RuntimeError):
+        await application.handlers[1][0].callback(None, None)
+
+    assert get_metric_value(ok, "count") == ok_before + 1
+    assert get_metric_value(error, "count") == error_before + 1
+
+
+def test_profiler_keeps_slowest_samples() -> None:
+    profiler = HandlerProfiler(top_n=2)
+    for name, duration in (("a", 0.1), ("b", 0.5), ("c", 0.3), ("d", 0.05)):
+        profiler.record(name, duration, "ok", SimpleNamespace())
+
+    assert [s.handler for s in profiler.slowest()] == ["b", "c"]
+    assert [s.handler for s in profiler.dump()] == ["b", "c"]
+    assert profiler.slowest() == []
+
+
+def test_profiler_sampling_and_disabled() -> None:
+    draws = iter([0.9, 0.1])
+    profiler = HandlerProfiler(top_n=5, sample_rate=0.5, rng=lambda: next(draws))
+    profiler.record("skipped", 1.0, "ok", None)
+    profiler.record("kept", 0.2, "ok", None)
+
+    assert [s.handler for s in profiler.slowest()] == ["kept"]
+
+    disabled = HandlerProfiler(top_n=0)
+    disabled.record("x", 1.0, "ok", None)
+    assert not disabled.enabled
+    assert disabled.slowest() == []
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from telegram import Update
+from telegram.ext import Application, ContextTypes, MessageHandler, filters
+from telegram.request import BaseRequest, RequestData
+
+from services.bot.update_processor import ChatOrderedUpdateProcessor
+from services.bot.webhook import SECRET_HEADER, WEBHOOK_PATH, build_webhook_app
+
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "Bot", "username": "test_bot"}
+
+
+class FakeTelegramRequest(BaseRequest):
+    """In-process stand-in for the Telegram Bot API server."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    @property
+    def read_timeout(self) -> float | None:
+        return 1.0
+
+    async def initialize(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        return None
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout: object = None,
+        write_timeout: object = None,
+        connect_timeout: object = None,
+        pool_timeout: object = None,
+    ) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        self.calls.append((api_method, dict(params)))
+        result: object = True
+        if api_method == "getMe":
+            result = BOT_USER
+        elif api_method == "sendMessage":
+            result = {
+                "message_id": len(self.calls),
+                "date": int(time.time()),
+                "chat": {"id": params["chat_id"], "type": "private"},
+                "text": params["text"],
+            }
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+    def sent_texts(self) -> list[str]:
+        return [params["text"] for method, params in self.calls if method == "sendMessage"]
+
+
+def _message_update(update_id: int, chat_id: int, text: str) -> dict[str, object]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "U"},
+            "text": text,
+        },
+    }
+
+
+async def _echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    message = update.effective_message
+    assert message is not None and message.text is not None
+    if message.text.startswith("slow"):
+        await asyncio.sleep(0.3)
+    await context.bot.send_message(chat_id=message.chat_id, text=f"echo:{message.text}")
+
+
+def _build(fake: FakeTelegramRequest, workers: int = 4) -> Any:
+    application = (
+        Application.builder()
+        .token("123:TEST")
+        .request(fake)
+        .get_updates_request(fake)
+        .updater(None)
+        .concurrent_updates(ChatOrderedUpdateProcessor(workers))
+        .build()
+    )
+    application.add_handler(MessageHandler(filters.TEXT, _echo))
+    return application
+
+
+def _wait_for(fake: FakeTelegramRequest, count: int, timeout: float = 5.0) -> list[str]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        texts = fake.sent_texts()
+        if len(texts) >= count:
+            return texts
+        time.sleep(0.01)
+    raise AssertionError(f"expected {count} messages, got {fake.sent_texts()}")
+
+
+def test_webhook_processes_chats_concurrently_in_order() -> None:
+    fake = FakeTelegramRequest()
+    app = build_webhook_app(
+        _build(fake), secret_token="s3cret", webhook_url="https://bot.example/hook"
+    )
+
+    with TestClient(app) as client:
+        headers = {SECRET_HEADER: "s3cret"}
+        for update in (
+            _message_update(1, 100, "slow-1"),
+            _message_update(2, 100, "after-1"),
+            _message_update(3, 200, "fast-2"),
+        ):
+            assert client.post(WEBHOOK_PATH, json=update, headers=headers).status_code == 200
+        texts = _wait_for(fake, 3)
+
+    assert any(method == "setWebhook" for method, _ in fake.calls)
+    # Chat 200 is not held up by the slow update of chat 100 ...
+    assert texts.index("echo:fast-2") < texts.index("echo:slow-1")
+    # ... while chat 100 still sees its updates in order.
+    assert texts.index("echo:slow-1") < texts.index("echo:after-1")
+
+
+def test_webhook_rejects_wrong_secret() -> None:
+    fake = FakeTelegramRequest()
+    app = build_webhook_app(_build(fake), secret_token="s3cret")
+
+    with TestClient(app) as client:
+        resp = client.post(
+            WEBHOOK_PATH,
+            json=_message_update(1, 100, "hi"),
+            headers={SECRET_HEADER: "wrong"},
+        )
+        bad = client.post(
+            WEBHOOK_PATH, content=b"not json", headers={SECRET_HEADER: "s3cret"}
+        )
+
+    assert resp.status_code == 403
+    assert bad.status_code == 400
+    assert fake.sent_texts() == []
+
+
+@pytest.mark.asyncio
+async def test_processor_bounds_workers_and_keeps_chat_order() -> None:
+    processor = ChatOrderedUpdateProcessor(workers=2, backlog=8)
+    running = 0
+    peak = 0
+    order: list[tuple[int, int]] = []
+
+    async def job(chat: int, seq: int) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (3 - seq))
+        order.append((chat, seq))
+        running -= 1
+
+    def update(chat: int, seq: int) -> Update:
+        return Update.de_json(_message_update(chat * 10 + seq, chat, "x"), None)  # type: ignore[return-value]
+
+    await asyncio.gather(
+        *(
+            processor.process_update(update(chat, seq), job(chat, seq))
+            for seq in range(3)
+            for chat in (1, 2, 3)
+        )
+    )
+
+    assert peak <= 2
+    for chat in (1, 2, 3):
+        assert [seq for c, seq in order if c == chat] == [0, 1, 2]
+    assert processor.pending == 0
@@ -408,3 +408,48 @@ def _dispose_openai_clients_after_test() -> Iterator[None]:
     from services.api.app.diabetes.services.gpt_client import dispose_openai_clients
 
     asyncio.run(dispose_openai_clients())
+
+
+@pytest.fixture(autouse=True)
+def _reset_outbound_dispatcher() -> Iterator[None]:
+    """Give every test fresh outbound rate-limit buckets."""
+    yield
+    from services.api.app.diabetes.utils.outbound import reset_dispatcher
+
+    reset_dispatcher()
+
+
+@pytest.fixture(autouse=True)
+def _reset_learning_store() -> Iterator[None]:
+    """Drop learning state staged but not written by the previous test."""
+    yield
+    from services.api.app.assistant.services.learning_store import reset_store
+
+    reset_store()
+
+
+@pytest.fixture(autouse=True)
+def _reset_vision_cache() -> Iterator[None]:
+    """Do not let a cached Vision answer leak into the next test."""
+    yield
+    from services.api.app.diabetes.vision_cache import reset_cache
+
+    reset_cache()
+
+
+@pytest.fixture(autouse=True)
+def _reset_lab_documents() -> Iterator[None]:
+    """Forget lab PDF texts cached by the previous test."""
+    yield
+    from services.api.app.diabetes.lab_documents import reset_cache
+
+    reset_cache()
+
+
+@pytest.fixture(autouse=True)
+def _reset_curriculum_index() -> Iterator[None]:
+    """Do not serve lessons cached from the previous test's database."""
+    yield
+    from services.api.app.diabetes.curriculum_index import reset_index
+
+    reset_index()
@@ -35,19 +35,13 @@ class DummyMessage:
 
 @pytest.mark.asyncio
 async def test_start_lesson_unknown_slug(monkeypatch: pytest.MonkeyPatch) -> None:
-    async def fake_run_db(fn, *args: object, **kwargs: object) -> object:
-        class DummyResult:
-            def scalar_one_or_none(self) -> None:
-                return None
-
-        class DummySession:
-            def execute(
-                self, *args: object, **kwargs: object
-            ) -> DummyResult:  # pragma: no cover - helper
-                return DummyResult()
+    async def fake_get_lesson_by_slug(slug: str) -> None:
+        return None
 
-        return fn(DummySession())
+    async def fake_run_db(*args: object, **kwargs: object) -> None:
+        raise AssertionError("run_db should not be called")
 
+    monkeypatch.setattr(curriculum_engine, "get_lesson_by_slug", fake_get_lesson_by_slug)
     monkeypatch.setattr(curriculum_engine.db, "run_db", fake_run_db)
 
     with pytest.raises(LessonNotFoundError) as excinfo:
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from services.api.app.config import settings
+from services.api.app.diabetes import lab_documents
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for lines in pages:
+        y = 800
+        for line in lines:
+            pdf.drawString(40, y, line)
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def thread_pool(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(lab_documents, "_get_pool", lambda: pool)
+    yield
+    pool.shutdown(wait=False)
+
+
+def test_read_pdf_text_stops_after_results() -> None:
+    data = make_pdf(
+        [
+            ["Clinic report", "Patient: Ivanov"],
+            ["Glucose: 5.1 (3.3-5.5)", "ALT: 41 (10-40)"],
+            ["Comments and terms of service"],
+            ["Glucose: 99"],
+        ]
+    )
+
+    result = lab_documents.read_pdf_text(data, max_pages=10)
+
+    assert result.total_pages == 4
+    assert result.pages_read == 3
+    assert "Glucose: 5.1" in result.text
+    assert "Comments" not in result.text
+    assert "99" not in result.text
+
+
+def test_read_pdf_text_respects_page_limit() -> None:
+    data = make_pdf([[f"Page {n}"] for n in range(5)])
+
+    result = lab_documents.read_pdf_text(data, max_pages=2)
+
+    assert result.pages_read == 2
+    assert "Page 1" in result.text
+    assert "Page 2" not in result.text
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_caches_by_key(
+    monkeypatch: pytest.MonkeyPatch, thread_pool: None
+) -> None:
+    calls: list[bytes] = []
+
+    def fake_read(data: bytes, max_pages: int) -> lab_documents.PdfText:
+        calls.append(data)
+        return lab_documents.PdfText("Glucose: 5", 1, 1)
+
+    monkeypatch.setattr(lab_documents, "read_pdf_text", fake_read)
+
+    first = await lab_documents.extract_pdf_text(b"%PDF", cache_key="uniq")
+    second = await lab_documents.extract_pdf_text(b"other bytes", cache_key="uniq")
+
+    assert first == second == "Glucose: 5"
+    assert calls == [b"%PDF"]
+    assert lab_documents.cached_text("uniq") == "Glucose: 5"
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_refuses_large_documents(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "labs_pdf_max_bytes", 10)
+
+    with pytest.raises(lab_documents.DocumentTooLargeError):
+        await lab_documents.extract_pdf_text(b"x" * 11)
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_times_out(
+    monkeypatch: pytest.MonkeyPatch, thread_pool: None
+) -> None:
+    def slow_read(data: bytes, max_pages: int) -> lab_documents.PdfText:
+        time.sleep(0.5)
+        return lab_documents.PdfText("late", 1, 1)
+
+    monkeypatch.setattr(lab_documents, "read_pdf_text", slow_read)
+    monkeypatch.setattr(settings, "labs_pdf_timeout_sec", 0.05)
+
+    with pytest.raises(lab_documents.DocumentTimeoutError):
+        await lab_documents.extract_pdf_text(b"%PDF", cache_key="slow")
+    await asyncio.sleep(0)
+    assert lab_documents.cached_text("slow") is None
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_in_worker_process() -> None:
+    data = make_pdf([["Glucose: 5.1 (3.3-5.5)"]])
+    try:
+        text = await lab_documents.extract_pdf_text(data)
+    finally:
+        lab_documents.shutdown_pool()
+
+    assert text is not None
+    assert "Glucose: 5.1" in text
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
@@ -8,24 +10,107 @@ import pytest
 from pypdf.errors import PdfReadError
 from telegram.error import TelegramError
 
-from services.api.app.diabetes import labs_handlers
+from services.api.app.config import settings
+from services.api.app.diabetes import lab_documents, labs_handlers
 
 
-def test_extract_text_from_file_logs_pdf_error(
-    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+@pytest.fixture
+def thread_pool(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Read PDFs in a thread so monkeypatches reach the reader."""
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(lab_documents, "_get_pool", lambda: pool)
+    yield
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_read_file_text_logs_pdf_error(
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    thread_pool: None,
 ) -> None:
     def fake_pdf_reader(_: object) -> None:
         raise PdfReadError("boom")
 
-    monkeypatch.setattr(labs_handlers, "PdfReader", fake_pdf_reader)
+    monkeypatch.setattr(lab_documents, "PdfReader", fake_pdf_reader)
 
     with caplog.at_level(logging.WARNING):
-        result = labs_handlers._extract_text_from_file(b"example", "application/pdf")
+        result = await labs_handlers._read_file_text(
+            b"example", "application/pdf", None
+        )
 
     assert result == "example"
     assert "Failed to read PDF" in caplog.text
 
 
+@pytest.mark.asyncio
+async def test_labs_handler_reuses_text_of_known_document(
+    monkeypatch: pytest.MonkeyPatch, thread_pool: None
+) -> None:
+    monkeypatch.setattr(
+        lab_documents,
+        "read_pdf_text",
+        lambda data, max_pages: lab_documents.PdfText("Глюкоза: 5 (3.3-5.5)", 1, 1),
+    )
+    download = AsyncMock(return_value=(b"%PDF-1.4", "application/pdf"))
+    monkeypatch.setattr(labs_handlers, "_download_file", download)
+    monkeypatch.setattr(labs_handlers, "build_main_keyboard", lambda: None)
+
+    replies: list[str] = []
+    for _ in range(2):
+        message = SimpleNamespace(
+            text=None,
+            document=SimpleNamespace(
+                file_id="fid",
+                file_unique_id="uniq",
+                file_size=100,
+                mime_type="application/pdf",
+            ),
+            photo=None,
+            reply_text=AsyncMock(),
+        )
+        ctx = SimpleNamespace(user_data={"waiting_labs": True})
+        await labs_handlers.labs_handler(
+            SimpleNamespace(effective_message=message), ctx
+        )
+        replies.append(message.reply_text.await_args.args[0])
+
+    download.assert_awaited_once()
+    assert replies[0] == replies[1]
+    assert "Глюкоза" in replies[0]
+
+
+@pytest.mark.asyncio
+async def test_labs_handler_refuses_large_pdf_before_download(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "labs_pdf_max_bytes", 1000)
+    download = AsyncMock()
+    monkeypatch.setattr(labs_handlers, "_download_file", download)
+    message = SimpleNamespace(
+        text=None,
+        document=SimpleNamespace(
+            file_id="fid",
+            file_unique_id="big",
+            file_size=5000,
+            mime_type="application/pdf",
+        ),
+        photo=None,
+        reply_text=AsyncMock(),
+    )
+    ctx = SimpleNamespace(user_data={"waiting_labs": True})
+
+    result = await labs_handlers.labs_handler(
+        SimpleNamespace(effective_message=message), ctx
+    )
+
+    assert result == labs_handlers.END
+    download.assert_not_awaited()
+    message.reply_text.assert_awaited_once_with(labs_handlers.TOO_LARGE_REPLY)
+    assert "waiting_labs" not in ctx.user_data
+
+
 @pytest.mark.asyncio
 async def test_download_document_logs_and_returns_none(
     caplog: pytest.LogCaptureFixture,
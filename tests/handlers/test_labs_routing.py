@@ -60,6 +60,7 @@ async def app_with_handlers(
     settings = SimpleNamespace(
         learning_mode_enabled=False,
         assistant_mode_timeout_sec=60,
+        onboarding_metrics_interval_sec=0,
     )
     monkeypatch.setattr("services.api.app.config.reload_settings", lambda: settings)
     monkeypatch.setattr(registration, "register_profile_handlers", lambda app: None)
@@ -510,7 +510,9 @@ async def test_photo_handler_typing_action_error(
 
 
 @pytest.mark.asyncio
-async def test_photo_handler_value_error(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_photo_handler_value_error(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
     class DummyMessage:
         def __init__(self) -> None:
             self.photo: tuple[Any, ...] = ()
@@ -550,7 +552,7 @@ async def test_photo_handler_value_error(monkeypatch: pytest.MonkeyPatch) -> Non
 
     monkeypatch.setattr(photo_handlers, "extract_nutrition_info", raise_value)
 
-    path = Path("p.jpg")
+    path = tmp_path / "p.jpg"
     path.write_text("img")
 
     message = DummyMessage()
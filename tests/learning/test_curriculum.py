@@ -10,7 +10,7 @@ from services.api.app.diabetes.curriculum_engine import (
     next_step,
     start_lesson,
 )
-from services.api.app.diabetes import curriculum_engine
+from services.api.app.diabetes import curriculum_engine, curriculum_index
 from collections.abc import Mapping
 from services.api.app.diabetes.learning_fixtures import load_lessons
 from services.api.app.diabetes.prompts import LESSONS_V0_PATH, disclaimer
@@ -89,6 +89,7 @@ async def test_happy_path_one_lesson(monkeypatch: pytest.MonkeyPatch) -> None:
         assert q is not None
         q.question = q.question + "??"
         session.commit()
+    curriculum_index.bump_version()
 
     question_text, completed = await next_step(1, lesson_id, {})
     assert completed is False
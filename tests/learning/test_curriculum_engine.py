@@ -401,24 +401,20 @@ async def test_next_step_lesson_not_found(monkeypatch: pytest.MonkeyPatch) -> No
 
     async def fake_run_db(fn, *args: object, **kwargs: object) -> object:
         class DummySession:
-            def __init__(self) -> None:
-                self.calls = 0
-
             def execute(self, *args: object, **kwargs: object) -> object:  # pragma: no cover - helper
-                self.calls += 1
-                call = self.calls
-
                 class DummyResult:
                     def scalar_one_or_none(self) -> object | None:
-                        if call == 1:
-                            return progress
-                        return None
+                        return progress
 
                 return DummyResult()
 
         return fn(DummySession())
 
+    async def fake_get_lesson(lesson_id: int) -> None:
+        return None
+
     monkeypatch.setattr(db, "run_db", fake_run_db)
+    monkeypatch.setattr(curriculum_engine, "get_lesson", fake_get_lesson)
 
     with pytest.raises(LessonNotFoundError):
         await next_step(1, 1, {})
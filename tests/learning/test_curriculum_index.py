@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app.diabetes import curriculum_index
+from services.api.app.diabetes.learning_fixtures import load_lessons
+from services.api.app.diabetes.models_learning import Lesson, LessonStep
+from services.api.app.diabetes.services import db
+
+
+def _setup_db() -> sessionmaker[Session]:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    db.Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, class_=Session)
+
+
+def _write_lessons(tmp_path: Path, slugs: list[str]) -> Path:
+    path = tmp_path / "lessons.json"
+    lessons = [
+        {
+            "slug": slug,
+            "title": slug.upper(),
+            "steps": [f"{slug} 1", f"{slug} 2"],
+            "quiz": [{"question": "q?", "options": ["a", "b"], "answer": 1}],
+        }
+        for slug in slugs
+    ]
+    path.write_text(json.dumps(lessons), encoding="utf-8")
+    return path
+
+
+@pytest.mark.asyncio
+async def test_index_is_loaded_once(tmp_path: Path) -> None:
+    SessionLocal = _setup_db()
+    await load_lessons(_write_lessons(tmp_path, ["a", "b"]), sessionmaker=SessionLocal)
+
+    index = await curriculum_index.get_index(sessionmaker=SessionLocal)
+    assert [lesson.slug for lesson in index.lessons] == ["a", "b"]
+    lesson = index.by_slug["a"]
+    assert index.by_id[lesson.id] is lesson
+    assert lesson.steps == ("a 1", "a 2")
+    assert lesson.questions[0].options == ("a", "b")
+    assert lesson.questions[0].correct_option == 1
+
+    assert await curriculum_index.get_index(sessionmaker=SessionLocal) is index
+
+
+@pytest.mark.asyncio
+async def test_loading_fixtures_invalidates_index(tmp_path: Path) -> None:
+    SessionLocal = _setup_db()
+    await load_lessons(_write_lessons(tmp_path, ["a"]), sessionmaker=SessionLocal)
+    first = await curriculum_index.get_index(sessionmaker=SessionLocal)
+
+    await load_lessons(_write_lessons(tmp_path, ["b"]), sessionmaker=SessionLocal)
+    second = await curriculum_index.get_index(sessionmaker=SessionLocal)
+
+    assert second.version > first.version
+    assert "b" in second.by_slug
+
+
+@pytest.mark.asyncio
+async def test_miss_reloads_new_lessons() -> None:
+    SessionLocal = _setup_db()
+    assert await curriculum_index.get_lesson_by_slug("new", sessionmaker=SessionLocal) is None
+
+    with SessionLocal() as session:
+        lesson = Lesson(slug="new", title="New", content="", is_active=True)
+        session.add(lesson)
+        session.flush()
+        session.add(LessonStep(lesson_id=lesson.id, step_order=1, content="s1"))
+        session.commit()
+        lesson_id = lesson.id
+
+    entry = await curriculum_index.get_lesson(lesson_id, sessionmaker=SessionLocal)
+    assert entry is not None
+    assert entry.steps == ("s1",)
+
+
+@pytest.mark.asyncio
+async def test_reload_in_another_process_is_picked_up(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    SessionLocal = _setup_db()
+    path = _write_lessons(tmp_path, ["a"])
+    await load_lessons(path, sessionmaker=SessionLocal)
+    first = await curriculum_index.get_index(sessionmaker=SessionLocal)
+
+    # The fixture loader runs as a separate process: its local bump is lost.
+    monkeypatch.setattr(curriculum_index, "bump_version", lambda: None)
+    path.write_text(
+        json.dumps([{"slug": "a", "title": "A", "steps": ["edited"], "quiz": []}]),
+        encoding="utf-8",
+    )
+    await load_lessons(path, sessionmaker=SessionLocal)
+    assert await curriculum_index.get_index(sessionmaker=SessionLocal) is first
+
+    monkeypatch.setattr(curriculum_index, "CHECK_INTERVAL", 0.0)
+    second = await curriculum_index.get_index(sessionmaker=SessionLocal)
+    assert second is not first
+    assert second.by_slug["a"].steps == ("edited",)
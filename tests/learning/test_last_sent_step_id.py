@@ -2,6 +2,7 @@ import pytest
 from types import SimpleNamespace
 from typing import Any
 
+from services.api.app.assistant.services import learning_store
 from services.api.app.diabetes import learning_handlers
 from services.api.app.diabetes.models_learning import ProgressData
 
@@ -72,27 +73,25 @@ async def test_last_sent_step_id_updates(monkeypatch: pytest.MonkeyPatch) -> Non
     monkeypatch.setattr(learning_handlers.plans_repo, "create_plan", fake_create_plan)
     monkeypatch.setattr(learning_handlers.plans_repo, "update_plan", fake_update_plan)
 
+    monkeypatch.setattr(learning_handlers.settings, "learning_flush_delay_sec", 0)
     calls: list[ProgressData] = []
 
-    async def spy_upsert(uid: int, pid: int, data: ProgressData) -> None:
-        calls.append(data.copy())
+    async def fake_run_db(_fn: object, batch: Any, **_kwargs: object) -> set[int]:
+        calls.extend(entry.progress for entry in batch.values() if entry.progress)
+        return set()
 
-    monkeypatch.setattr(learning_handlers.progress_repo, "upsert_progress", spy_upsert)
+    monkeypatch.setattr(learning_store, "run_db", fake_run_db)
 
     user_data: dict[str, Any] = {}
-    bot_data: dict[str, object] = {}
 
     msg1 = DummyMessage()
-    await learning_handlers._start_lesson(msg1, user_data, bot_data, {}, "intro")
+    await learning_handlers._start_lesson(msg1, user_data, {}, "intro")
 
-    assert calls[0]["last_sent_step_id"] == 2
-    progress_map = bot_data[learning_handlers.PROGRESS_KEY]
-    assert progress_map[1]["last_sent_step_id"] == 2
+    assert calls[-1]["last_sent_step_id"] == 2
 
-    context = SimpleNamespace(user_data=user_data, bot_data=bot_data)
+    context = SimpleNamespace(user_data=user_data, bot_data={})
     msg2 = DummyMessage(text="answer")
     update = SimpleNamespace(message=msg2, effective_user=msg2.from_user)
     await learning_handlers.lesson_answer_handler(update, context)
 
     assert calls[-1]["last_sent_step_id"] == 3
-    assert progress_map[1]["last_sent_step_id"] == 3
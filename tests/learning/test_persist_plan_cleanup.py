@@ -5,24 +5,55 @@ from typing import Any
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
 
+from services.api.app.assistant.services import learning_store
 from services.api.app.diabetes import learning_handlers
 
 
 @pytest.mark.asyncio
-async def test_persist_removes_plan_id_on_error(
+async def test_failed_flush_keeps_state_queued(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     user_data: dict[str, Any] = {
         "learning_plan": ["step1"],
         "learning_plan_id": 1,
     }
-    bot_data: dict[str, object] = {}
 
-    async def fail_update_plan(plan_id: int, plan_json: list[str]) -> None:
+    async def fail_run_db(*_args: object, **_kwargs: object) -> set[int]:
         raise SQLAlchemyError("fail")
 
-    monkeypatch.setattr(learning_handlers.plans_repo, "update_plan", fail_update_plan)
+    monkeypatch.setattr(learning_store, "run_db", fail_run_db)
 
-    await learning_handlers._persist(1, user_data, bot_data)
+    await learning_handlers._persist(1, user_data)
+    with pytest.raises(SQLAlchemyError):
+        await learning_store.flush()
+
+    assert learning_store.has_pending(1)
+    assert user_data["learning_plan_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_persist_removes_plan_id_of_deleted_plan(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    user_data: dict[str, Any] = {
+        "learning_plan": ["step1"],
+        "learning_plan_id": 1,
+    }
+
+    async def missing_run_db(*_args: object, **_kwargs: object) -> set[int]:
+        return {1}
+
+    async def fail_get_active_plan(user_id: int) -> None:
+        raise SQLAlchemyError("fail")
+
+    monkeypatch.setattr(learning_store, "run_db", missing_run_db)
+    monkeypatch.setattr(
+        learning_handlers.plans_repo, "get_active_plan", fail_get_active_plan
+    )
+
+    await learning_handlers._persist(1, user_data)
+    await learning_store.flush()
+    await learning_handlers._persist(1, user_data)
 
     assert "learning_plan_id" not in user_data
+    assert not learning_store.has_pending(1)
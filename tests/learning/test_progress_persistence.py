@@ -5,6 +5,7 @@ from typing import Any
 
 import pytest
 
+from services.api.app.assistant.services import learning_store
 from services.api.app.diabetes import learning_handlers
 from services.api.app.diabetes.learning_state import LearnState, set_state
 from services.api.app.diabetes.models_learning import ProgressData
@@ -19,20 +20,18 @@ async def test_persist_saves_progress(monkeypatch: pytest.MonkeyPatch) -> None:
     }
     state = LearnState(topic="intro", step=2, last_step_text="s", prev_summary="p")
     set_state(user_data, state)
-    bot_data: dict[str, object] = {}
 
-    calls: list[tuple[int, int, ProgressData]] = []
+    batches: list[dict[tuple[int, int], Any]] = []
 
-    async def fake_update_plan(plan_id: int, plan_json: list[str]) -> None:
-        return None
-
-    async def fake_upsert(uid: int, pid: int, data: ProgressData) -> None:
-        calls.append((uid, pid, data))
+    async def fake_run_db(_fn: object, batch: Any, **_kwargs: object) -> set[int]:
+        batches.append(batch)
+        return set()
 
-    monkeypatch.setattr(learning_handlers.plans_repo, "update_plan", fake_update_plan)
-    monkeypatch.setattr(learning_handlers.progress_repo, "upsert_progress", fake_upsert)
+    monkeypatch.setattr(learning_store, "run_db", fake_run_db)
 
-    await learning_handlers._persist(1, user_data, bot_data)
+    await learning_handlers._persist(1, user_data)
+    assert learning_store.has_pending(1)
+    await learning_store.flush()
 
     expected: ProgressData = {
         "topic": "intro",
@@ -42,9 +41,41 @@ async def test_persist_saves_progress(monkeypatch: pytest.MonkeyPatch) -> None:
         "prev_summary": "p",
         "last_sent_step_id": None,
     }
-    progress_map = bot_data[learning_handlers.PROGRESS_KEY]
-    assert progress_map == {1: expected}
-    assert calls == [(1, 1, expected)]
+    assert len(batches) == 1
+    entry = batches[0][(1, 1)]
+    assert entry.plan_json == ["a"]
+    assert entry.progress == expected
+    assert not learning_store.has_pending(1)
+
+
+@pytest.mark.asyncio
+async def test_persist_skips_unchanged_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    user_data: dict[str, Any] = {"learning_plan": ["a", "b"], "learning_plan_id": 1}
+    set_state(user_data, LearnState(topic="intro", step=1, last_step_text="s"))
+
+    batches: list[dict[tuple[int, int], Any]] = []
+
+    async def fake_run_db(_fn: object, batch: Any, **_kwargs: object) -> set[int]:
+        batches.append(batch)
+        return set()
+
+    monkeypatch.setattr(learning_store, "run_db", fake_run_db)
+
+    await learning_handlers._persist(1, user_data)
+    await learning_handlers._persist(1, user_data)
+    await learning_store.flush()
+    await learning_handlers._persist(1, user_data)
+    assert not learning_store.has_pending(1)
+
+    set_state(user_data, LearnState(topic="intro", step=2, last_step_text="t"))
+    await learning_handlers._persist(1, user_data)
+    await learning_store.flush()
+
+    assert len(batches) == 2
+    entry = batches[1][(1, 1)]
+    assert entry.plan_json is None
+    assert entry.progress is not None
+    assert entry.progress["step_idx"] == 2
 
 
 @pytest.mark.asyncio
@@ -37,8 +37,7 @@ async def test_start_lesson_busy_message(monkeypatch: pytest.MonkeyPatch) -> Non
 
     msg = DummyMessage()
     user_data: dict[str, object] = {}
-    bot_data: dict[str, object] = {}
 
-    await learning_handlers._start_lesson(msg, user_data, bot_data, {}, "slug")
+    await learning_handlers._start_lesson(msg, user_data, {}, "slug")
     assert msg.replies == [BUSY_MESSAGE]
     assert "lesson_id" not in user_data
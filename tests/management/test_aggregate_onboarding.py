@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta, timezone
 
 import json
 import logging
@@ -99,3 +99,140 @@ def test_main_stdout_flag(
     stdout = capsys.readouterr().out.strip()
     assert json.loads(stdout) == metrics
     assert caplog.text == ""
+
+
+def _counts(session_local: sessionmaker[SASession]) -> dict[tuple[date, str, str], int]:
+    with session_local() as session:
+        return {
+            (r.date, r.variant, r.step): r.count
+            for r in session.query(OnboardingMetricDaily).all()
+        }
+
+
+def _add_events(
+    session_local: sessionmaker[SASession], *events: tuple[str, str, datetime]
+) -> None:
+    with session_local() as session:
+        session.add_all(
+            OnboardingMetricEvent(variant=v, step=s, created_at=ts)
+            for v, s, ts in events
+        )
+        session.commit()
+
+
+def test_aggregate_incremental_upserts_new_events(
+    session_local: sessionmaker[SASession],
+) -> None:
+    now = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+    _add_events(
+        session_local,
+        ("A", "start", datetime(2024, 1, 2, 1)),
+        ("A", "start", datetime(2024, 1, 3, 1)),
+        ("B", "finish", datetime(2024, 1, 3, 2)),
+    )
+    # Pre-existing rows from a full-day run are rebuilt, not added to.
+    aggregate_onboarding.aggregate_for_date(date(2024, 1, 2), sessionmaker=session_local)
+
+    folded = aggregate_onboarding.aggregate_incremental(
+        sessionmaker=session_local, batch_size=2, now=now
+    )
+    assert folded == 3
+    assert _counts(session_local) == {
+        (date(2024, 1, 2), "A", "start"): 1,
+        (date(2024, 1, 3), "A", "start"): 1,
+        (date(2024, 1, 3), "B", "finish"): 1,
+    }
+
+    _add_events(
+        session_local,
+        ("A", "start", datetime(2024, 1, 3, 11)),
+        ("A", "step1", datetime(2024, 1, 3, 11, 59, 50)),
+    )
+    assert (
+        aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=now)
+        == 1
+    )
+    counts = _counts(session_local)
+    assert counts[(date(2024, 1, 3), "A", "start")] == 2
+    assert (date(2024, 1, 3), "A", "step1") not in counts
+
+    later = now + timedelta(minutes=1)
+    assert (
+        aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=later)
+        == 1
+    )
+    assert (
+        aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=later)
+        == 0
+    )
+    assert _counts(session_local)[(date(2024, 1, 3), "A", "step1")] == 1
+
+
+def test_first_incremental_run_keeps_days_without_stored_events(
+    session_local: sessionmaker[SASession],
+) -> None:
+    now = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+    with session_local() as session:
+        # Raw events of Jan 1 were already purged; only the rollup is left.
+        session.add(
+            OnboardingMetricDaily(date=date(2024, 1, 1), variant="A", step="start", count=7)
+        )
+        session.commit()
+    _add_events(session_local, ("A", "start", datetime(2024, 1, 2, 1)))
+
+    aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=now)
+
+    assert _counts(session_local) == {
+        (date(2024, 1, 1), "A", "start"): 7,
+        (date(2024, 1, 2), "A", "start"): 1,
+    }
+
+
+def test_watermark_is_created_once(session_local: sessionmaker[SASession]) -> None:
+    with session_local() as session:
+        assert aggregate_onboarding._create_watermark(session) is True
+        assert aggregate_onboarding._create_watermark(session) is False
+        session.commit()
+
+
+def test_backfill_leaves_events_past_watermark_to_incremental(
+    session_local: sessionmaker[SASession],
+) -> None:
+    now = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+    _add_events(session_local, ("A", "start", datetime(2024, 1, 2, 1)))
+    aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=now)
+    _add_events(
+        session_local,
+        ("A", "start", datetime(2024, 1, 2, 2)),
+        ("A", "start", datetime(2024, 1, 1, 2)),
+    )
+
+    result = aggregate_onboarding.backfill(
+        date(2024, 1, 1), date(2024, 1, 2), sessionmaker=session_local
+    )
+    assert result == {
+        "2024-01-01": [],
+        "2024-01-02": [{"variant": "A", "step": "start", "count": 1}],
+    }
+
+    aggregate_onboarding.aggregate_incremental(sessionmaker=session_local, now=now)
+    assert _counts(session_local) == {
+        (date(2024, 1, 1), "A", "start"): 1,
+        (date(2024, 1, 2), "A", "start"): 2,
+    }
+
+
+def test_main_backfill_range(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    calls: list[tuple[date, date]] = []
+
+    def fake_backfill(date_from: date, date_to: date) -> dict[str, object]:
+        calls.append((date_from, date_to))
+        return {}
+
+    monkeypatch.setattr(aggregate_onboarding, "backfill", fake_backfill)
+
+    assert aggregate_onboarding.main(["--from", "2024-01-01", "--stdout"]) == 0
+    assert calls == [(date(2024, 1, 1), date(2024, 1, 1))]
+    assert capsys.readouterr().out.strip() == "{}"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app.diabetes import dynamic_tutor, step_cache
+from services.api.app.diabetes.models_learning import LearningStepCache, LearningUserProfile
+from services.api.app.diabetes.services import db
+from services.api.app.management import warm_step_cache
+
+
+@pytest.fixture()
+def session_local(monkeypatch: pytest.MonkeyPatch) -> Iterator[sessionmaker[Session]]:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_local = sessionmaker(bind=engine, class_=Session)
+    db.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(step_cache, "SessionLocal", session_local)
+    monkeypatch.setattr(warm_step_cache, "SessionLocal", session_local)
+    step_cache.reset_memory()
+    yield session_local
+    step_cache.reset_memory()
+    engine.dispose()
+
+
+def _add_profiles(session_local: sessionmaker[Session]) -> None:
+    with session_local() as session:
+        for user_id, age_group in ((1, "adult"), (2, "adult"), (3, "teen")):
+            session.add(db.User(telegram_id=user_id, thread_id=""))
+            session.add(
+                LearningUserProfile(
+                    user_id=user_id,
+                    age_group=age_group,
+                    learning_level="novice",
+                    diabetes_type="T1",
+                )
+            )
+        session.commit()
+
+
+def test_common_profiles_orders_by_frequency(
+    session_local: sessionmaker[Session],
+) -> None:
+    _add_profiles(session_local)
+
+    profiles = warm_step_cache.common_profiles(2, sessionmaker=session_local)
+
+    assert profiles[0] == {}
+    assert profiles[1]["age_group"] == "adult"
+    assert len(profiles) == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_topic_generates_each_bucket_once(
+    monkeypatch: pytest.MonkeyPatch, session_local: sessionmaker[Session]
+) -> None:
+    prompts: list[Any] = []
+
+    async def fake_create_learning_chat_completion(**kwargs: Any) -> str:
+        prompts.append(kwargs["messages"])
+        return f"text {len(prompts)}"
+
+    monkeypatch.setattr(
+        dynamic_tutor,
+        "create_learning_chat_completion",
+        fake_create_learning_chat_completion,
+    )
+    profiles = [{}, {"age_group": "adult"}, {"age_group": "adult", "x": "y"}]
+
+    stats = await warm_step_cache.warm_topic("xe", profiles, steps=2)
+    assert stats == {"generated": 4, "cached": 0, "failed": 0}
+
+    stats = await warm_step_cache.warm_topic("xe", profiles, steps=2)
+    assert stats == {"generated": 0, "cached": 4, "failed": 0}
+    assert len(prompts) == 4
+
+    stats = await warm_step_cache.warm_topic("xe", profiles[:1], refresh=True)
+    assert stats == {"generated": 1, "cached": 0, "failed": 0}
+    with session_local() as session:
+        assert session.query(LearningStepCache).count() == 1
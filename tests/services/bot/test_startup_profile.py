@@ -0,0 +1,69 @@
+import sys
+
+import pytest
+
+from services.bot import startup_profile
+
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 | encodings
+import time:       600 |        600 |   encodings.aliases
+noise that is not an importtime line
+import time:       50 |       5050 | matplotlib
+import time:      5000 |       5000 |   matplotlib.pyplot
+"""
+
+
+def test_parse_importtime() -> None:
+    timings = startup_profile.parse_importtime(SAMPLE.splitlines())
+
+    assert [t.module for t in timings] == [
+        "_io",
+        "encodings",
+        "encodings.aliases",
+        "matplotlib",
+        "matplotlib.pyplot",
+    ]
+    assert timings[1].depth == 0
+    assert timings[2].depth == 1
+    assert timings[3].cumulative_us == 5050
+
+
+def test_slowest_imports_sums_per_package() -> None:
+    timings = startup_profile.parse_importtime(SAMPLE.splitlines())
+
+    assert startup_profile.slowest_imports(timings, top=2) == [
+        ("matplotlib", 5050),
+        ("encodings", 900),
+    ]
+    assert startup_profile.loaded_heavy_modules(timings) == ["matplotlib"]
+    assert "matplotlib" in startup_profile.format_report(timings, top=1)
+
+
+def test_record_import_profile_sets_metrics(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    timings = startup_profile.parse_importtime(SAMPLE.splitlines())
+    monkeypatch.setattr(startup_profile, "profile_imports", lambda modules: timings)
+
+    assert startup_profile.record_import_profile(top=5) == timings
+
+    sample = startup_profile.bot_import_seconds.labels(module="matplotlib")
+    assert sample._value.get() == pytest.approx(0.00505)
+
+
+def test_bot_entry_point_does_not_import_heavy_modules() -> None:
+    """Rendering and PDF libraries must only load when a handler needs them."""
+
+    timings = startup_profile.profile_imports()
+
+    assert any(t.module == "services.bot.main" for t in timings)
+    assert startup_profile.loaded_heavy_modules(timings) == []
+
+
+def test_heavy_modules_still_load_on_demand() -> None:
+    from services.api.app.diabetes.services import reporting
+
+    assert reporting.canvas is sys.modules["reportlab.pdfgen.canvas"]
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from services.api.app.assistant.services import context_builder
+from services.api.app.config import settings
+from services.api.app.diabetes import assistant_state
+from services.api.app.diabetes.utils.tokens import count_tokens
+
+
+def _turn(i: int, size: int = 40) -> str:
+    return f"user: q{i} " + "x" * size + f"\nassistant: a{i} " + "y" * size
+
+
+def test_count_tokens_empty_and_growing() -> None:
+    assert count_tokens("") == 0
+    assert 0 < count_tokens("сахар") <= count_tokens("сахар " * 10)
+
+
+def test_summarize_keeps_first_sentences() -> None:
+    turn = "user: Какой сахар в норме? Мне 40 лет.\nassistant: От 4 до 7 ммоль/л. Уточните у врача."
+    assert assistant_state.summarize([turn]) == (
+        "user: Какой сахар в норме?; assistant: От 4 до 7 ммоль/л."
+    )
+
+
+def test_compact_summary_drops_oldest_lines(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(assistant_state, "SUMMARY_MAX_CHARS", 20)
+    summary = assistant_state.compact_summary("line one\nline two", "line three")
+    assert summary == "line two\nline three"
+    assert assistant_state.compact_summary(None, "z" * 30) == "z" * 20
+
+
+def test_build_messages_fits_budget() -> None:
+    history = [_turn(i) for i in range(5)]
+    messages = context_builder.build_messages("old facts", history, "now?", budget=100)
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].endswith("old facts")
+    assert messages[-1] == {"role": "user", "content": "now?"}
+    kept = messages[1:-1]
+    assert 0 < len(kept) < 10
+    # The newest turns are kept, in order.
+    assert kept[-1]["content"].startswith("a4")
+    assert kept[-2]["content"].startswith("q4")
+    assert sum(count_tokens(m["content"]) for m in messages) <= 100
+
+
+def test_build_messages_always_sends_question() -> None:
+    messages = context_builder.build_messages(None, [_turn(0)], "q" * 400, budget=10)
+    assert messages == [{"role": "user", "content": "q" * 400}]
+
+
+@pytest.mark.asyncio
+async def test_schedule_refine_replaces_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "assistant_summary_llm", True)
+    kwargs_seen: dict[str, Any] = {}
+    saved: dict[str, Any] = {}
+
+    async def fake_completion(**kwargs: Any) -> Any:
+        kwargs_seen.update(kwargs)
+        return SimpleNamespace(
+            id="cmpl",
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" short "))],
+        )
+
+    async def fake_get_memory(user_id: int) -> None:
+        return None
+
+    async def fake_save_memory(user_id: int, **kwargs: Any) -> None:
+        saved.update(kwargs)
+
+    monkeypatch.setattr(context_builder.gpt_client, "create_chat_completion", fake_completion)
+    monkeypatch.setattr(context_builder.memory_service, "get_memory", fake_get_memory)
+    monkeypatch.setattr(context_builder.memory_service, "save_memory", fake_save_memory)
+
+    user_data: dict[str, object] = {assistant_state.SUMMARY_KEY: "long summary"}
+    context_builder.schedule_refine(1, user_data)
+    await asyncio.gather(*context_builder._tasks)
+
+    assert kwargs_seen["model"] == settings.assistant_summary_model
+    assert user_data[assistant_state.SUMMARY_KEY] == "short"
+    assert saved["summary_text"] == "short"
+
+
+@pytest.mark.asyncio
+async def test_refine_keeps_newer_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    user_data: dict[str, object] = {assistant_state.SUMMARY_KEY: "old"}
+
+    async def fake_completion(**kwargs: Any) -> Any:
+        user_data[assistant_state.SUMMARY_KEY] = "newer"
+        return SimpleNamespace(
+            id="cmpl",
+            choices=[SimpleNamespace(message=SimpleNamespace(content="refined"))],
+        )
+
+    monkeypatch.setattr(context_builder.gpt_client, "create_chat_completion", fake_completion)
+    await context_builder._refine(1, user_data, "old")
+    assert user_data[assistant_state.SUMMARY_KEY] == "newer"
+
+
+def test_schedule_refine_disabled_by_default() -> None:
+    user_data: dict[str, object] = {assistant_state.SUMMARY_KEY: "s"}
+    context_builder.schedule_refine(1, user_data)
+    assert not context_builder._tasks
@@ -5,9 +5,10 @@ from typing import Any
 
 import httpx
 import pytest
-from telegram.ext import Application, CallbackContext, ExtBot
+from telegram.ext import Application, CallbackContext, ExtBot, PicklePersistence
 
 from services.api import rest_client
+from services.api.app.diabetes.user_session import UserSession
 from services.bot.main import build_persistence
 
 
@@ -111,6 +112,29 @@ async def test_tg_init_data_persisted_and_used_by_rest_client(
     assert captured["headers"]["Authorization"] == "tg secret"
 
 
+@pytest.mark.asyncio
+async def test_dict_user_data_is_loaded_as_session(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    persistence_path = tmp_path / "data.pkl"
+    legacy: PicklePersistence[Any, Any, Any] = PicklePersistence(
+        str(persistence_path), single_file=True
+    )
+    await legacy.update_user_data(1, {"tg_init_data": "abc", "_task": None})
+    await legacy.flush()
+
+    monkeypatch.setenv("BOT_PERSISTENCE_PATH", str(persistence_path))
+    persistence = build_persistence()
+    user_data = await persistence.get_user_data()
+    assert isinstance(user_data[1], UserSession)
+    assert user_data[1]["tg_init_data"] == "abc"
+
+    await persistence.update_user_data(1, user_data[1])
+    await persistence.flush()
+    reloaded = await build_persistence().get_user_data()
+    assert dict(reloaded[1]) == {"tg_init_data": "abc"}
+
+
 def test_state_directory_override(
     tmp_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
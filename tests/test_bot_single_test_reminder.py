@@ -84,12 +84,18 @@ def test_single_test_reminder(monkeypatch: pytest.MonkeyPatch) -> None:
         def token(self, _: str) -> "DummyBuilder":
             return self
 
+        def context_types(self, _: object) -> "DummyBuilder":
+            return self
+
         def persistence(self, _: object) -> "DummyBuilder":
             return self
 
         def post_init(self, _: object) -> "DummyBuilder":
             return self
 
+        def post_shutdown(self, _: object) -> "DummyBuilder":
+            return self
+
         def build(self) -> DummyApp:
             return built_app
 
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+from typing import Iterator
+
+import pytest
+import sqlalchemy as sa
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app import config
+from services.api.app.diabetes.services import db
+from services.api.app.main import app
+from services.api.app.services import cohort, user_roles
+
+TOKEN = "test-token"
+NOW = datetime.datetime(2025, 3, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def build_init_data(user_id: int = 1, token: str = TOKEN) -> str:
+    user = json.dumps({"id": user_id, "first_name": "A"}, separators=(",", ":"))
+    params = {"auth_date": str(int(time.time())), "query_id": "abc", "user": user}
+    data_check = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    params["hash"] = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(params)
+
+
+@pytest.fixture
+def factory(monkeypatch: pytest.MonkeyPatch) -> Iterator[sessionmaker[Session]]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    db.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, class_=Session)
+    monkeypatch.setattr(db, "SessionLocal", session_factory)
+    monkeypatch.setattr(user_roles, "SessionLocal", session_factory)
+    monkeypatch.setattr(config.settings, "telegram_token", TOKEN)
+    cohort.clear_cache()
+    yield session_factory
+    cohort.clear_cache()
+    engine.dispose()
+
+
+def _seed(factory: sessionmaker[Session]) -> None:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with factory() as session:
+        session.add_all(
+            [
+                db.User(telegram_id=100, thread_id="t", org_id=7),
+                db.User(telegram_id=101, thread_id="t", org_id=8),
+                db.User(telegram_id=1, thread_id="t", org_id=7, first_name="Ann"),
+                db.User(telegram_id=2, thread_id="t", org_id=7),
+                db.User(telegram_id=3, thread_id="t", org_id=8),
+                db.UserRole(user_id=100, role="clinician"),
+                db.UserRole(user_id=101, role="clinician"),
+            ]
+        )
+        for hours, sugar in ((1, 5.0), (2, 12.0), (3, 8.0), (300, 3.0)):
+            session.add(
+                db.Entry(
+                    telegram_id=1,
+                    event_time=now - datetime.timedelta(hours=hours),
+                    sugar_before=sugar,
+                )
+            )
+        session.add_all(
+            [
+                db.Entry(telegram_id=2, event_time=now - datetime.timedelta(days=10)),
+                db.Entry(telegram_id=3, event_time=now, sugar_before=6.0),
+            ]
+        )
+        session.add_all(
+            [
+                db.Alert(user_id=1, sugar=12.0, type="hyper", ts=now, resolved=True),
+                db.Alert(user_id=1, sugar=3.0, type="hypo", ts=now, resolved=False),
+            ]
+        )
+        session.commit()
+
+
+def _get(client: TestClient, user_id: int, **params: object) -> object:
+    return client.get(
+        "/api/cohort",
+        params=params,
+        headers={"Authorization": f"tg {build_init_data(user_id)}"},
+    )
+
+
+def test_cohort_aggregates_per_patient(factory: sessionmaker[Session]) -> None:
+    _seed(factory)
+    with TestClient(app) as client:
+        resp = _get(client, 100, orgId=7, days=3)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 2
+    assert [p["telegramId"] for p in body["items"]] == [1, 2]
+    ann = body["items"][0]
+    assert ann["firstName"] == "Ann"
+    assert ann["readings"] == 3
+    assert ann["averageSugar"] == 8.33
+    assert ann["timeInRange"] == 66.7
+    assert ann["alerts"] == 2
+    assert ann["openAlerts"] == 1
+    assert ann["lastSeen"] is not None
+    empty = body["items"][1]
+    assert empty["readings"] == 0
+    assert empty["averageSugar"] is None
+    assert empty["timeInRange"] is None
+    # Last seen before the window, and still reported.
+    assert empty["lastSeen"] is not None
+
+
+def test_cohort_paginates(factory: sessionmaker[Session]) -> None:
+    _seed(factory)
+    with TestClient(app) as client:
+        first = _get(client, 100, orgId=7, pageSize=1).json()
+        second = _get(client, 100, orgId=7, pageSize=1, page=2).json()
+
+    assert [p["telegramId"] for p in first["items"]] == [1]
+    assert [p["telegramId"] for p in second["items"]] == [2]
+    assert first["total"] == second["total"] == 2
+
+
+def test_cohort_requires_clinician_of_same_org(
+    factory: sessionmaker[Session],
+) -> None:
+    _seed(factory)
+    with TestClient(app) as client:
+        assert _get(client, 1, orgId=7).status_code == 403
+        assert _get(client, 101, orgId=7).status_code == 403
+        assert client.get("/api/cohort", params={"orgId": 7}).status_code == 401
+
+
+def test_cohort_pages_are_cached(
+    factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _seed(factory)
+    calls = 0
+    query = cohort.query_cohort
+
+    def counting_query(*args: object, **kwargs: object) -> object:
+        nonlocal calls
+        calls += 1
+        return query(*args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(cohort, "query_cohort", counting_query)
+    with TestClient(app) as client:
+        _get(client, 100, orgId=7)
+        _get(client, 100, orgId=7)
+        _get(client, 100, orgId=7, page=2)
+
+    assert calls == 2
+
+
+def test_query_cohort_pages_and_readings(factory: sessionmaker[Session]) -> None:
+    patients = 3
+    days = 4
+    with factory() as session:
+        session.execute(
+            sa.insert(db.User),
+            [
+                {"telegram_id": i, "thread_id": "t", "org_id": 1}
+                for i in range(1, patients + 1)
+            ],
+        )
+        session.execute(
+            sa.insert(db.Entry),
+            [
+                {
+                    "telegram_id": i,
+                    "event_time": NOW - datetime.timedelta(days=d, hours=i),
+                    "sugar_before": 4.0 + d,
+                }
+                for i in range(1, patients + 1)
+                for d in range(days + 2)
+            ],
+        )
+        session.commit()
+
+    with factory() as session:
+        pages = [
+            cohort.query_cohort(
+                session,
+                1,
+                since=NOW - datetime.timedelta(days=days),
+                page=page,
+                page_size=2,
+            )
+            for page in (1, 2)
+        ]
+
+    assert [total for total, _ in pages] == [patients, patients]
+    items = [item for _, page_items in pages for item in page_items]
+    assert len(items) == patients
+    assert all(item.readings == days for item in items)
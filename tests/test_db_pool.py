@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from services.api.app.diabetes.metrics import (
+    db_down_seconds,
+    db_pool_checkout_wait_seconds,
+    db_pool_in_use,
+    db_pool_size,
+    get_metric_value,
+)
+from services.api.app.diabetes.services import db, monitoring
+
+
+def test_engine_options_for_postgres(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(db.settings, "db_pool_size", 7)
+    monkeypatch.setattr(db.settings, "db_max_overflow", 3)
+    monkeypatch.setattr(db.settings, "db_statement_timeout_ms", 15000)
+
+    options = db.engine_options(sa.engine.make_url("postgresql://u@h/d"))
+
+    assert options["poolclass"] is db.InstrumentedQueuePool
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=15000"}
+
+
+def test_engine_options_keep_memory_sqlite_default() -> None:
+    assert db.engine_options(sa.engine.make_url("sqlite://")) == {}
+    assert db.engine_options(sa.engine.make_url("sqlite:///:memory:")) == {}
+
+
+def test_file_sqlite_gets_wal_and_pool_metrics(tmp_path: Path) -> None:
+    url = sa.engine.make_url(f"sqlite:///{tmp_path / 'pool.db'}")
+    engine = sa.create_engine(url, **db.engine_options(url))
+    db._configure_engine(engine, url)
+    before = get_metric_value(db_pool_checkout_wait_seconds, "count")
+    try:
+        with engine.connect() as conn:
+            journal = conn.execute(sa.text("PRAGMA journal_mode")).scalar()
+            busy = conn.execute(sa.text("PRAGMA busy_timeout")).scalar()
+            in_use = get_metric_value(db_pool_in_use)
+    finally:
+        engine.dispose()
+
+    assert journal == "wal"
+    assert busy == db.settings.db_sqlite_busy_timeout_ms
+    assert in_use == 1
+    assert get_metric_value(db_pool_size) == db.settings.db_pool_size
+    assert get_metric_value(db_pool_checkout_wait_seconds, "count") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_ping_db_clears_down_gauge(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    url = sa.engine.make_url(f"sqlite:///{tmp_path / 'ping.db'}")
+    engine = sa.create_engine(url, **db.engine_options(url))
+    monkeypatch.setattr(
+        monitoring, "SessionLocal", sessionmaker(bind=engine, class_=Session)
+    )
+    db_down_seconds.set(5)
+    try:
+        await monitoring.ping_db()
+    finally:
+        engine.dispose()
+
+    assert get_metric_value(db_down_seconds) == 0
@@ -18,6 +18,7 @@ def _reload(module: str) -> ModuleType:
 class DummyEngine:
     def __init__(self, url: Any) -> None:
         self.url = url
+        self.pool = None
         self.disposed = False
 
     def dispose(self) -> None:
@@ -45,7 +46,7 @@ def test_init_db_recreates_engine_on_url_change(
 
     created: list[DummyEngine] = []
 
-    def fake_create_engine(url: Any) -> DummyEngine:
+    def fake_create_engine(url: Any, **kwargs: Any) -> DummyEngine:
         engine = DummyEngine(url)
         created.append(engine)
         return engine
@@ -4,6 +4,7 @@ import re
 from dataclasses import dataclass
 from types import SimpleNamespace
 from typing import Any, cast
+from unittest.mock import AsyncMock
 
 from sqlalchemy import create_engine
 
@@ -11,6 +12,7 @@ import pytest
 from telegram import Update
 from telegram.ext import CallbackContext, ConversationHandler, MessageHandler, filters
 
+from services.api.app.config import settings
 from services.api.app.diabetes.handlers import dose_calc, photo_handlers
 from services.api.app.diabetes.utils.constants import XE_GRAMS
 
@@ -216,7 +218,7 @@ async def test_dose_sugar_success(monkeypatch: pytest.MonkeyPatch) -> None:
     profile = DummyProfile(icr=10.0, cf=2.0, target_bg=5.5)
 
     monkeypatch.setattr(dose_calc, "SessionLocal", lambda: DummySession(profile))
-    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient: 3.0)
+    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient, **kwargs: 3.0)
     monkeypatch.setattr(dose_calc, "confirm_keyboard", lambda: "confirm")
 
     result = await dose_calc.dose_sugar(
@@ -241,7 +243,7 @@ async def test_dose_sugar_converts_xe(monkeypatch: pytest.MonkeyPatch) -> None:
     profile = DummyProfile(icr=10.0, cf=2.0, target_bg=5.5)
 
     monkeypatch.setattr(dose_calc, "SessionLocal", lambda: DummySession(profile))
-    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient: 3.0)
+    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient, **kwargs: 3.0)
     monkeypatch.setattr(dose_calc, "confirm_keyboard", lambda: "confirm")
 
     result = await dose_calc.dose_sugar(
@@ -258,6 +260,40 @@ async def test_dose_sugar_converts_xe(monkeypatch: pytest.MonkeyPatch) -> None:
     assert entry["carbs_g"] == XE_GRAMS * 2.0
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("enabled", [False, True])
+async def test_dose_sugar_subtracts_iob_only_when_enabled(
+    enabled: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    update, context = make_update_context("6")
+    context.user_data["pending_entry"] = {"carbs_g": 30.0}
+    profile = DummyProfile(icr=10.0, cf=2.0, target_bg=5.5)
+    calls: list[Any] = []
+
+    def fake_calc_bolus(carbs: float, sugar: float, patient: Any, **kwargs: Any) -> float:
+        calls.append(kwargs.get("iob"))
+        return 3.0
+
+    on_board = AsyncMock(return_value=1.5)
+    monkeypatch.setattr(settings, "iob_enabled", enabled)
+    monkeypatch.setattr(dose_calc, "SessionLocal", lambda: DummySession(profile))
+    monkeypatch.setattr(dose_calc, "calc_bolus", fake_calc_bolus)
+    monkeypatch.setattr(dose_calc, "_insulin_on_board", on_board)
+    monkeypatch.setattr(dose_calc, "confirm_keyboard", lambda: "confirm")
+
+    await dose_calc.dose_sugar(
+        cast(Update, update),
+        cast(
+            CallbackContext[Any, dict[str, Any], dict[str, Any], dict[str, Any]],
+            context,
+        ),
+    )
+
+    assert on_board.called is enabled
+    assert calls == [1.5 if enabled else 0.0]
+    assert ("Активный инсулин" in update.message.replies[-1]) is enabled
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("dtype", ["unknown", "t2_no"])
 async def test_dose_sugar_skips_for_unsupported_types(dtype: str, monkeypatch: pytest.MonkeyPatch) -> None:
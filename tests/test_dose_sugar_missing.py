@@ -106,7 +106,7 @@ async def test_dose_sugar_uses_async_db(monkeypatch: pytest.MonkeyPatch) -> None
         return func()
 
     monkeypatch.setattr(asyncio, "to_thread", fake_to_thread)
-    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient: 1.0)
+    monkeypatch.setattr(dose_calc, "calc_bolus", lambda carbs, sugar, patient, **kwargs: 1.0)
     monkeypatch.setattr(dose_calc, "confirm_keyboard", lambda: "confirm")
 
     result = await dose_calc.dose_sugar(update, context)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import time
+import urllib.parse
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.api.app.main as server
+from services.api.app.config import settings
+from services.api.app.diabetes.services import db
+from services.api.app.services import export
+from services.api.app.telegram_auth import TG_INIT_DATA_HEADER
+
+TOKEN = "test-token"
+
+
+def build_init_data(user_id: int = 1) -> str:
+    user = json.dumps({"id": user_id, "first_name": "A"}, separators=(",", ":"))
+    params = {"auth_date": str(int(time.time())), "query_id": "abc", "user": user}
+    data_check = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret = hmac.new(b"WebAppData", TOKEN.encode(), hashlib.sha256).digest()
+    params["hash"] = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(params)
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    db.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, class_=Session)
+    monkeypatch.setattr(db, "SessionLocal", factory)
+    monkeypatch.setattr(settings, "telegram_token", TOKEN)
+    with factory() as session:
+        session.add_all(
+            [db.User(telegram_id=1, thread_id="t"), db.User(telegram_id=2, thread_id="t")]
+        )
+        for day in (1, 2, 3):
+            session.add(
+                db.Entry(
+                    telegram_id=1,
+                    event_time=datetime.datetime(
+                        2024, 1, day, 8, tzinfo=datetime.timezone.utc
+                    ),
+                    sugar_before=5.0 + day,
+                    carbs_g=30.0,
+                    dose=2.0 if day == 1 else None,
+                )
+            )
+        session.add(
+            db.Entry(
+                telegram_id=2,
+                event_time=datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc),
+                sugar_before=9.9,
+            )
+        )
+        session.add(
+            db.HistoryRecord(
+                id="h1",
+                telegram_id=1,
+                date=datetime.date(2024, 1, 2),
+                time=datetime.time(12, 30),
+                type="measurement",
+                sugar=7.5,
+                notes="после обеда",
+            )
+        )
+        session.commit()
+    with TestClient(server.app) as test_client:
+        yield test_client
+    engine.dispose()
+
+
+def _headers(user_id: int = 1) -> dict[str, str]:
+    return {TG_INIT_DATA_HEADER: build_init_data(user_id)}
+
+
+def test_export_requires_auth(client: TestClient) -> None:
+    assert client.get("/api/export").status_code == 401
+
+
+def test_export_ndjson(client: TestClient) -> None:
+    resp = client.get("/api/export", headers=_headers())
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["kind"] for r in rows] == ["entry", "entry", "entry", "history"]
+    assert [r["sugar_before"] for r in rows[:3]] == [6.0, 7.0, 8.0]
+    assert rows[3]["notes"] == "после обеда"
+    assert rows[3]["time"] == "12:30:00"
+    assert rows[0]["insulin_short"] == 2.0
+    assert "dose" not in rows[0]
+
+
+def test_export_csv_with_date_range(client: TestClient) -> None:
+    resp = client.get(
+        "/api/export",
+        params={"format": "csv", "dateFrom": "2024-01-02", "dateTo": "2024-01-02"},
+        headers=_headers(),
+    )
+
+    assert resp.status_code == 200
+    assert "diary-export.csv" in resp.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["kind"] for r in rows] == ["entry", "history"]
+    assert rows[0]["sugar_before"] == "7.0"
+    assert rows[0]["insulin_short"] == ""
+
+
+def test_export_gzip_history_only(client: TestClient) -> None:
+    resp = client.get(
+        "/api/export", params={"kind": "history", "gzip": "true"}, headers=_headers()
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(resp.content).decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["h1"]
+
+
+def test_export_rejects_inverted_range(client: TestClient) -> None:
+    resp = client.get(
+        "/api/export",
+        params={"dateFrom": "2024-02-01", "dateTo": "2024-01-01"},
+        headers=_headers(),
+    )
+    assert resp.status_code == 400
+
+
+def test_chunked_flushes_in_bounded_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(export, "EXPORT_CHUNK_BYTES", 100)
+    lines = (f"{i:09d}\n" for i in range(1000))
+
+    chunks = list(export.chunked(lines))
+
+    assert len(chunks) > 50
+    assert max(len(c) for c in chunks) < 200
+    assert b"".join(chunks).count(b"\n") == 1000
@@ -543,6 +543,44 @@ async def test_create_chat_completion_retry(monkeypatch: pytest.MonkeyPatch) ->
     assert calls == 2
 
 
+@pytest.mark.asyncio
+async def test_create_chat_completion_records_latency_and_tokens(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from services.api.app.diabetes.metrics import (
+        get_metric_value,
+        openai_request_seconds,
+        openai_tokens_total,
+    )
+
+    async def fake_create(**_: object) -> object:
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=5)
+        )
+
+    fake_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create))
+    )
+
+    async def fake_get_async_client() -> SimpleNamespace:
+        return fake_client
+
+    monkeypatch.setattr(gpt_client, "_get_async_client", fake_get_async_client)
+
+    latency = openai_request_seconds.labels(model="m-metrics", task="unit", outcome="ok")
+    prompt = openai_tokens_total.labels(model="m-metrics", task="unit", kind="prompt")
+    completion = openai_tokens_total.labels(
+        model="m-metrics", task="unit", kind="completion"
+    )
+    before = get_metric_value(latency, "count")
+
+    await gpt_client.create_chat_completion(model="m-metrics", messages=[], task="unit")
+
+    assert get_metric_value(latency, "count") == before + 1
+    assert get_metric_value(prompt) == 12
+    assert get_metric_value(completion) == 5
+
+
 @pytest.mark.asyncio
 async def test_create_chat_completion_without_api_key(
     monkeypatch: pytest.MonkeyPatch,
@@ -644,3 +682,49 @@ def test_validate_image_path_rejects_similar_prefix(
     monkeypatch.setattr(settings, "photos_dir", str(root))
     with pytest.raises(ValueError):
         gpt_client._validate_image_path(str(tmp_path / "photos2" / "img.jpg"))
+
+
+@pytest.mark.asyncio
+async def test_analyze_photo_sends_inline_image_and_parses_json(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    captured: dict[str, Any] = {}
+
+    async def fake_create_chat_completion(**kwargs: Any) -> object:
+        captured.update(kwargs)
+        content = (
+            '{"name": "Гречка с курицей", "weight_g": 250, "protein_g": 20,'
+            ' "fat_g": 8.5, "carbs_g": 45, "calories_kcal": 420, "xe": 3.5}'
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+    monkeypatch.setattr(gpt_client, "create_chat_completion", fake_create_chat_completion)
+    monkeypatch.setattr(settings, "vision_model", "gpt-vision")
+
+    text, info = await gpt_client.analyze_photo(b"\x89PNGdata", prompt="Что на фото?")
+
+    assert captured["model"] == "gpt-vision"
+    assert captured["response_format"] is gpt_client.PHOTO_NUTRITION_FORMAT
+    content = captured["messages"][0]["content"]
+    assert content[0] == {"type": "text", "text": "Что на фото?"}
+    assert content[1]["image_url"]["url"].startswith("data:image/png;base64,")
+    assert info.carbs_g == 45 and info.xe == 3.5 and info.fat_g == 8.5
+    assert text.splitlines()[0] == "Гречка с курицей"
+    assert "Углеводы: 45 г" in text
+
+
+def test_parse_photo_nutrition_drops_invalid_values() -> None:
+    text, info = gpt_client.parse_photo_nutrition(
+        '{"name": "", "weight_g": null, "protein_g": -1, "fat_g": true,'
+        ' "carbs_g": "30", "calories_kcal": 100, "xe": null}'
+    )
+
+    assert info == gpt_client.NutritionInfo(calories_kcal=100)
+    assert text == "Блюдо\nКалории: 100 ккал"
+
+
+def test_parse_photo_nutrition_rejects_plain_text() -> None:
+    with pytest.raises(ValueError):
+        gpt_client.parse_photo_nutrition("Гречка, углеводы 45 г")
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import io
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from services.api.app.diabetes.utils.image_pipeline import (
+    MAX_BYTES,
+    MAX_LONG_SIDE,
+    MAX_SHORT_SIDE,
+    hamming,
+    prepare_image,
+)
+
+
+def _photo(width: int, height: int, fmt: str = "JPEG", quality: int = 95) -> bytes:
+    """Return a photo-like picture: a plate with food on a shaded table."""
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((width * 0.15, height * 0.1, width * 0.85, height * 0.9), fill=(235, 235, 230))
+    draw.ellipse((width * 0.3, height * 0.3, width * 0.55, height * 0.6), fill=(150, 90, 40))
+    draw.rectangle((width * 0.55, height * 0.45, width * 0.7, height * 0.7), fill=(60, 140, 60))
+    image = image.filter(ImageFilter.GaussianBlur(radius=max(1, width // 400)))
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def test_prepare_image_downscales_to_vision_resolution() -> None:
+    raw = _photo(3000, 2000)
+
+    prepared = prepare_image(raw)
+
+    assert prepared.original_size == len(raw)
+    assert prepared.width is not None and prepared.height is not None
+    assert min(prepared.width, prepared.height) <= MAX_SHORT_SIDE
+    assert max(prepared.width, prepared.height) <= MAX_LONG_SIDE
+    assert len(prepared.data) <= MAX_BYTES
+    assert len(prepared.data) < len(raw)
+    with Image.open(io.BytesIO(prepared.data)) as image:
+        assert image.format == "JPEG"
+
+
+def test_prepare_image_keeps_small_jpeg() -> None:
+    raw = _photo(320, 240, quality=20)
+
+    prepared = prepare_image(raw)
+
+    assert prepared.data == raw
+    assert prepared.phash is not None
+
+
+def test_prepare_image_converts_png() -> None:
+    raw = _photo(400, 300, fmt="PNG")
+
+    prepared = prepare_image(raw)
+
+    with Image.open(io.BytesIO(prepared.data)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (400, 300)
+
+
+def test_prepare_image_passes_undecodable_bytes_through() -> None:
+    prepared = prepare_image(b"img")
+
+    assert prepared.data == b"img"
+    assert prepared.phash is None
+
+
+def test_hash_survives_resize_and_recompression() -> None:
+    raw = _photo(1600, 1200)
+    with Image.open(io.BytesIO(raw)) as image:
+        smaller = image.resize((800, 600))
+    buffer = io.BytesIO()
+    smaller.save(buffer, format="JPEG", quality=60)
+
+    first = prepare_image(raw).phash
+    second = prepare_image(buffer.getvalue()).phash
+
+    assert first is not None and second is not None
+    assert hamming(first, second) <= 4
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app.diabetes.services import iob as iob_module
+from services.api.app.diabetes.services.db import Base, Entry, User
+from services.api.app.diabetes.services.iob import (
+    IOBEngine,
+    TreatmentState,
+    carbs_on_board_fraction,
+    insulin_on_board_fraction,
+    peak_minutes,
+)
+from services.api.app.diabetes.utils.calc_bolus import (
+    PatientProfile,
+    calc_bolus,
+    calc_bolus_table,
+)
+
+NOW = datetime.datetime(2025, 3, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def session_factory(monkeypatch: pytest.MonkeyPatch) -> sessionmaker[Session]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as session:
+        session.add(User(telegram_id=1, thread_id="tid"))
+        session.commit()
+    monkeypatch.setattr(iob_module, "SessionLocal", factory)
+    return factory
+
+
+def _add(
+    factory: sessionmaker[Session], minutes_ago: float, **fields: float
+) -> None:
+    with factory() as session:
+        session.add(
+            Entry(
+                telegram_id=1,
+                event_time=NOW - datetime.timedelta(minutes=minutes_ago),
+                **fields,
+            )
+        )
+        session.commit()
+
+
+def test_insulin_curve_shape() -> None:
+    minutes = np.array([-10, 0, 75, 120, 239, 240, 300])
+    fractions = insulin_on_board_fraction(minutes, 4.0, 75.0)
+
+    assert fractions[0] == 1.0
+    assert fractions[1] == pytest.approx(1.0)
+    assert np.all(np.diff(fractions[1:]) <= 0)
+    assert fractions[-2] == 0.0
+    assert fractions[-1] == 0.0
+    assert 0.3 < fractions[3] < 0.8
+
+
+def test_peak_is_clamped_for_short_dia() -> None:
+    assert peak_minutes("regular", 6.0) == 144.0
+    assert peak_minutes("lispro", 2.0) == 48.0
+    assert peak_minutes(None, 4.0) == 75.0
+
+
+def test_carbs_curve_is_linear() -> None:
+    fractions = carbs_on_board_fraction([0, 90, 180, 240], 180.0)
+    assert fractions.tolist() == [1.0, 0.5, 0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_engine_tracks_doses_incrementally(
+    session_factory: sessionmaker[Session],
+) -> None:
+    engine = IOBEngine()
+    _add(session_factory, 0, insulin_short=4.0, carbs_g=60.0)
+    _add(session_factory, 600, dose=10.0)  # outside DIA
+
+    first = await engine.on_board(1, dia=4.0, now=NOW)
+    assert first.iob == pytest.approx(4.0)
+    assert first.cob == pytest.approx(60.0)
+
+    _add(session_factory, 0, xe=1.0)
+    later = NOW + datetime.timedelta(minutes=90)
+    second = await engine.on_board(1, dia=4.0, now=later)
+
+    state = engine._state(1)
+    assert len(state.treatments) == 2
+    assert 0 < second.iob < 4.0
+    assert second.cob == pytest.approx((60.0 + 12.0) * 0.5)
+
+    engine.invalidate(1)
+    assert engine._state(1).last_id == 0
+
+
+@pytest.mark.asyncio
+async def test_engine_sees_edits_stamped_before_the_app_clock(
+    session_factory: sessionmaker[Session],
+) -> None:
+    # The database clock runs an hour behind the bot.
+    db_now = NOW - datetime.timedelta(hours=1)
+    with session_factory() as session:
+        session.add(
+            Entry(telegram_id=1, event_time=NOW, insulin_short=4.0, created_at=db_now)
+        )
+        session.commit()
+    engine = IOBEngine()
+    first = await engine.on_board(1, dia=4.0, now=NOW)
+    assert first.iob == pytest.approx(4.0)
+
+    with session_factory() as session:
+        entry = session.query(Entry).one()
+        entry.insulin_short = 2.0
+        entry.updated_at = db_now + datetime.timedelta(minutes=1)
+        session.commit()
+    second = await engine.on_board(1, dia=4.0, now=NOW)
+    assert second.iob == pytest.approx(2.0)
+
+
+def test_state_batch_curve_matches_single_points() -> None:
+    state = TreatmentState()
+    start = NOW.timestamp()
+    for i in range(20):
+        state.upsert(i + 1, NOW + datetime.timedelta(minutes=15 * i), 1.0, None)
+    points = start + np.arange(0, 600, 30) * 60.0
+
+    curve = state.iob_curve(points, 4.0, 75.0)
+
+    for at, value in zip(points, curve):
+        assert state.iob_curve(at, 4.0, 75.0)[0] == pytest.approx(value)
+
+
+def test_calc_bolus_table_matches_calc_bolus() -> None:
+    profile = PatientProfile(icr=12.0, cf=2.5, target_bg=6.0)
+    carbs = np.arange(0, 120, 7.0)
+    bgs = np.arange(3.0, 20.0, 0.7)
+
+    table = calc_bolus_table(carbs[:, None], bgs[None, :], profile, iob=0.6)
+
+    for i, c in enumerate(carbs):
+        for j, bg in enumerate(bgs):
+            assert table[i, j] == calc_bolus(float(c), float(bg), profile, iob=0.6)
+
+
+def test_calc_bolus_table_validates_input() -> None:
+    profile = PatientProfile(icr=12.0, cf=2.5, target_bg=6.0)
+    with pytest.raises(ValueError):
+        calc_bolus_table([-1.0], 5.0, profile)
+    with pytest.raises(ValueError):
+        calc_bolus_table([1.0], 5.0, profile, iob=-1.0)
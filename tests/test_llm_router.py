@@ -5,7 +5,7 @@ import pytest
 import types
 
 from services.api.app import config
-from services.api.app.diabetes.llm_router import LLMRouter, LLMTask
+from services.api.app.diabetes.llm_router import LLMBackend, LLMRouter, LLMTask
 from services.api.app.diabetes.services import gpt_client
 
 
@@ -56,3 +56,18 @@ async def test_create_learning_chat_completion_uses_router(
 
     assert captured["model"] == "gpt-4o-mini"
     assert observed == [LLMTask.EXPLAIN_STEP]
+
+
+def test_router_routes_photo_analysis_by_settings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = config.get_settings()
+    monkeypatch.setattr(settings, "vision_model", "gpt-4o")
+    router = LLMRouter()
+
+    monkeypatch.setattr(settings, "vision_backend", "assistants")
+    assert router.choose_backend(LLMTask.PHOTO_ANALYSIS) is LLMBackend.ASSISTANTS
+    monkeypatch.setattr(settings, "vision_backend", "chat")
+    assert router.choose_backend(LLMTask.PHOTO_ANALYSIS) is LLMBackend.CHAT
+    assert router.choose_model(LLMTask.PHOTO_ANALYSIS) == "gpt-4o"
+    assert router.choose_backend(LLMTask.EXPLAIN_STEP) is LLMBackend.CHAT
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from fastapi.testclient import TestClient
 
 from prometheus_client import CONTENT_TYPE_LATEST
@@ -36,6 +38,14 @@ def test_prometheus_metrics_endpoint(monkeypatch: pytest.MonkeyPatch) -> None:
     assert "lessons_started" in body
     assert "lessons_completed" in body
     assert "quiz_avg_score_sum" in body
+    for name in (
+        "handler_latency_seconds",
+        "db_call_wait_seconds",
+        "db_call_seconds",
+        "openai_request_seconds",
+        "openai_tokens_total",
+    ):
+        assert f"# TYPE {name}" in body
 
 
 def test_prometheus_metrics_requires_auth() -> None:
@@ -45,3 +55,22 @@ def test_prometheus_metrics_requires_auth() -> None:
         resp = client.get("/api/metrics")
 
     assert resp.status_code == 401
+
+
+def test_render_metrics_aggregates_multiprocess_dir(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    from prometheus_client import CollectorRegistry, Counter, values
+
+    from services.api.app.routers.metrics import render_metrics
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(values, "ValueClass", values.MultiProcessValue(lambda: 4242))
+    bot_counter = Counter(
+        "bot_process_counter", "Written by another process", registry=CollectorRegistry()
+    )
+    bot_counter.inc(3)
+
+    body = render_metrics().decode()
+
+    assert "bot_process_counter_total 3.0" in body
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, cast
+
+import pytest
+from telegram.error import Forbidden, RetryAfter
+
+from services.api.app.diabetes.metrics import outbound_retry_after_total
+from services.api.app.diabetes.utils import outbound
+from services.api.app.diabetes.utils.outbound import (
+    MessageDispatcher,
+    Priority,
+    TokenBucket,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Bot:
+    def __init__(
+        self,
+        *,
+        flood: dict[int | str, int] | None = None,
+        blocked: set[int | str] | None = None,
+    ) -> None:
+        self.sent: list[tuple[int | str, str]] = []
+        self.times: list[float] = []
+        self.flood = flood or {}
+        self.blocked = blocked or set()
+
+    async def send_message(self, chat_id: int | str, text: str, **kwargs: Any) -> str:
+        if chat_id in self.blocked:
+            raise Forbidden("blocked")
+        if self.flood.get(chat_id):
+            self.flood[chat_id] -= 1
+            raise RetryAfter(0.05)
+        self.sent.append((chat_id, text))
+        self.times.append(time.monotonic())
+        return text
+
+
+def test_token_bucket_refills_over_time() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(2.0, 2.0, clock=clock)
+
+    bucket.take()
+    bucket.take()
+    assert bucket.delay() == pytest.approx(0.5)
+    assert not bucket.idle
+
+    clock.now = 0.5
+    assert bucket.delay() == 0
+    clock.now = 10.0
+    assert bucket.idle
+
+
+def test_token_bucket_pause_and_reserve() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(1.0, 1.0, clock=clock)
+
+    bucket.pause(3.0)
+    assert bucket.delay() == pytest.approx(3.0)
+    clock.now = 3.0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_token_bucket_rejects_bad_rate() -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1)
+
+
+@pytest.mark.asyncio
+async def test_sos_overtakes_waiting_marketing() -> None:
+    dispatcher = MessageDispatcher(global_rate=50.0, global_burst=1.0)
+    bot = _Bot()
+
+    marketing = [
+        asyncio.create_task(
+            dispatcher.send(cast(Any, bot), i, "promo", priority=Priority.MARKETING)
+        )
+        for i in range(1, 5)
+    ]
+    sos = asyncio.create_task(
+        dispatcher.send(cast(Any, bot), 99, "sos", priority=Priority.SOS)
+    )
+    await asyncio.gather(*marketing, sos)
+
+    order = [chat_id for chat_id, _ in bot.sent]
+    assert order[0] == 1
+    assert order[1] == 99
+    assert sorted(order[2:]) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_global_rate_is_enforced() -> None:
+    dispatcher = MessageDispatcher(global_rate=100.0, global_burst=1.0)
+    bot = _Bot()
+
+    results = await dispatcher.broadcast(cast(Any, bot), list(range(10)), "hi")
+
+    assert len(results) == 10
+    assert bot.times[-1] - bot.times[0] >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_per_chat_rate_is_enforced() -> None:
+    dispatcher = MessageDispatcher(global_rate=1000.0, chat_rate=20.0, chat_burst=1.0)
+    bot = _Bot()
+
+    for _ in range(3):
+        await dispatcher.send(cast(Any, bot), 1, "hi")
+
+    assert bot.times[-1] - bot.times[0] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_and_retries() -> None:
+    dispatcher = MessageDispatcher(global_rate=1000.0, global_burst=10.0)
+    bot = _Bot(flood={1: 2})
+    before = outbound_retry_after_total._value.get()
+
+    started = time.monotonic()
+    assert await dispatcher.send(cast(Any, bot), 1, "hi") == "hi"
+
+    assert bot.sent == [(1, "hi")]
+    assert time.monotonic() - started >= 0.1
+    assert outbound_retry_after_total._value.get() - before == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_gives_up_after_max_retries() -> None:
+    dispatcher = MessageDispatcher(global_rate=1000.0, max_retries=1)
+    bot = _Bot(flood={1: 5})
+
+    with pytest.raises(RetryAfter):
+        await dispatcher.send(cast(Any, bot), 1, "hi")
+
+
+@pytest.mark.asyncio
+async def test_broadcast_dedupes_and_returns_errors() -> None:
+    dispatcher = MessageDispatcher(global_rate=1000.0, global_burst=100.0)
+    bot = _Bot(blocked={2})
+
+    results = await dispatcher.broadcast(cast(Any, bot), [1, 2, 1, 3], "hi")
+
+    assert results[0] == "hi"
+    assert isinstance(results[1], Forbidden)
+    assert results[2] == "hi"
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_send_message_uses_shared_dispatcher(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(outbound.settings, "outbound_global_rate", 5.0)
+    bot = _Bot()
+
+    await outbound.send_message(cast(Any, bot), 1, "hi", priority=Priority.SOS)
+
+    assert outbound.get_dispatcher() is outbound.get_dispatcher()
+    assert bot.sent == [(1, "hi")]
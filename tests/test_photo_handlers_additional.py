@@ -9,6 +9,7 @@ from typing import Any, cast
 from unittest.mock import AsyncMock
 
 import pytest
+from openai import OpenAIError
 from telegram import Update
 from telegram.ext import CallbackContext
 
@@ -17,6 +18,7 @@ os.environ.setdefault("OPENAI_ASSISTANT_ID", "asst_test")
 
 import services.api.app.diabetes.handlers.photo_handlers as photo_handlers
 import services.api.app.diabetes.utils.functions as functions
+from services.api.app.config import settings
 
 
 class DummyPhoto:
@@ -874,3 +876,103 @@ async def test_photo_handler_long_vision_text_parse_fail(
     assert message.docs
     assert any("слишком длинный" in t for t in message.texts)
     assert message.kwargs[-1].get("parse_mode") is None
+
+
+@pytest.mark.asyncio
+async def test_photo_handler_chat_backend_skips_assistants(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class DummyMessage:
+        def __init__(self) -> None:
+            self.photo = (DummyPhoto(),)
+            self.texts: list[str] = []
+            self.status = SimpleNamespace(delete=AsyncMock())
+
+        async def reply_text(self, text: str, **kwargs: Any) -> Any:
+            self.texts.append(text)
+            if text.startswith("🔍"):
+                return self.status
+            return None
+
+    class File:
+        async def download_as_bytearray(self) -> bytearray:
+            return bytearray(b"img")
+
+    analyze = AsyncMock(
+        return_value=(
+            "Гречка\nУглеводы: 45 г\nХЕ: 3.5",
+            functions.NutritionInfo(carbs_g=45, xe=3.5),
+        )
+    )
+    assistant = AsyncMock()
+    monkeypatch.setattr(settings, "vision_backend", "chat")
+    monkeypatch.setattr(photo_handlers, "analyze_photo", analyze)
+    monkeypatch.setattr(photo_handlers, "_assistant_vision", assistant)
+
+    message = DummyMessage()
+    update = cast(
+        Update,
+        SimpleNamespace(message=message, effective_user=SimpleNamespace(id=1)),
+    )
+    context = cast(
+        CallbackContext[Any, dict[str, Any], dict[str, Any], dict[str, Any]],
+        SimpleNamespace(
+            bot=SimpleNamespace(get_file=AsyncMock(return_value=File())),
+            user_data=MappingProxyType({}),
+        ),
+    )
+
+    result = await photo_handlers.photo_handler(update, context)
+
+    assert result == photo_handlers.PHOTO_SUGAR
+    analyze.assert_awaited_once()
+    assert analyze.await_args.args == (b"img",)
+    assistant.assert_not_called()
+    assert message.status.delete.called
+    user_data = photo_handlers._get_mutable_user_data(context)
+    assert user_data["pending_entry"]["carbs_g"] == 45
+    assert user_data["pending_entry"]["xe"] == 3.5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [OpenAIError("boom"), ValueError("bad json")])
+async def test_photo_handler_chat_backend_failure_deletes_status(
+    monkeypatch: pytest.MonkeyPatch, error: Exception
+) -> None:
+    class DummyMessage:
+        def __init__(self) -> None:
+            self.photo = (DummyPhoto(),)
+            self.texts: list[str] = []
+            self.status = SimpleNamespace(delete=AsyncMock())
+
+        async def reply_text(self, text: str, **kwargs: Any) -> Any:
+            self.texts.append(text)
+            if text.startswith("🔍"):
+                return self.status
+            return None
+
+    class File:
+        async def download_as_bytearray(self) -> bytearray:
+            return bytearray(b"img")
+
+    monkeypatch.setattr(settings, "vision_backend", "chat")
+    monkeypatch.setattr(photo_handlers, "analyze_photo", AsyncMock(side_effect=error))
+
+    message = DummyMessage()
+    update = cast(
+        Update,
+        SimpleNamespace(message=message, effective_user=SimpleNamespace(id=1)),
+    )
+    context = cast(
+        CallbackContext[Any, dict[str, Any], dict[str, Any], dict[str, Any]],
+        SimpleNamespace(
+            bot=SimpleNamespace(get_file=AsyncMock(return_value=File())),
+            user_data=MappingProxyType({}),
+        ),
+    )
+
+    result = await photo_handlers.photo_handler(update, context)
+
+    assert result == photo_handlers.END
+    assert message.status.delete.called
+    assert message.texts[-1].startswith("⚠️ Vision не смог")
@@ -39,6 +39,7 @@ from services.api.app.diabetes.handlers import (
 )
 from services.api.app.diabetes import assistant_state, learning_handlers
 from services.api.app.diabetes import commands
+from services.api.app.diabetes.user_session import UserSession
 from services.api.app.config import reload_settings
 
 dynamic_learning_handlers = learning_handlers
@@ -626,6 +627,34 @@ async def test_assistant_mode_timeout_clears_state(
     bot.send_message.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_assistant_mode_timeout_clears_user_session(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scheduled: dict[str, Any] = {}
+
+    def fake_run_repeating(self, callback: Any, *args: Any, **kwargs: Any) -> None:
+        if kwargs.get("name") == "assistant_mode_timeout":
+            scheduled["callback"] = callback
+
+    monkeypatch.setattr(JobQueue, "run_repeating", fake_run_repeating)
+
+    app = ApplicationBuilder().token("TESTTOKEN").build()
+    register_handlers(app)
+
+    session = UserSession(
+        {assistant_state.LAST_MODE_KEY: "chat", "thread_id": "tid"}
+    )
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    ctx = SimpleNamespace(application=SimpleNamespace(user_data={1: session}), bot=bot)
+
+    await scheduled["callback"](ctx)
+
+    assert dict(session) == {"thread_id": "tid"}
+    bot.send_message.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_assistant_mode_timeout_handles_telegram_error(
     monkeypatch: pytest.MonkeyPatch,
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import datetime as dt
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, cast
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from services.api.app.config import settings
+from services.api.app.diabetes.handlers import reminder_handlers, reminder_jobs
+from services.api.app.diabetes.services.db import Reminder
+from services.api.app.diabetes.utils.jobs import _remove_jobs
+from services.api.app.diabetes.utils.reminder_wheel import (
+    ReminderWheel,
+    WheelEntry,
+    get_wheel,
+    next_fire,
+)
+
+UTC = dt.timezone.utc
+MSK = ZoneInfo("Europe/Moscow")
+
+
+class _Queue:
+    def __init__(self) -> None:
+        self.daily: list[str] = []
+        self.repeating: list[dict[str, object]] = []
+
+    def get_jobs_by_name(self, name: str) -> list[object]:
+        return [job for job in self.repeating if job["name"] == name]
+
+    def run_daily(self, callback: object, **kwargs: Any) -> object:
+        self.daily.append(cast(str, kwargs["name"]))
+        return SimpleNamespace(**kwargs)
+
+    def run_repeating(self, callback: object, **kwargs: Any) -> object:
+        self.repeating.append({"callback": callback, **kwargs})
+        return SimpleNamespace(**kwargs)
+
+    def jobs(self) -> list[object]:
+        return []
+
+
+@pytest.fixture(autouse=True)
+def _clear_wheel() -> Iterator[None]:
+    get_wheel().clear()
+    yield
+    get_wheel().clear()
+
+
+def _entry(name: str, at: dt.time, **kwargs: Any) -> WheelEntry:
+    data: dict[str, object] = {"reminder_id": 1, "chat_id": 1}
+    return WheelEntry(name=name, data=data, at=at, tz=UTC, **kwargs)
+
+
+def test_next_fire_respects_timezone_and_days() -> None:
+    # Wednesday 2025-01-01 06:00 UTC is 09:00 in Moscow.
+    after = dt.datetime(2025, 1, 1, 6, 0, tzinfo=UTC)
+
+    assert next_fire(dt.time(8, 0), MSK, range(7), after) == dt.datetime(
+        2025, 1, 2, 5, 0, tzinfo=UTC
+    )
+    assert next_fire(dt.time(10, 0), MSK, range(7), after) == dt.datetime(
+        2025, 1, 1, 7, 0, tzinfo=UTC
+    )
+    # Only Mondays: the next one is 2025-01-06.
+    assert next_fire(dt.time(8, 0), MSK, (0,), after) == dt.datetime(
+        2025, 1, 6, 5, 0, tzinfo=UTC
+    )
+    assert next_fire(dt.time(8, 0), MSK, (), after) is None
+
+
+def test_pop_due_returns_bucket_and_rearms() -> None:
+    wheel = ReminderWheel()
+    now = dt.datetime(2025, 1, 1, 7, 59, 30, tzinfo=UTC)
+    wheel.add(_entry("reminder_1", dt.time(8, 0)), now=now)
+    wheel.add(_entry("reminder_2", dt.time(8, 0)), now=now)
+    wheel.add(_entry("reminder_3", dt.time(8, 1)), now=now)
+
+    assert wheel.pop_due(now) == []
+    due = wheel.pop_due(dt.datetime(2025, 1, 1, 8, 0, 1, tzinfo=UTC))
+
+    assert sorted(e.name for e in due) == ["reminder_1", "reminder_2"]
+    assert wheel.next_fire_at("reminder_1") == dt.datetime(2025, 1, 2, 8, 0, tzinfo=UTC)
+    assert len(wheel) == 3
+
+
+def test_replace_and_discard_skip_stale_heap_items() -> None:
+    wheel = ReminderWheel()
+    now = dt.datetime(2025, 1, 1, 7, 0, tzinfo=UTC)
+    wheel.add(_entry("reminder_1", dt.time(8, 0)), now=now)
+    wheel.add(_entry("reminder_1", dt.time(9, 0)), now=now)
+    wheel.add(_entry("reminder_2", dt.time(8, 0)), now=now)
+
+    assert wheel.discard(["reminder_2", "reminder_9"]) == 1
+    assert wheel.pop_due(dt.datetime(2025, 1, 1, 8, 0, 1, tzinfo=UTC)) == []
+    due = wheel.pop_due(dt.datetime(2025, 1, 1, 9, 0, 1, tzinfo=UTC))
+    assert [e.at for e in due] == [dt.time(9, 0)]
+
+
+def test_readd_after_minute_boundary_keeps_pending_fire() -> None:
+    wheel = ReminderWheel()
+    start = dt.datetime(2025, 1, 1, 7, 0, tzinfo=UTC)
+    wheel.add(_entry("reminder_1", dt.time(8, 0)), now=start)
+
+    # The reminders GC refreshes the entry after 08:00:00 but before the tick.
+    refreshed = wheel.add(
+        WheelEntry(name="reminder_1", data={"chat_id": 2}, at=dt.time(8, 0), tz=UTC),
+        now=dt.datetime(2025, 1, 1, 8, 0, 0, 500_000, tzinfo=UTC),
+    )
+
+    assert refreshed == dt.datetime(2025, 1, 1, 8, 0, tzinfo=UTC)
+    due = wheel.pop_due(dt.datetime(2025, 1, 1, 8, 0, 1, tzinfo=UTC))
+    assert [e.data for e in due] == [{"chat_id": 2}]
+    assert wheel.next_fire_at("reminder_1") == dt.datetime(2025, 1, 2, 8, 0, tzinfo=UTC)
+
+
+def test_bucketed_schedule_uses_wheel_and_single_tick(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "reminder_bucketed", True)
+    queue = _Queue()
+    user = SimpleNamespace(profile=None, timezone="Europe/Moscow")
+    for rid in (1, 2, 3):
+        rem = Reminder(
+            id=rid,
+            telegram_id=10 + rid,
+            type="sugar",
+            kind="at_time",
+            time=dt.time(8, 0),
+            is_enabled=True,
+        )
+        reminder_jobs.schedule_reminder(rem, cast(Any, queue), cast(Any, user))
+
+    assert queue.daily == []
+    assert [job["name"] for job in queue.repeating] == [
+        reminder_jobs.REMINDER_TICK_JOB_NAME
+    ]
+    assert len(get_wheel()) == 3
+    entry_tz = get_wheel().pop_due(dt.datetime.now(UTC) + dt.timedelta(days=2))[0].tz
+    assert entry_tz == MSK
+
+    assert _remove_jobs(cast(Any, queue), "reminder_2") == 1
+    assert "reminder_2" not in get_wheel()
+
+
+def test_default_mode_keeps_run_daily() -> None:
+    queue = _Queue()
+    rem = Reminder(
+        id=1, telegram_id=1, type="sugar", kind="at_time", time=dt.time(8, 0), is_enabled=True
+    )
+    user = SimpleNamespace(profile=None, timezone=None)
+
+    reminder_jobs.schedule_reminder(rem, cast(Any, queue), cast(Any, user))
+
+    assert queue.daily == ["reminder_1"]
+    assert len(get_wheel()) == 0
+
+
+@pytest.mark.asyncio
+async def test_tick_fires_due_reminders_in_batches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "reminder_bucket_batch_size", 2)
+    monkeypatch.setattr(settings, "reminder_bucket_jitter_sec", 0)
+    fired: list[object] = []
+
+    async def fake_fire(bot: object, data: dict[str, object]) -> None:
+        if data["reminder_id"] == 3:
+            raise RuntimeError("boom")
+        fired.append(data["reminder_id"])
+
+    monkeypatch.setattr(reminder_handlers, "fire_reminder", fake_fire)
+    past = dt.datetime.now(UTC) - dt.timedelta(days=1, minutes=1)
+    minute = (dt.datetime.now(UTC) - dt.timedelta(minutes=1)).time()
+    for rid in range(1, 6):
+        get_wheel().add(
+            WheelEntry(
+                name=f"reminder_{rid}",
+                data={"reminder_id": rid, "chat_id": rid},
+                at=minute,
+                tz=UTC,
+            ),
+            now=past,
+        )
+
+    await reminder_jobs.reminder_bucket_tick(cast(Any, SimpleNamespace(bot=object())))
+
+    assert sorted(cast(list[int], fired)) == [1, 2, 4, 5]
+    assert len(get_wheel()) == 5
+    assert all(
+        cast(dt.datetime, get_wheel().next_fire_at(f"reminder_{rid}")) > dt.datetime.now(UTC)
+        for rid in range(1, 6)
+    )
+
+
+def test_benchmark_wheel_20k_reminders_same_minute() -> None:
+    wheel = ReminderWheel()
+    now = dt.datetime(2025, 1, 1, 7, 0, tzinfo=UTC)
+    start = time.perf_counter()
+    for rid in range(20_000):
+        wheel.add(_entry(f"reminder_{rid}", dt.time(8, 0 if rid % 2 else 30)), now=now)
+    due = wheel.pop_due(dt.datetime(2025, 1, 1, 8, 0, 1, tzinfo=UTC))
+    elapsed = time.perf_counter() - start
+
+    assert len(due) == 10_000
+    assert len(wheel) == 20_000
+    assert elapsed < 5.0
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import datetime
+
+from services.api.app.diabetes.services.report_digest import DigestBuilder
+
+
+def _at(day: int, hour: int = 8) -> datetime.datetime:
+    return datetime.datetime(2025, 1, 1) + datetime.timedelta(days=day, hours=hour)
+
+
+def test_digest_aggregates_days_and_episodes() -> None:
+    builder = DigestBuilder(max_outliers=1)
+    builder.add(_at(0, 8), 5.0, carbs_g=40.0, dose=4.0)
+    builder.add(_at(0, 12), 2.5)
+    builder.add(_at(0, 13), 2.8)
+    builder.add(_at(0, 18), 15.0, xe=2.0)
+    builder.add(_at(1, 8), 7.0, dose=2.0)
+    builder.add(_at(1, 9), None, carbs_g=10.0)
+
+    digest = builder.build()
+
+    assert digest.entries == 6
+    assert digest.readings == 5
+    assert digest.time_in_range == 40.0
+    assert digest.hypo_episodes == 1
+    assert digest.hyper_episodes == 1
+    assert digest.carbs_total == 40.0 + 2.0 * 12 + 10.0
+    assert digest.insulin_total == 6.0
+    first = digest.days[0]
+    assert (first.sugar_min, first.sugar_max) == (2.5, 15.0)
+    assert first.sugar_mean == (5.0 + 2.5 + 2.8 + 15.0) / 4
+    assert [o.sugar for o in digest.outliers] == [2.5, 15.0]
+
+
+def test_digest_text_size_does_not_grow_with_period() -> None:
+    def build(days: int) -> str:
+        builder = DigestBuilder()
+        for day in range(days):
+            for hour in range(0, 24, 3):
+                builder.add(_at(day, hour), 4.0 + (day + hour) % 9, carbs_g=20.0)
+        return builder.build().text()
+
+    month = build(31)
+    year = build(365)
+
+    assert len(year.splitlines()) == len(month.splitlines())
+    assert len(year) < len(month) * 1.5
+
+
+def test_digest_version_tracks_data() -> None:
+    def digest(sugar: float) -> str:
+        builder = DigestBuilder()
+        builder.add(_at(0), sugar)
+        return builder.build().version
+
+    assert digest(6.0) == digest(6.0)
+    assert digest(6.0) != digest(6.5)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+
+def test_generate_pdf_report_consumes_generators() -> None:
+    from services.api.app.diabetes.services.reporting import generate_pdf_report
+
+    consumed: list[int] = []
+
+    def lines() -> Iterator[str]:
+        for i in range(50):
+            consumed.append(i)
+            yield f"line {i}"
+
+    pdf = generate_pdf_report(["summary"], iter(()), lines(), "", None)
+
+    assert consumed == list(range(50))
+    assert pdf.getvalue().startswith(b"%PDF")
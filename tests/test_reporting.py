@@ -335,41 +335,24 @@ async def test_send_report_uses_gpt(monkeypatch: pytest.MonkeyPatch) -> None:
     update: Any = SimpleNamespace(message=message, effective_user=SimpleNamespace(id=1))
     context: Any = SimpleNamespace(user_data={"thread_id": "tid"})
 
-    class Run:
-        status = "completed"
-        thread_id = "tid"
-        id = "rid"
-
-    async def fake_send_message(**kwargs: Any) -> Run:
-        return Run()
-
-    class DummyClient:
-        beta = SimpleNamespace(
-            threads=SimpleNamespace(
-                runs=SimpleNamespace(retrieve=lambda **kw: Run()),
-                messages=SimpleNamespace(
-                    list=lambda **kw: SimpleNamespace(
-                        data=[
-                            SimpleNamespace(
-                                role="assistant",
-                                content=[
-                                    SimpleNamespace(
-                                        text=SimpleNamespace(
-                                            value="Совет: пейте больше воды."
-                                        )
-                                    )
-                                ],
-                            )
-                        ]
-                    )
-                ),
-            )
+    prompts: list[str] = []
+
+    async def fake_completion(**kwargs: Any) -> Any:
+        prompts.append(kwargs["messages"][-1]["content"])
+        assert kwargs["task"] == "report"
+        return SimpleNamespace(
+            id="cmpl",
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="Совет: пейте больше воды.")
+                )
+            ],
         )
 
-    monkeypatch.setattr(handlers, "send_message", fake_send_message)
-    monkeypatch.setattr(handlers, "_get_client", lambda: DummyClient())
+    handlers._advice_cache.clear()
+    monkeypatch.setattr(handlers, "create_chat_completion", fake_completion)
     monkeypatch.setattr(
-        handlers, "make_sugar_plot", lambda entries, period_label: io.BytesIO(b"img")
+        handlers, "plot_sugar_series", lambda series, period_label: io.BytesIO(b"img")
     )
 
     await handlers.send_report(
@@ -384,3 +367,14 @@ async def test_send_report_uses_gpt(monkeypatch: pytest.MonkeyPatch) -> None:
     pdf_buf.seek(0)
     text = "".join(page.extract_text() for page in read_pdf(pdf_buf).pages)
     assert "пейте больше воды" in text
+    assert len(prompts) == 1
+    assert "Время в диапазоне" in prompts[0]
+
+    # The same period with unchanged data is served from the cache.
+    await handlers.send_report(
+        update,
+        context,
+        datetime.datetime(2025, 6, 1, tzinfo=datetime.timezone.utc),
+        "период",
+    )
+    assert len(prompts) == 1
@@ -1,11 +1,16 @@
 from types import SimpleNamespace, TracebackType
 from typing import Any, Callable
 
-import asyncio
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session as SASession, sessionmaker
 
+from services.api.app.diabetes.metrics import (
+    db_call_seconds,
+    db_call_wait_seconds,
+    get_metric_value,
+)
+from services.api.app.diabetes.services import db
 from services.api.app.diabetes.services.db import run_db
 
 
@@ -17,14 +22,14 @@ async def test_run_db_sqlite_in_memory(monkeypatch: pytest.MonkeyPatch) -> None:
 
         called = False
 
-        async def fake_to_thread(
-            fn: Callable[..., Any], *args: Any, **kwargs: Any
+        async def fake_run_in_executor(
+            name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any
         ) -> Any:
             nonlocal called
             called = True
             return fn(*args, **kwargs)
 
-        monkeypatch.setattr(asyncio, "to_thread", fake_to_thread)
+        monkeypatch.setattr(db, "run_in_executor", fake_run_in_executor)
 
         def work(session: SASession) -> int:
             return 42
@@ -60,21 +65,23 @@ async def test_run_db_postgres(monkeypatch: pytest.MonkeyPatch) -> None:
     def dummy_sessionmaker() -> DummySession:
         return DummySession()
 
-    called = False
+    called: str | None = None
 
-    async def fake_to_thread(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    async def fake_run_in_executor(
+        name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
         nonlocal called
-        called = True
+        called = name
         return fn(*args, **kwargs)
 
-    monkeypatch.setattr(asyncio, "to_thread", fake_to_thread)
+    monkeypatch.setattr(db, "run_in_executor", fake_run_in_executor)
 
     def work(session: SASession) -> int:
         return 42
 
     result = await run_db(work, sessionmaker=dummy_sessionmaker)
     assert result == 42
-    assert called is True
+    assert called == "db"
 
 
 @pytest.mark.asyncio
@@ -86,3 +93,108 @@ async def test_run_db_without_engine() -> None:
 
     with pytest.raises(RuntimeError, match="init_db"):
         await run_db(work, sessionmaker=Session)
+
+
+@pytest.mark.asyncio
+async def test_run_db_records_wait_and_execution_time() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    try:
+        Session = sessionmaker(bind=engine)
+
+        def timed_work(session: SASession) -> int:
+            return 1
+
+        def failing_work(session: SASession) -> int:
+            raise ValueError("boom")
+
+        prefix = "test_run_db.test_run_db_records_wait_and_execution_time"
+        ok = db_call_seconds.labels(function=f"{prefix}.timed_work", outcome="ok")
+        wait = db_call_wait_seconds.labels(function=f"{prefix}.timed_work")
+        error = db_call_seconds.labels(
+            function=f"{prefix}.failing_work", outcome="error"
+        )
+        ok_before = get_metric_value(ok, "count")
+        wait_before = get_metric_value(wait, "count")
+        error_before = get_metric_value(error, "count")
+
+        assert await run_db(timed_work, sessionmaker=Session) == 1
+        with pytest.raises(ValueError):
+            await run_db(failing_work, sessionmaker=Session)
+
+        assert get_metric_value(ok, "count") == ok_before + 1
+        assert get_metric_value(wait, "count") == wait_before + 1
+        assert get_metric_value(error, "count") == error_before + 1
+    finally:
+        engine.dispose()
+
+
+def _setup_counter_db() -> Any:
+    engine = create_engine("sqlite:///:memory:")
+    db.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_uow_shares_one_session_and_commits_on_exit() -> None:
+    engine = _setup_counter_db()
+    try:
+        Session = sessionmaker(bind=engine)
+        sessions: list[SASession] = []
+
+        def add_user(session: SASession) -> None:
+            sessions.append(session)
+            session.add(db.User(telegram_id=1, thread_id="t"))
+
+        def count_users(session: SASession) -> int:
+            sessions.append(session)
+            return session.query(db.User).count()
+
+        async with db.uow(Session):
+            await run_db(add_user, sessionmaker=Session)
+            assert await run_db(count_users, sessionmaker=Session) == 1
+
+        assert sessions[0] is sessions[1]
+        with Session() as session:
+            assert session.query(db.User).count() == 1
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_uow_rolls_back_when_block_raises() -> None:
+    engine = _setup_counter_db()
+    try:
+        Session = sessionmaker(bind=engine)
+
+        def add_user(session: SASession) -> None:
+            session.add(db.User(telegram_id=1, thread_id="t"))
+
+        with pytest.raises(ValueError):
+            async with db.uow(Session) as unit:
+                await unit.run(add_user)
+                raise ValueError("boom")
+
+        with Session() as session:
+            assert session.query(db.User).count() == 0
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_uow_other_sessionmaker_does_not_join() -> None:
+    engine = _setup_counter_db()
+    try:
+        Session = sessionmaker(bind=engine)
+        Other = sessionmaker(bind=engine)
+        sessions: list[SASession] = []
+
+        def remember(session: SASession) -> None:
+            sessions.append(session)
+
+        async with db.uow(Session) as unit:
+            await unit.run(remember)
+            await run_db(remember, sessionmaker=Other)
+
+        assert sessions[0] is not sessions[1]
+    finally:
+        engine.dispose()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api.app.diabetes import dynamic_tutor, step_cache
+from services.api.app.diabetes.metrics import (
+    learning_step_cache_hit,
+    learning_step_cache_miss,
+)
+from services.api.app.diabetes.models_learning import LearningStepCache
+from services.api.app.diabetes.prompts import build_system_prompt, profile_bucket
+from services.api.app.diabetes.services import db
+
+
+@pytest.fixture()
+def session_local(monkeypatch: pytest.MonkeyPatch) -> Iterator[sessionmaker[Session]]:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_local = sessionmaker(bind=engine, class_=Session)
+    db.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(step_cache, "SessionLocal", session_local)
+    step_cache.reset_memory()
+    yield session_local
+    step_cache.reset_memory()
+    engine.dispose()
+
+
+def test_profile_bucket_matches_system_prompt() -> None:
+    a = {"age_group": "adult", "learning_level": "novice", "diabetes_type": "T1"}
+    b = {**a, "age_group": "adult ", "name": "ignored"}
+    c = {**a, "age_group": "teen"}
+
+    assert profile_bucket(a) == profile_bucket(b)
+    assert build_system_prompt(a) == build_system_prompt(b)
+    assert profile_bucket(a) != profile_bucket(c)
+
+
+def test_step_key_ignores_user_specific_fields() -> None:
+    a = {"age_group": "adult", "diabetes_type": "T1"}
+    b = {"age_group": "adult", "diabetes_type": "T1", "user_id": "42"}
+
+    key = step_cache.step_key(a, "xe", 1, None)
+    assert key == step_cache.step_key(b, "xe_basics", 1, None)
+    assert key != step_cache.step_key(a, "xe", 2, None)
+    assert key != step_cache.step_key(a, "xe", 1, "summary")
+
+
+@pytest.mark.asyncio
+async def test_generate_step_text_shares_text_between_users(
+    monkeypatch: pytest.MonkeyPatch, session_local: sessionmaker[Session]
+) -> None:
+    calls = 0
+
+    async def fake_create_learning_chat_completion(**kwargs: object) -> str:
+        nonlocal calls
+        calls += 1
+        return f"step {calls}"
+
+    monkeypatch.setattr(
+        dynamic_tutor,
+        "create_learning_chat_completion",
+        fake_create_learning_chat_completion,
+    )
+    monkeypatch.setattr(dynamic_tutor.settings, "learning_shared_step_cache", True)
+    memory_hits = learning_step_cache_hit.labels(tier="memory")._value.get()
+    db_hits = learning_step_cache_hit.labels(tier="db")._value.get()
+    misses = learning_step_cache_miss._value.get()
+
+    first = await dynamic_tutor.generate_step_text(
+        {"age_group": "adult", "user": "1"}, "xe", 1, None
+    )
+    second = await dynamic_tutor.generate_step_text(
+        {"age_group": "adult", "user": "2"}, "xe", 1, None
+    )
+    step_cache.reset_memory()
+    third = await dynamic_tutor.generate_step_text({"age_group": "adult"}, "xe", 1, None)
+
+    assert first == second == third == "step 1"
+    assert calls == 1
+    assert learning_step_cache_miss._value.get() == misses + 1
+    assert learning_step_cache_hit.labels(tier="memory")._value.get() == memory_hits + 1
+    assert learning_step_cache_hit.labels(tier="db")._value.get() == db_hits + 1
+    with session_local() as session:
+        row = session.get(LearningStepCache, step_cache.step_key({"age_group": "adult"}, "xe", 1, None))
+        assert row is not None
+        assert row.topic_slug == "xe_basics"
+
+
+@pytest.mark.asyncio
+async def test_generate_step_text_skips_shared_cache_when_disabled(
+    monkeypatch: pytest.MonkeyPatch, session_local: sessionmaker[Session]
+) -> None:
+    async def fake_create_learning_chat_completion(**kwargs: object) -> str:
+        return "text"
+
+    monkeypatch.setattr(
+        dynamic_tutor,
+        "create_learning_chat_completion",
+        fake_create_learning_chat_completion,
+    )
+    monkeypatch.setattr(dynamic_tutor.settings, "learning_shared_step_cache", False)
+
+    assert await dynamic_tutor.generate_step_text({}, "xe", 1, None) == "text"
+
+    with session_local() as session:
+        assert session.query(LearningStepCache).count() == 0
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import pickle
+
+import pytest
+
+from services.api.app.diabetes import user_session
+from services.api.app.diabetes.user_session import UserSession, as_session
+
+
+def _sample() -> UserSession:
+    return UserSession(
+        {
+            "tg_init_data": "init",
+            "pending_entry": {"sugar_before": 5.5},
+            "assistant_history": ["user: q\nassistant: a"],
+            "assistant_summary": "s",
+            "learning_plan": ["step"],
+            "custom": [1, 2],
+        }
+    )
+
+
+def test_behaves_like_dict() -> None:
+    session = _sample()
+    assert session == {
+        "tg_init_data": "init",
+        "pending_entry": {"sugar_before": 5.5},
+        "assistant_history": ["user: q\nassistant: a"],
+        "assistant_summary": "s",
+        "learning_plan": ["step"],
+        "custom": [1, 2],
+    }
+    assert session.pop("custom") == [1, 2]
+    assert session.setdefault("waiting_labs", True) is True
+    assert "custom" not in session
+    assert dict(session.copy()) == dict(session)
+
+
+def test_pickle_round_trip_keeps_sections_packed() -> None:
+    restored = pickle.loads(pickle.dumps(_sample()))
+
+    assert restored["tg_init_data"] == "init"
+    assert set(restored._packed) == {"assistant", "learning"}
+    assert restored["assistant_summary"] == "s"
+    assert set(restored._packed) == {"learning"}
+    assert restored == _sample()
+    assert not restored._packed
+
+
+def test_untouched_section_is_written_back_as_is() -> None:
+    restored = pickle.loads(pickle.dumps(_sample()))
+    restored["tg_init_data"] = "new"
+
+    again = pickle.loads(pickle.dumps(restored))
+    assert again["tg_init_data"] == "new"
+    assert again["learning_plan"] == ["step"]
+
+
+def test_private_keys_are_not_persisted() -> None:
+    session = _sample()
+    session["_task"] = asyncio.Event()
+    restored = copy.deepcopy(session)
+    assert "_task" in session
+    assert "_task" not in restored
+
+
+def test_lists_are_bounded() -> None:
+    session = UserSession()
+    session["assistant_history"] = [str(i) for i in range(user_session.HISTORY_LIMIT + 5)]
+    history = session["assistant_history"]
+    assert isinstance(history, list)
+    assert len(history) == user_session.HISTORY_LIMIT
+    assert history[0] == "5"
+
+    history.extend(["x"] * 10)
+    restored = pickle.loads(pickle.dumps(session))
+    restored_history = restored["assistant_history"]
+    assert isinstance(restored_history, list)
+    assert len(restored_history) == user_session.HISTORY_LIMIT
+    assert restored_history[-1] == "x"
+
+
+def test_tuples_keep_their_type() -> None:
+    session = UserSession({"edit_query": {"range": (1, 2)}, "custom": (3, 4)})
+    restored = pickle.loads(pickle.dumps(session))
+    assert restored["edit_query"] == {"range": (1, 2)}
+    assert restored["custom"] == (3, 4)
+    assert restored == session
+
+
+def test_typed_properties() -> None:
+    session = _sample()
+    assert session.tg_init_data == "init"
+    assert session.pending_entry == {"sugar_before": 5.5}
+    assert session.lesson_id is None
+    assert session.learning_plan == ["step"]
+    assert session.learning_plan_index == 0
+
+    session["thread_id"] = 42
+    assert session.thread_id is None
+    session.thread_id = "t"
+    assert session["thread_id"] == "t"
+    session.pending_entry = None
+    assert "pending_entry" not in session
+
+
+def test_default_list_is_stored() -> None:
+    session = UserSession()
+    session.assistant_history.append("user: q")
+    assert session["assistant_history"] == ["user: q"]
+
+
+def test_newer_version_is_dropped() -> None:
+    core, packed = _sample()._dump()
+    broken = bytes([user_session.SCHEMA_VERSION + 1]) + core[1:]
+    assert dict(user_session._restore(broken, packed)) == {}
+
+
+def test_older_version_is_upgraded(monkeypatch: pytest.MonkeyPatch) -> None:
+    raw = pickle.dumps(_sample())
+    index = user_session._BY_KEY["tg_init_data"][0]
+
+    def upgrade(values: dict[object, object]) -> dict[object, object]:
+        if index in values:
+            values[index] = f"v2:{values[index]}"
+        return values
+
+    version = user_session.SCHEMA_VERSION
+    monkeypatch.setattr(user_session, "SCHEMA_VERSION", version + 1)
+    monkeypatch.setattr(user_session, "UPGRADES", {version: upgrade})
+
+    restored = pickle.loads(raw)
+    assert restored.tg_init_data == "v2:init"
+    assert restored.learning_plan == ["step"]
+
+
+def test_missing_upgrade_is_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    raw = pickle.dumps(_sample())
+    monkeypatch.setattr(user_session, "SCHEMA_VERSION", user_session.SCHEMA_VERSION + 1)
+    assert dict(pickle.loads(raw)) == {}
+
+
+def test_as_session_converts_dicts() -> None:
+    session = _sample()
+    assert as_session(session) is session
+    data: dict[str, object] = {"edit_id": 3}
+    converted = as_session(data)
+    assert isinstance(converted, UserSession)
+    assert converted["edit_id"] == 3
+    converted.tg_init_data = "init"
+    assert data["tg_init_data"] == "init"
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, cast
+from unittest.mock import AsyncMock
+
+import pytest
+from telegram import Update
+from telegram.ext import CallbackContext
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_ASSISTANT_ID", "asst_test")
+
+import services.api.app.diabetes.handlers.photo_handlers as photo_handlers
+import services.api.app.diabetes.utils.functions as functions
+from services.api.app.config import settings
+from services.api.app.diabetes import vision_cache
+from services.api.app.diabetes.utils.image_pipeline import PreparedImage
+
+
+def test_lookup_matches_near_hash_of_same_user() -> None:
+    vision_cache.store(1, 0b1011, "a" * 64, "гречка")
+
+    assert vision_cache.lookup(1, 0b1001, "b" * 64) == "гречка"
+    assert vision_cache.lookup(1, 0xFFFF_0000, "b" * 64) is None
+
+
+def test_lookup_shares_only_identical_images_between_users() -> None:
+    vision_cache.store(1, 0b1011, "a" * 64, "гречка")
+
+    assert vision_cache.lookup(2, 0b1011, "a" * 64) == "гречка"
+    # Same perceptual hash, different bytes: another user's plate.
+    assert vision_cache.lookup(2, 0b1011, "b" * 64) is None
+
+
+def test_global_tier_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "vision_cache_size", 2)
+    for phash in (1 << 10, 1 << 20, 1 << 30):
+        vision_cache.store(phash, phash, str(phash), f"text-{phash}")
+
+    assert vision_cache.lookup(99, 1 << 10, str(1 << 10)) is None
+    assert vision_cache.lookup(99, 1 << 30, str(1 << 30)) == f"text-{1 << 30}"
+
+
+def test_disabled_cache_stores_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "vision_cache_size", 0)
+    vision_cache.store(1, 0b1011, "a" * 64, "гречка")
+
+    assert vision_cache.lookup(1, 0b1011, "a" * 64) is None
+
+
+@pytest.mark.asyncio
+async def test_photo_handler_answers_repeated_photo_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class DummyMessage:
+        def __init__(self) -> None:
+            self.photo = (SimpleNamespace(file_id="fid"),)
+            self.texts: list[str] = []
+
+        async def reply_text(self, text: str, **kwargs: Any) -> None:
+            self.texts.append(text)
+
+    class File:
+        async def download_as_bytearray(self) -> bytearray:
+            return bytearray(b"img")
+
+    async def fake_prepare(file_bytes: bytes) -> PreparedImage:
+        return PreparedImage(
+            data=file_bytes, original_size=len(file_bytes), phash=42, digest="d"
+        )
+
+    vision = AsyncMock(return_value=("Гречка 150 г, 30 г углеводов", None))
+    monkeypatch.setattr(photo_handlers, "_prepare_photo", fake_prepare)
+    monkeypatch.setattr(photo_handlers, "_assistant_vision", vision)
+    monkeypatch.setattr(
+        photo_handlers,
+        "extract_nutrition_info",
+        lambda text: functions.NutritionInfo(carbs_g=30, xe=2.5),
+    )
+
+    async def handle() -> tuple[int, DummyMessage]:
+        message = DummyMessage()
+        update = cast(
+            Update,
+            SimpleNamespace(message=message, effective_user=SimpleNamespace(id=1)),
+        )
+        context = cast(
+            CallbackContext[Any, dict[str, Any], dict[str, Any], dict[str, Any]],
+            SimpleNamespace(
+                bot=SimpleNamespace(get_file=AsyncMock(return_value=File())),
+                user_data=MappingProxyType({}),
+            ),
+        )
+        return await photo_handlers.photo_handler(update, context), message
+
+    first, _ = await handle()
+    second, message = await handle()
+
+    assert first == second == photo_handlers.PHOTO_SUGAR
+    vision.assert_awaited_once()
+    assert "Гречка 150 г" in message.texts[-1]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from services.api.app.diabetes.metrics import (
+    executor_rejected_total,
+    get_metric_value,
+)
+from services.api.app.diabetes.utils import executors
+from services.api.app.diabetes.utils.executors import (
+    BoundedExecutor,
+    ExecutorSaturatedError,
+)
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_in_named_thread_with_context() -> None:
+    var: contextvars.ContextVar[str] = contextvars.ContextVar("var")
+    var.set("request-1")
+    executor = BoundedExecutor("test_named", workers=1)
+    try:
+        name, value = await executor.run(
+            lambda: (threading.current_thread().name, var.get())
+        )
+    finally:
+        executor.shutdown()
+
+    assert name.startswith("test_named-executor")
+    assert value == "request-1"
+    assert executor.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_workers() -> None:
+    executor = BoundedExecutor("test_bounds", workers=2, queue_size=4)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+
+    try:
+        await asyncio.gather(*(executor.run(work) for _ in range(6)))
+    finally:
+        executor.shutdown()
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_saturated() -> None:
+    executor = BoundedExecutor("test_saturated", workers=1, queue_timeout=0.05)
+    release = threading.Event()
+    rejected = executor_rejected_total.labels(executor="test_saturated")
+    before = get_metric_value(rejected)
+
+    try:
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: None)
+        release.set()
+        assert await blocked is True
+        # The slot is free again once the blocking call has finished.
+        assert await executor.run(lambda: 42) == 42
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert get_metric_value(rejected) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_get_executor_uses_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    executors.shutdown_executors()
+    monkeypatch.setattr(executors.settings, "executor_openai_workers", 3)
+    monkeypatch.setattr(executors.settings, "executor_queue_size", 5)
+    try:
+        executor = executors.get_executor("openai_sync")
+        assert executors.get_executor("openai_sync") is executor
+        assert executor.workers == 3
+        assert executor.capacity == 8
+        assert await executors.run_in_executor("openai_sync", sum, [1, 2]) == 3
+    finally:
+        executors.shutdown_executors()